@@ -1,7 +1,12 @@
 """Notebook command group."""
 
+import contextlib
+import json
+import os
 import sys
+from collections.abc import Collection
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
 
@@ -18,6 +23,27 @@ from ai_kit.cli.utils.prompts import (
     prompt_purpose,
 )
 
+if TYPE_CHECKING:
+    from ai_kit.cli.core.migrations import MigrationRegistry
+
+
+@contextlib.contextmanager
+def _events_output(events: str, events_file: Path | None):
+    """Stream of JSON lines events, or None for the live display.
+
+    When events go to stdout, all other output goes to stderr for the duration,
+    so that stdout stays valid JSON lines.
+    """
+    if events != "jsonl":
+        yield None
+    elif events_file:
+        with open(events_file, "a", encoding="utf-8") as stream:
+            yield stream
+    else:
+        stream = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            yield stream
+
 
 @click.group()
 def notebook():
@@ -187,64 +213,500 @@ def show_stats():
 @click.argument("output_notebook", type=click.Path(path_type=Path))
 @click.option("-p", "--parameter", multiple=True, help="Parameter in key=value format")
 @click.option("--kernel", default=None, help="Kernel name (default: python3)")
-def run(input_notebook: Path, output_notebook: Path, parameter: tuple, kernel: str):
+@click.option(
+    "--events",
+    type=click.Choice(["rich", "jsonl"]),
+    default="rich",
+    show_default=True,
+    help="How to stream execution events: live display or JSON lines",
+)
+@click.option(
+    "--events-file",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Write JSON lines events to this file instead of stdout",
+)
+@click.option(
+    "--flush-every",
+    type=click.IntRange(min=0),
+    default=30,
+    show_default=True,
+    help="Seconds between saves of the partially executed notebook (0 disables)",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Maximum wall-clock seconds for the whole run",
+)
+@click.option(
+    "--cell-timeout",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Maximum seconds for a single cell",
+)
+@click.option("--max-rss", default=None, help="Maximum kernel memory, e.g. 512M or 4G")
+@click.option("--max-output-bytes", default=None, help="Maximum total output size, e.g. 50M")
+@click.option(
+    "--output-budget",
+    default="8M",
+    show_default=True,
+    help="Output kept in the notebook, beyond which it is truncated (0 disables)",
+)
+@click.option(
+    "--cell-output-budget",
+    default=None,
+    help="Output kept per cell, beyond which it is truncated, e.g. 1M",
+)
+@click.option(
+    "--spill-outputs",
+    is_flag=True,
+    help="Write truncated output to <output>.overflow.jsonl instead of dropping it",
+)
+def run(
+    input_notebook: Path,
+    output_notebook: Path,
+    parameter: tuple,
+    kernel: str,
+    events: str,
+    events_file: Path | None,
+    flush_every: int,
+    timeout: float | None,
+    cell_timeout: int | None,
+    max_rss: str | None,
+    max_output_bytes: str | None,
+    output_budget: str,
+    cell_output_budget: str | None,
+    spill_outputs: bool,
+):
     """Run notebook with papermill (parameterized execution).
 
+    Cell progress, stdout/stderr and elapsed time are streamed while the
+    notebook runs, either to a live display or as JSON lines (--events jsonl)
+    that a job runner can tail.
+
+    Resource limits are enforced on the kernel process. Peak RSS, CPU seconds
+    and output bytes are recorded in the output notebook metadata and printed
+    when the run ends.
+
+    Stream and display outputs beyond the output budgets are truncated while
+    the notebook runs, with a marker in the affected cells, so noisy cells
+    cannot produce an oversized notebook.
+
     Example:
         just notebook run input.ipynb output.ipynb -p start_date=2024-01-01
+        just notebook run input.ipynb output.ipynb --events jsonl --events-file run.jsonl
+        just notebook run input.ipynb output.ipynb --timeout 3600 --max-rss 4G
+        just notebook run input.ipynb output.ipynb --cell-output-budget 1M --spill-outputs
     """
-    try:
-        import papermill as pm
-    except ImportError:
-        print_error("papermill is not installed. Install with: uv add ipykernel papermill")
-        sys.exit(1)
+    with _events_output(events, events_file) as events_stream:
+        try:
+            from ai_kit.cli.core.execution import (
+                JsonlEventWriter,
+                OutputBudget,
+                ResourceLimits,
+                parse_parameters,
+                parse_size,
+                run_notebook,
+            )
+        except ImportError:
+            print_error("papermill is not installed. Install with: uv add ipykernel papermill")
+            sys.exit(1)
 
-    # Parse parameters
-    params = {}
-    for param in parameter:
-        if "=" not in param:
-            print_error(f"Invalid parameter format: {param}. Use key=value")
+        from ai_kit.cli.utils.output import ExecutionProgress, print_resource_usage
+
+        # Parse parameters and limits
+        try:
+            params = parse_parameters(parameter)
+            limits = ResourceLimits(
+                timeout=timeout,
+                cell_timeout=cell_timeout,
+                max_rss=parse_size(max_rss) if max_rss else None,
+                max_output_bytes=parse_size(max_output_bytes) if max_output_bytes else None,
+            )
+            budget = OutputBudget(
+                cell_bytes=parse_size(cell_output_budget) if cell_output_budget else None,
+                notebook_bytes=parse_size(output_budget),
+                spill_path=(
+                    output_notebook.with_suffix(".overflow.jsonl") if spill_outputs else None
+                ),
+            )
+        except ValueError as e:
+            print_error(str(e))
             sys.exit(1)
-        key, value = param.split("=", 1)
-        # Try to parse as number or boolean
-        if value.lower() == "true":
-            params[key] = True
-        elif value.lower() == "false":
-            params[key] = False
-        elif value.isdigit():
-            params[key] = int(value)
-        else:
-            try:
-                params[key] = float(value)
-            except ValueError:
-                params[key] = value
 
-    print(f"Executing notebook: {input_notebook}")
-    if params:
-        print(f"Parameters: {params}")
+        # Keep the final event to print the resource summary
+        completed = []
+
+        def record_completion(event):
+            if event.type == "notebook_complete":
+                completed.append(event)
+
+        print(f"Executing notebook: {input_notebook}")
+        if params:
+            print(f"Parameters: {params}")
+
+        with contextlib.ExitStack() as stack:
+            if events_stream is not None:
+                handler = JsonlEventWriter(events_stream)
+            else:
+                handler = stack.enter_context(ExecutionProgress())
+
+            try:
+                run_notebook(
+                    input_notebook,
+                    output_notebook,
+                    parameters=params,
+                    kernel_name=kernel,
+                    event_handlers=[handler, record_completion],
+                    flush_every=flush_every,
+                    limits=limits,
+                    budget=budget,
+                )
+            except Exception as e:
+                stack.close()
+                print_error(f"Failed to execute notebook: {e}")
+                if completed:
+                    print_resource_usage(completed[-1].data["resources"])
+                sys.exit(1)
 
-    try:
-        pm.execute_notebook(
-            str(input_notebook),
-            str(output_notebook),
-            parameters=params,
-            kernel_name=kernel,
-        )
         print_success(f"Notebook executed successfully: {output_notebook}")
+        if completed:
+            print_resource_usage(completed[-1].data["resources"])
         print("\nNext steps:")
         print(f"  - Review output: jupyter notebook {output_notebook}")
         print(f"  - Convert to report: just notebook convert {output_notebook} html")
-    except Exception as e:
-        print_error(f"Failed to execute notebook: {e}")
+
+
+@notebook.command("fan-out")
+@click.argument("input_notebook", type=click.Path(exists=True, path_type=Path))
+@click.argument("output_dir", type=click.Path(file_okay=False, path_type=Path))
+@click.option(
+    "--vary",
+    multiple=True,
+    help="Variant values in name=value1,value2 format (repeat for combinations)",
+)
+@click.option(
+    "--variants",
+    "variants_file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="JSON file with a list of parameter sets, one per output notebook",
+)
+@click.option("-p", "--parameter", multiple=True, help="Shared parameter in key=value format")
+@click.option("--kernel", default=None, help="Kernel name (default: the notebook's kernel)")
+@click.option(
+    "--marker",
+    default="fan-out",
+    show_default=True,
+    help="Tag of the last cell of the shared part",
+)
+@click.option(
+    "--events",
+    type=click.Choice(["rich", "jsonl"]),
+    default="rich",
+    show_default=True,
+    help="How to stream execution events: live display or JSON lines",
+)
+@click.option(
+    "--events-file",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Write JSON lines events to this file instead of stdout",
+)
+def fan_out(
+    input_notebook: Path,
+    output_dir: Path,
+    vary: tuple,
+    variants_file: Path | None,
+    parameter: tuple,
+    kernel: str | None,
+    marker: str,
+    events: str,
+    events_file: Path | None,
+):
+    """Run the shared part of a notebook once and render it for many variants.
+
+    Cells up to and including the first cell tagged with the marker (default
+    "fan-out") run once. Each variant then runs the remaining cells from a
+    snapshot of the kernel state, producing one output notebook per variant
+    in OUTPUT_DIR.
+
+    Example:
+        just notebook fan-out reporting/monthly.ipynb output/ --vary department=75,69,13
+        just notebook fan-out reporting/monthly.ipynb output/ --variants recipients.json
+    """
+    with _events_output(events, events_file) as events_stream:
+        try:
+            from ai_kit.cli.core.execution import (
+                JsonlEventWriter,
+                parse_parameters,
+                parse_variants,
+                run_fan_out,
+            )
+        except ImportError:
+            print_error("papermill is not installed. Install with: uv add ipykernel papermill")
+            sys.exit(1)
+
+        from ai_kit.cli.utils.output import ExecutionProgress
+
+        # Collect variants from --vary and --variants
+        try:
+            params = parse_parameters(parameter)
+            variants = parse_variants(vary) if vary else []
+            if variants_file:
+                with open(variants_file, encoding="utf-8") as f:
+                    loaded = json.load(f)
+                if not isinstance(loaded, list) or not all(isinstance(v, dict) for v in loaded):
+                    raise ValueError(f"{variants_file} must contain a JSON list of objects")
+                variants.extend(loaded)
+        except ValueError as e:
+            print_error(str(e))
+            sys.exit(1)
+
+        if not variants:
+            print_error("No variants given. Use --vary name=value1,value2 or --variants FILE")
+            sys.exit(1)
+
+        print(f"Fanning out notebook: {input_notebook} ({len(variants)} variants)")
+        if params:
+            print(f"Shared parameters: {params}")
+
+        results = []
+        with contextlib.ExitStack() as stack:
+            if events_stream is not None:
+                handler = JsonlEventWriter(events_stream)
+            else:
+                handler = stack.enter_context(ExecutionProgress())
+
+            try:
+                results = run_fan_out(
+                    input_notebook,
+                    output_dir,
+                    variants,
+                    parameters=params,
+                    kernel_name=kernel,
+                    marker=marker,
+                    event_handlers=[handler],
+                )
+            except Exception as e:
+                stack.close()
+                print_error(f"Failed to execute shared cells: {e}")
+                sys.exit(1)
+
+        failed = [result for result in results if result.status != "completed"]
+        for result in results:
+            if result.status == "completed":
+                print_success(f"{result.output_path}")
+            else:
+                print_error(f"{result.output_path}: {result.error}")
+
+        if failed:
+            print_error(f"{len(failed)} of {len(results)} variants failed")
+            sys.exit(1)
+        print_success(f"Rendered {len(results)} notebooks in {output_dir}")
+
+
+@notebook.command()
+@click.option("--once", is_flag=True, help="Run due notebooks once and exit")
+@click.option("--list", "list_only", is_flag=True, help="List scheduled notebooks and exit")
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help="Maximum notebooks running at the same time",
+)
+@click.option(
+    "--interval",
+    type=click.IntRange(min=1),
+    default=60,
+    show_default=True,
+    help="Seconds between schedule checks",
+)
+@click.option(
+    "--catch-up",
+    type=click.Choice(["all", "latest", "skip"]),
+    default="latest",
+    show_default=True,
+    help="Missed runs: replay all, run the latest only, or skip them",
+)
+@click.option(
+    "--grace",
+    type=click.IntRange(min=0),
+    default=300,
+    show_default=True,
+    help="Seconds after which a fire time counts as missed",
+)
+@click.option(
+    "--state-file",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Scheduler state file (default: .ai-kit/scheduler-state.json)",
+)
+@click.option(
+    "--output-dir",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Directory for executed reports (default: output/reports)",
+)
+def scheduler(
+    once: bool,
+    list_only: bool,
+    jobs: int,
+    interval: int,
+    catch_up: str,
+    grace: int,
+    state_file: Path | None,
+    output_dir: Path | None,
+):
+    """Run reporting notebooks on their schedule.
+
+    Reporting notebooks declare a cron schedule in their metadata cell,
+    e.g. **Schedule**: 0 8 * * 1 (Mondays at 08:00) or @daily. Notebooks seen
+    for the first time start their schedule now; the last run of each notebook
+    is persisted so restarts do not run a report twice.
+
+    Example:
+        just notebook scheduler
+        just notebook scheduler --once --catch-up all
+        just notebook scheduler --list
+    """
+    from datetime import datetime
+
+    from ai_kit.cli.core.config import get_notebooks_dir
+    from ai_kit.cli.core.scheduler import Scheduler
+    from ai_kit.cli.utils.output import print_warning
+
+    notebooks_dir = get_notebooks_dir()
+    if not notebooks_dir.exists():
+        print_error(f"Notebooks directory not found: {notebooks_dir}")
         sys.exit(1)
 
+    repo_root = notebooks_dir.parent
+    runner = Scheduler(
+        notebooks_dir,
+        state_path=state_file or repo_root / ".ai-kit" / "scheduler-state.json",
+        output_dir=output_dir or repo_root / "output" / "reports",
+        max_jobs=jobs,
+        catch_up=catch_up,
+        grace=grace,
+    )
+
+    if list_only:
+        scheduled = runner.scan()
+        for warning in runner.warnings:
+            print_warning(f"Invalid schedule: {warning}")
+        if not scheduled:
+            print("No scheduled reporting notebooks found")
+            print("\nAdd a schedule to the metadata cell, e.g. **Schedule**: 0 8 * * 1")
+            return
+        print("\nScheduled notebooks:\n")
+        now = datetime.now()
+        for item in scheduled:
+            next_run = item.schedule.next_after(now).strftime("%Y-%m-%d %H:%M")
+            print(f"  - {item.path.name}: {item.schedule.expression} (next: {next_run})")
+        return
+
+    def report(run):
+        if run.status == "completed":
+            print_success(
+                f"{run.notebook.path.name} ({run.scheduled_for:%Y-%m-%d %H:%M}): {run.output_path}"
+            )
+        else:
+            print_error(
+                f"{run.notebook.path.name} ({run.scheduled_for:%Y-%m-%d %H:%M}): {run.error}"
+            )
+
+    try:
+        if once:
+            runs = runner.run_pending(on_complete=report)
+            for warning in runner.warnings:
+                print_warning(f"Invalid schedule: {warning}")
+            print(f"\n{len(runs)} scheduled run(s) executed")
+            if any(run.status == "failed" for run in runs):
+                sys.exit(1)
+        else:
+            print(f"Scheduler started (checking every {interval}s, {jobs} concurrent jobs)")
+            runner.serve(interval=interval, on_complete=report)
+    except KeyboardInterrupt:
+        print("\nScheduler stopped")
+
 
 @notebook.command()
-@click.argument("input_notebook", type=click.Path(exists=True, path_type=Path))
-@click.argument("format", type=click.Choice(["html", "pdf", "markdown", "script", "slides"]))
+@click.argument("inputs", nargs=-1, required=True)
+@click.argument("format")
 @click.option("-o", "--output", type=click.Path(path_type=Path), help="Output file path")
-def convert(input_notebook: Path, format: str, output: Path):
-    """Convert notebook to another format with nbconvert.
+@click.option(
+    "-d",
+    "--output-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Directory for the outputs (default: next to each notebook)",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Worker processes for many notebooks (default: CPU count)",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Conversion cache directory (default: .ai-kit/convert-cache)",
+)
+@click.option(
+    "--cache-size",
+    type=click.IntRange(min=0),
+    default=1024,
+    show_default=True,
+    help="Maximum cache size in MB, least recently used outputs are evicted first",
+)
+@click.option(
+    "--no-cache", is_flag=True, help="Always convert, without reading or updating the cache"
+)
+@click.option("--force", is_flag=True, help="Convert even when outputs are up to date")
+@click.option(
+    "--extract-images",
+    is_flag=True,
+    help="HTML only: write images to separate files instead of inlining them",
+)
+@click.option(
+    "--images-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Directory for extracted images (default: images/ in the output directory)",
+)
+def convert(
+    inputs: tuple,
+    format: str,
+    output: Path,
+    output_dir: Path | None,
+    jobs: int | None,
+    cache_dir: Path | None,
+    cache_size: int,
+    no_cache: bool,
+    force: bool,
+    extract_images: bool,
+    images_dir: Path | None,
+):
+    """Convert notebooks to other formats with nbconvert.
+
+    INPUTS can be notebooks, directories (searched recursively) or glob
+    patterns. Many notebooks are converted in parallel, each worker process
+    reusing one exporter per format, and a summary of sizes and times is printed.
+
+    FORMAT can list several formats separated by commas: each notebook is then
+    read and preprocessed once and exported to all of them.
+
+    Conversions are incremental: outputs built from the same notebook content,
+    format, exporter version and options are skipped or restored from the
+    conversion cache, which CI can keep between runs.
+
+    With --extract-images, HTML images are written once to content-addressed
+    files shared by all converted notebooks, and pages are streamed to disk.
 
     Formats:
         html      - HTML report (default)
@@ -256,85 +718,129 @@ def convert(input_notebook: Path, format: str, output: Path):
     Example:
         just notebook convert output.ipynb html
         just notebook convert output.ipynb pdf -o report.pdf
+        just notebook convert output.ipynb html,markdown,script
+        just notebook convert notebooks/reporting notebooks/evaluations html -d site/
+        just notebook convert "notebooks/**/*.ipynb" markdown -j 4
+        just notebook convert notebooks/reporting html -d site/ --extract-images
     """
     try:
-        from nbconvert import (
-            HTMLExporter,
-            MarkdownExporter,
-            PDFExporter,
-            PythonExporter,
-            SlidesExporter,
-        )
+        import nbconvert  # noqa: F401
     except ImportError:
         print_error("nbconvert is not installed. Install with: uv add nbconvert")
         sys.exit(1)
 
-    # Map format to exporter
-    exporters = {
-        "html": HTMLExporter,
-        "pdf": PDFExporter,
-        "markdown": MarkdownExporter,
-        "script": PythonExporter,
-        "slides": SlidesExporter,
-    }
-
-    exporter_class = exporters[format]
-    exporter = exporter_class()
-
-    print(f"Converting notebook to {format}: {input_notebook}")
+    from ai_kit.cli.core.config import get_notebooks_dir
+    from ai_kit.cli.core.conversion import (
+        ConversionCache,
+        collect_notebooks,
+        convert_notebooks,
+        default_output_path,
+        parse_formats,
+        run_format_conversions,
+    )
+    from ai_kit.cli.utils.output import print_conversion_summary
 
     try:
-        # Read notebook
-        with open(input_notebook) as f:
-            import nbformat
-
-            notebook = nbformat.read(f, as_version=4)
+        formats = parse_formats(format)
+        notebooks = collect_notebooks(inputs)
+    except ValueError as e:
+        print_error(str(e))
+        sys.exit(1)
 
-        # Convert
-        (body, resources) = exporter.from_notebook_node(notebook)
+    if output and len(notebooks) > 1:
+        print_error("--output can only be used with a single notebook, use --output-dir")
+        sys.exit(1)
+    if output and len(formats) > 1:
+        print_error("--output can only be used with a single format, use --output-dir")
+        sys.exit(1)
 
-        # Determine output path
-        if output:
-            output_path = output
+    if (extract_images or images_dir) and "html" not in formats:
+        print_error("--extract-images is only available for html")
+        sys.exit(1)
+    if extract_images and images_dir is None:
+        if output_dir:
+            images_dir = output_dir / "images"
+        elif output:
+            images_dir = output.parent / "images"
         else:
-            # Default output path
-            extensions = {
-                "html": ".html",
-                "pdf": ".pdf",
-                "markdown": ".md",
-                "script": ".py",
-                "slides": ".slides.html",
-            }
-            output_path = input_notebook.with_suffix(extensions[format])
-
-        # Write output
-        with open(output_path, "w" if format != "pdf" else "wb") as f:
-            if format == "pdf":
-                f.write(body)
-            else:
-                f.write(body)
+            images_dir = (
+                Path(os.path.commonpath([p.resolve().parent for p in notebooks])) / "images"
+            )
 
-        print_success(f"Converted to {format}: {output_path}")
+    cache = None
+    if not no_cache:
+        cache = ConversionCache(
+            cache_dir or get_notebooks_dir().parent / ".ai-kit" / "convert-cache",
+            max_size=cache_size * 1024 * 1024,
+        )
 
-        # Format-specific tips
-        if format == "html":
-            print(f"\nOpen in browser: open {output_path}")
-        elif format == "pdf":
-            print("\nNote: PDF conversion requires pandoc and LaTeX")
-        elif format == "script":
-            print(f"\nRun script: python {output_path}")
+    if len(notebooks) > 1:
+        print(f"Converting {len(notebooks)} notebooks to {', '.join(formats)}")
 
-    except Exception as e:
-        print_error(f"Failed to convert notebook: {e}")
-        if format == "pdf":
-            print("\nPDF conversion requires:")
-            print("  - pandoc: brew install pandoc")
-            print("  - LaTeX: brew install --cask mactex")
+        def report(result):
+            if result.ok:
+                print_success(f"{result.input_path} → {result.output_path} ({result.status})")
+            else:
+                print_error(f"{result.input_path}: {result.error}")
+
+        results = convert_notebooks(
+            notebooks,
+            formats,
+            output_dir=output_dir,
+            jobs=jobs,
+            on_complete=report,
+            cache=cache,
+            images_dir=images_dir,
+            force=force,
+        )
+        print_conversion_summary(results)
+        if not all(result.ok for result in results):
+            sys.exit(1)
+        return
+
+    input_notebook = notebooks[0]
+    if output:
+        outputs = {formats[0]: output}
+    else:
+        outputs = {f: default_output_path(input_notebook, f, output_dir) for f in formats}
+
+    print(f"Converting notebook to {', '.join(formats)}: {input_notebook}")
+
+    results = run_format_conversions(
+        [(input_notebook, outputs)],
+        cache=cache,
+        images_dir=images_dir,
+        force=force,
+    )
+    for result in results:
+        if not result.ok:
+            print_error(f"Failed to convert notebook to {result.format}: {result.error}")
+            if result.format == "pdf":
+                print("\nPDF conversion requires:")
+                print("  - pandoc: brew install pandoc")
+                print("  - LaTeX: brew install --cask mactex")
+        elif result.status == "unchanged":
+            print_success(f"Up to date: {result.output_path}")
+        elif result.status == "cached":
+            print_success(f"Restored from cache: {result.output_path}")
+        else:
+            print_success(f"Converted to {result.format}: {result.output_path}")
+    if not all(result.ok for result in results):
         sys.exit(1)
 
+    # Format-specific tips
+    if "html" in outputs:
+        print(f"\nOpen in browser: open {outputs['html']}")
+    if "pdf" in outputs:
+        print("\nNote: PDF conversion requires pandoc and LaTeX")
+    if "script" in outputs:
+        print(f"\nRun script: python {outputs['script']}")
+
 
 @notebook.command()
-@click.argument("notebook_path", type=click.Path(exists=True, path_type=Path))
+@click.argument(
+    "notebook_paths", nargs=-1, required=True, type=click.Path(exists=True, path_type=Path)
+)
 @click.option("--destination", prompt="Destination package/app", help="Where code was migrated to")
 @click.option("--rationale", prompt="Migration rationale", help="Why this migration was needed")
 @click.option(
@@ -342,103 +848,63 @@ def convert(input_notebook: Path, format: str, output: Path):
     is_flag=True,
     help="Delete notebook after documenting migration (exploratory only)",
 )
-def migrate(notebook_path: Path, destination: str, rationale: str, delete: bool):
+def migrate(notebook_paths: tuple, destination: str, rationale: str, delete: bool):
     """Document notebook-to-production migration.
 
     This command helps track when notebook insights are migrated to production code.
     It captures the git commit SHA and creates a migration record.
 
+    Several notebooks, or whole folders, can be migrated at once: the last
+    commit of every notebook is found in a single pass over the git history,
+    and the records are written once all of them are resolved.
+
     Example:
         just notebook migrate notebooks/exploratory/experiment.ipynb \\
           --destination packages/my-feature \\
           --rationale "Validated approach, ready for production"
+        just notebook migrate notebooks/exploratory/ \\
+          --destination packages/my-feature \\
+          --rationale "End of project" --delete
     """
     from ai_kit.cli.core.config import CATEGORIES, get_notebooks_dir
-    from ai_kit.cli.utils.git import get_current_commit_sha, get_file_last_commit_sha
+    from ai_kit.cli.core.conversion import collect_notebooks
+    from ai_kit.cli.core.migrations import (
+        MIGRATIONS_DIR,
+        REGISTRY_FILENAME,
+        MigrationRecord,
+        MigrationRegistry,
+    )
+    from ai_kit.cli.utils.git import get_current_commit_sha, get_files_last_commit_shas
 
-    # Validate notebook exists and get category
-    if not notebook_path.exists():
-        print_error(f"Notebook not found: {notebook_path}")
-        sys.exit(1)
-
-    # Determine category from path
-    notebooks_dir = get_notebooks_dir()
-    try:
-        relative_path = notebook_path.relative_to(notebooks_dir)
-        category = relative_path.parts[0]
-    except (ValueError, IndexError):
-        print_error(f"Notebook must be in notebooks/ directory: {notebook_path}")
-        sys.exit(1)
-
-    if category not in CATEGORIES:
-        print_error(f"Invalid category: {category}")
-        sys.exit(1)
-
-    # Get git information
     try:
-        current_sha = get_current_commit_sha()
-        file_sha = get_file_last_commit_sha(notebook_path)
-    except Exception as e:
-        print_error(f"Failed to get git information: {e}")
-        print("Make sure the notebook is committed to git.")
+        notebook_paths = collect_notebooks(notebook_paths)
+    except ValueError as e:
+        print_error(str(e))
         sys.exit(1)
 
-    # Generate migration record
-    from datetime import datetime
-
-    migration_date = datetime.now().strftime("%Y-%m-%d")
-    migration_record = f"""# Migration Record: {notebook_path.name}
-
-**Date**: {migration_date}
-**Source Notebook**: `{notebook_path.relative_to(Path.cwd())}`
-**Category**: {category}
-**Destination**: `{destination}`
-
-## Git References
-
-- **Notebook Last Commit**: `{file_sha}`
-- **Migration Commit**: `{current_sha}`
-
-## Rationale
-
-{rationale}
-
-## Verification
-
-To review the original notebook:
-```bash
-git show {file_sha}:{notebook_path.relative_to(Path.cwd())}
-```
-
-## Next Steps
-
-- [ ] Code migrated to `{destination}`
-- [ ] Tests added for migrated functionality
-- [ ] Documentation updated
-- [ ] Original notebook {"deleted" if delete else "retained"} (git history preserves it)
-"""
-
-    # Create migration records directory
-    migration_dir = Path("docs/migrations")
-    migration_dir.mkdir(parents=True, exist_ok=True)
-
-    # Write migration record
-    record_filename = f"{migration_date}-{notebook_path.stem}.md"
-    record_path = migration_dir / record_filename
-
-    with open(record_path, "w") as f:
-        f.write(migration_record)
+    # Determine each notebook's category from its path
+    notebooks_dir = get_notebooks_dir().resolve()
+    categories = {}
+    for notebook_path in notebook_paths:
+        try:
+            relative_path = notebook_path.resolve().relative_to(notebooks_dir)
+            category = relative_path.parts[0]
+        except (ValueError, IndexError):
+            print_error(f"Notebook must be in notebooks/ directory: {notebook_path}")
+            sys.exit(1)
 
-    print_success(f"Migration record created: {record_path}")
-    print("\nGit references:")
-    print(f"  Notebook commit: {file_sha}")
-    print(f"  Current commit: {current_sha}")
+        if category not in CATEGORIES:
+            print_error(f"Invalid category: {category}")
+            sys.exit(1)
+        categories[notebook_path] = category
 
-    # Handle deletion for exploratory notebooks
+    # Refuse deletion before writing any record
     if delete:
-        if category != "exploratory":
+        for notebook_path, category in categories.items():
+            if category == "exploratory":
+                continue
             print_error(
-                f"\nCannot delete {category} notebooks. "
+                f"\nCannot delete {category} notebooks ({notebook_path}). "
                 "Only exploratory notebooks should be deleted after migration."
             )
             print(f"\n{CATEGORIES[category].display_name} notebooks must be retained for:")
@@ -455,138 +921,405 @@ git show {file_sha}:{notebook_path.relative_to(Path.cwd())}
                 print("  - Recurring report generation")
             sys.exit(1)
 
+    # Get git information
+    try:
+        current_sha = get_current_commit_sha()
+        file_shas = get_files_last_commit_shas(notebook_paths)
+    except Exception as e:
+        print_error(f"Failed to get git information: {e}")
+        print("Make sure the notebooks are committed to git.")
+        sys.exit(1)
+
+    # Generate migration records
+    from datetime import datetime
+
+    migration_date = datetime.now().strftime("%Y-%m-%d")
+    migration_dir = MIGRATIONS_DIR
+    registry = MigrationRegistry(migration_dir / REGISTRY_FILENAME)
+    records = {}
+    entries = []
+    for notebook_path in notebook_paths:
+        source_path = Path(os.path.relpath(notebook_path.resolve()))
+        relative_path = notebook_path.resolve().relative_to(notebooks_dir)
+        source = f"{notebooks_dir.name}/{relative_path.as_posix()}"
+        # Migrating a notebook again on the same day replaces its record
+        record_path = _migration_record_path(
+            notebook_path, source, migration_date, migration_dir, registry, records
+        )
+        records[record_path] = _migration_record(
+            source_path,
+            categories[notebook_path],
+            destination,
+            rationale,
+            file_shas[notebook_path],
+            current_sha,
+            migration_date,
+            delete,
+        )
+        entries.append(
+            MigrationRecord(
+                source=source,
+                category=categories[notebook_path],
+                destination=destination,
+                rationale=rationale,
+                date=migration_date,
+                notebook_commit=file_shas[notebook_path],
+                migration_commit=current_sha,
+                record=record_path.as_posix(),
+                deleted=delete,
+            )
+        )
+
+    # Write all migration records, then add them to the registry
+    migration_dir.mkdir(parents=True, exist_ok=True)
+    for record_path, migration_record in records.items():
+        with open(record_path, "w") as f:
+            f.write(migration_record)
+    registry.write(entries)
+
+    if len(notebook_paths) == 1:
+        [notebook_path] = notebook_paths
+        [record_target] = records
+        print_success(f"Migration record created: {record_target}")
+        print("\nGit references:")
+        print(f"  Notebook commit: {file_shas[notebook_path]}")
+        print(f"  Current commit: {current_sha}")
+        name = notebook_path.name
+    else:
+        for record_path, notebook_path in zip(records, notebook_paths, strict=True):
+            print_success(f"{notebook_path} → {record_path} ({file_shas[notebook_path][:12]})")
+        print(f"\n{len(records)} migration records created in {migration_dir}")
+        print(f"  Current commit: {current_sha}")
+        record_target = migration_dir
+        name = f"{len(notebook_paths)} notebooks"
+    targets = " ".join(str(path) for path in notebook_paths)
+    # The registry is inside the records directory when several were written
+    to_add = record_target
+    if record_target != migration_dir:
+        to_add = f"{record_target} {migration_dir / REGISTRY_FILENAME}"
+
+    # Handle deletion for exploratory notebooks
+    if delete:
         # Confirm deletion
         if click.confirm(
-            f"\n⚠️  Delete {notebook_path.name}? (git history will preserve it)",
+            f"\n⚠️  Delete {name}? (git history will preserve it)",
             default=False,
         ):
-            notebook_path.unlink()
-            print_success(f"Deleted notebook: {notebook_path}")
+            for notebook_path in notebook_paths:
+                notebook_path.unlink()
+            print_success(f"Deleted notebook: {targets}")
             print("\nNext steps:")
-            print(f"  1. Review migration record: {record_path}")
-            print(f"  2. Commit changes: git add {record_path}")
-            print(f"  3. Commit deletion: git rm {notebook_path}")
-            print(f"  4. Reference in spec: Link to {record_path} in feature spec")
+            print(f"  1. Review migration record: {record_target}")
+            print(f"  2. Commit changes: git add {to_add}")
+            print(f"  3. Commit deletion: git rm {targets}")
+            print(f"  4. Reference in spec: Link to {record_target} in feature spec")
         else:
             print("\nNotebook retained. Delete manually when ready:")
-            print(f"  git rm {notebook_path}")
+            print(f"  git rm {targets}")
     else:
         print("\nNext steps:")
-        print(f"  1. Review migration record: {record_path}")
-        print(f"  2. Commit record: git add {record_path} && git commit")
-        print(f"  3. Reference in spec: Link to {record_path} in feature spec")
+        print(f"  1. Review migration record: {record_target}")
+        print(f"  2. Commit record: git add {to_add} && git commit")
+        print(f"  3. Reference in spec: Link to {record_target} in feature spec")
 
-        if category == "exploratory":
+        if set(categories.values()) == {"exploratory"}:
             print("\nNote: Exploratory notebooks can be deleted after migration:")
-            print(f"  just notebook migrate {notebook_path} --delete")
+            print(f"  just notebook migrate {targets} --delete")
+
+
+@notebook.command("migrations")
+@click.argument("notebook_paths", nargs=-1, type=click.Path(path_type=Path))
+@click.option("--destination", help="Only migrations to this destination or a path inside it")
+@click.option(
+    "--category", type=click.Choice(list(CATEGORIES)), help="Only notebooks of this category"
+)
+@click.option(
+    "--since",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="Only migrations on or after this date (YYYY-MM-DD)",
+)
+@click.option(
+    "--until",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="Only migrations on or before this date (YYYY-MM-DD)",
+)
+@click.option("--json", "as_json", is_flag=True, help="Print the records as JSON")
+@click.option(
+    "--rebuild",
+    is_flag=True,
+    help="Rebuild the registry from the Markdown records before querying",
+)
+def list_migrations(
+    notebook_paths: tuple,
+    destination: str | None,
+    category: str | None,
+    since,
+    until,
+    as_json: bool,
+    rebuild: bool,
+):
+    """Query migration records by notebook, destination, category and date.
+
+    Records are read from docs/migrations/registry.jsonl, which notebook
+    migrate fills next to the Markdown records. --rebuild recreates it from
+    the Markdown records, for migrations documented before the registry.
+
+    Example:
+        just notebook migrations notebooks/exploratory/experiment.ipynb
+        just notebook migrations --destination packages/my-feature
+        just notebook migrations --category exploratory --since 2024-10-01 --json
+    """
+    from dataclasses import asdict
+
+    from ai_kit.cli.core.config import get_notebooks_dir
+    from ai_kit.cli.core.migrations import (
+        MIGRATIONS_DIR,
+        REGISTRY_FILENAME,
+        MigrationRegistry,
+        load_markdown_records,
+    )
+
+    registry = MigrationRegistry(MIGRATIONS_DIR / REGISTRY_FILENAME)
+    if rebuild:
+        records = load_markdown_records(MIGRATIONS_DIR)
+        registry.rebuild(records)
+        print_success(f"Registry rebuilt from {len(records)} Markdown records: {registry.path}")
+
+    # Sources are recorded from the repository root
+    root = get_notebooks_dir().parent.resolve()
+    sources = None
+    if notebook_paths:
+        sources = []
+        for path in notebook_paths:
+            try:
+                sources.append(path.resolve().relative_to(root).as_posix())
+            except ValueError:
+                sources.append(path.as_posix())
+
+    try:
+        records = registry.query(
+            sources=sources,
+            destination=destination,
+            category=category,
+            since=since and since.date(),
+            until=until and until.date(),
+        )
+    except ValueError as e:
+        print_error(str(e))
+        print("Rebuild it with: just notebook migrations --rebuild")
+        sys.exit(1)
+
+    if as_json:
+        print(json.dumps([asdict(record) for record in records], indent=2))
+        return
+
+    if not records:
+        print("No migration records found")
+        if not registry.path.exists():
+            print("\nDocument a migration with:")
+            print("  just notebook migrate <notebook-path>")
+        return
+
+    print("\nMigration Records:\n")
+    for record in records:
+        deleted = ", deleted" if record.deleted else ""
+        print(
+            f"  {record.date}  {record.source} → {record.destination}  ({record.category}{deleted})"
+        )
+        print(f"      {record.rationale.splitlines()[0] if record.rationale else ''}")
+        print(f"      Notebook commit: {record.notebook_commit[:12]}  Record: {record.record}")
+
+    print(f"\nTotal: {len(records)} records")
 
 
 @notebook.command()
-@click.argument("notebook_path", type=click.Path(exists=True, path_type=Path))
-@click.option("--identifier", prompt="Tag identifier", help="Unique identifier for this tag")
-@click.option("--message", prompt="Tag message", help="Description of what this tag represents")
-@click.option("--push", is_flag=True, help="Push tag to remote after creation")
-def tag(notebook_path: Path, identifier: str, message: str, push: bool):
-    """Create git tag for compliance/evaluation notebooks.
+@click.argument("notebook_paths", nargs=-1, type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--identifier",
+    help="Unique identifier for this tag (prefixed with each notebook's name when tagging several)",
+)
+@click.option("--message", help="Description of what this tag represents")
+@click.option(
+    "--manifest",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help='JSON list of {"notebook": ..., "identifier": ..., "message": ...} to tag',
+)
+@click.option("--push", is_flag=True, help="Push tags to remote after creation")
+def tag(
+    notebook_paths: tuple,
+    identifier: str | None,
+    message: str | None,
+    manifest: Path | None,
+    push: bool,
+):
+    """Create git tags for compliance/evaluation notebooks.
 
     Tags follow the format: {category}/{identifier}-{date}
 
     This is typically used by compliance officers to mark notebooks
     for regulatory audit trails.
 
+    Several notebooks can be tagged at once, from paths (each identifier is
+    then prefixed with the notebook's name) or from a manifest. Every tag is
+    validated before any is created, and --push publishes them all with a
+    single git push.
+
     Example:
         just notebook tag notebooks/compliance/model-bias-assessment.ipynb \\
           --identifier model-v1.0-audit \\
           --message "Compliance audit approved by Jane Doe"
+        just notebook tag --manifest audit-2024-q4.json --push
     """
     from datetime import datetime
 
     from ai_kit.cli.core.config import CATEGORIES, get_notebooks_dir
-    from ai_kit.cli.utils.git import create_git_tag
-
-    # Validate notebook exists and get category
-    if not notebook_path.exists():
-        print_error(f"Notebook not found: {notebook_path}")
+    from ai_kit.cli.utils.git import (
+        create_git_tag,
+        delete_git_tags,
+        list_git_tags,
+        push_git_tags,
+    )
+
+    # Collect the notebooks to tag with their identifier and message
+    if manifest:
+        if notebook_paths:
+            print_error("Give notebook paths or --manifest, not both")
+            sys.exit(1)
+        try:
+            items = json.loads(manifest.read_text())
+            entries = [
+                (
+                    Path(item["notebook"]),
+                    item["identifier"],
+                    item.get("message", message),
+                )
+                for item in items
+            ]
+        except (ValueError, TypeError, KeyError) as e:
+            print_error(f"Invalid manifest {manifest}: {e}")
+            print('Expected a JSON list of {"notebook": ..., "identifier": ..., "message": ...}')
+            sys.exit(1)
+        if not entries:
+            print_error(f"No notebooks in manifest: {manifest}")
+            sys.exit(1)
+        if any(entry_message is None for _, _, entry_message in entries):
+            message = click.prompt("Tag message")
+            entries = [(path, ident, msg or message) for path, ident, msg in entries]
+    elif notebook_paths:
+        if identifier is None:
+            identifier = click.prompt("Tag identifier")
+        if message is None:
+            message = click.prompt("Tag message")
+        if len(notebook_paths) == 1:
+            entries = [(notebook_paths[0], identifier, message)]
+        else:
+            entries = [
+                (path, f"{_tag_slug(path.stem)}-{identifier}", message) for path in notebook_paths
+            ]
+    else:
+        print_error("Give notebook paths or --manifest")
         sys.exit(1)
 
-    # Determine category from path
-    notebooks_dir = get_notebooks_dir()
-    try:
-        relative_path = notebook_path.relative_to(notebooks_dir)
-        category = relative_path.parts[0]
-    except (ValueError, IndexError):
-        print_error(f"Notebook must be in notebooks/ directory: {notebook_path}")
-        sys.exit(1)
+    # Validate every notebook and tag name before creating any tag
+    notebooks_dir = get_notebooks_dir().resolve()
+    date_str = datetime.now().strftime("%Y-%m-%d")
+    tags = []
+    for notebook_path, tag_identifier, tag_message in entries:
+        if not notebook_path.exists():
+            print_error(f"Notebook not found: {notebook_path}")
+            sys.exit(1)
 
-    if category not in CATEGORIES:
-        print_error(f"Invalid category: {category}")
-        sys.exit(1)
+        # Determine category from path
+        try:
+            relative_path = notebook_path.resolve().relative_to(notebooks_dir)
+            category = relative_path.parts[0]
+        except (ValueError, IndexError):
+            print_error(f"Notebook must be in notebooks/ directory: {notebook_path}")
+            sys.exit(1)
 
-    # Validate category is appropriate for tagging
-    if category == "exploratory":
-        print_error(
-            "\nExploratory notebooks should not be tagged. "
-            "They are temporary and should be deleted after migration."
-        )
-        print("\nFor audit trails, use:")
-        print("  - compliance: Regulatory documentation")
-        print("  - evaluations: Model performance assessments")
-        sys.exit(1)
+        if category not in CATEGORIES:
+            print_error(f"Invalid category: {category}")
+            sys.exit(1)
 
-    # Generate tag name
-    date_str = datetime.now().strftime("%Y-%m-%d")
-    tag_name = f"{category}/{identifier}-{date_str}"
-
-    # Validate tag name format
-    if not _validate_tag_name(tag_name):
-        print_error(f"Invalid tag name: {tag_name}")
-        print("\nTag name must:")
-        print("  - Start with category (compliance, evaluations, etc.)")
-        print("  - Contain only alphanumeric, hyphens, and slashes")
-        print("  - End with date in YYYY-MM-DD format")
-        sys.exit(1)
+        # Validate category is appropriate for tagging
+        if category == "exploratory":
+            print_error(
+                f"\nExploratory notebooks should not be tagged ({notebook_path}). "
+                "They are temporary and should be deleted after migration."
+            )
+            print("\nFor audit trails, use:")
+            print("  - compliance: Regulatory documentation")
+            print("  - evaluations: Model performance assessments")
+            sys.exit(1)
 
-    # Create tag
-    print(f"Creating tag: {tag_name}")
-    print(f"Message: {message}")
+        # Generate tag name
+        tag_name = f"{category}/{tag_identifier}-{date_str}"
 
-    if create_git_tag(tag_name, message):
-        print_success(f"Tag created: {tag_name}")
+        # Validate tag name format
+        if not _validate_tag_name(tag_name):
+            print_error(f"Invalid tag name: {tag_name}")
+            print("\nTag name must:")
+            print("  - Start with category (compliance, evaluations, etc.)")
+            print("  - Contain only alphanumeric, hyphens, and slashes")
+            print("  - End with date in YYYY-MM-DD format")
+            sys.exit(1)
 
-        if push:
-            import subprocess
+        tags.append((tag_name, tag_message, notebook_path, category, tag_identifier))
 
-            try:
-                subprocess.run(
-                    ["git", "push", "origin", tag_name],
-                    check=True,
-                    capture_output=True,
-                )
-                print_success(f"Tag pushed to remote: {tag_name}")
-            except subprocess.CalledProcessError as e:
-                print_error(f"Failed to push tag: {e}")
-                print(f"\nPush manually with: git push origin {tag_name}")
-                sys.exit(1)
-        else:
-            print("\nTo push tag to remote:")
-            print(f"  git push origin {tag_name}")
+    tag_names = [tag_name for tag_name, *_ in tags]
+    duplicates = sorted({name for name in tag_names if tag_names.count(name) > 1})
+    existing = sorted(set(tag_names) & set(list_git_tags()))
+    if duplicates or existing:
+        print_error(f"Tag already exists: {', '.join(duplicates or existing)}")
+        sys.exit(1)
 
+    # Create tags, removing those already created if one fails
+    created = []
+    for tag_name, tag_message, *_ in tags:
+        print(f"Creating tag: {tag_name}")
+        if len(tags) == 1:
+            print(f"Message: {tag_message}")
+        if not create_git_tag(tag_name, tag_message):
+            delete_git_tags(created)
+            print_error(f"Failed to create tag: {tag_name}")
+            if created:
+                print(f"Removed the {len(created)} tag(s) created before it")
+            print("\nPossible reasons:")
+            print("  - Tag already exists")
+            print("  - Not in a git repository")
+            print("  - Uncommitted changes")
+            sys.exit(1)
+        created.append(tag_name)
+        print_success(f"Tag created: {tag_name}")
+
+    if push:
+        try:
+            push_git_tags(tag_names)
+        except RuntimeError as e:
+            print_error(str(e))
+            print(f"\nPush manually with: git push origin {' '.join(tag_names)}")
+            sys.exit(1)
+        print_success(
+            f"Tag{'s' if len(tag_names) > 1 else ''} pushed to remote: {', '.join(tag_names)}"
+        )
+    else:
+        print("\nTo push tags to remote:")
+        print(f"  git push origin {' '.join(tag_names)}")
+
+    if len(tags) == 1:
+        [(tag_name, _, notebook_path, category, tag_identifier)] = tags
         print("\nTag details:")
         print(f"  Category: {category}")
-        print(f"  Identifier: {identifier}")
+        print(f"  Identifier: {tag_identifier}")
         print(f"  Date: {date_str}")
-        print(f"  Notebook: {notebook_path.relative_to(Path.cwd())}")
+        print(f"  Notebook: {os.path.relpath(notebook_path.resolve())}")
+    else:
+        print(f"\n{len(tags)} tags created")
 
-        print("\nDiscover tags:")
+    print("\nDiscover tags:")
+    for category in dict.fromkeys(category for *_, category, _ in tags):
         print(f"  git tag --list '{category}/*'")
-        print("  just notebook tags")
-    else:
-        print_error(f"Failed to create tag: {tag_name}")
-        print("\nPossible reasons:")
-        print("  - Tag already exists")
-        print("  - Not in a git repository")
-        print("  - Uncommitted changes")
-        sys.exit(1)
+    print("  just notebook tags")
 
 
 @notebook.command("tags")
@@ -594,18 +1327,63 @@ def tag(notebook_path: Path, identifier: str, message: str, push: bool):
     "--category",
     type=click.Choice(["compliance", "evaluations", "tutorials", "reporting"]),
 )
-def list_tags(category: str):
-    """List git tags for notebooks.
+@click.option("--identifier", help="Only tags whose identifier contains this text")
+@click.option(
+    "--since",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="Only tags created on or after this date (YYYY-MM-DD)",
+)
+@click.option(
+    "--until",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="Only tags created on or before this date (YYYY-MM-DD)",
+)
+@click.option(
+    "--sort",
+    type=click.Choice(["name", "date"]),
+    default="name",
+    show_default=True,
+    help="Order of the tags within each category",
+)
+@click.option("--reverse", is_flag=True, help="Reverse the sort order")
+def list_tags(
+    category: str,
+    identifier: str | None,
+    since,
+    until,
+    sort: str,
+    reverse: bool,
+):
+    """List git tags for notebooks with their date, tagger, commit and message.
+
+    Tags are read with a single git call and cached until a tag changes.
 
     Example:
         just notebook tags
         just notebook tags --category compliance
+        just notebook tags --since 2024-10-01 --until 2024-12-31 --sort date
+        just notebook tags --identifier model-v1
     """
-    from ai_kit.cli.utils.git import list_git_tags
+    from ai_kit.cli.core.config import get_notebooks_dir
+    from ai_kit.cli.utils.git import list_git_tag_details
+
+    # Tags end with their date: category/identifier-YYYY-MM-DD
+    pattern = f"{category or '*'}/*-[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]"
 
-    pattern = f"{category}/*" if category else "*/20*"  # Match date pattern
+    try:
+        tags = list_git_tag_details(
+            pattern, cache_path=get_notebooks_dir().parent / ".ai-kit" / "tags-cache.json"
+        )
+    except RuntimeError as e:
+        print_error(str(e))
+        sys.exit(1)
 
-    tags = list_git_tags(pattern)
+    if identifier:
+        tags = [tag for tag in tags if identifier in _tag_identifier(tag.name)]
+    if since:
+        tags = [tag for tag in tags if tag.date and tag.date.date() >= since.date()]
+    if until:
+        tags = [tag for tag in tags if tag.date and tag.date.date() <= until.date()]
 
     if not tags:
         if category:
@@ -623,21 +1401,231 @@ def list_tags(category: str):
 
     tags_by_category = defaultdict(list)
     for tag in tags:
-        if "/" in tag:
-            cat = tag.split("/")[0]
+        if "/" in tag.name:
+            cat = tag.name.split("/")[0]
             tags_by_category[cat].append(tag)
 
+    def sort_key(tag):
+        if sort == "date":
+            return (tag.date.timestamp() if tag.date else 0, tag.name)
+        return (tag.name,)
+
     for cat in sorted(tags_by_category.keys()):
+        cat_tags = sorted(tags_by_category[cat], key=sort_key, reverse=reverse)
+        width = max(len(tag.name) for tag in cat_tags)
         print(f"  {cat}:")
-        for tag in sorted(tags_by_category[cat]):
-            print(f"    - {tag}")
+        for tag in cat_tags:
+            date = f"{tag.date:%Y-%m-%d %H:%M}" if tag.date else "-"
+            tagger = tag.tagger or "(lightweight)"
+            print(f"    - {tag.name:<{width}}  {date}  {tag.commit[:10]}  {tagger}: {tag.subject}")
 
     print(f"\nTotal: {len(tags)} tags")
 
 
+@notebook.command("history")
+@click.argument("notebook_paths", nargs=-1, type=click.Path(path_type=Path))
+@click.option(
+    "--category", type=click.Choice(list(CATEGORIES)), help="Only notebooks of this category"
+)
+@click.option("--json", "as_json", is_flag=True, help="Print the history as JSON")
+def history(notebook_paths: tuple, category: str | None, as_json: bool):
+    """Show the audit history of notebooks: commits, authors, lines changed and tags.
+
+    The history of every notebook is read with a single git log pass and
+    cached, so later runs only read the commits made since. Notebooks are
+    followed across renames, and deleted notebooks are listed too.
+
+    Example:
+        just notebook history
+        just notebook history --category compliance
+        just notebook history notebooks/compliance/model-bias-assessment.ipynb --json
+    """
+    from ai_kit.cli.core.config import get_notebooks_dir
+    from ai_kit.cli.core.history import build_notebook_history
+    from ai_kit.cli.utils.git import list_git_tag_details
+
+    notebooks_dir = get_notebooks_dir()
+    cache_dir = notebooks_dir.parent / ".ai-kit"
+    try:
+        tags = list_git_tag_details(
+            "*/*-[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]",
+            cwd=notebooks_dir,
+            cache_path=cache_dir / "tags-cache.json",
+        )
+        notebook_history = build_notebook_history(
+            notebooks_dir, tags=tags, cache_path=cache_dir / "history-cache.json"
+        )
+    except RuntimeError as e:
+        print_error(str(e))
+        sys.exit(1)
+
+    if notebook_paths:
+        selected = {}
+        for path in notebook_paths:
+            try:
+                relative = path.resolve().relative_to(notebooks_dir.resolve()).as_posix()
+            except ValueError:
+                print_error(f"Notebook must be in notebooks/ directory: {path}")
+                sys.exit(1)
+            if relative not in notebook_history:
+                print_error(f"No git history for notebook: {path}")
+                sys.exit(1)
+            selected[relative] = notebook_history[relative]
+        notebook_history = selected
+    if category:
+        notebook_history = {
+            path: revisions
+            for path, revisions in notebook_history.items()
+            if path.split("/", 1)[0] == category
+        }
+
+    if as_json:
+        print(
+            json.dumps(
+                [
+                    {
+                        "notebook": f"{notebooks_dir.name}/{path}",
+                        "deleted": revisions[0].status == "D",
+                        "revisions": [
+                            {**vars(revision), "date": revision.date.isoformat()}
+                            for revision in revisions
+                        ],
+                    }
+                    for path, revisions in notebook_history.items()
+                ],
+                indent=2,
+            )
+        )
+        return
+
+    if not notebook_history:
+        print("No notebook history found")
+        return
+
+    for path, revisions in notebook_history.items():
+        insertions = sum(revision.insertions or 0 for revision in revisions)
+        deletions = sum(revision.deletions or 0 for revision in revisions)
+        authors = len({revision.email or revision.author for revision in revisions})
+        deleted = " (deleted)" if revisions[0].status == "D" else ""
+        print(
+            f"\n{notebooks_dir.name}/{path}{deleted}: {len(revisions)} commits, "
+            f"+{insertions} -{deletions}, {authors} author{'s' if authors > 1 else ''}"
+        )
+        for revision in revisions:
+            lines = (
+                f"+{revision.insertions} -{revision.deletions}"
+                if revision.insertions is not None
+                else "binary"
+            )
+            tags = f"  [{', '.join(revision.tags)}]" if revision.tags else ""
+            print(
+                f"  {revision.date:%Y-%m-%d}  {revision.commit[:10]}  {revision.status}  "
+                f"{lines:<12} {revision.author}: {revision.subject}{tags}"
+            )
+
+    print(f"\nTotal: {len(notebook_history)} notebooks")
+
+
+def _tag_identifier(tag_name: str) -> str:
+    """Identifier part of a tag name: category/identifier-YYYY-MM-DD."""
+    import re
+
+    name = tag_name.split("/", 1)[-1]
+    return re.sub(r"-\d{4}-\d{2}-\d{2}$", "", name)
+
+
+def _tag_slug(name: str) -> str:
+    """Lowercase ``name`` and join its letters and digits with dashes, as tag names need."""
+    import re
+
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
 def _validate_tag_name(tag_name: str) -> bool:
     """Validate tag name format: category/identifier-YYYY-MM-DD."""
     import re
 
     pattern = r"^[a-z]+/[a-z0-9-]+-\d{4}-\d{2}-\d{2}$"
     return bool(re.match(pattern, tag_name))
+
+
+def _migration_record_path(
+    notebook_path: Path,
+    source: str,
+    migration_date: str,
+    migration_dir: Path,
+    registry: "MigrationRegistry",
+    taken: Collection[Path],
+) -> Path:
+    """Markdown record of a notebook's migration: its own record of the day if
+    there is one, else ``<date>-<stem>.md``, or a path-based name when another
+    notebook already uses that name.
+    """
+    from ai_kit.cli.core.migrations import parse_migration_record
+
+    def owned(record_path: Path) -> bool:
+        if record_path in taken:
+            return False
+        existing = registry.by_record(record_path.as_posix())
+        if existing is not None:
+            return existing.source == source
+        if not record_path.exists():
+            return True
+        try:
+            text = record_path.read_text(encoding="utf-8")
+            recorded = parse_migration_record(text, record_path).source
+        except ValueError:
+            return False
+        return Path(recorded).resolve() == notebook_path.resolve()
+
+    for previous in reversed(registry.by_source(source)):
+        if previous.date == migration_date and owned(Path(previous.record)):
+            return Path(previous.record)
+    record_path = migration_dir / f"{migration_date}-{notebook_path.stem}.md"
+    if owned(record_path):
+        return record_path
+    source_path = Path(os.path.relpath(notebook_path.resolve()))
+    return migration_dir / f"{migration_date}-{'-'.join(source_path.with_suffix('').parts)}.md"
+
+
+def _migration_record(
+    source_path: Path,
+    category: str,
+    destination: str,
+    rationale: str,
+    file_sha: str,
+    current_sha: str,
+    migration_date: str,
+    delete: bool,
+) -> str:
+    """Render the migration record of one notebook."""
+    return f"""# Migration Record: {source_path.name}
+
+**Date**: {migration_date}
+**Source Notebook**: `{source_path}`
+**Category**: {category}
+**Destination**: `{destination}`
+
+## Git References
+
+- **Notebook Last Commit**: `{file_sha}`
+- **Migration Commit**: `{current_sha}`
+
+## Rationale
+
+{rationale}
+
+## Verification
+
+To review the original notebook:
+```bash
+git show {file_sha}:{source_path}
+```
+
+## Next Steps
+
+- [ ] Code migrated to `{destination}`
+- [ ] Tests added for migrated functionality
+- [ ] Documentation updated
+- [ ] Original notebook {"deleted" if delete else "retained"} (git history preserves it)
+"""
@@ -0,0 +1,622 @@
+"""Notebook conversion with nbconvert.
+
+Building an exporter loads its Jinja templates and preprocessors, so each
+process builds one exporter per format and reuses it for every notebook.
+Many notebooks are converted on a process pool.
+
+A notebook converted to several formats is read once, and the preprocessors
+every exporter runs (:data:`SHARED_PREPROCESSORS`) are applied once, before
+the exporters run side by side on threads.
+
+A :class:`ConversionCache` makes reruns incremental: its manifest records the
+input content hash, format, exporter version and options behind each output,
+and converted outputs are kept in a size-capped, least-recently-used cache
+directory that CI can restore between runs.
+
+HTML can be written with images in separate content-addressed files, shared
+by all the notebooks converted to the same images directory (see
+:mod:`ai_kit.cli.core.html_export`).
+"""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import nbformat
+
+# nbconvert exporter class for each output format
+EXPORTERS = {
+    "html": "HTMLExporter",
+    "pdf": "PDFExporter",
+    "markdown": "MarkdownExporter",
+    "script": "PythonExporter",
+    "slides": "SlidesExporter",
+}
+
+# Default output extension for each format
+EXTENSIONS = {
+    "html": ".html",
+    "pdf": ".pdf",
+    "markdown": ".md",
+    "script": ".py",
+    "slides": ".slides.html",
+}
+
+# Preprocessors enabled by every exporter, run once per notebook for all formats
+SHARED_PREPROCESSORS = ("TagRemovePreprocessor", "RegexRemovePreprocessor")
+
+# Bump when ai-kit changes how outputs are produced, to invalidate caches
+CONVERTER_VERSION = 1
+
+# Default maximum size of the conversion cache
+DEFAULT_CACHE_SIZE = 1024**3
+
+# Exporters built in this process, by format
+_exporters: dict[str, Any] = {}
+
+
+@dataclass
+class ConversionResult:
+    """Outcome of converting one notebook."""
+
+    input_path: Path
+    output_path: Path
+    format: str
+    size: int = 0
+    seconds: float = 0.0
+    status: str = "converted"
+    error: str | None = None
+    assets: list[Path] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Whether the conversion succeeded."""
+        return self.error is None
+
+
+def get_exporter(format: str):
+    """Return this process's exporter for a format, building it on first use.
+
+    Exporters skip :data:`SHARED_PREPROCESSORS`; :func:`prepare_notebook` runs
+    them once for all formats.
+    """
+    if format not in _exporters:
+        from traitlets.config import Config
+
+        config = Config({name: {"enabled": False} for name in SHARED_PREPROCESSORS})
+        if format == "html":
+            from ai_kit.cli.core.html_export import StreamingHTMLExporter
+
+            exporter = StreamingHTMLExporter(config=config)
+        else:
+            import nbconvert
+
+            exporter = getattr(nbconvert, EXPORTERS[format])(config=config)
+        # Templates are compiled and highlighting modules imported on first
+        # render; do it now, before exporters run on threads and outside the
+        # first notebook's timing (PDF is skipped, it would run LaTeX)
+        if format != "pdf":
+            exporter.from_notebook_node(
+                nbformat.v4.new_notebook(
+                    cells=[nbformat.v4.new_markdown_cell("#"), nbformat.v4.new_code_cell("x")]
+                )
+            )
+        _exporters[format] = exporter
+    return _exporters[format]
+
+
+def parse_formats(value: str) -> list[str]:
+    """Parse a comma-separated list of formats, such as ``html,markdown,script``.
+
+    Raises:
+        ValueError: If the list is empty or a format is unknown
+    """
+    formats = list(dict.fromkeys(part.strip() for part in value.split(",") if part.strip()))
+    if not formats:
+        raise ValueError("No output format given")
+    unknown = [format for format in formats if format not in EXPORTERS]
+    if unknown:
+        raise ValueError(
+            f"Unknown format(s): {', '.join(unknown)} (choose from {', '.join(EXPORTERS)})"
+        )
+    return formats
+
+
+def prepare_notebook(notebook):
+    """Normalize a notebook and apply the preprocessors shared by all exporters."""
+    from nbconvert import preprocessors
+    from nbformat import validator
+
+    _, notebook = validator.normalize(notebook)
+    resources: dict[str, Any] = {}
+    for name in SHARED_PREPROCESSORS:
+        notebook, resources = getattr(preprocessors, name)(enabled=True)(notebook, resources)
+    return notebook
+
+
+def collect_notebooks(patterns: Iterable[str | Path]) -> list[Path]:
+    """Expand paths, directories and glob patterns into notebook paths.
+
+    Directories are searched recursively, skipping ``.ipynb_checkpoints``.
+    Each notebook is listed once, in the order first matched.
+
+    Raises:
+        ValueError: If a pattern matches no notebook
+    """
+    notebooks: dict[Path, None] = {}
+    for pattern in patterns:
+        pattern = str(pattern)
+        matches = [Path(match) for match in sorted(glob.glob(pattern, recursive=True))]
+        found = []
+        for match in matches:
+            if match.is_dir():
+                found.extend(
+                    path
+                    for path in sorted(match.rglob("*.ipynb"))
+                    if ".ipynb_checkpoints" not in path.parts
+                )
+            elif match.suffix == ".ipynb":
+                found.append(match)
+        if not found:
+            raise ValueError(f"No notebooks found for: {pattern}")
+        notebooks.update(dict.fromkeys(found))
+    return list(notebooks)
+
+
+def default_output_path(
+    input_path: Path, format: str, output_dir: Path | None = None, base_dir: Path | None = None
+) -> Path:
+    """Output path for a notebook: next to it, or under ``output_dir``.
+
+    Under ``output_dir``, the notebook's path relative to ``base_dir`` is kept
+    so notebooks with the same name in different folders do not collide.
+    """
+    name = input_path.stem + EXTENSIONS[format]
+    if output_dir is None:
+        return input_path.with_name(name)
+    relative = input_path.parent.relative_to(base_dir) if base_dir else Path()
+    return output_dir / relative / name
+
+
+def _export(
+    notebook, format: str, output_path: Path, images_dir: Path | None, result: ConversionResult
+) -> ConversionResult:
+    """Export a prepared notebook to one format, recording failures in ``result``."""
+    start = time.perf_counter()
+    try:
+        if images_dir is not None and format == "html":
+            result.size, result.assets = get_exporter(format).write(
+                notebook, output_path, images_dir
+            )
+        else:
+            body, _ = get_exporter(format).from_notebook_node(notebook)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            if isinstance(body, bytes):
+                output_path.write_bytes(body)
+            else:
+                output_path.write_text(body, encoding="utf-8")
+            result.size = output_path.stat().st_size
+    except Exception as e:
+        result.status = "failed"
+        result.error = str(e) or type(e).__name__
+    result.seconds += time.perf_counter() - start
+    return result
+
+
+def convert_formats(
+    input_path: Path, outputs: dict[str, Path], images_dir: Path | None = None
+) -> list[ConversionResult]:
+    """Convert one notebook to several formats, reading and preprocessing it once.
+
+    Exporters run on one thread per format. Failures are reported in the
+    results rather than raised; the time spent reading the notebook is
+    shared between the results.
+
+    Args:
+        input_path: Notebook to convert
+        outputs: Output path for each format
+        images_dir: Write HTML images to files in this directory
+
+    Returns:
+        Results in the order of ``outputs``
+    """
+    start = time.perf_counter()
+    results = [
+        ConversionResult(input_path, output_path, format) for format, output_path in outputs.items()
+    ]
+    try:
+        with open(input_path, encoding="utf-8") as f:
+            notebook = prepare_notebook(nbformat.read(f, as_version=4))
+        for format in outputs:
+            get_exporter(format)
+    except Exception as e:
+        for result in results:
+            result.status = "failed"
+            result.error = str(e) or type(e).__name__
+            result.seconds = time.perf_counter() - start
+        return results
+
+    shared = (time.perf_counter() - start) / len(results)
+    for result in results:
+        result.seconds = shared
+    if len(results) == 1:
+        [result] = results
+        return [_export(notebook, result.format, result.output_path, images_dir, result)]
+    with ThreadPoolExecutor(len(results)) as pool:
+        futures = [
+            pool.submit(_export, notebook, result.format, result.output_path, images_dir, result)
+            for result in results
+        ]
+        return [future.result() for future in futures]
+
+
+def convert_notebook(
+    input_path: Path, format: str, output_path: Path, images_dir: Path | None = None
+) -> ConversionResult:
+    """Convert one notebook, reporting failures in the result rather than raising.
+
+    With ``images_dir`` (HTML only), images are written to files in that
+    directory and the page is streamed to disk.
+    """
+    [result] = convert_formats(input_path, {format: output_path}, images_dir)
+    return result
+
+
+def _init_worker(formats: list[str]):
+    """Build the worker's exporters once, before it receives notebooks."""
+    for format in formats:
+        get_exporter(format)
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def exporter_version() -> str:
+    """Version of the conversion toolchain, recorded with each output."""
+    import nbconvert
+
+    return f"nbconvert-{nbconvert.__version__}+ai-kit-{CONVERTER_VERSION}"
+
+
+class ConversionCache:
+    """Manifest of conversions and a size-capped store of their outputs.
+
+    Each conversion is keyed by the input content hash, the format, the
+    exporter version and the options. The manifest (``manifest.json``) maps
+    keys to cached artifacts and output paths to the key they were built
+    from. Artifacts are evicted least recently used first once the cache
+    exceeds ``max_size`` bytes.
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int = DEFAULT_CACHE_SIZE):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.manifest_path = self.cache_dir / "manifest.json"
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.outputs: dict[str, dict[str, Any]] = {}
+        self._version: str | None = None
+        # What each key computed in this run stands for, stored with its entry
+        self._descriptions: dict[str, dict[str, Any]] = {}
+        if self.manifest_path.exists():
+            try:
+                data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+                self.entries = data.get("entries", {})
+                self.outputs = data.get("outputs", {})
+            except (OSError, ValueError):
+                # A corrupt manifest only costs a full rebuild
+                self.entries, self.outputs = {}, {}
+
+    def key(self, input_path: Path, format: str, options: dict[str, Any] | None = None) -> str:
+        """Conversion key of a notebook for a format and options."""
+        if self._version is None:
+            self._version = exporter_version()
+        description = {
+            "input_hash": file_hash(input_path),
+            "format": format,
+            "exporter_version": self._version,
+            "options": options or {},
+        }
+        key = hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+        self._descriptions[key] = description
+        return key
+
+    def _artifact(self, name: str) -> Path:
+        return self.cache_dir / "objects" / name[:2] / name
+
+    def is_current(self, output_path: Path, key: str) -> bool:
+        """Whether ``output_path`` was built from ``key`` and is unchanged since."""
+        record = self.outputs.get(str(Path(output_path).resolve()))
+        if not record or record["key"] != key or not output_path.exists():
+            return False
+        stat = output_path.stat()
+        if stat.st_size != record["size"] or stat.st_mtime_ns != record["mtime_ns"]:
+            return False
+        assets = self.entries.get(key, {}).get("assets", [])
+        return all((output_path.parent / asset["path"]).exists() for asset in assets)
+
+    def restore(self, key: str, output_path: Path) -> bool:
+        """Copy a cached artifact to ``output_path``, if there is one."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        artifact = self.cache_dir / entry["artifact"]
+        if not artifact.exists():
+            del self.entries[key]
+            return False
+        assets = [
+            (self.cache_dir / asset["artifact"], output_path.parent / asset["path"])
+            for asset in entry.get("assets", [])
+        ]
+        if not all(cached.exists() for cached, _ in assets):
+            del self.entries[key]
+            return False
+        for cached, path in assets:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(cached, path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(artifact, output_path)
+        entry["last_used"] = time.time()
+        self._record_output(key, output_path)
+        return True
+
+    def store(self, key: str, input_path: Path, output_path: Path, assets: Iterable[Path] = ()):
+        """Add a freshly converted output and the files it links to to the cache.
+
+        Assets (images) are stored under their own, content-addressed, names so
+        outputs sharing an image share its cached copy.
+        """
+        artifact = self._artifact(key + "".join(output_path.suffixes))
+        artifact.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(output_path, artifact)
+        size = artifact.stat().st_size
+        cached_assets = []
+        for asset in assets:
+            cached = self._artifact(asset.name)
+            if not cached.exists():
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(asset, cached)
+            size += cached.stat().st_size
+            cached_assets.append(
+                {
+                    "path": os.path.relpath(asset, output_path.parent),
+                    "artifact": str(cached.relative_to(self.cache_dir)),
+                }
+            )
+        self.entries[key] = {
+            **self._descriptions.get(key, {}),
+            "input": str(input_path),
+            "artifact": str(artifact.relative_to(self.cache_dir)),
+            "assets": cached_assets,
+            "size": size,
+            "last_used": time.time(),
+        }
+        self._record_output(key, output_path)
+
+    def _record_output(self, key: str, output_path: Path):
+        stat = output_path.stat()
+        self.outputs[str(Path(output_path).resolve())] = {
+            "key": key,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+    def size(self) -> int:
+        """Total size of the cached artifacts."""
+        return sum(entry["size"] for entry in self.entries.values())
+
+    def evict(self) -> list[str]:
+        """Remove least recently used artifacts until the cache fits ``max_size``."""
+        evicted = []
+        total = self.size()
+        for key, entry in sorted(self.entries.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_size:
+                break
+            (self.cache_dir / entry["artifact"]).unlink(missing_ok=True)
+            total -= entry["size"]
+            evicted.append(key)
+        evicted_assets = set()
+        for key in evicted:
+            entry = self.entries.pop(key)
+            evicted_assets.update(asset["artifact"] for asset in entry.get("assets", []))
+        # Assets may be shared with outputs still cached
+        for entry in self.entries.values():
+            evicted_assets.difference_update(asset["artifact"] for asset in entry.get("assets", []))
+        for artifact in evicted_assets:
+            (self.cache_dir / artifact).unlink(missing_ok=True)
+        return evicted
+
+    def save(self):
+        """Write the manifest atomically."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        data = {"version": CONVERTER_VERSION, "entries": self.entries, "outputs": self.outputs}
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, self.manifest_path)
+
+
+def run_format_conversions(
+    tasks: list[tuple[Path, dict[str, Path]]],
+    jobs: int | None = None,
+    on_complete: Callable[[ConversionResult], None] | None = None,
+    cache: ConversionCache | None = None,
+    images_dir: Path | None = None,
+    force: bool = False,
+) -> list[ConversionResult]:
+    """Convert notebooks to one or more formats, skipping outputs that are up to date.
+
+    With a cache, outputs built from the same input, format, exporter version
+    and options are left alone (``unchanged``) or copied from the cache
+    (``cached``); only the remaining outputs are converted, on a process pool
+    with one exporter per format in each worker. A notebook is read once for
+    all its pending formats.
+
+    Args:
+        tasks: Notebooks to convert and the output path for each format
+        jobs: Worker processes (default: CPU count); 1 converts in this process
+        on_complete: Called with each result as it completes
+        cache: Conversion cache to consult and update
+        images_dir: Write HTML images to files in this directory
+        force: Convert even when the output is up to date
+
+    Returns:
+        Results in the order of ``tasks``, then of their formats
+
+    Raises:
+        ValueError: If ``images_dir`` is given without an HTML output
+    """
+    formats = list(dict.fromkeys(format for _, outputs in tasks for format in outputs))
+    if images_dir is not None and "html" not in formats:
+        raise ValueError("Images can only be written to separate files for HTML")
+
+    def options(format: str, output_path: Path) -> dict[str, Any] | None:
+        if images_dir is None or format != "html":
+            return None
+        return {"images": Path(os.path.relpath(images_dir, output_path.parent)).as_posix()}
+
+    results: dict[tuple[Path, str], ConversionResult] = {}
+    keys: dict[tuple[Path, str], str] = {}
+
+    def complete(result: ConversionResult):
+        task = (result.input_path, result.format)
+        results[task] = result
+        if cache is not None and result.ok and result.status == "converted":
+            cache.store(keys[task], result.input_path, result.output_path, result.assets)
+        if on_complete is not None:
+            on_complete(result)
+
+    pending = []
+    for input_path, outputs in tasks:
+        remaining = {}
+        for format, output_path in outputs.items():
+            if cache is not None:
+                start = time.perf_counter()
+                key = keys[input_path, format] = cache.key(
+                    input_path, format, options(format, output_path)
+                )
+                status = None
+                if not force and cache.is_current(output_path, key):
+                    status = "unchanged"
+                elif not force and cache.restore(key, output_path):
+                    status = "cached"
+                if status is not None:
+                    complete(
+                        ConversionResult(
+                            input_path,
+                            output_path,
+                            format,
+                            size=output_path.stat().st_size,
+                            seconds=time.perf_counter() - start,
+                            status=status,
+                        )
+                    )
+                    continue
+            remaining[format] = output_path
+        if remaining:
+            pending.append((input_path, remaining))
+
+    jobs = min(jobs or os.cpu_count() or 1, len(pending))
+    if jobs <= 1:
+        for input_path, outputs in pending:
+            for result in convert_formats(input_path, outputs, images_dir):
+                complete(result)
+    else:
+        with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(formats,)) as pool:
+            futures = [
+                pool.submit(convert_formats, input_path, outputs, images_dir)
+                for input_path, outputs in pending
+            ]
+            for future in as_completed(futures):
+                for result in future.result():
+                    complete(result)
+
+    if cache is not None:
+        cache.evict()
+        cache.save()
+    return [results[input_path, format] for input_path, outputs in tasks for format in outputs]
+
+
+def run_conversions(
+    tasks: list[tuple[Path, Path]],
+    format: str,
+    jobs: int | None = None,
+    on_complete: Callable[[ConversionResult], None] | None = None,
+    cache: ConversionCache | None = None,
+    images_dir: Path | None = None,
+    force: bool = False,
+) -> list[ConversionResult]:
+    """Convert ``(input, output)`` pairs to one format, skipping up-to-date outputs.
+
+    See :func:`run_format_conversions`.
+
+    Raises:
+        ValueError: If ``images_dir`` is given for a format other than HTML
+    """
+    return run_format_conversions(
+        [(input_path, {format: output_path}) for input_path, output_path in tasks],
+        jobs,
+        on_complete,
+        cache=cache,
+        images_dir=images_dir,
+        force=force,
+    )
+
+
+def convert_notebooks(
+    inputs: list[Path],
+    format: str | list[str],
+    output_dir: Path | None = None,
+    jobs: int | None = None,
+    on_complete: Callable[[ConversionResult], None] | None = None,
+    cache: ConversionCache | None = None,
+    images_dir: Path | None = None,
+    force: bool = False,
+) -> list[ConversionResult]:
+    """Convert notebooks on a process pool, one exporter per format and worker.
+
+    Args:
+        inputs: Notebooks to convert
+        format: Output format (a key of :data:`EXPORTERS`), or several formats
+        output_dir: Directory for the outputs (default: next to each notebook)
+        jobs: Worker processes (default: CPU count); 1 converts in this process
+        on_complete: Called with each result as it completes
+        cache: Conversion cache making reruns incremental
+        images_dir: Write HTML images to files in this directory
+        force: Convert even when the output is up to date
+
+    Returns:
+        Results in the order of ``inputs``, then of the formats
+    """
+    formats = [format] if isinstance(format, str) else list(format)
+    base_dir = None
+    if output_dir is not None and inputs:
+        base_dir = Path(os.path.commonpath([path.resolve().parent for path in inputs]))
+    tasks = [
+        (
+            path,
+            {
+                format: default_output_path(
+                    path.resolve() if base_dir else path, format, output_dir, base_dir
+                )
+                for format in formats
+            },
+        )
+        for path in inputs
+    ]
+    return run_format_conversions(
+        tasks, jobs, on_complete, cache=cache, images_dir=images_dir, force=force
+    )
@@ -0,0 +1,916 @@
+"""Notebook execution with live progress events.
+
+Notebooks are executed through papermill using a dedicated ``ai-kit`` engine.
+The engine drives a papermill notebook client that reports execution events
+(cell start/finish, stdout/stderr, elapsed time) to handlers as they happen,
+so long-running batch jobs can be followed live.
+
+Runs can be bounded with :class:`ResourceLimits`. Limits are enforced on the
+kernel process with rlimits and a watchdog thread, and the resources used are
+recorded in the output notebook metadata under ``ai_kit.resources``.
+:class:`OutputBudget` bounds the stream and display outputs kept in the
+notebook: output beyond the budget is truncated with a marker, or spilled to
+a JSON lines sidecar file, as it arrives.
+
+:func:`run_fan_out` renders one notebook for many parameter sets: the cells up
+to the ``fan-out`` tag run once, and each variant runs the remaining cells
+from a snapshot of the kernel namespace.
+"""
+
+import contextlib
+import itertools
+import json
+import os
+import re
+import signal
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, TextIO
+
+import nbformat
+import papermill as pm
+from papermill.clientwrap import PapermillNotebookClient
+from papermill.engines import NBClientEngine, papermill_engines
+from papermill.log import logger
+from papermill.utils import merge_kwargs, remove_args
+from traitlets import Any as AnyTrait
+
+ENGINE_NAME = "ai-kit"
+
+# Default interval (seconds) between flushes of the partially executed notebook
+DEFAULT_FLUSH_EVERY = 30
+
+# Interval (seconds) between watchdog checks of the kernel process
+WATCHDOG_INTERVAL = 0.5
+
+# Default budget for the outputs kept in an executed notebook, below the 10 MB
+# limit enforced by check_notebook_size
+DEFAULT_OUTPUT_BUDGET = 8 * 1024**2
+
+# Output types subject to output budgets (errors are always kept)
+BUDGETED_OUTPUTS = ("stream", "display_data", "execute_result")
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+class ResourceLimitError(RuntimeError):
+    """Raised when a notebook run exceeds one of its resource limits."""
+
+
+@dataclass
+class ResourceLimits:
+    """Resource limits for a notebook run. ``None`` disables a limit."""
+
+    timeout: float | None = None
+    cell_timeout: int | None = None
+    max_rss: int | None = None
+    max_output_bytes: int | None = None
+
+
+@dataclass
+class OutputBudget:
+    """Byte budgets for the outputs kept in an executed notebook.
+
+    ``None`` or 0 disables a budget. Output beyond a budget is written to
+    ``spill_path`` (JSON lines) when set, and dropped otherwise.
+    """
+
+    cell_bytes: int | None = None
+    notebook_bytes: int | None = None
+    spill_path: Path | None = None
+
+    def allowance(self, cell_used: int, notebook_used: int) -> int | None:
+        """Bytes still allowed for a cell, or ``None`` when unlimited."""
+        remaining = [
+            budget - used
+            for budget, used in ((self.cell_bytes, cell_used), (self.notebook_bytes, notebook_used))
+            if budget
+        ]
+        return max(min(remaining), 0) if remaining else None
+
+
+def output_size(msg: dict[str, Any]) -> int:
+    """Size in bytes of the payload of a stream or display message."""
+    content = msg["content"]
+    if msg["msg_type"] == "stream":
+        return len(content.get("text", "").encode("utf-8"))
+    return len(json.dumps(content.get("data", {})))
+
+
+def split_text(text: str, limit: int) -> tuple[str, str]:
+    """Split text so the head fits in ``limit`` bytes, at a line end when possible."""
+    head = text.encode("utf-8")[:limit].decode("utf-8", "ignore")
+    if len(head) < len(text) and "\n" in head:
+        head = head[: head.rindex("\n") + 1]
+    return head, text[len(head) :]
+
+
+@dataclass
+class ResourceUsage:
+    """Resources used by a notebook run."""
+
+    peak_rss: int | None = None
+    cpu_seconds: float | None = None
+    output_bytes: int = 0
+    truncated_bytes: int = 0
+    wall_seconds: float | None = None
+    limit_exceeded: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the usage as a JSON-serializable dict."""
+        return asdict(self)
+
+
+@dataclass
+class ExecutionEvent:
+    """Event emitted while a notebook executes."""
+
+    type: str
+    elapsed: float
+    cell_index: int | None = None
+    data: dict[str, Any] = field(default_factory=dict)
+    timestamp: str = field(default_factory=lambda: datetime.now(UTC).isoformat())
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a flat, JSON-serializable representation of the event."""
+        event = {
+            "event": self.type,
+            "timestamp": self.timestamp,
+            "elapsed": round(self.elapsed, 3),
+        }
+        if self.cell_index is not None:
+            event["cell"] = self.cell_index
+        event.update(self.data)
+        return event
+
+
+EventHandler = Callable[[ExecutionEvent], None]
+
+
+def parse_size(value: str) -> int:
+    """Parse a byte size such as ``512M`` or ``2G`` (binary units).
+
+    Raises:
+        ValueError: If the size is not a number with an optional K/M/G/T suffix
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*", value, re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size: {value}. Use a number with optional K, M, G or T suffix")
+    number, unit = match.groups()
+    return int(float(number) * SIZE_UNITS[unit.upper()])
+
+
+def format_size(size: int | None) -> str:
+    """Format a byte size for display."""
+    if size is None:
+        return "n/a"
+    if size < 1024:
+        return f"{size} B"
+    if size < 1024**2:
+        return f"{size / 1024:.1f} KB"
+    if size < 1024**3:
+        return f"{size / 1024**2:.1f} MB"
+    return f"{size / 1024**3:.1f} GB"
+
+
+def read_process_usage(pid: int) -> tuple[int, int, float] | None:
+    """Read current RSS, peak RSS (bytes) and CPU seconds of a process from /proc.
+
+    Returns:
+        ``(rss, peak_rss, cpu_seconds)``, or None if /proc is unavailable
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            status = f.read()
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+
+    fields = dict(re.findall(r"^(VmRSS|VmHWM):\s+(\d+) kB", status, re.MULTILINE))
+    if "VmRSS" not in fields:
+        # Zombie processes no longer report memory
+        return None
+    rss = int(fields["VmRSS"]) * 1024
+    peak_rss = int(fields.get("VmHWM", 0)) * 1024
+    # utime and stime are fields 14 and 15; the command name may contain spaces
+    ticks = stat.rsplit(")", 1)[1].split()
+    cpu_seconds = (int(ticks[11]) + int(ticks[12])) / os.sysconf("SC_CLK_TCK")
+    return rss, peak_rss, cpu_seconds
+
+
+class KernelWatchdog:
+    """Enforce resource limits on a kernel process and track its usage.
+
+    A background thread samples the kernel's memory and CPU usage and kills
+    the kernel when the run exceeds its wall-clock timeout or maximum RSS.
+    """
+
+    def __init__(
+        self,
+        pid: int | None,
+        limits: ResourceLimits,
+        usage: ResourceUsage,
+        interval: float = WATCHDOG_INTERVAL,
+    ):
+        self.pid = pid
+        self.limits = limits
+        self.usage = usage
+        self.interval = interval
+        self.start_time = time.monotonic()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._watch, name="kernel-watchdog", daemon=True)
+
+    def start(self):
+        """Apply rlimits to the kernel and start watching it."""
+        if self.pid is not None and self.limits.max_rss:
+            try:
+                # Allocations beyond the limit raise MemoryError inside the kernel
+                import resource
+
+                resource.prlimit(
+                    self.pid, resource.RLIMIT_DATA, (self.limits.max_rss, self.limits.max_rss)
+                )
+            except (ImportError, AttributeError, OSError):
+                # prlimit is Linux-only; the watchdog still enforces the limit
+                pass
+        self.sample()
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching, taking a final usage sample."""
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.sample()
+
+    def sample(self) -> int | None:
+        """Record the kernel's usage, returning its current RSS."""
+        if self.pid is None:
+            return None
+        sample = read_process_usage(self.pid)
+        if sample is None:
+            return None
+        rss, peak_rss, cpu_seconds = sample
+        self.usage.peak_rss = max(self.usage.peak_rss or 0, peak_rss, rss)
+        self.usage.cpu_seconds = cpu_seconds
+        return rss
+
+    def check(self):
+        """Check the limits once, killing the kernel if one is exceeded."""
+        rss = self.sample()
+        elapsed = time.monotonic() - self.start_time
+        if self.limits.timeout and elapsed > self.limits.timeout:
+            self.kill(f"Notebook exceeded timeout of {self.limits.timeout:g}s")
+        elif self.limits.max_rss and rss is not None and rss > self.limits.max_rss:
+            self.kill(
+                f"Kernel memory {format_size(rss)} exceeded "
+                f"max RSS of {format_size(self.limits.max_rss)}"
+            )
+
+    def kill(self, reason: str):
+        """Record why the run was stopped and kill the kernel."""
+        if self.usage.limit_exceeded is None:
+            self.usage.limit_exceeded = reason
+            self.sample()
+        if self.pid is not None:
+            with contextlib.suppress(OSError):
+                os.kill(self.pid, signal.SIGKILL)
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+
+class JsonlEventWriter:
+    """Write execution events as JSON lines, flushing after each event."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def __call__(self, event: ExecutionEvent):
+        """Write one event."""
+        self.stream.write(json.dumps(event.to_dict(), default=str) + "\n")
+        self.stream.flush()
+
+
+class EventEmitter:
+    """Dispatch execution events to handlers, timing them from a common start."""
+
+    def __init__(self, handlers: Iterable[EventHandler] = ()):
+        self.handlers = list(handlers)
+        self.start = time.monotonic()
+
+    def elapsed(self) -> float:
+        """Seconds since the emitter was created."""
+        return time.monotonic() - self.start
+
+    def emit(self, event_type: str, cell_index: int | None = None, **data: Any):
+        """Build an event and send it to every handler."""
+        event = ExecutionEvent(event_type, self.elapsed(), cell_index, data)
+        for handler in self.handlers:
+            handler(event)
+
+
+class AiKitNotebookClient(PapermillNotebookClient):
+    """Papermill notebook client that reports execution events as they happen."""
+
+    emitter = AnyTrait(default_value=None, allow_none=True).tag(config=True)
+    limits = AnyTrait(default_value=None, allow_none=True).tag(config=True)
+    usage = AnyTrait(default_value=None, allow_none=True).tag(config=True)
+    budget = AnyTrait(default_value=None, allow_none=True).tag(config=True)
+
+    def __init__(self, nb_man, **kw):
+        super().__init__(nb_man, **kw)
+        if self.limits is None:
+            self.limits = ResourceLimits()
+        if self.usage is None:
+            self.usage = ResourceUsage()
+        if self.budget is None:
+            self.budget = OutputBudget()
+        self.watchdog: KernelWatchdog | None = None
+        self._cell_start_times: dict[int, float] = {}
+        self._kept_bytes = 0
+        self._cell_kept_bytes: dict[int, int] = {}
+        self._truncation_markers: dict[int, tuple[nbformat.NotebookNode, int]] = {}
+        self._spill_file: TextIO | None = None
+        self.on_notebook_start = self._notebook_started
+        self.on_cell_execute = self._cell_started
+        self.on_cell_executed = self._cell_executed
+
+    def _emit(self, event_type: str, cell_index: int | None = None, **data: Any):
+        if self.emitter is not None:
+            self.emitter.emit(event_type, cell_index, **data)
+
+    def execute(self, **kwargs):
+        """Execute the notebook, recording resource usage in its metadata."""
+        try:
+            return super().execute(**kwargs)
+        finally:
+            self._notebook_completed(self.nb)
+            if self._spill_file is not None:
+                self._spill_file.close()
+                self._spill_file = None
+            # A kernel passed in by the caller outlives this client: release
+            # our channels but leave the kernel running
+            if not self.owns_km and self.kc is not None:
+                self.kc.stop_channels()
+                self.kc = None
+
+    def _kernel_pid(self) -> int | None:
+        process = getattr(getattr(self.km, "provisioner", None), "process", None)
+        return getattr(process, "pid", None)
+
+    def _notebook_started(self, notebook, **kwargs):
+        self.watchdog = KernelWatchdog(self._kernel_pid(), self.limits, self.usage)
+        self.watchdog.start()
+        code_cells = sum(1 for cell in notebook.cells if cell.cell_type == "code")
+        self._emit(
+            "notebook_start",
+            cells=len(notebook.cells),
+            code_cells=code_cells,
+            kernel=self.kernel_name,
+        )
+
+    def _notebook_completed(self, notebook):
+        if self.watchdog is not None:
+            self.watchdog.stop()
+            self.usage.wall_seconds = round(time.monotonic() - self.watchdog.start_time, 3)
+        notebook.metadata.setdefault("ai_kit", {})
+        notebook.metadata["ai_kit"]["resources"] = self.usage.to_dict()
+        notebook.metadata["ai_kit"]["limits"] = asdict(self.limits)
+        if self._truncation_markers:
+            notebook.metadata["ai_kit"]["truncated_cells"] = sorted(self._truncation_markers)
+
+    def _cell_started(self, cell, cell_index, **kwargs):
+        self._cell_start_times[cell_index] = time.monotonic()
+        first_line = next((line for line in cell.source.splitlines() if line.strip()), "")
+        self._emit("cell_start", cell_index, source=first_line[:80])
+
+    def _cell_executed(self, cell, cell_index, execute_reply, **kwargs):
+        started = self._cell_start_times.pop(cell_index, time.monotonic())
+        content = execute_reply.get("content", {}) if execute_reply else {}
+        data = {
+            "status": content.get("status", "ok"),
+            "duration": round(time.monotonic() - started, 3),
+            "execution_count": cell.get("execution_count"),
+        }
+        if data["status"] == "error":
+            data["ename"] = content.get("ename")
+            data["evalue"] = content.get("evalue")
+        if self.watchdog is not None:
+            self.watchdog.sample()
+        self._emit("cell_complete", cell_index, **data)
+
+    def output(self, outs, msg, display_id, cell_index):
+        """Store an output, keeping the cell and the notebook within their budgets."""
+        allowance = self.budget.allowance(
+            self._cell_kept_bytes.get(cell_index, 0), self._kept_bytes
+        )
+        if msg["msg_type"] not in BUDGETED_OUTPUTS or allowance is None:
+            return super().output(outs, msg, display_id, cell_index)
+
+        size = output_size(msg)
+        if cell_index not in self._truncation_markers and size <= allowance:
+            self._count_kept(cell_index, size)
+            return super().output(outs, msg, display_id, cell_index)
+
+        # Over budget: keep what fits of a stream, spill or drop the rest.
+        # Once a cell is truncated, its later outputs are not kept.
+        kept = None
+        overflow = msg["content"]
+        dropped = size
+        if msg["msg_type"] == "stream" and cell_index not in self._truncation_markers:
+            head, tail = split_text(overflow["text"], allowance)
+            if head:
+                kept = super().output(
+                    outs, {**msg, "content": {**overflow, "text": head}}, display_id, cell_index
+                )
+                dropped = len(tail.encode("utf-8"))
+                self._count_kept(cell_index, size - dropped)
+            overflow = {**overflow, "text": tail}
+        self._spill(cell_index, msg["msg_type"], overflow)
+        self._mark_truncated(outs, cell_index, dropped)
+        return kept
+
+    def _count_kept(self, cell_index: int, size: int):
+        self._kept_bytes += size
+        self._cell_kept_bytes[cell_index] = self._cell_kept_bytes.get(cell_index, 0) + size
+
+    def _spill(self, cell_index: int, output_type: str, content: dict[str, Any]):
+        if self.budget.spill_path is None:
+            return
+        if self._spill_file is None:
+            # Kept open for the whole run, closed in execute()
+            self._spill_file = open(self.budget.spill_path, "a", encoding="utf-8")  # noqa: SIM115
+        record = {"cell": cell_index, "output_type": output_type}
+        if output_type == "stream":
+            record.update(name=content.get("name"), text=content.get("text"))
+        else:
+            record["data"] = content.get("data", {})
+        self._spill_file.write(json.dumps(record) + "\n")
+
+    def _mark_truncated(self, outs, cell_index: int, dropped: int):
+        self.usage.truncated_bytes += dropped
+        self.usage.output_bytes += dropped
+        marker, total = self._truncation_markers.get(cell_index, (None, 0))
+        if marker is None:
+            marker = nbformat.v4.new_output("stream", name="stderr", text="")
+            outs.append(marker)
+        total += dropped
+        self._truncation_markers[cell_index] = (marker, total)
+        destination = (
+            f"written to {self.budget.spill_path.name}" if self.budget.spill_path else "dropped"
+        )
+        marker.text = f"[ai-kit] Output truncated: {format_size(total)} {destination}\n"
+
+    def process_message(self, msg, cell, cell_index):
+        """Process a kernel message, report stream output and count output bytes."""
+        output = super().process_message(msg, cell, cell_index)
+        if output is not None:
+            if output.output_type == "stream":
+                self._emit("stream", cell_index, name=output.name, text=output.text)
+            self.usage.output_bytes += len(json.dumps(output))
+        max_output_bytes = self.limits.max_output_bytes
+        if max_output_bytes and self.usage.output_bytes > max_output_bytes and self.watchdog:
+            self.watchdog.kill(
+                f"Notebook output exceeded max output bytes of {format_size(max_output_bytes)}"
+            )
+        return output
+
+
+class AiKitEngine(NBClientEngine):
+    """Papermill engine executing notebooks with :class:`AiKitNotebookClient`."""
+
+    @classmethod
+    def execute_managed_notebook(
+        cls,
+        nb_man,
+        kernel_name,
+        log_output=False,
+        stdout_file=None,
+        stderr_file=None,
+        start_timeout=60,
+        execution_timeout=None,
+        **kwargs,
+    ):
+        """Execute the parameterized notebook with the event-reporting client."""
+        kwargs = remove_args(["input_path"], **kwargs)
+        safe_kwargs = remove_args(["timeout", "startup_timeout"], **kwargs)
+        final_kwargs = merge_kwargs(
+            safe_kwargs,
+            timeout=execution_timeout if execution_timeout else kwargs.get("timeout"),
+            startup_timeout=start_timeout,
+            kernel_name=kernel_name,
+            log=logger,
+            log_output=log_output,
+            stdout_file=stdout_file,
+            stderr_file=stderr_file,
+        )
+        return AiKitNotebookClient(nb_man, **final_kwargs).execute()
+
+
+papermill_engines.register(ENGINE_NAME, AiKitEngine)
+
+
+def parse_parameters(parameters: Iterable[str]) -> dict[str, Any]:
+    """Parse key=value parameters, converting booleans and numbers.
+
+    Raises:
+        ValueError: If a parameter is not in key=value format
+    """
+    params = {}
+    for param in parameters:
+        if "=" not in param:
+            raise ValueError(f"Invalid parameter format: {param}. Use key=value")
+        key, value = param.split("=", 1)
+        # Try to parse as number or boolean
+        if value.lower() == "true":
+            params[key] = True
+        elif value.lower() == "false":
+            params[key] = False
+        elif value.isdigit():
+            params[key] = int(value)
+        else:
+            try:
+                params[key] = float(value)
+            except ValueError:
+                params[key] = value
+    return params
+
+
+def _execute(
+    input_path: Path | nbformat.NotebookNode,
+    output_path: Path | None,
+    parameters: dict[str, Any] | None,
+    kernel_name: str | None,
+    emitter: EventEmitter,
+    limits: ResourceLimits,
+    usage: ResourceUsage,
+    flush_every: int = DEFAULT_FLUSH_EVERY,
+    progress_bar: bool = False,
+    budget: OutputBudget | None = None,
+    **engine_kwargs: Any,
+) -> nbformat.NotebookNode:
+    """Execute a notebook with the ai-kit engine.
+
+    Raises:
+        ResourceLimitError: If the run exceeded one of its limits
+    """
+    try:
+        return pm.execute_notebook(
+            input_path if isinstance(input_path, nbformat.NotebookNode) else str(input_path),
+            str(output_path) if output_path else None,
+            parameters=parameters,
+            engine_name=ENGINE_NAME,
+            kernel_name=kernel_name,
+            progress_bar=progress_bar,
+            autosave_cell_every=flush_every,
+            execution_timeout=limits.cell_timeout,
+            emitter=emitter,
+            limits=limits,
+            usage=usage,
+            budget=budget,
+            **engine_kwargs,
+        )
+    except Exception as e:
+        if usage.limit_exceeded:
+            raise ResourceLimitError(usage.limit_exceeded) from e
+        raise
+
+
+def run_notebook(
+    input_path: Path,
+    output_path: Path,
+    parameters: dict[str, Any] | None = None,
+    kernel_name: str | None = None,
+    event_handlers: Iterable[EventHandler] = (),
+    flush_every: int = DEFAULT_FLUSH_EVERY,
+    progress_bar: bool = False,
+    limits: ResourceLimits | None = None,
+    budget: OutputBudget | None = None,
+) -> nbformat.NotebookNode:
+    """Execute a notebook with papermill, streaming execution events.
+
+    The partially executed notebook is written to ``output_path`` at every cell
+    boundary and at most every ``flush_every`` seconds while a cell produces
+    output, so a crash does not lose the outputs collected so far.
+
+    Args:
+        input_path: Notebook to execute
+        output_path: Where to write the executed notebook
+        parameters: Values injected into the ``parameters`` cell
+        kernel_name: Kernel to use (default: the notebook's kernel)
+        event_handlers: Callables receiving each :class:`ExecutionEvent`
+        flush_every: Seconds between flushes of the partial notebook (0 disables)
+        progress_bar: Show papermill's own progress bar
+        limits: Resource limits enforced on the kernel
+        budget: Budgets for the outputs kept in the executed notebook
+
+    Returns:
+        The executed notebook, with resource usage in ``metadata.ai_kit.resources``
+
+    Raises:
+        papermill.PapermillExecutionError: If a cell raised an error
+        ResourceLimitError: If the run exceeded one of its limits
+    """
+    limits = limits or ResourceLimits()
+    usage = ResourceUsage()
+    emitter = EventEmitter(event_handlers)
+    status = "failed"
+    try:
+        nb = _execute(
+            input_path,
+            output_path,
+            parameters or {},
+            kernel_name,
+            emitter,
+            limits,
+            usage,
+            flush_every=flush_every,
+            progress_bar=progress_bar,
+            budget=budget,
+        )
+        status = "completed"
+        return nb
+    finally:
+        if usage.wall_seconds is None:
+            usage.wall_seconds = round(emitter.elapsed(), 3)
+        emitter.emit(
+            "notebook_complete",
+            status=status,
+            output=str(output_path),
+            resources=usage.to_dict(),
+        )
+
+
+# Cell tag marking the last cell of the shared part of a fan-out notebook
+FAN_OUT_TAG = "fan-out"
+
+# Globals left out of the kernel snapshot: IPython history and helpers, and
+# the snapshot's own names
+_SNAPSHOT_EXCLUDE = ("In", "Out", "get_ipython", "exit", "quit", "open")
+_SNAPSHOT_EXCLUDE_PATTERN = r"__ai_kit\w*|__\w+__|_{1,3}|_i{1,3}|_i?\d+|_[iod]h|_exit_code"
+
+_SNAPSHOT_CODE = f"""\
+import re as __ai_kit_re
+
+
+def __ai_kit_is_user_global(name):
+    return name not in {_SNAPSHOT_EXCLUDE!r} and not __ai_kit_re.fullmatch(
+        {_SNAPSHOT_EXCLUDE_PATTERN!r}, name
+    )
+
+
+__ai_kit_snapshot = {{
+    __ai_kit_name: __ai_kit_value
+    for __ai_kit_name, __ai_kit_value in globals().items()
+    if __ai_kit_is_user_global(__ai_kit_name)
+}}
+"""
+
+# Restore deep copies so a variant mutating a DataFrame in place does not leak
+# into the next one; objects that cannot be copied (modules, connections) are
+# shared by reference.
+_RESTORE_CODE = """\
+import copy as __ai_kit_copy
+for __ai_kit_name in [
+    __ai_kit_name
+    for __ai_kit_name in globals()
+    if __ai_kit_is_user_global(__ai_kit_name) and __ai_kit_name not in __ai_kit_snapshot
+]:
+    del globals()[__ai_kit_name]
+for __ai_kit_name, __ai_kit_value in __ai_kit_snapshot.items():
+    try:
+        globals()[__ai_kit_name] = __ai_kit_copy.deepcopy(__ai_kit_value)
+    except Exception:
+        globals()[__ai_kit_name] = __ai_kit_value
+"""
+
+
+@dataclass
+class FanOutResult:
+    """Outcome of rendering one fan-out variant."""
+
+    parameters: dict[str, Any]
+    output_path: Path
+    status: str = "pending"
+    error: str | None = None
+
+
+def variant_slug(parameters: dict[str, Any]) -> str:
+    """Build a file-name friendly slug from a variant's parameter values."""
+    slug = "-".join(str(value) for value in parameters.values())
+    slug = re.sub(r"[^\w.-]+", "-", slug).strip("-.").lower()
+    return slug or "variant"
+
+
+def parse_variants(vary: Iterable[str]) -> list[dict[str, Any]]:
+    """Expand ``name=v1,v2`` specs into the cartesian product of parameter sets.
+
+    Values are converted as in :func:`parse_parameters`.
+
+    Raises:
+        ValueError: If a spec is not in name=v1,v2 format
+    """
+    axes = []
+    for spec in vary:
+        name, sep, values = spec.partition("=")
+        if not sep or not name or not values:
+            raise ValueError(f"Invalid variant format: {spec}. Use name=value1,value2")
+        axes.append([parse_parameters([f"{name}={value.strip()}"]) for value in values.split(",")])
+    return [
+        {key: value for part in combination for key, value in part.items()}
+        for combination in itertools.product(*axes)
+    ]
+
+
+def split_fan_out(notebook: nbformat.NotebookNode, marker: str = FAN_OUT_TAG) -> tuple[list, list]:
+    """Split a notebook into shared cells and per-variant cells.
+
+    The shared part ends with the first cell tagged ``marker``.
+
+    Raises:
+        ValueError: If no cell is tagged with the marker
+    """
+    for index, cell in enumerate(notebook.cells):
+        if marker in cell.get("metadata", {}).get("tags", []):
+            return notebook.cells[: index + 1], notebook.cells[index + 1 :]
+    raise ValueError(f"No cell tagged '{marker}' marks the end of the shared cells")
+
+
+def _run_code(km, code: str):
+    """Run bookkeeping code in the kernel, raising if it fails.
+
+    A new client is connected for each call: clients of one kernel manager
+    share its session, and the kernel replies to the last one connected.
+    """
+    kc = km.client()
+    kc.start_channels()
+    try:
+        kc.wait_for_ready(timeout=60)
+        reply = kc.execute_interactive(
+            code, silent=True, store_history=False, output_hook=lambda msg: None
+        )
+    finally:
+        kc.stop_channels()
+    content = reply["content"]
+    if content["status"] != "ok":
+        raise RuntimeError(
+            f"Kernel snapshot failed: {content.get('ename')}: {content.get('evalue')}"
+        )
+
+
+def run_fan_out(
+    input_path: Path,
+    output_dir: Path,
+    variants: Iterable[dict[str, Any]],
+    parameters: dict[str, Any] | None = None,
+    kernel_name: str | None = None,
+    marker: str = FAN_OUT_TAG,
+    event_handlers: Iterable[EventHandler] = (),
+    flush_every: int = DEFAULT_FLUSH_EVERY,
+    limits: ResourceLimits | None = None,
+    budget: OutputBudget | None = None,
+    on_complete: Callable[[FanOutResult], None] | None = None,
+) -> list[FanOutResult]:
+    """Run the shared cells of a notebook once and render one notebook per variant.
+
+    The cells up to and including the first cell tagged ``marker`` run once,
+    with ``parameters`` injected as for :func:`run_notebook`. The kernel
+    namespace is then snapshotted in the kernel. For each variant the snapshot
+    is restored, the variant's parameters are injected and the remaining cells
+    run, and the shared outputs plus the variant outputs are written to
+    ``output_dir/<stem>-<slug>.ipynb``.
+
+    A failing variant is reported in its result and does not stop the others.
+    Limits and output budgets apply to each phase (the shared cells, then
+    each variant).
+
+    Raises:
+        ValueError: If the notebook has no marker cell or is not a Python notebook
+        papermill.PapermillExecutionError: If a shared cell raised an error
+        ResourceLimitError: If the shared cells exceeded one of the limits
+    """
+    from jupyter_client.manager import KernelManager
+    from papermill.translators import translate_parameters
+
+    limits = limits or ResourceLimits()
+    emitter = EventEmitter(event_handlers)
+    source = nbformat.read(input_path, as_version=4)
+    shared_cells, variant_cells = split_fan_out(source, marker)
+
+    kernel_name = kernel_name or source.metadata.get("kernelspec", {}).get("name", "python3")
+    language = source.metadata.get("kernelspec", {}).get("language", "python")
+    if language != "python":
+        raise ValueError(f"Fan-out needs a Python kernel, not {language}")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    results = [
+        FanOutResult(dict(variant), output_path=output_dir / f"{input_path.stem}-{slug}.ipynb")
+        for variant, slug in ((variant, variant_slug(variant)) for variant in variants)
+    ]
+
+    km = KernelManager(kernel_name=kernel_name)
+    km.start_kernel(cwd=str(Path(input_path).resolve().parent))
+    try:
+        # Shared cells: run once, then snapshot the namespace
+        shared_usage = ResourceUsage()
+        shared = _execute(
+            nbformat.from_dict({**source, "cells": shared_cells}),
+            None,
+            parameters or {},
+            kernel_name,
+            emitter,
+            limits,
+            shared_usage,
+            flush_every=flush_every,
+            budget=budget,
+            km=km,
+        )
+        emitter.emit(
+            "notebook_complete", status="completed", output=None, resources=shared_usage.to_dict()
+        )
+        _run_code(km, _SNAPSHOT_CODE)
+
+        for result in results:
+            result.output_path.unlink(missing_ok=True)
+            injected = nbformat.v4.new_code_cell(
+                translate_parameters(
+                    kernel_name,
+                    language,
+                    result.parameters,
+                    f"Fan-out variant: {variant_slug(result.parameters)}",
+                ),
+                metadata={"tags": ["injected-parameters"]},
+            )
+            variant = nbformat.from_dict({**source, "cells": [injected, *variant_cells]})
+            usage = ResourceUsage()
+            try:
+                _run_code(km, _RESTORE_CODE)
+                _execute(
+                    variant,
+                    result.output_path,
+                    None,
+                    kernel_name,
+                    emitter,
+                    limits,
+                    usage,
+                    flush_every=flush_every,
+                    budget=budget,
+                    km=km,
+                )
+                result.status = "completed"
+            except Exception as e:
+                result.status = "failed"
+                result.error = str(e)
+            finally:
+                _assemble_variant(shared, result, marker, shared_usage)
+                emitter.emit(
+                    "notebook_complete",
+                    status=result.status,
+                    output=str(result.output_path),
+                    resources=usage.to_dict(),
+                )
+            if on_complete is not None:
+                on_complete(result)
+            if not km.is_alive():
+                break
+    finally:
+        km.shutdown_kernel(now=True)
+
+    for result in results:
+        if result.status == "pending":
+            result.status = "failed"
+            result.error = "Kernel died before this variant ran"
+            if on_complete is not None:
+                on_complete(result)
+    return results
+
+
+def _assemble_variant(
+    shared: nbformat.NotebookNode,
+    result: FanOutResult,
+    marker: str,
+    shared_usage: ResourceUsage,
+):
+    """Write the shared cells followed by the variant's executed cells."""
+    if not result.output_path.exists():
+        return
+    variant = nbformat.read(result.output_path, as_version=4)
+    variant.cells = [*shared.cells, *variant.cells]
+    variant.metadata.setdefault("papermill", {})["parameters"] = {
+        **shared.metadata.get("papermill", {}).get("parameters", {}),
+        **result.parameters,
+    }
+    variant.metadata.setdefault("ai_kit", {})["fan_out"] = {
+        "marker": marker,
+        "shared_cells": len(shared.cells),
+        "variant": result.parameters,
+        "shared_resources": shared_usage.to_dict(),
+    }
+    nbformat.write(variant, str(result.output_path))
@@ -0,0 +1,212 @@
+"""Audit history of notebooks from the git log.
+
+The history of every notebook (who changed it, when, how many lines, and which
+tags captured each version) is built from a single streaming ``git log`` pass
+over the notebooks directory. The commits read are cached in a JSON file with
+the commit they were read up to, so later runs only read the commits made
+since.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from ai_kit.cli.utils.git import (
+    FileChange,
+    GitCommit,
+    GitTag,
+    get_current_commit_sha,
+    iter_git_log,
+)
+
+# Bump when the cache layout changes
+CACHE_VERSION = 1
+
+
+@dataclass
+class NotebookRevision:
+    """A commit that changed a notebook.
+
+    ``path`` is the notebook's path in that commit (it differs from the
+    current one before a rename). ``tags`` are the tags of the notebook's
+    category in which this revision is the notebook's latest version.
+    """
+
+    commit: str
+    author: str
+    email: str
+    date: datetime
+    subject: str
+    status: str
+    path: str
+    insertions: int | None
+    deletions: int | None
+    tags: list[str] = field(default_factory=list)
+
+
+def build_notebook_history(
+    notebooks_dir: Path, tags: list[GitTag] | None = None, cache_path: Path | None = None
+) -> dict[str, list[NotebookRevision]]:
+    """Build the history of every notebook ever committed under ``notebooks_dir``.
+
+    Notebooks are followed across renames. A tag captures a revision when the
+    revision is the newest change to the notebook in the tagged commit's
+    history.
+
+    Args:
+        notebooks_dir: Notebooks directory, inside a git repository
+        tags: Tags to report on each revision (see ``list_git_tag_details``)
+        cache_path: JSON file caching the commits read
+
+    Returns:
+        Revisions of each notebook, newest first, keyed by the notebook's
+        current (or last) path relative to ``notebooks_dir``, sorted by path
+
+    Raises:
+        RuntimeError: If git commands fail
+    """
+    head = get_current_commit_sha(cwd=notebooks_dir)
+    commits = _read_cache(cache_path, notebooks_dir)
+    cached_head = commits[0].sha if commits else None
+
+    if cached_head != head:
+        revisions = [head]
+        if cached_head:
+            # Only the commits made since; the cached ones are their ancestors
+            # or, after a rebase, are pruned below
+            revisions.append(f"^{cached_head}")
+        try:
+            new = list(iter_git_log(revisions, ["."], cwd=notebooks_dir))
+        except RuntimeError:
+            if not cached_head:
+                raise
+            # The cached commit is gone (history rewritten and collected)
+            commits, new = [], list(iter_git_log([head], ["."], cwd=notebooks_dir))
+        # New commits are never ancestors of cached ones: children stay first
+        commits = new + commits
+
+    masks = _reachability(commits, head, tags or [])
+    commits = [commit for commit, mask in zip(commits, masks, strict=True) if mask & 1]
+    masks = [mask for mask in masks if mask & 1]
+    if cache_path is not None and commits and commits[0].sha != cached_head:
+        _write_cache(cache_path, notebooks_dir, commits)
+
+    return _notebook_revisions(commits, masks, tags or [])
+
+
+def _reachability(commits: list[GitCommit], head: str, tags: list[GitTag]) -> list[int]:
+    """Bit mask of the refs each commit is reachable from.
+
+    Bit 0 is HEAD and bit ``i + 1`` the tag ``tags[i]``, for tags of commits in
+    HEAD's history. ``commits`` lists children before parents, so each mask is
+    complete when it is propagated.
+    """
+    index = {commit.sha: i for i, commit in enumerate(commits)}
+    masks = [0] * len(commits)
+    if head in index:
+        masks[index[head]] = 1
+    for bit, tag in enumerate(tags, 1):
+        if tag.commit in index:
+            masks[index[tag.commit]] |= 1 << bit
+    for i, commit in enumerate(commits):
+        if masks[i]:
+            for parent in commit.parents:
+                if parent in index:
+                    masks[index[parent]] |= masks[i]
+    # Only tags in HEAD's history count: the cache may still hold older branches
+    kept = 1
+    for bit, tag in enumerate(tags, 1):
+        if tag.commit in index and masks[index[tag.commit]] & 1:
+            kept |= 1 << bit
+    return [mask & kept for mask in masks]
+
+
+def _notebook_revisions(
+    commits: list[GitCommit], masks: list[int], tags: list[GitTag]
+) -> dict[str, list[NotebookRevision]]:
+    history: dict[str, list[NotebookRevision]] = {}
+    newer: dict[str, int] = {}
+    # Path of a notebook in older commits -> its current path
+    renamed: dict[str, str] = {}
+    for commit, mask in zip(commits, masks, strict=True):
+        for change in commit.changes:
+            if not change.path.endswith(".ipynb"):
+                continue
+            current = renamed.get(change.path, change.path)
+            if change.status == "R" and change.old_path:
+                renamed[change.old_path] = current
+            # Tags containing this revision but no newer revision of the notebook
+            captured = mask & ~newer.get(current, 1)
+            newer[current] = newer.get(current, 1) | mask
+            category = current.split("/", 1)[0]
+            history.setdefault(current, []).append(
+                NotebookRevision(
+                    commit=commit.sha,
+                    author=commit.author,
+                    email=commit.email,
+                    date=commit.date,
+                    subject=commit.subject,
+                    status=change.status,
+                    path=change.path,
+                    insertions=change.insertions,
+                    deletions=change.deletions,
+                    tags=[]
+                    if change.status == "D"
+                    else [
+                        tag.name
+                        for bit, tag in enumerate(tags, 1)
+                        if captured >> bit & 1 and tag.name.split("/", 1)[0] == category
+                    ],
+                )
+            )
+    return dict(sorted(history.items()))
+
+
+def _read_cache(cache_path: Path | None, notebooks_dir: Path) -> list[GitCommit]:
+    """Cached commits, newest first, or an empty list if unusable."""
+    if cache_path is None or not cache_path.exists():
+        return []
+    try:
+        data = json.loads(cache_path.read_text(encoding="utf-8"))
+        if data["version"] != CACHE_VERSION or data["notebooks_dir"] != str(notebooks_dir):
+            return []
+        return [
+            GitCommit(
+                sha=sha,
+                parents=parents,
+                author=author,
+                email=email,
+                date=datetime.fromisoformat(date),
+                subject=subject,
+                changes=[FileChange(*change) for change in changes],
+            )
+            for sha, parents, author, email, date, subject, changes in data["commits"]
+        ]
+    except (OSError, ValueError, KeyError, TypeError):
+        # A corrupt cache only costs a full git log
+        return []
+
+
+def _write_cache(cache_path: Path, notebooks_dir: Path, commits: list[GitCommit]) -> None:
+    data = {
+        "version": CACHE_VERSION,
+        "notebooks_dir": str(notebooks_dir),
+        "commits": [
+            [
+                commit.sha,
+                commit.parents,
+                commit.author,
+                commit.email,
+                commit.date.isoformat(),
+                commit.subject,
+                [list(vars(change).values()) for change in commit.changes],
+            ]
+            for commit in commits
+        ],
+    }
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(cache_path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp_path, cache_path)
@@ -0,0 +1,174 @@
+"""HTML export with images written to separate files.
+
+nbconvert inlines image outputs as base64 data URIs and builds the whole page
+as one string. :class:`StreamingHTMLExporter` instead writes each image to a
+content-addressed file (named after the SHA-256 of its bytes, so the same plot
+in several notebooks is stored once) and streams the rendered page to disk.
+"""
+
+import base64
+import hashlib
+import os
+import re
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+from nbconvert.exporters import Exporter, HTMLExporter
+from nbconvert.filters.highlight import Highlight2HTML
+from nbconvert.filters.widgetsdatatypefilter import WidgetsDataTypeFilter
+from nbconvert.preprocessors import Preprocessor
+
+# Image output types written to files, with their extension
+IMAGE_EXTENSIONS = {"image/png": ".png", "image/jpeg": ".jpg", "image/svg+xml": ".svg"}
+
+# Resources key holding the images directory and the images used by a notebook
+IMAGES_RESOURCE = "ai_kit_images"
+
+MISSING_ALT = "No description has been provided for this image"
+_IMG_WITHOUT_ALT = re.compile(r"<img\b(?![^>]*\balt=)")
+_FOCUSABLE = re.compile(
+    r'(<div\b[^>]*\bclass="[^"]*\b(?:jp-Cell-inputWrapper|jp-OutputArea-output)\b[^"]*")'
+)
+
+
+def write_image(images_dir: Path, content: bytes, extension: str) -> Path:
+    """Write image bytes to a content-addressed file, unless it already exists."""
+    path = images_dir / f"{hashlib.sha256(content).hexdigest()}{extension}"
+    if not path.exists():
+        images_dir.mkdir(parents=True, exist_ok=True)
+        # Several workers may write the same image: write then rename
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+    return path
+
+
+class ContentAddressedImages(Preprocessor):
+    """Replace inline image outputs with links to content-addressed files.
+
+    Active when ``resources[IMAGES_RESOURCE]`` holds ``dir`` (where images are
+    written) and ``base`` (the directory the HTML is written to, for relative
+    links). The image files used are added to its ``files`` list.
+    """
+
+    def preprocess_cell(self, cell, resources, index):
+        """Write the cell's images to files and point the outputs at them."""
+        images = resources.get(IMAGES_RESOURCE)
+        if not images or cell.cell_type != "code":
+            return cell, resources
+        for output in cell.get("outputs", []):
+            data = output.get("data", {})
+            for mime, extension in IMAGE_EXTENSIONS.items():
+                if not data.get(mime):
+                    continue
+                if mime == "image/svg+xml":
+                    content = data[mime].encode("utf-8")
+                else:
+                    content = base64.b64decode(data[mime])
+                path = write_image(Path(images["dir"]), content, extension)
+                link = Path(os.path.relpath(path, images["base"])).as_posix()
+                if mime == "image/svg+xml":
+                    output["svg_filename"] = link
+                else:
+                    output.setdefault("metadata", {}).setdefault("filenames", {})[mime] = link
+                # The templates only need the type to be present
+                data[mime] = ""
+                images["files"].append(path)
+        return cell, resources
+
+
+def make_accessible(chunks: Iterable[str]) -> Iterator[str]:
+    """Add missing image alt text and focusable outputs, as HTMLExporter does.
+
+    Chunks are processed up to their last complete tag so a tag split across
+    chunks is still matched.
+    """
+    pending = ""
+    for chunk in chunks:
+        pending += chunk
+        end = pending.rfind(">") + 1
+        if end:
+            yield _fix_tags(pending[:end])
+            pending = pending[end:]
+    if pending:
+        yield _fix_tags(pending)
+
+
+def _fix_tags(html: str) -> str:
+    html = _IMG_WITHOUT_ALT.sub(f'<img alt="{MISSING_ALT}"', html)
+    return _FOCUSABLE.sub(r'\1 tabindex="0"', html)
+
+
+class StreamingHTMLExporter(HTMLExporter):
+    """HTML exporter that can write images to files and stream the page to disk."""
+
+    def __init__(self, **kw: Any):
+        super().__init__(**kw)
+        self.register_preprocessor(ContentAddressedImages(parent=self), enabled=True)
+
+    def write(
+        self, nb, output_path: Path, images_dir: Path | None = None
+    ) -> tuple[int, list[Path]]:
+        """Render ``nb`` to ``output_path`` chunk by chunk.
+
+        Args:
+            nb: Notebook to export
+            output_path: HTML file to write
+            images_dir: Where to write image outputs (default: inline them)
+
+        Returns:
+            Bytes written and the image files the page links to
+        """
+        resources: dict[str, Any] = {}
+        if images_dir is not None:
+            resources[IMAGES_RESOURCE] = {
+                "dir": images_dir,
+                "base": output_path.parent,
+                "files": [],
+            }
+
+        # Same setup as HTMLExporter.from_notebook_node and
+        # TemplateExporter.from_notebook_node, without rendering to a string
+        langinfo = nb.metadata.get("language_info", {})
+        lexer = langinfo.get("pygments_lexer", langinfo.get("name", None))
+        self.register_filter(
+            "highlight_code",
+            self.filters.get("highlight_code", Highlight2HTML(pygments_lexer=lexer, parent=self)),
+        )
+        resources = self._init_resources(resources)
+        self.register_filter(
+            "filter_data_type",
+            WidgetsDataTypeFilter(
+                notebook_metadata=self._nb_metadata, parent=self, resources=resources
+            ),
+        )
+        nb_copy, resources = Exporter.from_notebook_node(self, nb, resources)
+        resources.setdefault("raw_mimetypes", self.raw_mimetypes)
+        resources.setdefault("output_mimetype", self.output_mimetype)
+        resources["global_content_filter"] = {
+            "include_code": not self.exclude_code_cell,
+            "include_markdown": not self.exclude_markdown,
+            "include_raw": not self.exclude_raw,
+            "include_unknown": not self.exclude_unknown,
+            "include_input": not self.exclude_input,
+            "include_output": not self.exclude_output,
+            "include_output_stdin": not self.exclude_output_stdin,
+            "include_input_prompt": not self.exclude_input_prompt,
+            "include_output_prompt": not self.exclude_output_prompt,
+            "no_prompt": self.exclude_input_prompt and self.exclude_output_prompt,
+        }
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        chunks = self.template.generate(nb=nb_copy, resources=resources)
+        with open(output_path, "w", encoding="utf-8") as f:
+            started = False
+            for chunk in make_accessible(chunks):
+                if not started:
+                    chunk = chunk.lstrip("\r\n")
+                    started = bool(chunk)
+                f.write(chunk)
+        # Preprocessors work on a copy of the resources: read the images back
+        images = resources.get(IMAGES_RESOURCE)
+        files = list(dict.fromkeys(images["files"])) if images else []
+        return output_path.stat().st_size, files
@@ -0,0 +1,207 @@
+"""Registry of notebook migration records.
+
+``notebook migrate`` writes a Markdown record per notebook for people to read,
+and appends the same information as one JSON line to ``registry.jsonl`` next
+to them. :class:`MigrationRegistry` reads that file on the first query and
+indexes it by source notebook and destination, so tracing where a notebook's
+code went (or which notebooks a package came from) is a dictionary lookup.
+"""
+
+import json
+import re
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import date
+from pathlib import Path
+
+# Where migration records are written, relative to the repository root
+MIGRATIONS_DIR = Path("docs/migrations")
+
+REGISTRY_FILENAME = "registry.jsonl"
+
+
+@dataclass
+class MigrationRecord:
+    """One notebook migrated to production code.
+
+    ``source`` is the notebook path relative to the repository root and
+    ``record`` the Markdown record describing the migration.
+    """
+
+    source: str
+    category: str
+    destination: str
+    rationale: str
+    date: str
+    notebook_commit: str
+    migration_commit: str
+    record: str
+    deleted: bool = False
+
+
+def _normalize(path: str) -> str:
+    return Path(path).as_posix().rstrip("/")
+
+
+class MigrationRegistry:
+    """Migration records stored as JSON lines, loaded lazily.
+
+    Args:
+        path: The ``registry.jsonl`` file (it need not exist yet)
+    """
+
+    def __init__(self, path: Path = MIGRATIONS_DIR / REGISTRY_FILENAME):
+        self.path = Path(path)
+        self._records: list[MigrationRecord] | None = None
+        self._by_source: dict[str, list[MigrationRecord]] = {}
+        self._by_destination: dict[str, list[MigrationRecord]] = {}
+
+    @property
+    def records(self) -> list[MigrationRecord]:
+        """Every record, in the order they were written."""
+        return self._load()
+
+    def _load(self) -> list[MigrationRecord]:
+        if self._records is None:
+            self._records = []
+            self._by_source = defaultdict(list)
+            self._by_destination = defaultdict(list)
+            if self.path.exists():
+                with open(self.path, encoding="utf-8") as f:
+                    for number, line in enumerate(f, 1):
+                        if not line.strip():
+                            continue
+                        try:
+                            record = MigrationRecord(**json.loads(line))
+                        except (ValueError, TypeError) as e:
+                            raise ValueError(
+                                f"Invalid migration record at {self.path}:{number}: {e}"
+                            ) from e
+                        self._index(record)
+        return self._records
+
+    def _index(self, record: MigrationRecord) -> None:
+        self._records.append(record)
+        self._by_source[_normalize(record.source)].append(record)
+        self._by_destination[_normalize(record.destination)].append(record)
+
+    def by_source(self, source: str) -> list[MigrationRecord]:
+        """Migrations of a notebook, given its path from the repository root."""
+        self._load()
+        return list(self._by_source.get(_normalize(source), []))
+
+    def by_record(self, record: str) -> MigrationRecord | None:
+        """Latest migration described by a Markdown record, if any."""
+        matches = [r for r in self._load() if _normalize(r.record) == _normalize(record)]
+        return matches[-1] if matches else None
+
+    def query(
+        self,
+        sources: list[str] | None = None,
+        destination: str | None = None,
+        category: str | None = None,
+        since: date | None = None,
+        until: date | None = None,
+    ) -> list[MigrationRecord]:
+        """Records matching every given filter, oldest first.
+
+        Args:
+            sources: Notebook paths from the repository root
+            destination: Destination, or a directory containing it
+            category: Notebook category
+            since: First migration date included
+            until: Last migration date included
+        """
+        records = self._load()
+        if sources is not None:
+            wanted = {id(record) for source in sources for record in self.by_source(source)}
+            records = [record for record in records if id(record) in wanted]
+        if destination is not None:
+            prefix = _normalize(destination)
+            matched = [
+                record
+                for name, entries in self._by_destination.items()
+                if name == prefix or name.startswith(prefix + "/")
+                for record in entries
+            ]
+            wanted = {id(record) for record in matched}
+            records = [record for record in records if id(record) in wanted]
+        if category is not None:
+            records = [record for record in records if record.category == category]
+        if since is not None:
+            records = [record for record in records if record.date >= since.isoformat()]
+        if until is not None:
+            records = [record for record in records if record.date <= until.isoformat()]
+        return records
+
+    def append(self, records: list[MigrationRecord]) -> None:
+        """Add records at the end of the registry file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(asdict(record)) + "\n")
+        if self._records is not None:
+            for record in records:
+                self._index(record)
+
+    def write(self, records: list[MigrationRecord]) -> None:
+        """Add records, replacing the entries of Markdown records written again."""
+        rewritten = {_normalize(record.record) for record in records}
+        kept = [r for r in self._load() if _normalize(r.record) not in rewritten]
+        if len(kept) == len(self._load()):
+            self.append(records)
+        else:
+            self.rebuild(kept + list(records))
+
+    def rebuild(self, records: list[MigrationRecord]) -> None:
+        """Replace the registry's content with ``records``."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".jsonl.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(asdict(record)) + "\n")
+        tmp_path.replace(self.path)
+        self._records = None
+
+
+_FIELD = r"^\*\*{}\*\*: `?([^`\n]*)`?$"
+
+
+def parse_migration_record(text: str, record_path: Path) -> MigrationRecord:
+    """Read back a Markdown record written by ``notebook migrate``.
+
+    Raises:
+        ValueError: If a field is missing
+    """
+
+    def field(pattern: str, flags: int = 0) -> str:
+        match = re.search(pattern, text, re.MULTILINE | flags)
+        if match is None:
+            raise ValueError(f"Not a migration record: {record_path}")
+        return match.group(1).strip()
+
+    return MigrationRecord(
+        source=field(_FIELD.format("Source Notebook")),
+        category=field(_FIELD.format("Category")),
+        destination=field(_FIELD.format("Destination")),
+        rationale=field(r"^## Rationale\n\n(.*?)\n\n## Verification", re.DOTALL),
+        date=field(_FIELD.format("Date")),
+        notebook_commit=field(r"^- \*\*Notebook Last Commit\*\*: `([0-9a-f]+)`"),
+        migration_commit=field(r"^- \*\*Migration Commit\*\*: `([0-9a-f]+)`"),
+        record=record_path.as_posix(),
+        deleted=bool(re.search(r"Original notebook deleted", text)),
+    )
+
+
+def load_markdown_records(migrations_dir: Path = MIGRATIONS_DIR) -> list[MigrationRecord]:
+    """Parse every Markdown migration record of a directory, oldest first.
+
+    Files that are not migration records (such as a README) are skipped.
+    """
+    records = []
+    for path in sorted(migrations_dir.glob("*.md")):
+        try:
+            records.append(parse_migration_record(path.read_text(encoding="utf-8"), path))
+        except ValueError:
+            continue
+    return sorted(records, key=lambda record: record.date)
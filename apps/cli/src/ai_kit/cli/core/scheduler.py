@@ -0,0 +1,415 @@
+"""Local scheduler for reporting notebooks.
+
+Reporting notebooks declare a ``**Schedule**:`` field in their metadata cell
+using cron syntax (``0 8 * * 1``) or an alias (``@daily``, ``weekly``). The
+scheduler scans them, runs the ones that are due through
+:func:`ai_kit.cli.core.execution.run_notebook` with a bounded number of
+concurrent jobs, and persists the last scheduled time of each notebook so a
+restart does not run the same report twice.
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Collection
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Literal
+
+import nbformat
+
+from ai_kit.cli.core.validators import extract_metadata_from_markdown
+
+CatchUpPolicy = Literal["all", "latest", "skip"]
+
+CATCH_UP_POLICIES = ["all", "latest", "skip"]
+
+# Fire times older than this are considered missed (seconds)
+DEFAULT_GRACE = 300
+
+# Safety cap on the number of missed runs replayed with the "all" policy
+MAX_CATCH_UP_RUNS = 100
+
+ALIASES = {
+    "hourly": "0 * * * *",
+    "daily": "0 0 * * *",
+    "weekly": "0 0 * * 0",
+    "monthly": "0 0 1 * *",
+    "yearly": "0 0 1 1 *",
+    "annually": "0 0 1 1 *",
+}
+
+MONTH_NAMES = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+DAY_NAMES = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+
+
+def _parse_field(field: str, low: int, high: int, names: list[str] | None = None) -> set[int]:
+    """Parse one cron field into the set of values it matches."""
+    values = set()
+    for part in field.lower().split(","):
+        base, _, step_text = part.partition("/")
+        step = int(step_text) if step_text else 1
+        if step < 1:
+            raise ValueError(f"Invalid step in cron field: {field}")
+
+        if base == "*":
+            start, end = low, high
+        else:
+            bounds = base.split("-")
+            if len(bounds) > 2:
+                raise ValueError(f"Invalid range in cron field: {field}")
+            start, end = (_parse_value(bound, names) for bound in (bounds[0], bounds[-1]))
+            if step_text and len(bounds) == 1:
+                end = high
+        if not low <= start <= end <= high:
+            raise ValueError(f"Cron field out of range {low}-{high}: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def _parse_value(value: str, names: list[str] | None) -> int:
+    if names and value in names:
+        return names.index(value) + (1 if names is MONTH_NAMES else 0)
+    if not value.isdigit():
+        raise ValueError(f"Invalid cron value: {value}")
+    return int(value)
+
+
+class CronSchedule:
+    """A five-field cron expression: minute hour day-of-month month day-of-week."""
+
+    def __init__(self, expression: str):
+        expression = expression.strip().strip("`").strip()
+        alias = expression.lstrip("@").lower()
+        self.expression = expression
+        fields = ALIASES.get(alias, expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Invalid cron expression: {expression}")
+
+        minute, hour, day, month, weekday = fields
+        self.minutes = _parse_field(minute, 0, 59)
+        self.hours = _parse_field(hour, 0, 23)
+        self.days = _parse_field(day, 1, 31)
+        self.months = _parse_field(month, 1, 12, MONTH_NAMES)
+        # Both 0 and 7 mean Sunday
+        self.weekdays = {d % 7 for d in _parse_field(weekday, 0, 7, DAY_NAMES)}
+        self._day_restricted = day != "*"
+        self._weekday_restricted = weekday != "*"
+
+    def __repr__(self):
+        return f"CronSchedule({self.expression!r})"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        # Standard cron: when both are restricted, either one may match
+        if self._day_restricted and self._weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def matches(self, moment: datetime) -> bool:
+        """Whether the schedule fires at this minute."""
+        return (
+            moment.minute in self.minutes
+            and moment.hour in self.hours
+            and moment.month in self.months
+            and self._day_matches(moment)
+        )
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Return the first fire time strictly after ``moment``.
+
+        Raises:
+            ValueError: If the schedule never fires (e.g. 30 February)
+        """
+        current = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = current + timedelta(days=5 * 366)
+        while current < limit:
+            if current.month not in self.months:
+                next_month = current.replace(day=1, hour=0, minute=0) + timedelta(days=32)
+                current = next_month.replace(day=1)
+            elif not self._day_matches(current):
+                current = current.replace(hour=0, minute=0) + timedelta(days=1)
+            elif current.hour not in self.hours:
+                current = current.replace(minute=0) + timedelta(hours=1)
+            elif current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+            else:
+                return current
+        raise ValueError(f"Schedule never fires: {self.expression}")
+
+    def fire_times(self, after: datetime, until: datetime) -> list[datetime]:
+        """Return the fire times in ``(after, until]``, oldest first."""
+        times = []
+        current = self.next_after(after)
+        while current <= until:
+            times.append(current)
+            current = self.next_after(current)
+        return times
+
+
+@dataclass
+class ScheduledNotebook:
+    """A reporting notebook with a schedule."""
+
+    path: Path
+    schedule: CronSchedule
+
+
+@dataclass
+class ScheduledRun:
+    """One scheduled execution of a notebook."""
+
+    notebook: ScheduledNotebook
+    scheduled_for: datetime
+    output_path: Path
+    status: str = "pending"
+    error: str | None = None
+
+
+def read_schedule(notebook_path: Path) -> str | None:
+    """Read the ``Schedule`` field from a notebook's metadata cell."""
+    with open(notebook_path, encoding="utf-8") as f:
+        nb = nbformat.read(f, as_version=4)
+    if not nb.cells or nb.cells[0].cell_type != "markdown":
+        return None
+    return extract_metadata_from_markdown(nb.cells[0].source).get("schedule")
+
+
+def due_times(
+    schedule: CronSchedule,
+    last: datetime,
+    now: datetime,
+    policy: CatchUpPolicy = "latest",
+    grace: float = DEFAULT_GRACE,
+) -> list[datetime]:
+    """Return the fire times to run now, applying the catch-up policy.
+
+    Fire times older than ``grace`` seconds are missed runs: ``all`` replays
+    every one of them, ``latest`` runs only the most recent and ``skip`` drops
+    them.
+    """
+    times = schedule.fire_times(last, now)
+    if policy == "all":
+        return times[-MAX_CATCH_UP_RUNS:]
+    if policy == "latest":
+        return times[-1:]
+    cutoff = now - timedelta(seconds=grace)
+    return [t for t in times if t >= cutoff][-1:]
+
+
+class SchedulerState:
+    """Persisted last-run state of scheduled notebooks, stored as JSON.
+
+    Updates are serialized by ``lock`` so worker threads can record runs
+    while the scheduler registers new notebooks.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.notebooks: dict[str, dict] = {}
+        self.lock = threading.RLock()
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                self.notebooks = json.load(f).get("notebooks", {})
+
+    def last_scheduled(self, key: str) -> datetime | None:
+        """Return the last fire time handled for a notebook."""
+        entry = self.notebooks.get(key)
+        if not entry or not entry.get("last_scheduled"):
+            return None
+        return datetime.fromisoformat(entry["last_scheduled"])
+
+    def record(self, key: str, **fields):
+        """Update a notebook's entry and save the state."""
+        with self.lock:
+            entry = self.notebooks.setdefault(key, {})
+            entry.update(fields)
+            self.save()
+
+    def save(self):
+        """Write the state atomically."""
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"notebooks": self.notebooks}, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+def _default_runner(input_path: Path, output_path: Path):
+    from ai_kit.cli.core.execution import run_notebook
+
+    run_notebook(input_path, output_path)
+
+
+class Scheduler:
+    """Run reporting notebooks whose schedule is due."""
+
+    def __init__(
+        self,
+        notebooks_dir: Path,
+        state_path: Path,
+        output_dir: Path,
+        max_jobs: int = 2,
+        catch_up: CatchUpPolicy = "latest",
+        grace: float = DEFAULT_GRACE,
+        runner: Callable[[Path, Path], None] | None = None,
+    ):
+        self.notebooks_dir = notebooks_dir
+        self.state = SchedulerState(state_path)
+        self.output_dir = output_dir
+        self.max_jobs = max_jobs
+        self.catch_up = catch_up
+        self.grace = grace
+        self.runner = runner or _default_runner
+        self.warnings: list[str] = []
+        self._stopping = threading.Event()
+
+    def _key(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.notebooks_dir).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def scan(self) -> list[ScheduledNotebook]:
+        """Find reporting notebooks with a valid schedule."""
+        self.warnings = []
+        scheduled = []
+        for path in sorted((self.notebooks_dir / "reporting").glob("*.ipynb")):
+            try:
+                expression = read_schedule(path)
+            except Exception as e:
+                self.warnings.append(f"{path.name}: cannot read notebook ({e})")
+                continue
+            if not expression:
+                continue
+            try:
+                scheduled.append(ScheduledNotebook(path, CronSchedule(expression)))
+            except ValueError as e:
+                self.warnings.append(f"{path.name}: {e}")
+        return scheduled
+
+    def due(
+        self, now: datetime | None = None, exclude: Collection[Path] = ()
+    ) -> list[ScheduledRun]:
+        """Return the runs due at ``now`` for every scheduled notebook.
+
+        Notebooks seen for the first time start their schedule at ``now``;
+        notebooks in ``exclude`` (still running) are left for a later check.
+        """
+        now = (now or datetime.now()).replace(second=0, microsecond=0)
+        runs = []
+        for notebook in self.scan():
+            if notebook.path in exclude:
+                continue
+            key = self._key(notebook.path)
+            last = self.state.last_scheduled(key)
+            if last is None:
+                self.state.record(key, last_scheduled=now.isoformat(), status="registered")
+                continue
+            times = due_times(notebook.schedule, last, now, self.catch_up, self.grace)
+            for moment in times:
+                output_name = f"{notebook.path.stem}-{moment:%Y-%m-%dT%H%M}.ipynb"
+                runs.append(ScheduledRun(notebook, moment, self.output_dir / output_name))
+            if not times:
+                # Skipped fire times still advance the schedule
+                fire_times = notebook.schedule.fire_times(last, now)
+                if fire_times:
+                    self.state.record(key, last_scheduled=fire_times[-1].isoformat())
+        return runs
+
+    def _execute(self, run: ScheduledRun) -> ScheduledRun:
+        try:
+            self.runner(run.notebook.path, run.output_path)
+            run.status = "completed"
+        except Exception as e:
+            run.status = "failed"
+            run.error = str(e)
+        return run
+
+    def _run_in_order(
+        self,
+        runs: list[ScheduledRun],
+        on_complete: Callable[[ScheduledRun], None] | None,
+    ):
+        """Execute the runs of one notebook, recording each as it finishes."""
+        for run in runs:
+            if self._stopping.is_set():
+                return
+            self._execute(run)
+            with self.state.lock:
+                self.state.record(
+                    self._key(run.notebook.path),
+                    last_scheduled=run.scheduled_for.isoformat(),
+                    last_run=datetime.now().isoformat(timespec="seconds"),
+                    status=run.status,
+                    output=str(run.output_path),
+                    error=run.error,
+                )
+                if on_complete:
+                    on_complete(run)
+
+    def _submit(
+        self,
+        pool: ThreadPoolExecutor,
+        runs: list[ScheduledRun],
+        on_complete: Callable[[ScheduledRun], None] | None,
+    ) -> dict[Path, Future]:
+        """Queue the runs on ``pool``, one job per notebook."""
+        if runs:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+        by_notebook: dict[Path, list[ScheduledRun]] = {}
+        for run in runs:
+            by_notebook.setdefault(run.notebook.path, []).append(run)
+        return {
+            path: pool.submit(self._run_in_order, batch, on_complete)
+            for path, batch in by_notebook.items()
+        }
+
+    def run_pending(
+        self,
+        now: datetime | None = None,
+        on_complete: Callable[[ScheduledRun], None] | None = None,
+    ) -> list[ScheduledRun]:
+        """Execute every due run with at most ``max_jobs`` running at once.
+
+        Runs of the same notebook execute in order; the state is saved as each
+        run finishes so an interrupted scheduler resumes where it stopped.
+        """
+        runs = self.due(now)
+        with ThreadPoolExecutor(max_workers=self.max_jobs) as pool:
+            for future in self._submit(pool, runs, on_complete).values():
+                future.result()
+        return runs
+
+    def serve(
+        self,
+        interval: float = 60,
+        on_complete: Callable[[ScheduledRun], None] | None = None,
+        should_stop: Callable[[], bool] = lambda: False,
+    ):
+        """Check for due runs every ``interval`` seconds until ``should_stop``.
+
+        Notebooks run in the background, so a long report does not delay the
+        others; a notebook still running is checked again once it finishes.
+        On exit, queued runs are dropped and running notebooks stop after
+        their current run.
+        """
+        pool = ThreadPoolExecutor(max_workers=self.max_jobs)
+        running: dict[Path, Future] = {}
+        try:
+            while not should_stop():
+                for path, future in list(running.items()):
+                    if future.done():
+                        del running[path]
+                        future.result()
+                running.update(self._submit(pool, self.due(exclude=running), on_complete))
+                time.sleep(interval)
+        finally:
+            self._stopping.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+            self._stopping.clear()
@@ -1,56 +1,924 @@
-"""Git operations utilities."""
+"""Git operations utilities.
 
+The functions below go through a :class:`GitBackend`:
+
+- :class:`SubprocessGitBackend` (the default) runs the ``git`` command;
+- :class:`PythonGitBackend` reads refs and objects in-process, without starting
+  a process per call, and only runs ``git`` to push or delete tags and to read
+  the log with line counts;
+- :class:`MemoryGitBackend` keeps commits and tags in memory, for tests.
+
+The backend is chosen with the ``AI_KIT_GIT_BACKEND`` environment variable
+(``subprocess`` or ``python``) or replaced with :func:`set_git_backend`.
+"""
+
+import fnmatch
+import functools
+import hashlib
+import json
+import os
+import re
 import subprocess
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta, timezone
 from pathlib import Path
 
+from ai_kit.cli.utils.git_objects import (
+    Repository,
+    UnsupportedRepositoryError,
+    parse_ident,
+    user_config,
+)
+
+# for-each-ref fields of a tag, NUL-separated, one record per tag
+_TAG_FIELDS = (
+    "%(refname:strip=2)",
+    "%(objecttype)",
+    "%(objectname)",
+    "%(*objectname)",
+    "%(taggername)",
+    "%(taggeremail:trim)",
+    "%(creatordate:iso-strict)",
+    "%(contents:subject)",
+    "%(contents:body)",
+)
+_TAG_FORMAT = "%00".join(_TAG_FIELDS) + "%01"
+
+# git log fields of a commit, NUL-separated after a \x01 marker
+_LOG_FIELDS = ("%H", "%P", "%an", "%ae", "%aI", "%s")
+_LOG_FORMAT = "%x01" + "%x00".join(_LOG_FIELDS)
+
+# Characters and sequences git does not allow in ref names
+_INVALID_REF = re.compile(r"[\x00-\x20\x7f~^:?*\[\\]|\.\.|@\{|//|/\.|\.lock(/|$)|^[./-]|[./]$")
+
+
+@dataclass
+class GitTag:
+    """A git tag with its annotation.
+
+    For lightweight tags, ``tagger`` is empty and ``date`` and ``subject``
+    come from the tagged commit.
+    """
+
+    name: str
+    commit: str
+    date: datetime | None
+    tagger: str = ""
+    email: str = ""
+    subject: str = ""
+    body: str = ""
+    annotated: bool = True
+
+
+@dataclass
+class FileChange:
+    """A file changed by a commit.
+
+    ``status`` is git's change letter (A, M, D, R, C or T) and ``old_path``
+    the source of a rename or copy. Line counts are None for binary files.
+    """
+
+    status: str
+    path: str
+    old_path: str | None = None
+    insertions: int | None = None
+    deletions: int | None = None
+
+
+@dataclass
+class GitCommit:
+    """A commit with the files it changed (none for merges)."""
+
+    sha: str
+    parents: list[str]
+    author: str
+    email: str
+    date: datetime
+    subject: str
+    changes: list[FileChange] = field(default_factory=list)
+
+
+class GitBackend(ABC):
+    """Git operations on the repository containing ``cwd``."""
+
+    def __init__(self, cwd: Path | None = None):
+        self.cwd = cwd
+
+    @abstractmethod
+    def user_name(self) -> str | None:
+        """Git user name from config, or None if unset."""
+
+    @abstractmethod
+    def create_tag(self, tag_name: str, message: str) -> bool:
+        """Create an annotated tag of HEAD; False if it could not be created."""
+
+    @abstractmethod
+    def delete_tags(self, tag_names: list[str]) -> bool:
+        """Delete local tags; False if any could not be deleted."""
+
+    @abstractmethod
+    def push_tags(self, tag_names: list[str], remote: str = "origin") -> None:
+        """Push tags to a remote, raising RuntimeError on failure."""
+
+    @abstractmethod
+    def list_tags(self, pattern: str | None = None) -> list[str]:
+        """Tag names sorted by name, optionally filtered by a glob."""
+
+    @abstractmethod
+    def git_dir(self) -> Path | None:
+        """The repository's common git directory, or None if it has none on disk.
+
+        Raises:
+            RuntimeError: If ``cwd`` is not in a git repository
+        """
+
+    @abstractmethod
+    def tag_details(self) -> list[GitTag]:
+        """All tags with their annotation, sorted by name."""
+
+    @abstractmethod
+    def head_sha(self) -> str:
+        """SHA of the commit checked out."""
+
+    def file_last_commit_sha(self, file_path: Path) -> str:
+        """Last commit SHA that modified a file."""
+        return self.files_last_commit_shas([file_path])[file_path]
+
+    @abstractmethod
+    def files_last_commit_shas(self, file_paths: list[Path]) -> dict[Path, str]:
+        """Last commit SHA that modified each file, keyed as given."""
+
+    @abstractmethod
+    def log(self, revisions: list[str], paths: list[str]) -> Iterator[GitCommit]:
+        """Every commit reachable from ``revisions``, children before parents.
+
+        Revisions starting with ``^`` exclude the commits reachable from them.
+        Only changes to ``paths`` are reported, relative to ``cwd``.
+        """
+
+
+class SubprocessGitBackend(GitBackend):
+    """Backend running the ``git`` command."""
+
+    def user_name(self) -> str | None:
+        try:
+            result = subprocess.run(
+                ["git", "config", "user.name"],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            if result.returncode == 0:
+                return result.stdout.strip()
+        except FileNotFoundError:
+            pass
+        return None
+
+    def create_tag(self, tag_name: str, message: str) -> bool:
+        try:
+            subprocess.run(
+                ["git", "tag", "-a", tag_name, "-m", message],
+                cwd=self.cwd,
+                check=True,
+                capture_output=True,
+            )
+            return True
+        except subprocess.CalledProcessError:
+            return False
+
+    def delete_tags(self, tag_names: list[str]) -> bool:
+        if not tag_names:
+            return True
+        try:
+            subprocess.run(
+                ["git", "tag", "-d", *tag_names],
+                cwd=self.cwd,
+                check=True,
+                capture_output=True,
+            )
+            return True
+        except subprocess.CalledProcessError:
+            return False
+
+    def push_tags(self, tag_names: list[str], remote: str = "origin") -> None:
+        try:
+            subprocess.run(
+                ["git", "push", "--atomic", remote, *(f"refs/tags/{name}" for name in tag_names)],
+                cwd=self.cwd,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to push tags: {e.stderr.strip() or e}") from e
+
+    def list_tags(self, pattern: str | None = None) -> list[str]:
+        try:
+            cmd = ["git", "tag", "--list"]
+            if pattern:
+                cmd.append(pattern)
+
+            result = subprocess.run(
+                cmd,
+                cwd=self.cwd,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            return [tag.strip() for tag in result.stdout.split("\n") if tag.strip()]
+        except subprocess.CalledProcessError:
+            return []
+
+    def git_dir(self) -> Path | None:
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", "--git-common-dir"],
+                cwd=self.cwd,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Not a git repository: {e}") from e
+        return (Path(self.cwd or Path.cwd()) / result.stdout.strip()).resolve()
+
+    def tag_details(self) -> list[GitTag]:
+        try:
+            result = subprocess.run(
+                ["git", "for-each-ref", "--sort=refname", f"--format={_TAG_FORMAT}", "refs/tags"],
+                cwd=self.cwd,
+                check=True,
+                capture_output=True,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to list tags: {e}") from e
+        return _parse_tags(result.stdout)
+
+    def head_sha(self) -> str:
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                cwd=self.cwd,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            return result.stdout.strip()
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to get current commit SHA: {e}") from e
+
+    def file_last_commit_sha(self, file_path: Path) -> str:
+        try:
+            result = subprocess.run(
+                ["git", "log", "-1", "--format=%H", "--", str(file_path)],
+                cwd=self.cwd,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            sha = result.stdout.strip()
+            if not sha:
+                raise RuntimeError(f"File not found in git history: {file_path}")
+            return sha
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to get file commit SHA: {e}") from e
+
+    def files_last_commit_shas(self, file_paths: list[Path]) -> dict[Path, str]:
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", "--show-toplevel"],
+                cwd=self.cwd,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to get file commit SHAs: {e}") from e
+        toplevel = Path(result.stdout.strip()).resolve()
+        wanted = _relative_paths(file_paths, self.cwd, toplevel)
+
+        shas: dict[Path, str] = {}
+        remaining = set(wanted)
+        if remaining:
+            # -c lists the files of merges that differ from every parent (conflict
+            # resolutions), which git log -- <file> reports as the last change
+            process = subprocess.Popen(
+                [
+                    "git",
+                    "--literal-pathspecs",
+                    "log",
+                    "-c",
+                    "--format=%x01%H",
+                    "--name-only",
+                    "-z",
+                    "--",
+                    *sorted(remaining),
+                ],
+                cwd=toplevel,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            sha = None
+            pending = b""
+            try:
+                while remaining:
+                    chunk = process.stdout.read1(64 * 1024)
+                    if not chunk:
+                        break
+                    *fields, pending = (pending + chunk).split(b"\0")
+                    for field in fields:
+                        if field.startswith(b"\x01"):
+                            sha = field[1:].decode()
+                            continue
+                        name = field.lstrip(b"\n").decode("utf-8", "surrogateescape")
+                        if name in remaining:
+                            remaining.discard(name)
+                            for file_path in wanted[name]:
+                                shas[file_path] = sha
+                if remaining:
+                    process.wait()
+            finally:
+                if process.poll() is None:
+                    # Every file was found: older history is not needed
+                    process.kill()
+                    process.wait()
+                process.stdout.close()
+                stderr = process.stderr.read().decode(errors="replace").strip()
+                process.stderr.close()
+            if remaining and process.returncode:
+                raise RuntimeError(f"Failed to get file commit SHAs: {stderr}")
+
+        _check_found(remaining, wanted)
+        return shas
+
+    def log(self, revisions: list[str], paths: list[str]) -> Iterator[GitCommit]:
+        # --full-history --sparse lists every commit, not only those changing
+        # paths, so the commit graph is complete
+        process = subprocess.Popen(
+            ["git", "--literal-pathspecs", "log", "--topo-order", "--full-history", "--sparse"]
+            + ["--relative", f"--format={_LOG_FORMAT}", "--raw", "--numstat", "-z", "-M"]
+            + [*revisions, "--", *paths],
+            cwd=self.cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        try:
+            yield from _parse_log(_read_fields(process.stdout))
+            process.wait()
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            stderr = process.stderr.read().decode(errors="replace").strip()
+            process.stderr.close()
+        if process.returncode:
+            raise RuntimeError(f"Failed to read git log: {stderr}")
+
+
+class PythonGitBackend(SubprocessGitBackend):
+    """Backend reading the repository's files directly.
+
+    Refs, commits, trees and tags are read from ``.git`` (loose and packed
+    objects), so reads start no process. Creating, pushing and deleting tags
+    still run ``git``, so tags honour ``tag.gpgSign``, shared repository
+    permissions and the reflog, as does any operation on a repository format
+    :mod:`ai_kit.cli.utils.git_objects` does not read.
+    """
+
+    def __init__(self, cwd: Path | None = None):
+        super().__init__(cwd)
+        self._repository: Repository | None = None
+        self._unsupported = False
+
+    def _repo(self) -> Repository | None:
+        """The repository, or None to fall back to ``git``.
+
+        Raises:
+            FileNotFoundError: If ``cwd`` is not in a git repository
+        """
+        if self._repository is None and not self._unsupported:
+            try:
+                self._repository = Repository.discover(self.cwd)
+            except UnsupportedRepositoryError:
+                self._unsupported = True
+        return self._repository
+
+    def _fallback(self):
+        # A pack or ref format found while reading: use git from now on
+        self._unsupported = True
+        self._repository = None
+
+    def user_name(self) -> str | None:
+        try:
+            repo = self._repo()
+        except FileNotFoundError:
+            repo = None
+        if repo is None and self._unsupported:
+            return super().user_name()
+        return user_config(repo).get("user.name")
+
+    def list_tags(self, pattern: str | None = None) -> list[str]:
+        try:
+            repo = self._repo()
+            if repo is None:
+                return super().list_tags(pattern)
+            names = list(repo.refs())
+        except UnsupportedRepositoryError:
+            self._fallback()
+            return super().list_tags(pattern)
+        except (OSError, ValueError):
+            return []
+        if pattern:
+            names = [name for name in names if fnmatch.fnmatchcase(name, pattern)]
+        return names
+
+    def git_dir(self) -> Path | None:
+        try:
+            repo = self._repo()
+        except FileNotFoundError as e:
+            raise RuntimeError(str(e)) from e
+        if repo is None:
+            return super().git_dir()
+        return repo.common_dir.resolve()
+
+    def tag_details(self) -> list[GitTag]:
+        try:
+            repo = self._repo()
+            if repo is None:
+                return super().tag_details()
+            return [self._tag(repo, name, sha) for name, sha in repo.refs().items()]
+        except UnsupportedRepositoryError:
+            self._fallback()
+            return super().tag_details()
+        except (OSError, KeyError, ValueError) as e:
+            raise RuntimeError(f"Failed to list tags: {e}") from e
+
+    @staticmethod
+    def _tag(repo: Repository, name: str, sha: str) -> GitTag:
+        kind, _ = repo.read(sha)
+        if kind == "tag":
+            tag = repo.tag(sha)
+            tagger, email, timestamp, tz = parse_ident(tag.tagger)
+            subject, body = _split_message(tag.message)
+            return GitTag(
+                name=name,
+                commit=tag.object,
+                date=_ident_date(timestamp, tz) if tag.tagger else None,
+                tagger=tagger,
+                email=email,
+                subject=subject,
+                body=body,
+            )
+        if kind == "commit":
+            commit = repo.commit(sha)
+            _, _, timestamp, tz = parse_ident(commit.committer)
+            subject, body = _split_message(commit.message)
+            return GitTag(
+                name=name,
+                commit=sha,
+                date=_ident_date(timestamp, tz),
+                subject=subject,
+                body=body,
+                annotated=False,
+            )
+        return GitTag(name=name, commit=sha, date=None, annotated=False)
+
+    def head_sha(self) -> str:
+        try:
+            repo = self._repo()
+            if repo is None:
+                return super().head_sha()
+            return repo.head()
+        except (OSError, ValueError) as e:
+            raise RuntimeError(f"Failed to get current commit SHA: {e}") from e
+
+    def file_last_commit_sha(self, file_path: Path) -> str:
+        try:
+            return self.files_last_commit_shas([file_path])[file_path]
+        except RuntimeError as e:
+            if str(e).startswith("Files not found in git history"):
+                raise RuntimeError(f"File not found in git history: {file_path}") from e
+            raise
+
+    def files_last_commit_shas(self, file_paths: list[Path]) -> dict[Path, str]:
+        try:
+            repo = self._repo()
+        except FileNotFoundError as e:
+            raise RuntimeError(f"Failed to get file commit SHAs: {e}") from e
+        if repo is None or repo.worktree is None:
+            return super().files_last_commit_shas(file_paths)
+        wanted = _relative_paths(file_paths, self.cwd, repo.worktree.resolve())
+        try:
+            found = repo.last_commits(list(wanted)) if wanted else {}
+        except UnsupportedRepositoryError:
+            self._fallback()
+            return super().files_last_commit_shas(file_paths)
+        except (OSError, KeyError, ValueError) as e:
+            raise RuntimeError(f"Failed to get file commit SHAs: {e}") from e
+        _check_found(set(wanted) - set(found), wanted)
+        return {path: found[name] for name, paths in wanted.items() for path in paths}
+
+
+class MemoryGitBackend(GitBackend):
+    """In-memory repository for tests.
+
+    Args:
+        head: SHA of the commit checked out
+        files: Last commit SHA of each tracked file, keyed by path
+        user_name: Configured user name
+        tags: Existing tags
+        commits: History, children before parents
+    """
+
+    def __init__(
+        self,
+        head: str = "0" * 40,
+        files: dict[str | Path, str] | None = None,
+        user_name: str | None = None,
+        tags: list[GitTag] | None = None,
+        commits: list[GitCommit] | None = None,
+    ):
+        super().__init__()
+        self.head = head
+        self.commits = list(commits or [])
+        self.files = {Path(path).as_posix(): sha for path, sha in (files or {}).items()}
+        self.name = user_name
+        self.tags = {tag.name: tag for tag in tags or []}
+        self.pushed: list[tuple[str, list[str]]] = []
+
+    def user_name(self) -> str | None:
+        return self.name
+
+    def create_tag(self, tag_name: str, message: str) -> bool:
+        if tag_name in self.tags or _INVALID_REF.search(tag_name):
+            return False
+        subject, body = _split_message(message)
+        self.tags[tag_name] = GitTag(
+            name=tag_name,
+            commit=self.head,
+            date=datetime.now(UTC).replace(microsecond=0),
+            tagger=self.name or "",
+            subject=subject,
+            body=body,
+        )
+        return True
+
+    def delete_tags(self, tag_names: list[str]) -> bool:
+        missing = [name for name in tag_names if name not in self.tags]
+        for name in tag_names:
+            self.tags.pop(name, None)
+        return not missing
+
+    def push_tags(self, tag_names: list[str], remote: str = "origin") -> None:
+        missing = [name for name in tag_names if name not in self.tags]
+        if missing:
+            raise RuntimeError(f"Failed to push tags: unknown tags {', '.join(missing)}")
+        self.pushed.append((remote, list(tag_names)))
+
+    def list_tags(self, pattern: str | None = None) -> list[str]:
+        return [
+            name for name in sorted(self.tags) if not pattern or fnmatch.fnmatchcase(name, pattern)
+        ]
+
+    def git_dir(self) -> Path | None:
+        return None
+
+    def tag_details(self) -> list[GitTag]:
+        return [self.tags[name] for name in sorted(self.tags)]
+
+    def head_sha(self) -> str:
+        return self.head
+
+    def file_last_commit_sha(self, file_path: Path) -> str:
+        sha = self.files.get(Path(file_path).as_posix())
+        if sha is None:
+            raise RuntimeError(f"File not found in git history: {file_path}")
+        return sha
+
+    def files_last_commit_shas(self, file_paths: list[Path]) -> dict[Path, str]:
+        missing = [path for path in file_paths if Path(path).as_posix() not in self.files]
+        if missing:
+            raise RuntimeError(
+                f"Files not found in git history: {', '.join(str(path) for path in missing)}"
+            )
+        return {path: self.files[Path(path).as_posix()] for path in file_paths}
+
+    def log(self, revisions: list[str], paths: list[str]) -> Iterator[GitCommit]:
+        parents = {commit.sha: commit.parents for commit in self.commits}
+
+        def reachable(starts: list[str]) -> set[str]:
+            seen: set[str] = set()
+            stack = list(starts)
+            while stack:
+                sha = stack.pop()
+                if sha not in parents:
+                    raise RuntimeError(f"Failed to read git log: bad revision {sha}")
+                if sha not in seen:
+                    seen.add(sha)
+                    stack.extend(parent for parent in parents[sha] if parent in parents)
+            return seen
+
+        included = reachable([rev for rev in revisions if not rev.startswith("^")])
+        included -= reachable([rev[1:] for rev in revisions if rev.startswith("^")])
+        prefixes = [path.rstrip("/") for path in paths if path not in (".", "")]
+        for commit in self.commits:
+            if commit.sha in included:
+                changes = [
+                    change
+                    for change in commit.changes
+                    if not prefixes
+                    or any(change.path == p or change.path.startswith(p + "/") for p in prefixes)
+                ]
+                yield GitCommit(**{**vars(commit), "changes": changes})
+
+
+GIT_BACKENDS: dict[str, type[GitBackend]] = {
+    "subprocess": SubprocessGitBackend,
+    "python": PythonGitBackend,
+}
+
+_backend_override: GitBackend | None = None
+
+
+def set_git_backend(backend: GitBackend | None) -> GitBackend | None:
+    """Use ``backend`` for every git operation (None restores the default).
+
+    Returns:
+        The backend previously set
+    """
+    global _backend_override
+    previous, _backend_override = _backend_override, backend
+    return previous
+
+
+@functools.lru_cache(maxsize=16)
+def _python_backend(cwd: Path) -> PythonGitBackend:
+    # Keeps the parsed objects and open packs across calls
+    return PythonGitBackend(cwd)
+
+
+def get_git_backend(cwd: Path | None = None) -> GitBackend:
+    """Backend for the repository containing ``cwd``.
+
+    Raises:
+        ValueError: If ``AI_KIT_GIT_BACKEND`` names an unknown backend
+    """
+    if _backend_override is not None:
+        return _backend_override
+    name = os.environ.get("AI_KIT_GIT_BACKEND", "subprocess")
+    if name not in GIT_BACKENDS:
+        raise ValueError(
+            f"Unknown git backend: {name} (expected one of: {', '.join(GIT_BACKENDS)})"
+        )
+    if name == "python":
+        return _python_backend(Path(cwd or Path.cwd()).resolve())
+    return GIT_BACKENDS[name](cwd)
+
+
+def _relative_paths(
+    file_paths: list[Path], cwd: Path | None, toplevel: Path
+) -> dict[str, list[Path]]:
+    """Group paths by their location relative to the repository root, as git prints them."""
+    base = Path(cwd) if cwd else Path.cwd()
+    wanted: dict[str, list[Path]] = {}
+    for file_path in file_paths:
+        try:
+            relative = (base / file_path).resolve().relative_to(toplevel).as_posix()
+        except ValueError as e:
+            raise RuntimeError(f"File not in the git repository: {file_path}") from e
+        wanted.setdefault(relative, []).append(file_path)
+    return wanted
+
+
+def _check_found(remaining: set[str], wanted: dict[str, list[Path]]) -> None:
+    if remaining:
+        missing = ", ".join(str(path) for name in sorted(remaining) for path in wanted[name])
+        raise RuntimeError(f"Files not found in git history: {missing}")
+
+
+def _read_fields(stream) -> Iterator[str]:
+    """NUL-separated fields of a ``-z`` output, read as they arrive."""
+    pending = b""
+    while chunk := stream.read1(64 * 1024):
+        *fields, pending = (pending + chunk).split(b"\0")
+        for value in fields:
+            yield value.decode("utf-8", "surrogateescape")
+    if pending:
+        yield pending.decode("utf-8", "surrogateescape")
+
+
+def _parse_log(fields: Iterator[str]) -> Iterator[GitCommit]:
+    """Commits of ``git log --format=<_LOG_FORMAT> --raw --numstat -z``.
+
+    Each commit is its header fields, then one ``:modes shas status`` field
+    per changed file followed by its path(s), then one ``added\tdeleted\tpath``
+    field per file in the same order (with an empty path and two more fields
+    for renames).
+    """
+    commit = None
+    counted = 0
+    for value in fields:
+        value = value.lstrip("\n")
+        if value.startswith("\x01"):
+            if commit is not None:
+                yield commit
+            parents, author, email, date, subject = (next(fields) for _ in range(5))
+            commit = GitCommit(
+                sha=value[1:],
+                parents=parents.split(),
+                author=author,
+                email=email,
+                date=datetime.fromisoformat(date),
+                subject=subject,
+            )
+            counted = 0
+        elif value.startswith(":"):
+            status = value.rsplit(" ", 1)[1][0]
+            old_path = next(fields) if status in "RC" else None
+            commit.changes.append(FileChange(status, next(fields), old_path))
+        elif value:
+            added, deleted, path = value.split("\t", 2)
+            if not path:
+                next(fields), next(fields)
+            change = commit.changes[counted]
+            counted += 1
+            if added != "-":
+                change.insertions, change.deletions = int(added), int(deleted)
+    if commit is not None:
+        yield commit
+
+
+def _split_message(message: str) -> tuple[str, str]:
+    """Subject and body of a commit or tag message, as ``%(contents:...)`` shows them."""
+    message = message.split("\n-----BEGIN PGP SIGNATURE-----")[0]
+    subject, _, body = message.strip("\n").partition("\n\n")
+    return " ".join(subject.split("\n")).strip(), body.strip()
+
+
+def _ident_date(timestamp: int, tz: str) -> datetime:
+    sign = -1 if tz.startswith("-") else 1
+    offset = timedelta(hours=int(tz[1:3]), minutes=int(tz[3:5])) * sign
+    return datetime.fromtimestamp(timestamp, timezone(offset))
+
 
 def get_git_user_name() -> str | None:
     """Get git user name from config."""
-    try:
-        result = subprocess.run(
-            ["git", "config", "user.name"],
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except FileNotFoundError:
-        pass
-    return None
+    return get_git_backend().user_name()
 
 
 def create_git_tag(tag_name: str, message: str, cwd: Path | None = None) -> bool:
     """Create an annotated git tag."""
-    try:
-        subprocess.run(
-            ["git", "tag", "-a", tag_name, "-m", message],
-            cwd=cwd,
-            check=True,
-            capture_output=True,
-        )
-        return True
-    except subprocess.CalledProcessError:
-        return False
+    return get_git_backend(cwd).create_tag(tag_name, message)
+
+
+def delete_git_tags(tag_names: list[str], cwd: Path | None = None) -> bool:
+    """Delete local git tags with a single git command."""
+    return get_git_backend(cwd).delete_tags(tag_names)
+
+
+def push_git_tags(tag_names: list[str], remote: str = "origin", cwd: Path | None = None) -> None:
+    """Push tags to a remote with one git push, over one connection.
+
+    The push is atomic when the remote supports it: either every tag is
+    published or none is.
+
+    Raises:
+        RuntimeError: If git push fails
+    """
+    get_git_backend(cwd).push_tags(tag_names, remote)
 
 
 def list_git_tags(pattern: str | None = None, cwd: Path | None = None) -> list[str]:
     """List git tags, optionally filtered by pattern."""
-    try:
-        cmd = ["git", "tag", "--list"]
-        if pattern:
-            cmd.append(pattern)
-
-        result = subprocess.run(
-            cmd,
-            cwd=cwd,
-            check=True,
-            capture_output=True,
-            text=True,
+    return get_git_backend(cwd).list_tags(pattern)
+
+
+def iter_git_log(
+    revisions: list[str], paths: list[str], cwd: Path | None = None
+) -> Iterator[GitCommit]:
+    """Stream the commits reachable from ``revisions``, children before parents.
+
+    The log is read with a single ``git log --raw --numstat -z`` process and
+    parsed as it arrives. Every commit is listed (with an empty ``changes``
+    if it did not touch ``paths``), so the parents describe the whole graph.
+
+    Args:
+        revisions: Commits to start from; a ``^`` prefix excludes a commit's history
+        paths: Only report changes to these paths
+        cwd: Working directory; reported paths are relative to it
+
+    Raises:
+        RuntimeError: If git log fails, for example on an unknown revision
+    """
+    return get_git_backend(cwd).log(revisions, paths)
+
+
+def _refs_signature(git_dir: Path) -> str:
+    """Fingerprint of the tag refs storage, from file and directory mtimes.
+
+    Creating, moving or deleting a tag rewrites ``packed-refs`` or renames a
+    file in a ``refs/tags`` directory (or the reftable files), which changes
+    one of these mtimes.
+    """
+    stamps = []
+    packed_refs = git_dir / "packed-refs"
+    if packed_refs.exists():
+        stamps.append(f"packed-refs:{packed_refs.stat().st_mtime_ns}")
+    reftable = git_dir / "reftable"
+    if reftable.is_dir():
+        stamps.extend(f"{entry.name}:{entry.stat().st_mtime_ns}" for entry in os.scandir(reftable))
+    for root, _, _ in os.walk(git_dir / "refs" / "tags"):
+        stamps.append(f"{root}:{os.stat(root).st_mtime_ns}")
+    return hashlib.sha256("\n".join(sorted(stamps)).encode()).hexdigest()
+
+
+def _parse_tags(output: str) -> list[GitTag]:
+    tags = []
+    for record in output.split("\x01"):
+        record = record.lstrip("\n")
+        if not record:
+            continue
+        name, kind, object_sha, target_sha, tagger, email, date, subject, body = record.split("\0")
+        tags.append(
+            GitTag(
+                name=name,
+                commit=target_sha or object_sha,
+                date=datetime.fromisoformat(date) if date else None,
+                tagger=tagger,
+                email=email,
+                subject=subject,
+                body=body.strip(),
+                annotated=kind == "tag",
+            )
         )
-        return [tag.strip() for tag in result.stdout.split("\n") if tag.strip()]
-    except subprocess.CalledProcessError:
-        return []
+    return tags
+
+
+def list_git_tag_details(
+    pattern: str | None = None, cwd: Path | None = None, cache_path: Path | None = None
+) -> list[GitTag]:
+    """List git tags with their tagger, date, message and target commit.
+
+    All tags are read at once (a single ``git for-each-ref`` call with the
+    default backend). With ``cache_path``, the parsed tags are kept in a JSON
+    file keyed on the mtimes of ``packed-refs`` and ``refs/tags``, so they are
+    only read again after a tag is created, moved or deleted.
+
+    Args:
+        pattern: Only return tags matching this glob (as ``git tag --list``)
+        cwd: Working directory for git commands
+        cache_path: JSON file caching the parsed tags
+
+    Returns:
+        Tags sorted by name
+
+    Raises:
+        RuntimeError: If git commands fail
+    """
+    backend = get_git_backend(cwd)
+    try:
+        git_dir = backend.git_dir()
+    except RuntimeError as e:
+        raise RuntimeError(f"Failed to list tags: {e}") from e
+    if git_dir is None:
+        cache_path = None
+    signature = _refs_signature(git_dir) if git_dir is not None else ""
+
+    tags = None
+    if cache_path is not None and cache_path.exists():
+        try:
+            cached = json.loads(cache_path.read_text(encoding="utf-8"))
+            if cached["git_dir"] == str(git_dir) and cached["signature"] == signature:
+                tags = [
+                    GitTag(**{**tag, "date": tag["date"] and datetime.fromisoformat(tag["date"])})
+                    for tag in cached["tags"]
+                ]
+        except (OSError, ValueError, KeyError, TypeError):
+            # A corrupt cache only costs a git call
+            tags = None
+
+    if tags is None:
+        tags = backend.tag_details()
+        if cache_path is not None:
+            data = {
+                "git_dir": str(git_dir),
+                "signature": signature,
+                "tags": [{**vars(tag), "date": tag.date and tag.date.isoformat()} for tag in tags],
+            }
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(cache_path.suffix + ".tmp")
+            tmp_path.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp_path, cache_path)
+
+    if pattern:
+        tags = [tag for tag in tags if fnmatch.fnmatchcase(tag.name, pattern)]
+    return tags
 
 
 def get_current_commit_sha(cwd: Path | None = None) -> str:
@@ -59,17 +927,7 @@ def get_current_commit_sha(cwd: Path | None = None) -> str:
     Raises:
         RuntimeError: If git command fails
     """
-    try:
-        result = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
-            cwd=cwd,
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"Failed to get current commit SHA: {e}") from e
+    return get_git_backend(cwd).head_sha()
 
 
 def get_file_last_commit_sha(file_path: Path, cwd: Path | None = None) -> str:
@@ -85,17 +943,25 @@ def get_file_last_commit_sha(file_path: Path, cwd: Path | None = None) -> str:
     Raises:
         RuntimeError: If git command fails or file not in git
     """
-    try:
-        result = subprocess.run(
-            ["git", "log", "-1", "--format=%H", "--", str(file_path)],
-            cwd=cwd,
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-        sha = result.stdout.strip()
-        if not sha:
-            raise RuntimeError(f"File not found in git history: {file_path}")
-        return sha
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"Failed to get file commit SHA: {e}") from e
+    return get_git_backend(cwd).file_last_commit_sha(file_path)
+
+
+def get_files_last_commit_shas(file_paths: list[Path], cwd: Path | None = None) -> dict[Path, str]:
+    """Get the last commit SHA that modified each of many files.
+
+    With the default backend, walks the history once with a single
+    ``git log --name-only`` process, newest commit first, and stops reading as
+    soon as every file has been seen, instead of running ``git log -1`` once
+    per file.
+
+    Args:
+        file_paths: Paths to the files
+        cwd: Working directory for git commands (relative paths are resolved from it)
+
+    Returns:
+        The commit SHA for each path, keyed as given
+
+    Raises:
+        RuntimeError: If git commands fail or files are not in git
+    """
+    return get_git_backend(cwd).files_last_commit_shas(file_paths)
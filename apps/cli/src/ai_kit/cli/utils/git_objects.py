@@ -0,0 +1,577 @@
+"""Pure-Python access to a git repository's refs and object database.
+
+Implements enough of git's on-disk format to resolve refs and read commits,
+trees and tags (loose or packed, including deltas) without running ``git``.
+SHA-1 repositories using the files ref backend are supported; other layouts
+raise :class:`UnsupportedRepositoryError` so callers can fall back to the
+``git`` command.
+"""
+
+import heapq
+import itertools
+import mmap
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+# Pack object types
+_COMMIT, _TREE, _BLOB, _TAG, _OFS_DELTA, _REF_DELTA = 1, 2, 3, 4, 6, 7
+_TYPE_NAMES = {_COMMIT: "commit", _TREE: "tree", _BLOB: "blob", _TAG: "tag"}
+
+# Decoded objects kept to resolve delta chains
+_DELTA_BASE_CACHE_SIZE = 256
+
+# Parsed trees and commits kept between queries, least recently used dropped first
+_TREE_CACHE_SIZE = 4096
+_COMMIT_CACHE_SIZE = 16384
+
+
+class UnsupportedRepositoryError(Exception):
+    """The repository uses a format this module does not read."""
+
+
+@dataclass
+class Commit:
+    """The parts of a commit ai-kit reads."""
+
+    sha: str
+    tree: str
+    parents: list[str]
+    committer: str
+    time: int
+    message: str
+
+
+@dataclass
+class Tag:
+    """An annotated tag object."""
+
+    sha: str
+    object: str
+    type: str
+    name: str
+    tagger: str
+    message: str
+
+
+def parse_ident(ident: str) -> tuple[str, str, int, str]:
+    """Split ``Name <email> timestamp tz`` into its parts."""
+    name, _, rest = ident.partition(" <")
+    email, _, when = rest.partition("> ")
+    timestamp, _, tz = when.partition(" ")
+    return name, email, int(timestamp or 0), tz or "+0000"
+
+
+def _varint(data, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+
+def _cache_get(cache: dict, key):
+    """Look up ``key``, marking it as the most recently used."""
+    value = cache.pop(key, None)
+    if value is not None:
+        cache[key] = value
+    return value
+
+
+def _cache_put(cache: dict, key, value, limit: int):
+    """Store ``value``, dropping the least recently used entry beyond ``limit``."""
+    if len(cache) >= limit:
+        cache.pop(next(iter(cache)))
+    cache[key] = value
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Rebuild an object from its delta base and a git delta."""
+    _, pos = _varint(delta, 0)
+    size, pos = _varint(delta, pos)
+    out = bytearray()
+    while pos < len(delta):
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            offset = length = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (1 << (4 + i)):
+                    length |= delta[pos] << (8 * i)
+                    pos += 1
+            out += base[offset : offset + (length or 0x10000)]
+        elif op:
+            out += delta[pos : pos + op]
+            pos += op
+        else:
+            raise ValueError("Invalid delta instruction")
+    if len(out) != size:
+        raise ValueError("Delta produced an object of the wrong size")
+    return bytes(out)
+
+
+class _Pack:
+    """A pack file and its version 2 index."""
+
+    def __init__(self, idx_path: Path):
+        with open(idx_path, "rb") as f:
+            self.index = f.read()
+        if self.index[:4] != b"\xfftOc" or struct.unpack(">I", self.index[4:8])[0] != 2:
+            raise UnsupportedRepositoryError(f"Unsupported pack index version: {idx_path}")
+        self.fanout = struct.unpack(">256I", self.index[8:1032])
+        count = self.fanout[255]
+        self.shas_start = 1032
+        self.offsets_start = self.shas_start + 24 * count  # SHAs, then CRCs
+        self.large_offsets_start = self.offsets_start + 4 * count
+        with open(idx_path.with_suffix(".pack"), "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def offset(self, sha: bytes) -> int | None:
+        """Offset of an object in the pack, or None if it is not in it."""
+        lo = self.fanout[sha[0] - 1] if sha[0] else 0
+        hi = self.fanout[sha[0]]
+        index = self.index
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = self.shas_start + 20 * mid
+            current = index[start : start + 20]
+            if current < sha:
+                lo = mid + 1
+            elif current > sha:
+                hi = mid
+            else:
+                start = self.offsets_start + 4 * mid
+                offset = struct.unpack(">I", index[start : start + 4])[0]
+                if offset & 0x80000000:
+                    start = self.large_offsets_start + 8 * (offset & 0x7FFFFFFF)
+                    offset = struct.unpack(">Q", index[start : start + 8])[0]
+                return offset
+        return None
+
+    def entry(self, offset: int) -> tuple[int, int, int, int | bytes | None]:
+        """Type, size, data position and delta base (offset or SHA) of an entry."""
+        data = self.data
+        byte = data[offset]
+        pos = offset + 1
+        kind = (byte >> 4) & 7
+        size = byte & 0x0F
+        shift = 4
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+        base: int | bytes | None = None
+        if kind == _OFS_DELTA:
+            byte = data[pos]
+            pos += 1
+            distance = byte & 0x7F
+            while byte & 0x80:
+                byte = data[pos]
+                pos += 1
+                distance = ((distance + 1) << 7) | (byte & 0x7F)
+            base = offset - distance
+        elif kind == _REF_DELTA:
+            base = bytes(data[pos : pos + 20])
+            pos += 20
+        return kind, size, pos, base
+
+    def inflate(self, pos: int, size: int) -> bytes:
+        """Decompress ``size`` bytes stored at ``pos``."""
+        decompressor = zlib.decompressobj()
+        out = bytearray()
+        chunk = max(size + 64, 4096)
+        while not decompressor.eof:
+            data = self.data[pos : pos + chunk]
+            if not data:
+                break
+            out += decompressor.decompress(data)
+            pos += len(data)
+        return bytes(out)
+
+    def close(self):
+        self.data.close()
+
+
+class Repository:
+    """Read-mostly view of a git repository, without running ``git``.
+
+    Raises:
+        UnsupportedRepositoryError: If the repository uses SHA-256 object names or
+            the reftable ref backend
+    """
+
+    def __init__(self, git_dir: Path, common_dir: Path | None = None, worktree: Path | None = None):
+        self.git_dir = Path(git_dir)
+        self.common_dir = Path(common_dir or git_dir)
+        self.worktree = Path(worktree) if worktree else None
+        self.objects_dir = self.common_dir / "objects"
+        self.config = read_config(self.common_dir / "config")
+        if self.config.get("extensions.objectformat", "sha1").lower() != "sha1":
+            raise UnsupportedRepositoryError("Only SHA-1 repositories are supported")
+        if self.config.get("extensions.refstorage", "files").lower() != "files":
+            raise UnsupportedRepositoryError("Only the files ref backend is supported")
+        self._packs: list[_Pack] | None = None
+        self._delta_bases: dict[tuple[int, int], tuple[int, bytes]] = {}
+        self._trees: dict[str, dict[str, tuple[str, str]]] = {}
+        self._commits: dict[str, Commit] = {}
+
+    @classmethod
+    def discover(cls, path: Path | None = None) -> "Repository":
+        """Find the repository containing ``path`` (default: the working directory).
+
+        Raises:
+            FileNotFoundError: If ``path`` is not inside a git repository
+        """
+        start = Path(path or Path.cwd()).resolve()
+        env_dir = os.environ.get("GIT_DIR")
+        if env_dir:
+            worktree = os.environ.get("GIT_WORK_TREE")
+            return cls._from_git_dir(
+                (start / env_dir).resolve(), (start / worktree).resolve() if worktree else start
+            )
+        for directory in [start, *start.parents]:
+            dot_git = directory / ".git"
+            if dot_git.is_dir():
+                return cls._from_git_dir(dot_git, directory)
+            if dot_git.is_file():
+                # Worktrees and submodules: ".git" points to the git directory
+                content = dot_git.read_text().strip()
+                if content.startswith("gitdir:"):
+                    git_dir = (directory / content[7:].strip()).resolve()
+                    return cls._from_git_dir(git_dir, directory)
+            if (directory / "HEAD").is_file() and (directory / "objects").is_dir():
+                return cls._from_git_dir(directory)  # Bare repository
+        raise FileNotFoundError(f"Not a git repository: {start}")
+
+    @classmethod
+    def _from_git_dir(cls, git_dir: Path, worktree: Path | None = None) -> "Repository":
+        common_dir = git_dir
+        commondir_file = git_dir / "commondir"
+        if commondir_file.is_file():
+            common_dir = (git_dir / commondir_file.read_text().strip()).resolve()
+        return cls(git_dir, common_dir, worktree)
+
+    def close(self):
+        """Release the memory-mapped pack files."""
+        for pack in self._packs or []:
+            pack.close()
+        self._packs = None
+        self._delta_bases.clear()
+
+    # Refs
+
+    def _packed_refs(self) -> dict[str, str]:
+        refs = {}
+        path = self.common_dir / "packed-refs"
+        if path.exists():
+            for line in path.read_text().splitlines():
+                if line and line[0] not in "#^":
+                    sha, _, name = line.partition(" ")
+                    refs[name] = sha
+        return refs
+
+    def resolve_ref(self, name: str) -> str | None:
+        """SHA a ref (such as ``HEAD`` or ``refs/tags/x``) points to, following symrefs."""
+        for _ in range(10):
+            # HEAD is per worktree, refs/ are shared by all worktrees
+            path = (self.common_dir if name.startswith("refs/") else self.git_dir) / name
+            if path.is_file():
+                content = path.read_text().strip()
+                if content.startswith("ref:"):
+                    name = content[4:].strip()
+                    continue
+                return content
+            return self._packed_refs().get(name)
+        raise ValueError(f"Too many levels of symbolic refs: {name}")
+
+    def head(self) -> str:
+        """SHA of the commit checked out.
+
+        Raises:
+            ValueError: If HEAD does not point to a commit yet
+        """
+        sha = self.resolve_ref("HEAD")
+        if sha is None:
+            raise ValueError("HEAD does not point to a commit")
+        return sha
+
+    def refs(self, prefix: str = "refs/tags/") -> dict[str, str]:
+        """SHAs of the refs under ``prefix``, keyed by name without the prefix."""
+        refs = {
+            name[len(prefix) :]: sha
+            for name, sha in self._packed_refs().items()
+            if name.startswith(prefix)
+        }
+        root = self.common_dir / prefix
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                if filename.endswith(".lock"):
+                    continue
+                path = Path(directory) / filename
+                content = path.read_text().strip()
+                if not content.startswith("ref:"):
+                    refs[path.relative_to(root).as_posix()] = content
+        return dict(sorted(refs.items()))
+
+    # Objects
+
+    def _load_packs(self) -> list[_Pack]:
+        if self._packs is None:
+            self._packs = []
+            directories = [self.objects_dir]
+            alternates = self.objects_dir / "info" / "alternates"
+            if alternates.exists():
+                for line in alternates.read_text().splitlines():
+                    if line.strip() and not line.startswith("#"):
+                        directories.append((self.objects_dir / line.strip()).resolve())
+            self._object_dirs = directories
+            for directory in directories:
+                for idx_path in sorted((directory / "pack").glob("*.idx")):
+                    if idx_path.with_suffix(".pack").exists():
+                        self._packs.append(_Pack(idx_path))
+        return self._packs
+
+    def _read_packed(self, pack_number: int, offset: int) -> tuple[int, bytes]:
+        cached = self._delta_bases.get((pack_number, offset))
+        if cached is not None:
+            return cached
+        pack = self._packs[pack_number]
+        kind, size, pos, base = pack.entry(offset)
+        data = pack.inflate(pos, size)
+        if kind == _OFS_DELTA:
+            kind, base_data = self._read_packed(pack_number, base)
+            data = apply_delta(base_data, data)
+        elif kind == _REF_DELTA:
+            kind_name, base_data = self.read(base.hex())
+            kind = next(k for k, v in _TYPE_NAMES.items() if v == kind_name)
+            data = apply_delta(base_data, data)
+        if len(self._delta_bases) >= _DELTA_BASE_CACHE_SIZE:
+            self._delta_bases.pop(next(iter(self._delta_bases)))
+        self._delta_bases[pack_number, offset] = (kind, data)
+        return kind, data
+
+    def read(self, sha: str) -> tuple[str, bytes]:
+        """Type and content of an object.
+
+        Raises:
+            KeyError: If the object does not exist
+        """
+        raw = bytes.fromhex(sha)
+        for attempt in range(2):
+            for number, pack in enumerate(self._load_packs()):
+                offset = pack.offset(raw)
+                if offset is not None:
+                    kind, data = self._read_packed(number, offset)
+                    return _TYPE_NAMES[kind], data
+            for directory in self._object_dirs:
+                path = directory / sha[:2] / sha[2:]
+                if path.exists():
+                    data = zlib.decompress(path.read_bytes())
+                    header, _, content = data.partition(b"\0")
+                    return header.split(b" ")[0].decode(), content
+            if attempt == 0:
+                # A repack may have replaced the packs since they were opened
+                self.close()
+        raise KeyError(sha)
+
+    def commit(self, sha: str) -> Commit:
+        """Parse a commit."""
+        commit = _cache_get(self._commits, sha)
+        if commit is None:
+            kind, data = self.read(sha)
+            if kind != "commit":
+                raise ValueError(f"Not a commit: {sha}")
+            headers, message = _split_object(data)
+            committer = headers.get("committer", [""])[0]
+            commit = Commit(
+                sha=sha,
+                tree=headers["tree"][0],
+                parents=headers.get("parent", []),
+                committer=committer,
+                time=parse_ident(committer)[2] if committer else 0,
+                message=message,
+            )
+            _cache_put(self._commits, sha, commit, _COMMIT_CACHE_SIZE)
+        return commit
+
+    def tree(self, sha: str) -> dict[str, tuple[str, str]]:
+        """Entries of a tree: name to (mode, SHA)."""
+        entries = _cache_get(self._trees, sha)
+        if entries is None:
+            _, data = self.read(sha)
+            entries = {}
+            pos = 0
+            while pos < len(data):
+                space = data.index(b" ", pos)
+                nul = data.index(b"\0", space)
+                name = data[space + 1 : nul].decode("utf-8", "surrogateescape")
+                entries[name] = (data[pos:space].decode(), data[nul + 1 : nul + 21].hex())
+                pos = nul + 21
+            _cache_put(self._trees, sha, entries, _TREE_CACHE_SIZE)
+        return entries
+
+    def tag(self, sha: str) -> Tag:
+        """Parse an annotated tag object."""
+        kind, data = self.read(sha)
+        if kind != "tag":
+            raise ValueError(f"Not a tag: {sha}")
+        headers, message = _split_object(data)
+        return Tag(
+            sha=sha,
+            object=headers["object"][0],
+            type=headers["type"][0],
+            name=headers.get("tag", [""])[0],
+            tagger=headers.get("tagger", [""])[0],
+            message=message,
+        )
+
+    def path_entry(self, tree: str, path: str) -> tuple[str, str] | None:
+        """(mode, SHA) of ``path`` in a tree, or None if it does not exist."""
+        entry: tuple[str, str] | None = ("40000", tree)
+        for part in path.split("/"):
+            if entry is None or entry[0] != "40000":
+                return None
+            entry = self.tree(entry[1]).get(part)
+        return entry
+
+    def last_commits(self, paths: list[str], start: str | None = None) -> dict[str, str]:
+        """Last commit that modified each path, walking history newest first.
+
+        Like ``git log -1 -- <path>``: at a merge, history is followed through
+        a parent the paths are unchanged from; a path differing from every
+        parent is attributed to the merge.
+        """
+        remaining = set(paths)
+        found: dict[str, str] = {}
+        head = start or self.head()
+        # Same-date commits come out in insertion order, as in git's date queue
+        counter = itertools.count()
+        queue = [(-self.commit(head).time, next(counter), head)]
+        seen = {head}
+        while queue and remaining:
+            _, _, sha = heapq.heappop(queue)
+            commit = self.commit(sha)
+            entries = {path: self.path_entry(commit.tree, path) for path in remaining}
+            parents = [self.commit(parent) for parent in commit.parents]
+            follow = parents
+            changed = set()
+            if not parents:
+                changed = {path for path, entry in entries.items() if entry is not None}
+            else:
+                parent_entries = [
+                    {
+                        path: entries[path]
+                        if parent.tree == commit.tree
+                        else self.path_entry(parent.tree, path)
+                        for path in remaining
+                    }
+                    for parent in parents
+                ]
+                same = [pe == entries for pe in parent_entries]
+                if any(same):
+                    # History simplification: follow one unchanged parent only
+                    follow = [parents[same.index(True)]]
+                else:
+                    changed = {
+                        path
+                        for path in remaining
+                        if all(pe[path] != entries[path] for pe in parent_entries)
+                    }
+            for path in changed:
+                found[path] = sha
+            remaining -= changed
+            for parent in follow:
+                if parent.sha not in seen:
+                    seen.add(parent.sha)
+                    heapq.heappush(queue, (-parent.time, next(counter), parent.sha))
+        return found
+
+
+def _split_object(data: bytes) -> tuple[dict[str, list[str]], str]:
+    """Headers (with repeated keys) and message of a commit or tag."""
+    text = data.decode("utf-8", "replace")
+    header_text, _, message = text.partition("\n\n")
+    headers: dict[str, list[str]] = {}
+    for line in header_text.splitlines():
+        if line.startswith(" "):
+            continue  # Continuation of a multi-line header (signatures)
+        key, _, value = line.partition(" ")
+        headers.setdefault(key, []).append(value)
+    return headers, message
+
+
+def read_config(path: Path) -> dict[str, str]:
+    """Read a git config file into ``section[.subsection].key`` -> value.
+
+    Includes are not followed. Section and key names are lowercased.
+    """
+    values: dict[str, str] = {}
+    if not path.is_file():
+        return values
+    section = ""
+    for raw_line in path.read_text(errors="replace").splitlines():
+        line = raw_line.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line.startswith("["):
+            header = line[1 : line.index("]")]
+            name, _, subsection = header.partition(" ")
+            section = name.lower()
+            if subsection:
+                section += "." + subsection.strip().strip('"')
+            continue
+        key, sep, value = line.partition("=")
+        key = f"{section}.{key.strip().lower()}"
+        if not sep:
+            values[key] = "true"
+            continue
+        values[key] = _config_value(value)
+    return values
+
+
+def _config_value(value: str) -> str:
+    out = []
+    quoted = False
+    i = 0
+    value = value.strip()
+    while i < len(value):
+        char = value[i]
+        if char == '"':
+            quoted = not quoted
+        elif char == "\\" and i + 1 < len(value):
+            i += 1
+            out.append({"n": "\n", "t": "\t", "b": "\b"}.get(value[i], value[i]))
+        elif char in "#;" and not quoted:
+            break
+        else:
+            out.append(char)
+        i += 1
+    return "".join(out).strip() if not quoted else "".join(out)
+
+
+def user_config(repository: Repository | None = None) -> dict[str, str]:
+    """Merged system, global and repository config, like ``git config``."""
+    paths = []
+    if not os.environ.get("GIT_CONFIG_NOSYSTEM"):
+        paths.append(Path(os.environ.get("GIT_CONFIG_SYSTEM", "/etc/gitconfig")))
+    if "GIT_CONFIG_GLOBAL" in os.environ:
+        paths.append(Path(os.environ["GIT_CONFIG_GLOBAL"]))
+    else:
+        xdg = os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config"
+        paths += [Path(xdg) / "git" / "config", Path.home() / ".gitconfig"]
+    values: dict[str, str] = {}
+    for path in paths:
+        values.update(read_config(path))
+    if repository is not None:
+        values.update(repository.config)
+    return values
@@ -3,6 +3,14 @@
 from pathlib import Path
 
 from rich.console import Console
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    SpinnerColumn,
+    TextColumn,
+    TimeElapsedColumn,
+)
 
 console = Console()
 
@@ -54,3 +62,115 @@ def print_validation_errors(errors: list, warnings: list):
             print_warning(warning.message)
             if warning.suggestion:
                 console.print(f"  → {warning.suggestion}", style="dim")
+
+
+def print_resource_usage(resources: dict):
+    """Print the resources used by a notebook run."""
+
+    def size(value):
+        return "n/a" if value is None else f"{value / (1024 * 1024):.1f} MB"
+
+    cpu = resources.get("cpu_seconds")
+    wall = resources.get("wall_seconds")
+    console.print("\nResource usage:", style="bold")
+    console.print(f"  Peak RSS: {size(resources.get('peak_rss'))}")
+    console.print(f"  CPU time: {'n/a' if cpu is None else f'{cpu:.2f}s'}")
+    console.print(f"  Wall time: {'n/a' if wall is None else f'{wall:.2f}s'}")
+    console.print(f"  Output: {size(resources.get('output_bytes'))}")
+    if resources.get("truncated_bytes"):
+        console.print(f"  Truncated output: {size(resources['truncated_bytes'])}", style="yellow")
+    if resources.get("limit_exceeded"):
+        print_error(f"Limit exceeded: {resources['limit_exceeded']}")
+
+
+def print_conversion_summary(results: list):
+    """Print output sizes and times of a batch conversion."""
+    from rich.table import Table
+
+    table = Table(title="Conversion summary")
+    table.add_column("Notebook")
+    table.add_column("Output")
+    table.add_column("Status")
+    table.add_column("Size", justify="right")
+    table.add_column("Time", justify="right")
+    for result in results:
+        if result.ok:
+            table.add_row(
+                str(result.input_path),
+                str(result.output_path),
+                result.status,
+                f"{result.size / 1024:.1f} KB",
+                f"{result.seconds:.2f}s",
+            )
+        else:
+            table.add_row(
+                str(result.input_path), "-", "[red]failed[/red]", "-", f"{result.seconds:.2f}s"
+            )
+    console.print(table)
+
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    total_size = sum(result.size for result in results if result.ok) / (1024 * 1024)
+    total_time = sum(result.seconds for result in results)
+    breakdown = ", ".join(f"{count} {status}" for status, count in counts.items())
+    notebooks = len({result.input_path for result in results})
+    label = f"{notebooks} notebooks"
+    if len(results) != notebooks:
+        label += f", {len(results)} outputs"
+    console.print(
+        f"{label} ({breakdown}), {total_size:.1f} MB, {total_time:.1f}s of conversion time"
+    )
+
+
+class ExecutionProgress:
+    """Live display of notebook execution events.
+
+    Use as a context manager and pass the instance as an event handler to
+    :func:`ai_kit.cli.core.execution.run_notebook`.
+    """
+
+    def __init__(self, target: Console | None = None):
+        self.progress = Progress(
+            SpinnerColumn(),
+            TextColumn("{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeElapsedColumn(),
+            console=target or console,
+        )
+        self.task = None
+        self.total = 0
+
+    def __enter__(self):
+        self.progress.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.progress.stop()
+
+    def __call__(self, event):
+        """Update the display for one execution event."""
+        out = self.progress.console
+        if event.type == "notebook_start":
+            self.total = event.data["code_cells"]
+            self.task = self.progress.add_task("Starting", total=self.total)
+        elif event.type == "cell_start" and self.task is not None:
+            description = f"Cell {event.cell_index}: {event.data.get('source', '')}"
+            self.progress.update(self.task, description=description)
+        elif event.type == "stream":
+            style = "red" if event.data["name"] == "stderr" else "dim"
+            out.print(event.data["text"], end="", style=style, markup=False, highlight=False)
+        elif event.type == "cell_complete" and self.task is not None:
+            self.progress.advance(self.task)
+            if event.data["status"] == "error":
+                out.print(
+                    f"✗ Cell {event.cell_index} failed after {event.data['duration']:.1f}s: "
+                    f"{event.data.get('ename')}: {event.data.get('evalue')}",
+                    style="red",
+                    markup=False,
+                )
+        elif event.type == "notebook_complete" and self.task is not None:
+            if event.data["status"] == "completed":
+                self.progress.update(self.task, completed=self.total)
+            self.progress.update(self.task, description=f"Finished in {event.elapsed:.1f}s")
@@ -1,5 +1,9 @@
 """Integration tests for notebook commands."""
 
+import json
+import os
+import shutil
+import subprocess
 from unittest.mock import patch
 
 import nbformat
@@ -372,3 +376,713 @@ class TestNotebookCommandIntegration:
         stats_result = runner.invoke(cli, ["notebook", "stats"])
         assert stats_result.exit_code == 0
         assert "Total: 1" in stats_result.output
+
+
+class TestNotebookRunCommand:
+    """Test notebook run command."""
+
+    @pytest.fixture
+    def runner(self):
+        """Create CLI test runner."""
+        return CliRunner()
+
+    def test_run_writes_jsonl_events(self, runner, tmp_path):
+        """Test that --events jsonl streams events to a file."""
+        pytest.importorskip("papermill")
+        pytest.importorskip("ipykernel")
+
+        notebook = nbformat.v4.new_notebook(cells=[nbformat.v4.new_code_cell("print('hi')")])
+        notebook.metadata.kernelspec = {"name": "python3", "display_name": "Python 3"}
+        input_path = tmp_path / "in.ipynb"
+        with open(input_path, "w") as f:
+            nbformat.write(notebook, f)
+        events_path = tmp_path / "events.jsonl"
+
+        result = runner.invoke(
+            cli,
+            [
+                "notebook",
+                "run",
+                str(input_path),
+                str(tmp_path / "out.ipynb"),
+                "--events",
+                "jsonl",
+                "--events-file",
+                str(events_path),
+            ],
+        )
+
+        assert result.exit_code == 0
+        events = [json.loads(line) for line in events_path.read_text().splitlines()]
+        assert events[0]["event"] == "notebook_start"
+        streams = [event for event in events if event["event"] == "stream"]
+        assert streams[0]["text"] == "hi\n"
+        assert events[-1]["status"] == "completed"
+
+    def test_run_streams_jsonl_to_stdout(self, runner, tmp_path):
+        """Test that stdout holds only JSON lines when events go to stdout."""
+        pytest.importorskip("papermill")
+        pytest.importorskip("ipykernel")
+
+        notebook = nbformat.v4.new_notebook(cells=[nbformat.v4.new_code_cell("print('hi')")])
+        notebook.metadata.kernelspec = {"name": "python3", "display_name": "Python 3"}
+        notebook.metadata.language_info = {"name": "python"}
+        input_path = tmp_path / "in.ipynb"
+        with open(input_path, "w") as f:
+            nbformat.write(notebook, f)
+
+        result = runner.invoke(
+            cli,
+            [
+                "notebook",
+                "run",
+                str(input_path),
+                str(tmp_path / "out.ipynb"),
+                "-p",
+                "x=1",
+                "--events",
+                "jsonl",
+            ],
+        )
+
+        assert result.exit_code == 0
+        events = [json.loads(line) for line in result.stdout.splitlines()]
+        assert events[0]["event"] == "notebook_start"
+        assert events[-1]["status"] == "completed"
+        assert "Executing notebook" in result.stderr
+        assert "Next steps" in result.stderr
+
+    def test_run_invalid_parameter(self, runner, tmp_path):
+        """Test that malformed parameters are rejected."""
+        pytest.importorskip("papermill")
+
+        input_path = tmp_path / "in.ipynb"
+        with open(input_path, "w") as f:
+            nbformat.write(nbformat.v4.new_notebook(), f)
+
+        result = runner.invoke(
+            cli, ["notebook", "run", str(input_path), str(tmp_path / "out.ipynb"), "-p", "bad"]
+        )
+
+        assert result.exit_code == 1
+        assert "Invalid parameter format" in result.output
+
+
+class TestNotebookFanOutCommand:
+    """Test notebook fan-out command."""
+
+    @pytest.fixture
+    def runner(self):
+        """Create CLI test runner."""
+        return CliRunner()
+
+    @pytest.fixture
+    def input_path(self, tmp_path):
+        """Write an empty notebook."""
+        path = tmp_path / "in.ipynb"
+        with open(path, "w") as f:
+            nbformat.write(nbformat.v4.new_notebook(), f)
+        return path
+
+    def test_fan_out_requires_variants(self, runner, tmp_path, input_path):
+        """Test that at least one variant is required."""
+        pytest.importorskip("papermill")
+
+        result = runner.invoke(cli, ["notebook", "fan-out", str(input_path), str(tmp_path / "out")])
+
+        assert result.exit_code == 1
+        assert "No variants given" in result.output
+
+    def test_fan_out_invalid_variants_file(self, runner, tmp_path, input_path):
+        """Test that a variants file must hold a list of objects."""
+        pytest.importorskip("papermill")
+        variants_path = tmp_path / "variants.json"
+        variants_path.write_text('{"department": "75"}')
+
+        result = runner.invoke(
+            cli,
+            [
+                "notebook",
+                "fan-out",
+                str(input_path),
+                str(tmp_path / "out"),
+                "--variants",
+                str(variants_path),
+            ],
+        )
+
+        assert result.exit_code == 1
+        assert "JSON list of objects" in result.output
+
+
+class TestNotebookConvertCommand:
+    """Test notebook convert command."""
+
+    @pytest.fixture
+    def runner(self):
+        """Create CLI test runner."""
+        return CliRunner()
+
+    @pytest.fixture
+    def notebooks(self, tmp_path, monkeypatch):
+        """Write two notebooks in a folder, keeping the conversion cache in tmp_path."""
+        monkeypatch.chdir(tmp_path)
+        paths = []
+        for name in ("a", "b"):
+            path = tmp_path / "reporting" / f"{name}.ipynb"
+            path.parent.mkdir(exist_ok=True)
+            with open(path, "w") as f:
+                nbformat.write(
+                    nbformat.v4.new_notebook(cells=[nbformat.v4.new_markdown_cell(f"# {name}")]), f
+                )
+            paths.append(path)
+        return paths
+
+    def test_convert_single(self, runner, notebooks):
+        """Test converting one notebook next to it."""
+        pytest.importorskip("nbconvert")
+
+        result = runner.invoke(cli, ["notebook", "convert", str(notebooks[0]), "markdown"])
+
+        assert result.exit_code == 0
+        assert notebooks[0].with_suffix(".md").exists()
+
+    def test_convert_several_formats(self, runner, notebooks):
+        """Test converting one notebook to several formats at once."""
+        pytest.importorskip("nbconvert")
+
+        result = runner.invoke(
+            cli, ["notebook", "convert", str(notebooks[0]), "html,markdown,script"]
+        )
+
+        assert result.exit_code == 0
+        for suffix in (".html", ".md", ".py"):
+            assert notebooks[0].with_suffix(suffix).exists()
+
+    def test_convert_unknown_format(self, runner, notebooks):
+        """Test that unknown formats are rejected."""
+        result = runner.invoke(cli, ["notebook", "convert", str(notebooks[0]), "html,docx"])
+
+        assert result.exit_code == 1
+        assert "Unknown format(s): docx" in result.output
+
+    def test_convert_directory(self, runner, tmp_path, notebooks):
+        """Test converting a folder into an output directory with a summary."""
+        pytest.importorskip("nbconvert")
+
+        result = runner.invoke(
+            cli,
+            [
+                "notebook",
+                "convert",
+                str(tmp_path / "reporting"),
+                "markdown",
+                "-d",
+                str(tmp_path / "site"),
+                "-j",
+                "1",
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert "2 notebooks (2 converted)" in result.output
+        assert (tmp_path / "site" / "a.md").exists()
+        assert (tmp_path / "site" / "b.md").exists()
+
+    def test_convert_is_incremental(self, runner, tmp_path, notebooks):
+        """Test that an unchanged notebook is not converted again."""
+        pytest.importorskip("nbconvert")
+        args = ["notebook", "convert", str(notebooks[0]), "markdown"]
+
+        runner.invoke(cli, args)
+        result = runner.invoke(cli, args)
+
+        assert result.exit_code == 0
+        assert "Up to date" in result.output
+        assert (tmp_path / ".ai-kit" / "convert-cache" / "manifest.json").exists()
+
+    def test_output_requires_single_notebook(self, runner, tmp_path, notebooks):
+        """Test that -o is rejected for several notebooks."""
+        pytest.importorskip("nbconvert")
+
+        result = runner.invoke(
+            cli,
+            ["notebook", "convert", *map(str, notebooks), "html", "-o", str(tmp_path / "x.html")],
+        )
+
+        assert result.exit_code == 1
+        assert "--output-dir" in result.output
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+class TestNotebookMigrateCommand:
+    """Test notebook migrate command."""
+
+    @pytest.fixture
+    def runner(self):
+        """Create CLI test runner."""
+        return CliRunner()
+
+    @pytest.fixture
+    def repo(self, tmp_path, monkeypatch):
+        """Create a git repository with committed exploratory notebooks."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "pyproject.toml").touch()
+        paths = []
+        for name in ("a", "b", "c", "sub/a"):
+            path = tmp_path / "notebooks" / "exploratory" / f"{name}.ipynb"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w") as f:
+                nbformat.write(nbformat.v4.new_notebook(), f)
+            paths.append(path.relative_to(tmp_path))
+        (tmp_path / "notebooks" / "compliance").mkdir()
+        git = ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com"]
+        subprocess.run(["git", "init", "-q"], check=True)
+        subprocess.run(["git", "add", "-A"], check=True)
+        subprocess.run([*git, "commit", "-qm", "Add notebooks"], check=True)
+        return paths
+
+    def migrate(self, runner, *args):
+        """Run migrate with a destination and rationale."""
+        return runner.invoke(
+            cli,
+            ["notebook", "migrate", *args, "--destination", "packages/x", "--rationale", "Done"],
+        )
+
+    def test_migrate_folder(self, runner, tmp_path, repo):
+        """Test that a folder is migrated with a fixed number of git processes."""
+        with patch("subprocess.Popen", wraps=subprocess.Popen) as mock_popen:
+            result = self.migrate(runner, "notebooks/exploratory")
+
+        assert result.exit_code == 0, result.output
+        assert "4 migration records created" in result.output
+        assert mock_popen.call_count == 3
+        records = sorted(path.name for path in (tmp_path / "docs" / "migrations").glob("*.md"))
+        assert len(records) == 4
+        assert any(name.endswith("-notebooks-exploratory-sub-a.md") for name in records)
+        head = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        record = next((tmp_path / "docs" / "migrations").glob("*-b.md")).read_text()
+        assert f"git show {head}:notebooks/exploratory/b.ipynb" in record
+
+    def test_registry(self, runner, tmp_path, repo):
+        """Test that migrations are added to the registry and can be queried."""
+        self.migrate(runner, "notebooks/exploratory/a.ipynb")
+        self.migrate(runner, "notebooks/exploratory/b.ipynb", "notebooks/exploratory/sub")
+        registry = tmp_path / "docs" / "migrations" / "registry.jsonl"
+        assert len(registry.read_text().splitlines()) == 3
+
+        result = runner.invoke(cli, ["notebook", "migrations", "notebooks/exploratory/sub/a.ipynb"])
+        assert result.exit_code == 0, result.output
+        assert "notebooks/exploratory/sub/a.ipynb → packages/x" in result.output
+        assert "Total: 1 records" in result.output
+
+        result = runner.invoke(
+            cli, ["notebook", "migrations", "--destination", "packages", "--json"]
+        )
+        assert [r["source"] for r in json.loads(result.output)] == [
+            "notebooks/exploratory/a.ipynb",
+            "notebooks/exploratory/b.ipynb",
+            "notebooks/exploratory/sub/a.ipynb",
+        ]
+
+        registry.unlink()
+        result = runner.invoke(cli, ["notebook", "migrations", "--rebuild", "--json"])
+        assert result.exit_code == 0, result.output
+        assert len(registry.read_text().splitlines()) == 3
+
+    def test_migrate_again_replaces_record(self, runner, tmp_path, repo):
+        """Test that migrating a notebook again the same day rewrites its own record."""
+        self.migrate(runner, "notebooks/exploratory/a.ipynb")
+        self.migrate(runner, "notebooks/exploratory/sub/a.ipynb")
+        migrations = tmp_path / "docs" / "migrations"
+        records = sorted(path.name for path in migrations.glob("*.md"))
+
+        result = runner.invoke(
+            cli,
+            [
+                "notebook",
+                "migrate",
+                "notebooks/exploratory/a.ipynb",
+                "notebooks/exploratory/sub/a.ipynb",
+                "--destination",
+                "packages/y",
+                "--rationale",
+                "Again",
+            ],
+        )
+
+        assert result.exit_code == 0, result.output
+        assert sorted(path.name for path in migrations.glob("*.md")) == records
+        assert len(records) == 2
+        registry = [
+            json.loads(line) for line in (migrations / "registry.jsonl").read_text().splitlines()
+        ]
+        assert [(r["source"], r["destination"]) for r in registry] == [
+            ("notebooks/exploratory/a.ipynb", "packages/y"),
+            ("notebooks/exploratory/sub/a.ipynb", "packages/y"),
+        ]
+        assert sorted(r["record"] for r in registry) == [
+            f"docs/migrations/{name}" for name in records
+        ]
+
+    def test_uncommitted_notebook_writes_nothing(self, runner, tmp_path, repo):
+        """Test that no record is written when a notebook is not committed."""
+        path = tmp_path / "notebooks" / "exploratory" / "new.ipynb"
+        with open(path, "w") as f:
+            nbformat.write(nbformat.v4.new_notebook(), f)
+
+        result = self.migrate(runner, str(repo[0]), "notebooks/exploratory/new.ipynb")
+
+        assert result.exit_code == 1
+        assert "new.ipynb" in result.output
+        assert not (tmp_path / "docs" / "migrations").exists()
+
+    def test_delete_refused_before_writing(self, runner, tmp_path, repo):
+        """Test that deleting non-exploratory notebooks is refused up front."""
+        path = tmp_path / "notebooks" / "compliance" / "audit.ipynb"
+        with open(path, "w") as f:
+            nbformat.write(nbformat.v4.new_notebook(), f)
+
+        result = self.migrate(runner, str(repo[0]), str(path), "--delete")
+
+        assert result.exit_code == 1
+        assert "Cannot delete compliance notebooks" in result.output
+        assert not (tmp_path / "docs" / "migrations").exists()
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+class TestNotebookTagCommand:
+    """Test notebook tag command."""
+
+    git = ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com"]
+
+    @pytest.fixture
+    def runner(self):
+        """Create CLI test runner."""
+        return CliRunner()
+
+    @pytest.fixture
+    def repo(self, tmp_path, monkeypatch):
+        """Create a repository of compliance notebooks with a bare remote."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "pyproject.toml").touch()
+        for name in ("compliance/model-a", "compliance/model-b", "exploratory/draft"):
+            path = tmp_path / "notebooks" / f"{name}.ipynb"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w") as f:
+                nbformat.write(nbformat.v4.new_notebook(), f)
+        remote = tmp_path.parent / f"{tmp_path.name}-remote.git"
+        subprocess.run(["git", "init", "-q", "--bare", str(remote)], check=True)
+        subprocess.run(["git", "init", "-q"], check=True)
+        subprocess.run(["git", "remote", "add", "origin", str(remote)], check=True)
+        subprocess.run(["git", "add", "-A"], check=True)
+        subprocess.run([*self.git, "commit", "-qm", "Add notebooks"], check=True)
+        # Annotated tags need a tagger identity
+        subprocess.run(["git", "config", "user.name", "Test"], check=True)
+        subprocess.run(["git", "config", "user.email", "test@example.com"], check=True)
+        return remote
+
+    def tags(self, cwd=None):
+        """List tags of the repository or the remote."""
+        return subprocess.run(
+            ["git", "tag", "--list"], cwd=cwd, capture_output=True, text=True, check=True
+        ).stdout.split()
+
+    def test_tag_many_and_push_once(self, runner, repo):
+        """Test that every notebook is tagged and the tags pushed in one git push."""
+        with patch("subprocess.run", wraps=subprocess.run) as mock_run:
+            result = runner.invoke(
+                cli,
+                [
+                    "notebook",
+                    "tag",
+                    "notebooks/compliance/model-a.ipynb",
+                    "notebooks/compliance/model-b.ipynb",
+                    "--identifier",
+                    "q4-audit",
+                    "--message",
+                    "Q4 audit",
+                    "--push",
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        pushes = [call for call in mock_run.call_args_list if call.args[0][:2] == ["git", "push"]]
+        assert len(pushes) == 1
+        remote_tags = self.tags(repo)
+        assert len(remote_tags) == 2
+        assert remote_tags[0].startswith("compliance/model-a-q4-audit-")
+
+    def test_tag_many_slugs_notebook_names(self, runner, tmp_path, repo):
+        """Test that notebook names are made valid tag names in bulk mode."""
+        path = tmp_path / "notebooks" / "compliance" / "Eval_v2.1.ipynb"
+        with open(path, "w") as f:
+            nbformat.write(nbformat.v4.new_notebook(), f)
+
+        result = runner.invoke(
+            cli,
+            [
+                "notebook",
+                "tag",
+                "notebooks/compliance/model-a.ipynb",
+                str(path),
+                "--identifier",
+                "audit",
+                "--message",
+                "Audit",
+            ],
+        )
+
+        assert result.exit_code == 0, result.output
+        assert [tag.rsplit("-", 3)[0] for tag in self.tags()] == [
+            "compliance/eval-v2-1-audit",
+            "compliance/model-a-audit",
+        ]
+
+    def test_manifest(self, runner, tmp_path, repo):
+        """Test tagging from a manifest with per-notebook identifiers."""
+        manifest = tmp_path / "audit.json"
+        manifest.write_text(
+            json.dumps(
+                [
+                    {"notebook": "notebooks/compliance/model-a.ipynb", "identifier": "a-v1"},
+                    {
+                        "notebook": "notebooks/compliance/model-b.ipynb",
+                        "identifier": "b-v2",
+                        "message": "Specific",
+                    },
+                ]
+            )
+        )
+
+        result = runner.invoke(
+            cli, ["notebook", "tag", "--manifest", str(manifest), "--message", "Default"]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert [tag.rsplit("-", 3)[0] for tag in self.tags()] == [
+            "compliance/a-v1",
+            "compliance/b-v2",
+        ]
+
+    def test_invalid_notebook_creates_no_tag(self, runner, repo):
+        """Test that one invalid notebook prevents every tag."""
+        result = runner.invoke(
+            cli,
+            [
+                "notebook",
+                "tag",
+                "notebooks/compliance/model-a.ipynb",
+                "notebooks/exploratory/draft.ipynb",
+                "--identifier",
+                "audit",
+                "--message",
+                "Audit",
+            ],
+        )
+
+        assert result.exit_code == 1
+        assert "Exploratory notebooks should not be tagged" in result.output
+        assert self.tags() == []
+
+    def test_invalid_tag_name_creates_no_tag(self, runner, repo):
+        """Test that tag names are validated before any tag is created."""
+        result = runner.invoke(
+            cli,
+            [
+                "notebook",
+                "tag",
+                "notebooks/compliance/model-a.ipynb",
+                "notebooks/compliance/model-b.ipynb",
+                "--identifier",
+                "Q4_audit",
+                "--message",
+                "Audit",
+            ],
+        )
+
+        assert result.exit_code == 1
+        assert "Invalid tag name" in result.output
+        assert self.tags() == []
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+class TestNotebookTagsCommand:
+    """Test notebook tags command."""
+
+    @pytest.fixture
+    def runner(self):
+        """Create CLI test runner."""
+        return CliRunner()
+
+    @pytest.fixture
+    def repo(self, tmp_path, monkeypatch):
+        """Create a repository with notebook tags created on different dates."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "notebooks").mkdir()
+        git = ["git", "-c", "user.name=Jane", "-c", "user.email=jane@example.com"]
+        subprocess.run(["git", "init", "-q"], check=True)
+        subprocess.run([*git, "commit", "-q", "--allow-empty", "-m", "Initial"], check=True)
+        for name, date in [
+            ("compliance/model-v1-audit-2024-03-01", "2024-03-01T10:00:00"),
+            ("compliance/model-v2-audit-2024-09-01", "2024-09-01T10:00:00"),
+            ("evaluations/baseline-2024-06-01", "2024-06-01T10:00:00"),
+        ]:
+            subprocess.run(
+                [*git, "tag", "-a", name, "-m", f"Tag {name}"],
+                check=True,
+                env={**os.environ, "GIT_COMMITTER_DATE": date},
+            )
+        subprocess.run(["git", "tag", "not-a-notebook-tag"], check=True)
+
+    def names(self, output):
+        """Tag names listed in the command output."""
+        return [line.split()[1] for line in output.splitlines() if line.strip().startswith("- ")]
+
+    def test_lists_metadata(self, runner, repo):
+        """Test that tags are listed with their date, tagger and message."""
+        result = runner.invoke(cli, ["notebook", "tags"])
+
+        assert result.exit_code == 0
+        assert "Total: 3 tags" in result.output
+        assert "2024-03-01 10:00" in result.output
+        assert "Jane: Tag compliance/model-v1-audit-2024-03-01" in result.output
+        assert "not-a-notebook-tag" not in result.output
+
+    def test_filters_and_sort(self, runner, repo):
+        """Test filtering by date range and identifier, and sorting by date."""
+        result = runner.invoke(
+            cli,
+            ["notebook", "tags", "--since", "2024-02-01", "--until", "2024-08-31"],
+        )
+        assert self.names(result.output) == [
+            "compliance/model-v1-audit-2024-03-01",
+            "evaluations/baseline-2024-06-01",
+        ]
+
+        result = runner.invoke(
+            cli, ["notebook", "tags", "--identifier", "audit", "--sort", "date", "--reverse"]
+        )
+        assert self.names(result.output) == [
+            "compliance/model-v2-audit-2024-09-01",
+            "compliance/model-v1-audit-2024-03-01",
+        ]
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+class TestNotebookHistoryCommand:
+    """Test notebook history command."""
+
+    git = ["git", "-c", "user.name=Jane", "-c", "user.email=jane@example.com"]
+
+    @pytest.fixture
+    def runner(self):
+        """Create CLI test runner."""
+        return CliRunner()
+
+    @pytest.fixture
+    def repo(self, tmp_path, monkeypatch):
+        """Create a repository with a tagged compliance notebook and a reporting notebook."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "pyproject.toml").touch()
+        for name in ("compliance/model", "reporting/weekly"):
+            path = tmp_path / "notebooks" / f"{name}.ipynb"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("{}\n")
+        subprocess.run(["git", "init", "-q"], check=True)
+        subprocess.run(["git", "add", "-A"], check=True)
+        subprocess.run([*self.git, "commit", "-qm", "Add notebooks"], check=True)
+        subprocess.run(
+            [*self.git, "tag", "-a", "compliance/audit-2024-03-01", "-m", "Audit"], check=True
+        )
+        (tmp_path / "notebooks" / "compliance" / "model.ipynb").write_text("{}\n{}\n")
+        subprocess.run([*self.git, "commit", "-qam", "Update model"], check=True)
+        return tmp_path
+
+    def test_history(self, runner, repo):
+        """Test the commits, line counts and tags of each notebook."""
+        result = runner.invoke(cli, ["notebook", "history"])
+
+        assert result.exit_code == 0, result.output
+        assert "notebooks/compliance/model.ipynb: 2 commits, +2 -0, 1 author" in result.output
+        assert "Jane: Update model" in result.output
+        assert "Jane: Add notebooks  [compliance/audit-2024-03-01]" in result.output
+        assert "Total: 2 notebooks" in result.output
+        assert (repo / ".ai-kit" / "history-cache.json").exists()
+
+    def test_filters_and_json(self, runner, repo):
+        """Test selecting notebooks by path or category and printing JSON."""
+        result = runner.invoke(
+            cli, ["notebook", "history", "notebooks/compliance/model.ipynb", "--json"]
+        )
+
+        assert result.exit_code == 0, result.output
+        (entry,) = json.loads(result.output)
+        assert entry["notebook"] == "notebooks/compliance/model.ipynb"
+        assert [rev["subject"] for rev in entry["revisions"]] == ["Update model", "Add notebooks"]
+
+        result = runner.invoke(cli, ["notebook", "history", "--category", "reporting"])
+        assert "notebooks/reporting/weekly.ipynb" in result.output
+        assert "compliance" not in result.output
+
+    def test_unknown_notebook(self, runner, repo):
+        """Test an error for a notebook without history."""
+        result = runner.invoke(cli, ["notebook", "history", "notebooks/compliance/new.ipynb"])
+
+        assert result.exit_code == 1
+        assert "No git history for notebook" in result.output
+
+
+class TestNotebookCommandsWithMemoryGit:
+    """Test notebook git commands against an in-memory repository."""
+
+    @pytest.fixture
+    def runner(self):
+        """Create CLI test runner."""
+        return CliRunner()
+
+    @pytest.fixture
+    def backend(self, tmp_path, monkeypatch):
+        """Create a notebook project whose git operations stay in memory."""
+        from ai_kit.cli.utils.git import MemoryGitBackend, set_git_backend
+
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "pyproject.toml").touch()
+        path = tmp_path / "notebooks" / "compliance" / "model-a.ipynb"
+        path.parent.mkdir(parents=True)
+        with open(path, "w") as f:
+            nbformat.write(nbformat.v4.new_notebook(), f)
+        backend = MemoryGitBackend(head="abc123", user_name="Jane")
+        previous = set_git_backend(backend)
+        yield backend
+        set_git_backend(previous)
+
+    def test_tag_push_and_list(self, runner, backend):
+        """Test tagging, pushing and listing without a git repository."""
+        result = runner.invoke(
+            cli,
+            [
+                "notebook",
+                "tag",
+                "notebooks/compliance/model-a.ipynb",
+                "--identifier",
+                "audit",
+                "--message",
+                "Audit",
+                "--push",
+            ],
+            input="y\n",
+        )
+
+        assert result.exit_code == 0, result.output
+        (name,) = backend.tags
+        assert name.startswith("compliance/audit-")
+        assert backend.pushed == [("origin", [name])]
+
+        result = runner.invoke(cli, ["notebook", "tags"])
+
+        assert result.exit_code == 0, result.output
+        assert "Total: 1 tags" in result.output
+        assert "Jane: Audit" in result.output
@@ -0,0 +1,311 @@
+"""Tests for notebook conversion."""
+
+import base64
+
+import nbformat
+import pytest
+
+pytest.importorskip("nbconvert")
+
+from ai_kit.cli.core.conversion import (  # noqa: E402
+    ConversionCache,
+    collect_notebooks,
+    convert_formats,
+    convert_notebook,
+    convert_notebooks,
+    default_output_path,
+    parse_formats,
+    run_conversions,
+    run_format_conversions,
+)
+from ai_kit.cli.core.html_export import make_accessible  # noqa: E402
+
+
+def write_notebook(path, text="Hello"):
+    """Write a small notebook with a markdown and a code cell."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    notebook = nbformat.v4.new_notebook(
+        cells=[nbformat.v4.new_markdown_cell(f"# {text}"), nbformat.v4.new_code_cell("x = 1")]
+    )
+    with open(path, "w") as f:
+        nbformat.write(notebook, f)
+    return path
+
+
+class TestCollectNotebooks:
+    """Test expanding paths, directories and globs."""
+
+    def test_directories_and_globs(self, tmp_path):
+        """Test that directories are searched recursively and globs expanded."""
+        a = write_notebook(tmp_path / "reporting" / "a.ipynb")
+        b = write_notebook(tmp_path / "reporting" / "sub" / "b.ipynb")
+        write_notebook(tmp_path / "reporting" / ".ipynb_checkpoints" / "a-checkpoint.ipynb")
+        c = write_notebook(tmp_path / "evaluations" / "c.ipynb")
+
+        notebooks = collect_notebooks(
+            [tmp_path / "reporting", str(tmp_path / "evaluations" / "*.ipynb"), a]
+        )
+
+        assert notebooks == [a, b, c]
+
+    def test_no_match(self, tmp_path):
+        """Test that a pattern matching nothing is reported."""
+        with pytest.raises(ValueError, match="No notebooks found"):
+            collect_notebooks([str(tmp_path / "missing" / "*.ipynb")])
+
+
+class TestConvertNotebooks:
+    """Test converting one or many notebooks."""
+
+    def test_default_output_path(self, tmp_path):
+        """Test output paths next to the notebook and under an output directory."""
+        path = tmp_path / "reporting" / "sub" / "a.ipynb"
+
+        assert default_output_path(path, "markdown") == path.with_suffix(".md")
+        assert default_output_path(path, "slides", tmp_path / "site", tmp_path) == (
+            tmp_path / "site" / "reporting" / "sub" / "a.slides.html"
+        )
+
+    def test_convert_reports_errors(self, tmp_path):
+        """Test that a failed conversion is reported in the result."""
+        path = tmp_path / "broken.ipynb"
+        path.write_text("not json")
+
+        result = convert_notebook(path, "html", tmp_path / "broken.html")
+
+        assert not result.ok
+        assert not (tmp_path / "broken.html").exists()
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_convert_many(self, tmp_path, jobs):
+        """Test that results keep the input order and outputs keep folders apart."""
+        inputs = [
+            write_notebook(tmp_path / "reporting" / "report.ipynb", "Reporting"),
+            write_notebook(tmp_path / "evaluations" / "report.ipynb", "Evaluation"),
+        ]
+        completed = []
+
+        results = convert_notebooks(
+            inputs, "markdown", tmp_path / "site", jobs=jobs, on_complete=completed.append
+        )
+
+        assert [result.input_path for result in results] == inputs
+        assert len(completed) == 2
+        assert all(result.ok and result.size > 0 for result in results)
+        assert "# Reporting" in (tmp_path / "site" / "reporting" / "report.md").read_text()
+        assert "# Evaluation" in (tmp_path / "site" / "evaluations" / "report.md").read_text()
+
+
+class TestSeveralFormats:
+    """Test converting a notebook to several formats from one parse."""
+
+    def test_parse_formats(self):
+        """Test comma-separated formats, duplicates and unknown formats."""
+        assert parse_formats("html, markdown,script,html") == ["html", "markdown", "script"]
+        with pytest.raises(ValueError, match="Unknown format"):
+            parse_formats("html,docx")
+        with pytest.raises(ValueError, match="No output format"):
+            parse_formats(" , ")
+
+    def test_read_once(self, tmp_path, monkeypatch):
+        """Test that the notebook is read once and exported to every format."""
+        from ai_kit.cli.core import conversion
+
+        notebook = write_notebook(tmp_path / "report.ipynb", "Report")
+        reads = []
+        read = nbformat.read
+        monkeypatch.setattr(
+            conversion.nbformat, "read", lambda *a, **kw: reads.append(1) or read(*a, **kw)
+        )
+        outputs = {
+            format: default_output_path(notebook, format)
+            for format in ("html", "markdown", "script")
+        }
+
+        results = convert_formats(notebook, outputs)
+
+        assert len(reads) == 1
+        assert [result.format for result in results] == ["html", "markdown", "script"]
+        assert all(result.ok for result in results)
+        assert "x = 1" in (tmp_path / "report.py").read_text()
+        assert "# Report" in (tmp_path / "report.md").read_text()
+        assert (tmp_path / "report.html").stat().st_size > 0
+
+    def test_shared_preprocessors_once(self, tmp_path, monkeypatch):
+        """Test that the preprocessors every exporter runs are applied once."""
+        from nbconvert.preprocessors import TagRemovePreprocessor
+
+        notebook = write_notebook(tmp_path / "report.ipynb")
+        calls = []
+        preprocess = TagRemovePreprocessor.preprocess
+        monkeypatch.setattr(
+            TagRemovePreprocessor,
+            "preprocess",
+            lambda self, nb, resources: calls.append(1) or preprocess(self, nb, resources),
+        )
+
+        results = convert_formats(
+            notebook,
+            {
+                "html": tmp_path / "report.html",
+                "markdown": tmp_path / "report.md",
+                "script": tmp_path / "report.py",
+            },
+        )
+
+        assert all(result.ok for result in results)
+        assert len(calls) == 1
+
+    def test_cache_per_format(self, tmp_path):
+        """Test that only formats whose output is stale are converted again."""
+        notebook = write_notebook(tmp_path / "report.ipynb")
+        cache = ConversionCache(tmp_path / "cache")
+        outputs = {"markdown": tmp_path / "report.md", "script": tmp_path / "report.py"}
+        run_format_conversions([(notebook, outputs)], cache=cache)
+        (tmp_path / "report.py").unlink()
+
+        results = run_format_conversions(
+            [(notebook, outputs)], cache=ConversionCache(cache.cache_dir)
+        )
+
+        assert [result.status for result in results] == ["unchanged", "cached"]
+
+
+class TestConversionCache:
+    """Test incremental conversion with the manifest and cache."""
+
+    def convert(self, tmp_path, notebook, **kwargs):
+        """Convert a notebook to markdown with a cache under tmp_path."""
+        cache = ConversionCache(tmp_path / "cache", **kwargs)
+        [result] = run_conversions(
+            [(notebook, notebook.with_suffix(".md"))], "markdown", cache=cache
+        )
+        return result
+
+    def test_unchanged_then_stale(self, tmp_path):
+        """Test that reruns skip unchanged notebooks and rebuild edited ones."""
+        notebook = write_notebook(tmp_path / "report.ipynb")
+
+        assert self.convert(tmp_path, notebook).status == "converted"
+        assert self.convert(tmp_path, notebook).status == "unchanged"
+
+        write_notebook(notebook, "Edited")
+        assert self.convert(tmp_path, notebook).status == "converted"
+        assert "# Edited" in notebook.with_suffix(".md").read_text()
+
+    def test_restored_from_cache(self, tmp_path):
+        """Test that a deleted or reverted output is copied from the cache."""
+        notebook = write_notebook(tmp_path / "report.ipynb")
+        self.convert(tmp_path, notebook)
+        notebook.with_suffix(".md").unlink()
+
+        result = self.convert(tmp_path, notebook)
+
+        assert result.status == "cached"
+        assert "# Hello" in notebook.with_suffix(".md").read_text()
+
+    def test_key_depends_on_options(self, tmp_path):
+        """Test that format and options are part of the key."""
+        notebook = write_notebook(tmp_path / "report.ipynb")
+        cache = ConversionCache(tmp_path / "cache")
+
+        keys = {
+            cache.key(notebook, "markdown"),
+            cache.key(notebook, "html"),
+            cache.key(notebook, "html", {"embed_images": False}),
+        }
+
+        assert len(keys) == 3
+
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used artifacts are evicted first."""
+        old = write_notebook(tmp_path / "old.ipynb", "Old")
+        new = write_notebook(tmp_path / "new.ipynb", "New")
+        self.convert(tmp_path, old)
+        self.convert(tmp_path, new)
+        entries = ConversionCache(tmp_path / "cache").entries
+        max_size = max(entry["size"] for entry in entries.values())
+
+        cache = ConversionCache(tmp_path / "cache", max_size=max_size)
+        evicted = cache.evict()
+        cache.save()
+
+        remaining = ConversionCache(tmp_path / "cache").entries
+        assert len(evicted) == 1
+        assert [entry["input"] for entry in remaining.values()] == [str(new)]
+
+
+def write_plot_notebook(path, *images):
+    """Write a notebook whose code cell displays PNG images."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    outputs = [
+        nbformat.v4.new_output("display_data", data={"image/png": base64.b64encode(image).decode()})
+        for image in images
+    ]
+    notebook = nbformat.v4.new_notebook(
+        cells=[nbformat.v4.new_code_cell("plot()", outputs=outputs)]
+    )
+    with open(path, "w") as f:
+        nbformat.write(notebook, f)
+    return path
+
+
+class TestExtractImages:
+    """Test writing HTML images to content-addressed files."""
+
+    def test_make_accessible_across_chunks(self):
+        """Test that tags split across chunks still get alt text and tabindex."""
+        chunks = ['<div class="jp-OutputArea-output">', "<im", 'g src="a.png">', "</div>"]
+
+        html = "".join(make_accessible(chunks))
+
+        assert 'class="jp-OutputArea-output" tabindex="0"' in html
+        assert '<img alt="No description has been provided for this image" src="a.png">' in html
+
+    def test_images_deduplicated_across_notebooks(self, tmp_path):
+        """Test that a shared image is written once and linked from each page."""
+        shared, own = b"shared-image", b"own-image"
+        inputs = [
+            write_plot_notebook(tmp_path / "reporting" / "a.ipynb", shared, own),
+            write_plot_notebook(tmp_path / "evaluations" / "b.ipynb", shared),
+        ]
+        images_dir = tmp_path / "site" / "images"
+
+        results = convert_notebooks(
+            inputs, "html", tmp_path / "site", jobs=1, images_dir=images_dir
+        )
+
+        assert sorted(path.read_bytes() for path in images_dir.iterdir()) == [own, shared]
+        html = results[1].output_path.read_text()
+        assert base64.b64encode(shared).decode() not in html
+        assert f'src="../images/{results[1].assets[0].name}"' in html
+
+    def test_cache_restores_images(self, tmp_path):
+        """Test that restoring a page from the cache restores its images."""
+        notebook = write_plot_notebook(tmp_path / "a.ipynb", b"image")
+        output_path = tmp_path / "site" / "a.html"
+        images_dir = tmp_path / "site" / "images"
+
+        def convert():
+            cache = ConversionCache(tmp_path / "cache")
+            [result] = run_conversions(
+                [(notebook, output_path)], "html", cache=cache, images_dir=images_dir
+            )
+            return result
+
+        convert()
+        for path in images_dir.iterdir():
+            path.unlink()
+        output_path.unlink()
+
+        assert convert().status == "cached"
+        assert [path.read_bytes() for path in images_dir.iterdir()] == [b"image"]
+
+    def test_images_require_html(self, tmp_path):
+        """Test that extracting images is rejected for other formats."""
+        notebook = write_plot_notebook(tmp_path / "a.ipynb", b"image")
+
+        with pytest.raises(ValueError, match="HTML"):
+            run_conversions(
+                [(notebook, tmp_path / "a.md")], "markdown", images_dir=tmp_path / "images"
+            )
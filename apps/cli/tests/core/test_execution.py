@@ -0,0 +1,334 @@
+"""Tests for notebook execution."""
+
+import io
+import json
+
+import nbformat
+import pytest
+
+pytest.importorskip("papermill")
+pytest.importorskip("ipykernel")
+
+from ai_kit.cli.core.execution import (  # noqa: E402
+    EventEmitter,
+    ExecutionEvent,
+    JsonlEventWriter,
+    OutputBudget,
+    ResourceLimitError,
+    ResourceLimits,
+    format_size,
+    parse_parameters,
+    parse_size,
+    parse_variants,
+    run_fan_out,
+    run_notebook,
+    split_fan_out,
+    split_text,
+    variant_slug,
+)
+
+
+def write_notebook(path, *sources, parameters="x = 1"):
+    """Write a notebook with a parameters cell followed by code cells."""
+    cells = [
+        nbformat.v4.new_markdown_cell("# Test"),
+        nbformat.v4.new_code_cell(parameters, metadata={"tags": ["parameters"]}),
+    ]
+    cells.extend(nbformat.v4.new_code_cell(source) for source in sources)
+    notebook = nbformat.v4.new_notebook(cells=cells)
+    notebook.metadata.kernelspec = {
+        "name": "python3",
+        "display_name": "Python 3",
+        "language": "python",
+    }
+    with open(path, "w") as f:
+        nbformat.write(notebook, f)
+    return path
+
+
+class TestParseParameters:
+    """Test key=value parameter parsing."""
+
+    def test_parse_types(self):
+        """Test that booleans and numbers are converted."""
+        params = parse_parameters(["a=true", "b=False", "c=3", "d=0.5", "e=2024-01-01"])
+
+        assert params == {"a": True, "b": False, "c": 3, "d": 0.5, "e": "2024-01-01"}
+
+    def test_parse_invalid(self):
+        """Test that parameters without '=' are rejected."""
+        with pytest.raises(ValueError, match="Invalid parameter format"):
+            parse_parameters(["oops"])
+
+
+class TestSizes:
+    """Test byte size parsing and formatting."""
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [("1024", 1024), ("512K", 512 * 1024), ("1.5M", 1572864), ("2g", 2 * 1024**3)],
+    )
+    def test_parse_size(self, value, expected):
+        """Test sizes with and without unit suffixes."""
+        assert parse_size(value) == expected
+
+    def test_parse_size_invalid(self):
+        """Test that unknown units are rejected."""
+        with pytest.raises(ValueError, match="Invalid size"):
+            parse_size("12 parsecs")
+
+    def test_format_size(self):
+        """Test human-readable sizes."""
+        assert format_size(None) == "n/a"
+        assert format_size(512) == "512 B"
+        assert format_size(3 * 1024 * 1024) == "3.0 MB"
+
+
+class TestExecutionEvents:
+    """Test execution event helpers."""
+
+    def test_event_to_dict_is_flat(self):
+        """Test that event data is merged into the top level."""
+        event = ExecutionEvent("stream", 1.23456, 2, {"name": "stdout", "text": "hi\n"})
+
+        data = event.to_dict()
+
+        assert data["event"] == "stream"
+        assert data["elapsed"] == 1.235
+        assert data["cell"] == 2
+        assert data["name"] == "stdout"
+
+    def test_jsonl_writer(self):
+        """Test that events are written one JSON object per line."""
+        stream = io.StringIO()
+        emitter = EventEmitter([JsonlEventWriter(stream)])
+
+        emitter.emit("cell_start", 0, source="x = 1")
+        emitter.emit("cell_complete", 0, status="ok")
+
+        lines = stream.getvalue().splitlines()
+        assert [json.loads(line)["event"] for line in lines] == ["cell_start", "cell_complete"]
+
+
+class TestRunNotebook:
+    """Test executing notebooks with live events."""
+
+    def test_run_streams_events(self, tmp_path):
+        """Test that cell progress and output are reported in order."""
+        input_path = write_notebook(tmp_path / "in.ipynb", "print('hello', x)")
+        events = []
+
+        run_notebook(input_path, tmp_path / "out.ipynb", {"x": 5}, event_handlers=[events.append])
+
+        types = [event.type for event in events]
+        assert types[0] == "notebook_start"
+        assert types[-1] == "notebook_complete"
+        assert events[-1].data["status"] == "completed"
+        streams = [event for event in events if event.type == "stream"]
+        assert streams[0].data == {"name": "stdout", "text": "hello 5\n"}
+        assert types.count("cell_start") == types.count("cell_complete") == 3
+
+    def test_run_failure_reports_error(self, tmp_path):
+        """Test that a failing cell is reported and the partial notebook is saved."""
+        input_path = write_notebook(tmp_path / "in.ipynb", "print('before')", "1 / 0")
+        output_path = tmp_path / "out.ipynb"
+        events = []
+
+        with pytest.raises(Exception, match="ZeroDivisionError"):
+            run_notebook(input_path, output_path, event_handlers=[events.append])
+
+        failed = [e for e in events if e.type == "cell_complete" and e.data["status"] == "error"]
+        assert failed[0].data["ename"] == "ZeroDivisionError"
+        assert events[-1].data["status"] == "failed"
+
+        executed = nbformat.read(output_path, as_version=4)
+        assert executed.cells[3].outputs[0].text == "before\n"
+
+
+class TestResourceLimits:
+    """Test resource limits and accounting."""
+
+    def test_usage_recorded_in_metadata(self, tmp_path):
+        """Test that peak RSS, CPU time and output bytes are recorded."""
+        input_path = write_notebook(tmp_path / "in.ipynb", "print('x' * 100)")
+        output_path = tmp_path / "out.ipynb"
+
+        run_notebook(input_path, output_path)
+
+        resources = nbformat.read(output_path, as_version=4).metadata.ai_kit.resources
+        assert resources["output_bytes"] > 100
+        assert resources["limit_exceeded"] is None
+        if resources["peak_rss"] is not None:
+            assert resources["peak_rss"] > 0
+            assert resources["cpu_seconds"] >= 0
+
+    def test_timeout_kills_kernel(self, tmp_path):
+        """Test that the watchdog stops a run exceeding its timeout."""
+        input_path = write_notebook(tmp_path / "in.ipynb", "import time\ntime.sleep(30)")
+        output_path = tmp_path / "out.ipynb"
+        events = []
+
+        with pytest.raises(ResourceLimitError, match="timeout"):
+            run_notebook(
+                input_path,
+                output_path,
+                event_handlers=[events.append],
+                limits=ResourceLimits(timeout=1),
+            )
+
+        assert events[-1].data["resources"]["limit_exceeded"].startswith("Notebook exceeded")
+        metadata = nbformat.read(output_path, as_version=4).metadata.ai_kit
+        assert metadata.limits.timeout == 1
+
+    def test_max_output_bytes(self, tmp_path):
+        """Test that runaway output stops the run."""
+        input_path = write_notebook(
+            tmp_path / "in.ipynb", "import time\nwhile True:\n    print('x' * 1000)"
+        )
+
+        with pytest.raises(ResourceLimitError, match="max output bytes"):
+            run_notebook(
+                input_path,
+                tmp_path / "out.ipynb",
+                limits=ResourceLimits(max_output_bytes=100_000),
+            )
+
+
+class TestOutputBudget:
+    """Test truncation of outputs beyond their budgets."""
+
+    def test_allowance(self):
+        """Test that the tightest budget applies."""
+        budget = OutputBudget(cell_bytes=100, notebook_bytes=1000)
+
+        assert budget.allowance(30, 500) == 70
+        assert budget.allowance(0, 950) == 50
+        assert budget.allowance(200, 0) == 0
+        assert OutputBudget().allowance(10**9, 10**9) is None
+
+    def test_split_text_at_line_end(self):
+        """Test that text is split on a line boundary when possible."""
+        assert split_text("aaa\nbbb\nccc\n", 9) == ("aaa\nbbb\n", "ccc\n")
+        assert split_text("abcdef", 4) == ("abcd", "ef")
+        assert split_text("é" * 3, 3) == ("é", "éé")
+
+    def test_noisy_cell_is_truncated(self, tmp_path):
+        """Test that a noisy cell keeps its budget and later cells still have output."""
+        input_path = write_notebook(
+            tmp_path / "in.ipynb",
+            "for i in range(5000):\n    print('line', i)",
+            "print('after')",
+        )
+        output_path = tmp_path / "out.ipynb"
+
+        run_notebook(input_path, output_path, budget=OutputBudget(cell_bytes=1000))
+
+        executed = nbformat.read(output_path, as_version=4)
+        noisy, after = executed.cells[2], executed.cells[3]
+        kept = "".join(o.text for o in noisy.outputs if o.name == "stdout")
+        assert kept.startswith("line 0\n") and len(kept) <= 1000
+        assert noisy.outputs[-1].text.startswith("[ai-kit] Output truncated")
+        assert after.outputs[0].text == "after\n"
+        assert executed.metadata.ai_kit.truncated_cells == [2]
+        assert executed.metadata.ai_kit.resources.truncated_bytes > 0
+
+    def test_overflow_spilled_to_sidecar(self, tmp_path):
+        """Test that truncated output is written to the spill file."""
+        input_path = write_notebook(
+            tmp_path / "in.ipynb", "for i in range(2000):\n    print('line', i)"
+        )
+        spill_path = tmp_path / "out.overflow.jsonl"
+
+        run_notebook(
+            input_path,
+            tmp_path / "out.ipynb",
+            budget=OutputBudget(notebook_bytes=500, spill_path=spill_path),
+        )
+
+        executed = nbformat.read(tmp_path / "out.ipynb", as_version=4)
+        kept = "".join(o.text for o in executed.cells[2].outputs if o.name == "stdout")
+        records = [json.loads(line) for line in spill_path.read_text().splitlines()]
+        spilled = "".join(record["text"] for record in records)
+        assert kept + spilled == "".join(f"line {i}\n" for i in range(2000))
+
+
+class TestFanOut:
+    """Test running shared cells once for many variants."""
+
+    @pytest.fixture
+    def report(self, tmp_path):
+        """Write a report whose shared cell records how often it ran."""
+        path = write_notebook(
+            tmp_path / "report.ipynb",
+            "department = 'all'",
+            "print(department, token, loads, rows)\nrows.append(department)",
+            parameters="department = 'all'",
+        )
+        notebook = nbformat.read(path, as_version=4)
+        notebook.cells[2] = nbformat.v4.new_code_cell(
+            "import uuid\nloads = globals().get('loads', 0) + 1\n"
+            "token = uuid.uuid4().hex\nrows = []",
+            metadata={"tags": ["fan-out"]},
+        )
+        nbformat.write(notebook, path)
+        return path
+
+    def test_split_requires_marker(self):
+        """Test that a notebook without the marker tag is rejected."""
+        notebook = nbformat.v4.new_notebook(cells=[nbformat.v4.new_code_cell("x = 1")])
+
+        with pytest.raises(ValueError, match="fan-out"):
+            split_fan_out(notebook)
+
+    def test_parse_variants(self):
+        """Test that several --vary specs expand to their combinations."""
+        variants = parse_variants(["dept=75,69", "year=2024"])
+
+        assert variants == [{"dept": 75, "year": 2024}, {"dept": 69, "year": 2024}]
+
+    def test_variant_slug(self):
+        """Test that slugs are safe file names."""
+        assert variant_slug({"dept": "Île de France", "year": 2024}) == "île-de-france-2024"
+
+    def test_shared_cells_run_once(self, tmp_path, report):
+        """Test that variants share one run of the shared cells but not its mutations."""
+        results = run_fan_out(
+            report,
+            tmp_path / "out",
+            [{"department": "paris"}, {"department": "lyon"}],
+        )
+
+        assert [result.status for result in results] == ["completed", "completed"]
+        texts = [
+            nbformat.read(result.output_path, as_version=4).cells[-1].outputs[0].text.split()
+            for result in results
+        ]
+        assert texts[0][0] == "paris" and texts[1][0] == "lyon"
+        # Same shared token, loaded once, and a fresh copy of rows for each variant
+        assert texts[0][1:] == texts[1][1:]
+        assert texts[0][2:] == ["1", "[]"]
+
+        executed = nbformat.read(tmp_path / "out" / "report-lyon.ipynb", as_version=4)
+        assert executed.metadata.ai_kit.fan_out.variant == {"department": "lyon"}
+        assert executed.metadata.papermill.parameters == {"department": "lyon"}
+
+    def test_private_globals_are_restored(self, tmp_path):
+        """Test that globals starting with an underscore do not leak between variants."""
+        path = write_notebook(
+            tmp_path / "report.ipynb",
+            "department = 'all'",
+            "print(department, _shared, globals().get('_cache'))\n_cache = department",
+            parameters="department = 'all'",
+        )
+        notebook = nbformat.read(path, as_version=4)
+        notebook.cells[2] = nbformat.v4.new_code_cell(
+            "_shared = 'loaded'", metadata={"tags": ["fan-out"]}
+        )
+        nbformat.write(notebook, path)
+
+        results = run_fan_out(path, tmp_path / "out", [{"department": d} for d in ("a", "b")])
+
+        assert [
+            nbformat.read(result.output_path, as_version=4).cells[-1].outputs[0].text.split()
+            for result in results
+        ] == [["a", "loaded", "None"], ["b", "loaded", "None"]]
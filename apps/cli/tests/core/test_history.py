@@ -0,0 +1,190 @@
+"""Tests for the notebook audit history."""
+
+import shutil
+import subprocess
+from datetime import UTC, datetime
+from unittest.mock import patch
+
+import pytest
+
+from ai_kit.cli.core.history import build_notebook_history
+from ai_kit.cli.utils.git import (
+    FileChange,
+    GitCommit,
+    MemoryGitBackend,
+    list_git_tag_details,
+    set_git_backend,
+)
+
+GIT = ["git", "-c", "user.name=Jane", "-c", "user.email=jane@example.com"]
+
+
+def git(repo, *args):
+    """Run a git command in the repository and return its output."""
+    return subprocess.run(
+        [*GIT, *args], cwd=repo, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def commit(repo, message, files=None, remove=None):
+    """Write and remove notebooks, then commit."""
+    for name, content in (files or {}).items():
+        path = repo / "notebooks" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    for name in remove or []:
+        git(repo, "rm", "-q", f"notebooks/{name}")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-qm", message)
+    return git(repo, "rev-parse", "HEAD")
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+class TestBuildNotebookHistory:
+    """Test building the history of every notebook from the git log."""
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        """Create a repository where notebooks are added, changed, renamed and deleted."""
+        git(tmp_path, "init", "-q", "-b", "main")
+        first = commit(
+            tmp_path,
+            "Add notebooks",
+            {"compliance/model.ipynb": "a\nb\n", "evaluations/other.ipynb": "x\n"},
+        )
+        git(tmp_path, "tag", "-a", "compliance/v1-2024-01-01", "-m", "v1")
+        second = commit(tmp_path, "Update model", {"compliance/model.ipynb": "a\nb\nc\n"})
+        git(tmp_path, "mv", "notebooks/compliance/model.ipynb", "notebooks/compliance/v2.ipynb")
+        third = commit(tmp_path, "Rename model")
+        fourth = commit(tmp_path, "Drop other", remove=["evaluations/other.ipynb"])
+        commit(tmp_path, "Unrelated", {"README.md": "x"})
+        git(tmp_path, "tag", "-a", "compliance/v2-2024-02-01", "-m", "v2")
+        return tmp_path, [first, second, third, fourth]
+
+    def history(self, repo, **kwargs):
+        """Build the history with the repository's notebook tags."""
+        tags = list_git_tag_details(cwd=repo)
+        return build_notebook_history(repo / "notebooks", tags=tags, **kwargs)
+
+    def test_revisions(self, repo):
+        """Test authors, statuses, line counts and renames."""
+        path, (first, second, third, fourth) = repo
+
+        history = self.history(path)
+
+        assert list(history) == ["compliance/v2.ipynb", "evaluations/other.ipynb"]
+        model = history["compliance/v2.ipynb"]
+        assert [rev.commit for rev in model] == [third, second, first]
+        assert [rev.status for rev in model] == ["R", "M", "A"]
+        assert [rev.path for rev in model] == [
+            "compliance/v2.ipynb",
+            "compliance/model.ipynb",
+            "compliance/model.ipynb",
+        ]
+        assert [(rev.insertions, rev.deletions) for rev in model] == [(0, 0), (1, 0), (2, 0)]
+        assert model[0].author == "Jane"
+        other = history["evaluations/other.ipynb"]
+        assert [(rev.commit, rev.status) for rev in other] == [(fourth, "D"), (first, "A")]
+
+    def test_tags(self, repo):
+        """Test that each tag is reported on the revision it captured."""
+        path, _ = repo
+
+        history = self.history(path)
+
+        model = history["compliance/v2.ipynb"]
+        assert [rev.tags for rev in model] == [
+            ["compliance/v2-2024-02-01"],
+            [],
+            ["compliance/v1-2024-01-01"],
+        ]
+        # Tags of another category are not reported
+        assert all(not rev.tags for rev in history["evaluations/other.ipynb"])
+
+    def test_incremental_cache(self, repo, tmp_path):
+        """Test that later runs only read the commits made since the last one."""
+        path, _ = repo
+        cache_path = tmp_path / "history.json"
+        self.history(path, cache_path=cache_path)
+        head = git(path, "rev-parse", "HEAD")
+        new = commit(path, "Update again", {"compliance/v2.ipynb": "a\n"})
+
+        with patch("subprocess.Popen", wraps=subprocess.Popen) as mock_popen:
+            history = self.history(path, cache_path=cache_path)
+
+        (log,) = [c.args[0] for c in mock_popen.call_args_list if "log" in c.args[0]]
+        assert f"^{head}" in log
+        assert history["compliance/v2.ipynb"][0].commit == new
+        assert history == self.history(path)
+
+        with patch("subprocess.Popen", wraps=subprocess.Popen) as mock_popen:
+            assert self.history(path, cache_path=cache_path) == history
+        assert all("log" not in c.args[0] for c in mock_popen.call_args_list)
+
+    def test_rewritten_history(self, repo, tmp_path):
+        """Test that commits dropped by a reset are removed from the history."""
+        path, (_, _, third, _) = repo
+        cache_path = tmp_path / "history.json"
+        self.history(path, cache_path=cache_path)
+
+        git(path, "reset", "-q", "--hard", third)
+        history = self.history(path, cache_path=cache_path)
+
+        assert history["evaluations/other.ipynb"][0].status == "A"
+        assert history == self.history(path)
+
+    def test_follows_merges(self, tmp_path):
+        """Test that changes made on a merged branch are in the history."""
+        git(tmp_path, "init", "-q", "-b", "main")
+        commit(tmp_path, "Add", {"compliance/model.ipynb": "a\n"})
+        git(tmp_path, "checkout", "-qb", "side")
+        side = commit(tmp_path, "Side change", {"compliance/model.ipynb": "b\n"})
+        git(tmp_path, "checkout", "-q", "main")
+        commit(tmp_path, "Main change", {"README.md": "x"})
+        git(tmp_path, "merge", "-q", "--no-edit", "side")
+
+        history = build_notebook_history(tmp_path / "notebooks")
+
+        assert [rev.commit for rev in history["compliance/model.ipynb"]][0] == side
+
+
+class TestBuildNotebookHistoryInMemory:
+    """Test the history built from an in-memory repository."""
+
+    @pytest.fixture
+    def backend(self):
+        """Install an in-memory repository with two commits."""
+        date = datetime(2024, 1, 1, tzinfo=UTC)
+        commits = [
+            GitCommit(
+                "b" * 40,
+                ["a" * 40],
+                "Bob",
+                "bob@example.com",
+                date,
+                "Update",
+                [FileChange("M", "compliance/model.ipynb", None, 3, 1)],
+            ),
+            GitCommit(
+                "a" * 40,
+                [],
+                "Ann",
+                "ann@example.com",
+                date,
+                "Add",
+                [FileChange("A", "compliance/model.ipynb", None, 5, 0)],
+            ),
+        ]
+        previous = set_git_backend(MemoryGitBackend(head="b" * 40, commits=commits))
+        yield
+        set_git_backend(previous)
+
+    def test_history(self, backend, tmp_path):
+        """Test that revisions come from the backend's log."""
+        history = build_notebook_history(tmp_path)
+
+        revisions = history["compliance/model.ipynb"]
+        assert [(rev.author, rev.insertions, rev.deletions) for rev in revisions] == [
+            ("Bob", 3, 1),
+            ("Ann", 5, 0),
+        ]
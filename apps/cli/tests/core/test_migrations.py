@@ -0,0 +1,140 @@
+"""Tests for the migration registry."""
+
+import json
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from ai_kit.cli.commands.notebook import _migration_record
+from ai_kit.cli.core.migrations import (
+    MigrationRecord,
+    MigrationRegistry,
+    load_markdown_records,
+    parse_migration_record,
+)
+
+
+def record(source, destination, category="exploratory", day="2024-10-15"):
+    """Build a migration record."""
+    return MigrationRecord(
+        source=source,
+        category=category,
+        destination=destination,
+        rationale="Validated",
+        date=day,
+        notebook_commit="a" * 40,
+        migration_commit="b" * 40,
+        record=f"docs/migrations/{day}-{Path(source).stem}.md",
+    )
+
+
+class TestMigrationRegistry:
+    """Test storing and querying migration records."""
+
+    @pytest.fixture
+    def registry(self, tmp_path):
+        """Create a registry with records to two packages."""
+        registry = MigrationRegistry(tmp_path / "registry.jsonl")
+        registry.append(
+            [
+                record("notebooks/exploratory/a.ipynb", "packages/feature"),
+                record("notebooks/exploratory/b.ipynb", "packages/feature/sub", day="2024-11-02"),
+                record(
+                    "notebooks/evaluations/c.ipynb", "apps/api", "evaluations", day="2024-12-01"
+                ),
+            ]
+        )
+        return MigrationRegistry(registry.path)
+
+    def test_loaded_lazily(self, registry, tmp_path):
+        """Test that the file is only read on the first query."""
+        registry.path.write_text("")
+        assert registry.records == []
+
+        missing = MigrationRegistry(tmp_path / "missing.jsonl")
+        assert missing.records == []
+        assert not missing.path.exists()
+
+    def test_by_source(self, registry):
+        """Test looking records up by notebook path."""
+        (found,) = registry.by_source("notebooks/exploratory/b.ipynb")
+
+        assert found.destination == "packages/feature/sub"
+        assert registry.by_source("./notebooks/exploratory/a.ipynb")[0].source.endswith("a.ipynb")
+        assert registry.by_source("notebooks/missing.ipynb") == []
+
+    def test_query(self, registry):
+        """Test filtering by destination, category and date."""
+
+        def sources(**filters):
+            return [Path(r.source).stem for r in registry.query(**filters)]
+
+        assert sources(destination="packages/feature") == ["a", "b"]
+        assert sources(destination="packages/feature/sub/") == ["b"]
+        assert sources(destination="packages/feat") == []
+        assert sources(category="evaluations") == ["c"]
+        assert sources(since=date(2024, 11, 1), until=date(2024, 11, 30)) == ["b"]
+        assert sources(sources=["notebooks/exploratory/a.ipynb"], category="exploratory") == ["a"]
+
+    def test_append_after_load(self, registry):
+        """Test that appended records are indexed without reloading."""
+        assert len(registry.records) == 3
+
+        registry.append([record("notebooks/exploratory/d.ipynb", "packages/other")])
+
+        assert [r.source for r in registry.query(destination="packages/other")] == [
+            "notebooks/exploratory/d.ipynb"
+        ]
+        assert len(MigrationRegistry(registry.path).records) == 4
+
+    def test_write_replaces_rewritten_records(self, registry):
+        """Test that writing a record again replaces its entry instead of adding one."""
+        registry.write([record("notebooks/exploratory/a.ipynb", "packages/other")])
+        registry.write([record("notebooks/exploratory/d.ipynb", "packages/other")])
+
+        reloaded = MigrationRegistry(registry.path)
+        assert [r.source for r in reloaded.query(destination="packages/other")] == [
+            "notebooks/exploratory/a.ipynb",
+            "notebooks/exploratory/d.ipynb",
+        ]
+        assert len(reloaded.records) == 4
+        assert reloaded.by_record("docs/migrations/2024-10-15-d.md").source.endswith("d.ipynb")
+
+    def test_invalid_line(self, tmp_path):
+        """Test the error on a corrupt registry."""
+        path = tmp_path / "registry.jsonl"
+        path.write_text(json.dumps({"source": "x"}) + "\n")
+
+        with pytest.raises(ValueError, match="registry.jsonl:1"):
+            MigrationRegistry(path).by_source("x")
+
+
+class TestMarkdownRecords:
+    """Test reading back Markdown migration records."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that every field of a written record is parsed back."""
+        text = _migration_record(
+            Path("notebooks/exploratory/a.ipynb"),
+            "exploratory",
+            "packages/feature",
+            "Validated approach,\nready for production",
+            "c" * 40,
+            "d" * 40,
+            "2024-10-15",
+            True,
+        )
+        path = tmp_path / "2024-10-15-a.md"
+        path.write_text(text)
+        (tmp_path / "README.md").write_text("# Migrations\n")
+
+        parsed = parse_migration_record(text, path)
+        (loaded,) = load_markdown_records(tmp_path)
+
+        assert parsed == loaded
+        assert parsed.source == "notebooks/exploratory/a.ipynb"
+        assert parsed.destination == "packages/feature"
+        assert parsed.rationale == "Validated approach,\nready for production"
+        assert (parsed.notebook_commit, parsed.migration_commit) == ("c" * 40, "d" * 40)
+        assert parsed.deleted
@@ -0,0 +1,240 @@
+"""Tests for the reporting notebook scheduler."""
+
+import json
+import threading
+import time
+from datetime import datetime
+
+import nbformat
+import pytest
+
+from ai_kit.cli.core.scheduler import CronSchedule, Scheduler, due_times
+
+
+def write_report(path, schedule):
+    """Write a reporting notebook with a schedule in its metadata cell."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    notebook = nbformat.v4.new_notebook(
+        cells=[
+            nbformat.v4.new_markdown_cell(
+                f"# Report\n\n**Category**: reporting\n**Schedule**: {schedule}\n"
+            ),
+            nbformat.v4.new_code_cell("x = 1"),
+        ]
+    )
+    with open(path, "w") as f:
+        nbformat.write(notebook, f)
+    return path
+
+
+class TestCronSchedule:
+    """Test cron expression parsing and evaluation."""
+
+    def test_parse_fields(self):
+        """Test lists, ranges, steps and names."""
+        schedule = CronSchedule("*/15 8-10 1,15 jan-mar mon-fri")
+
+        assert schedule.minutes == {0, 15, 30, 45}
+        assert schedule.hours == {8, 9, 10}
+        assert schedule.days == {1, 15}
+        assert schedule.months == {1, 2, 3}
+        assert schedule.weekdays == {1, 2, 3, 4, 5}
+
+    @pytest.mark.parametrize("expression", ["@daily", "daily", "`0 0 * * *`"])
+    def test_aliases(self, expression):
+        """Test aliases and backtick-quoted expressions."""
+        schedule = CronSchedule(expression)
+
+        assert schedule.next_after(datetime(2024, 1, 1, 12, 0)) == datetime(2024, 1, 2, 0, 0)
+
+    @pytest.mark.parametrize("expression", ["", "weekly-ish", "61 * * * *", "* * * *"])
+    def test_invalid_expressions(self, expression):
+        """Test that invalid expressions are rejected."""
+        with pytest.raises(ValueError):
+            CronSchedule(expression)
+
+    def test_next_after_weekly(self):
+        """Test the next Monday 08:00 from a Wednesday."""
+        schedule = CronSchedule("0 8 * * 1")
+
+        assert schedule.next_after(datetime(2024, 10, 16, 9, 30)) == datetime(2024, 10, 21, 8, 0)
+
+    def test_sunday_as_seven(self):
+        """Test that 7 means Sunday."""
+        assert CronSchedule("0 0 * * 7").matches(datetime(2024, 10, 20, 0, 0))
+
+    def test_day_or_weekday(self):
+        """Test that restricted day-of-month and day-of-week match either."""
+        schedule = CronSchedule("0 0 13 * 5")
+
+        assert schedule.matches(datetime(2024, 10, 13))  # Sunday the 13th
+        assert schedule.matches(datetime(2024, 10, 18))  # Friday the 18th
+        assert not schedule.matches(datetime(2024, 10, 14))
+
+    def test_fire_times(self):
+        """Test fire times in a half-open interval."""
+        schedule = CronSchedule("0 * * * *")
+
+        times = schedule.fire_times(datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 1, 3, 0))
+
+        assert [t.hour for t in times] == [1, 2, 3]
+
+
+class TestDueTimes:
+    """Test catch-up policies."""
+
+    schedule = CronSchedule("0 * * * *")
+    last = datetime(2024, 1, 1, 0, 0)
+    now = datetime(2024, 1, 1, 3, 2)
+
+    def test_catch_up_all(self):
+        """Test that all missed runs are replayed."""
+        assert len(due_times(self.schedule, self.last, self.now, "all")) == 3
+
+    def test_catch_up_latest(self):
+        """Test that only the most recent run is kept."""
+        assert due_times(self.schedule, self.last, self.now, "latest") == [
+            datetime(2024, 1, 1, 3, 0)
+        ]
+
+    def test_catch_up_skip(self):
+        """Test that only on-time runs are kept."""
+        assert due_times(self.schedule, self.last, self.now, "skip", grace=300) == [
+            datetime(2024, 1, 1, 3, 0)
+        ]
+        assert due_times(self.schedule, self.last, self.now, "skip", grace=60) == []
+
+
+class TestScheduler:
+    """Test scanning, state and concurrency of the scheduler."""
+
+    @pytest.fixture
+    def notebooks_dir(self, tmp_path):
+        """Create reporting notebooks with and without schedules."""
+        notebooks_dir = tmp_path / "notebooks"
+        write_report(notebooks_dir / "reporting" / "hourly.ipynb", "0 * * * *")
+        write_report(notebooks_dir / "reporting" / "daily.ipynb", "@daily")
+        write_report(notebooks_dir / "reporting" / "template-like.ipynb", "[e.g., weekly]")
+        return notebooks_dir
+
+    def make_scheduler(self, tmp_path, notebooks_dir, runner, **kwargs):
+        """Create a scheduler writing state and outputs under tmp_path."""
+        return Scheduler(
+            notebooks_dir,
+            state_path=tmp_path / "state.json",
+            output_dir=tmp_path / "output",
+            runner=runner,
+            **kwargs,
+        )
+
+    def test_scan_reports_invalid_schedules(self, tmp_path, notebooks_dir):
+        """Test that notebooks with invalid schedules are reported, not run."""
+        scheduler = self.make_scheduler(tmp_path, notebooks_dir, runner=None)
+
+        scheduled = scheduler.scan()
+
+        assert sorted(item.path.name for item in scheduled) == ["daily.ipynb", "hourly.ipynb"]
+        assert "template-like.ipynb" in scheduler.warnings[0]
+
+    def test_state_prevents_duplicate_runs(self, tmp_path, notebooks_dir):
+        """Test that restarts do not run the same fire time twice."""
+        calls = []
+
+        def runner(input_path, output_path):
+            calls.append((input_path.name, output_path.name))
+
+        first_seen = datetime(2024, 1, 1, 0, 30)
+        self.make_scheduler(tmp_path, notebooks_dir, runner).run_pending(first_seen)
+        assert calls == []
+
+        later = datetime(2024, 1, 1, 1, 0)
+        self.make_scheduler(tmp_path, notebooks_dir, runner).run_pending(later)
+        self.make_scheduler(tmp_path, notebooks_dir, runner).run_pending(later)
+
+        assert calls == [("hourly.ipynb", "hourly-2024-01-01T0100.ipynb")]
+
+    def test_failed_runs_are_recorded(self, tmp_path, notebooks_dir):
+        """Test that failures are recorded without stopping other runs."""
+
+        def runner(input_path, output_path):
+            if input_path.name == "daily.ipynb":
+                raise RuntimeError("boom")
+
+        scheduler = self.make_scheduler(tmp_path, notebooks_dir, runner)
+        scheduler.run_pending(datetime(2024, 1, 1, 23, 30))
+
+        runs = scheduler.run_pending(datetime(2024, 1, 2, 0, 0))
+
+        assert {run.notebook.path.name: run.status for run in runs} == {
+            "daily.ipynb": "failed",
+            "hourly.ipynb": "completed",
+        }
+        assert scheduler.state.notebooks["reporting/daily.ipynb"]["error"] == "boom"
+
+    def test_concurrency_is_bounded(self, tmp_path, notebooks_dir):
+        """Test that at most max_jobs notebooks run at once."""
+        for i in range(4):
+            write_report(notebooks_dir / "reporting" / f"extra-{i}.ipynb", "0 * * * *")
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def runner(input_path, output_path):
+            with lock:
+                running.append(input_path)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(input_path)
+
+        scheduler = self.make_scheduler(tmp_path, notebooks_dir, runner, max_jobs=2)
+        scheduler.run_pending(datetime(2024, 1, 1, 0, 30))
+
+        runs = scheduler.run_pending(datetime(2024, 1, 1, 1, 0))
+
+        assert len(runs) == 5
+        assert max(peak) == 2
+
+    def test_interrupted_batch_keeps_finished_runs(self, tmp_path, notebooks_dir):
+        """Test that runs finished before an interruption are not replayed."""
+        calls = []
+
+        def interrupted(input_path, output_path):
+            if output_path.name == "hourly-2024-01-01T0200.ipynb":
+                raise KeyboardInterrupt
+            calls.append(output_path.name)
+
+        self.make_scheduler(tmp_path, notebooks_dir, interrupted, catch_up="all").run_pending(
+            datetime(2024, 1, 1, 0, 30)
+        )
+        with pytest.raises(KeyboardInterrupt):
+            self.make_scheduler(tmp_path, notebooks_dir, interrupted, catch_up="all").run_pending(
+                datetime(2024, 1, 1, 3, 0)
+            )
+
+        state = json.loads((tmp_path / "state.json").read_text())
+        assert state["notebooks"]["reporting/hourly.ipynb"]["last_scheduled"] == (
+            "2024-01-01T01:00:00"
+        )
+
+        def runner(input_path, output_path):
+            calls.append(output_path.name)
+
+        self.make_scheduler(tmp_path, notebooks_dir, runner, catch_up="all").run_pending(
+            datetime(2024, 1, 1, 3, 0)
+        )
+        assert calls == [
+            "hourly-2024-01-01T0100.ipynb",
+            "hourly-2024-01-01T0200.ipynb",
+            "hourly-2024-01-01T0300.ipynb",
+        ]
+
+    def test_running_notebooks_are_not_due(self, tmp_path, notebooks_dir):
+        """Test that notebooks still running are left for a later check."""
+        scheduler = self.make_scheduler(tmp_path, notebooks_dir, runner=None)
+        scheduler.due(datetime(2024, 1, 1, 23, 30))
+        hourly = notebooks_dir / "reporting" / "hourly.ipynb"
+
+        runs = scheduler.due(datetime(2024, 1, 2, 0, 0), exclude={hourly})
+
+        assert [run.notebook.path.name for run in runs] == ["daily.ipynb"]
@@ -1,5 +1,6 @@
 """Tests for git utilities."""
 
+import shutil
 import subprocess
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -7,11 +8,23 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from ai_kit.cli.utils.git import (
+    FileChange,
+    GitTag,
+    MemoryGitBackend,
+    PythonGitBackend,
+    SubprocessGitBackend,
     create_git_tag,
+    delete_git_tags,
     get_current_commit_sha,
     get_file_last_commit_sha,
+    get_files_last_commit_shas,
+    get_git_backend,
     get_git_user_name,
+    iter_git_log,
+    list_git_tag_details,
     list_git_tags,
+    push_git_tags,
+    set_git_backend,
 )
 
 
@@ -224,3 +237,415 @@ class TestGetFileLastCommitSha:
 
         with pytest.raises(RuntimeError, match="Failed to get file commit SHA"):
             get_file_last_commit_sha(file_path)
+
+
+def commit_files(repo, files, message):
+    """Write files in a git repository and commit them."""
+    for name, content in files.items():
+        path = repo / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    subprocess.run(["git", "add", "-A"], cwd=repo, check=True)
+    subprocess.run(
+        [
+            "git",
+            "-c",
+            "user.name=Test",
+            "-c",
+            "user.email=test@example.com",
+            "commit",
+            "-qm",
+            message,
+        ],
+        cwd=repo,
+        check=True,
+    )
+    return subprocess.run(
+        ["git", "rev-parse", "HEAD"], cwd=repo, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+class TestGetFilesLastCommitShas:
+    """Test getting many files' last commit SHAs from one history pass."""
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        """Create a repository where files were last changed in different commits."""
+        subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+        first = commit_files(
+            tmp_path,
+            {"notebooks/a.ipynb": "1", "notebooks/with space/b.ipynb": "1", "other.txt": "1"},
+            "first",
+        )
+        second = commit_files(tmp_path, {"notebooks/a.ipynb": "2"}, "second")
+        commit_files(tmp_path, {"other.txt": "2"}, "third")
+        return tmp_path, first, second
+
+    def test_matches_single_file_lookups(self, repo):
+        """Test that each file gets the commit that last modified it."""
+        path, first, second = repo
+        files = [Path("notebooks/a.ipynb"), Path("notebooks/with space/b.ipynb")]
+
+        result = get_files_last_commit_shas(files, cwd=path)
+
+        assert result == {files[0]: second, files[1]: first}
+        assert result == {file: get_file_last_commit_sha(file, cwd=path) for file in files}
+
+    def test_conflict_resolved_in_merge(self, repo):
+        """Test that a file whose conflict was resolved in a merge gets the merge commit."""
+        path, _, _ = repo
+        git = ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com"]
+        subprocess.run(["git", "checkout", "-qb", "side"], cwd=path, check=True)
+        commit_files(path, {"notebooks/a.ipynb": "side"}, "side")
+        subprocess.run(["git", "checkout", "-q", "-"], cwd=path, check=True)
+        commit_files(path, {"notebooks/a.ipynb": "main"}, "main")
+        subprocess.run([*git, "merge", "-q", "side"], cwd=path, capture_output=True)
+        merge = commit_files(path, {"notebooks/a.ipynb": "resolved"}, "merge")
+        files = [Path("notebooks/a.ipynb"), Path("notebooks/with space/b.ipynb")]
+
+        result = get_files_last_commit_shas(files, cwd=path)
+
+        assert result[files[0]] == merge
+        assert result == {file: get_file_last_commit_sha(file, cwd=path) for file in files}
+        assert result == PythonGitBackend(path).files_last_commit_shas(files)
+
+    def test_git_processes_do_not_grow_with_files(self, repo):
+        """Test that two git processes serve any number of files."""
+        path, _, _ = repo
+        files = [Path("notebooks/a.ipynb"), Path("notebooks/with space/b.ipynb")]
+
+        with patch("subprocess.Popen", wraps=subprocess.Popen) as mock_popen:
+            get_files_last_commit_shas(files, cwd=path)
+
+        assert mock_popen.call_count == 2
+
+    def test_file_not_in_history(self, repo):
+        """Test that untracked files are reported."""
+        path, _, _ = repo
+        (path / "notebooks" / "new.ipynb").write_text("{}")
+
+        with pytest.raises(RuntimeError, match="not found in git history: notebooks/new.ipynb"):
+            get_files_last_commit_shas([Path("notebooks/new.ipynb")], cwd=path)
+
+    def test_not_a_repository(self, tmp_path):
+        """Test failure outside a git repository."""
+        with pytest.raises(RuntimeError, match="Failed to get file commit SHAs"):
+            get_files_last_commit_shas([Path("a.ipynb")], cwd=tmp_path)
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+class TestPushGitTags:
+    """Test deleting and pushing several tags."""
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        """Create a repository with two tags and a bare remote."""
+        repo = tmp_path / "repo"
+        remote = tmp_path / "remote.git"
+        repo.mkdir()
+        subprocess.run(["git", "init", "-q", "--bare", str(remote)], check=True)
+        subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+        subprocess.run(["git", "remote", "add", "origin", str(remote)], cwd=repo, check=True)
+        commit_files(repo, {"a.txt": "1"}, "first")
+        for name in ("compliance/a-2024-01-01", "compliance/b-2024-01-01"):
+            subprocess.run(
+                ["git", "-c", "user.name=T", "-c", "user.email=t@t", "tag", "-a", name, "-m", "x"],
+                cwd=repo,
+                check=True,
+            )
+        return repo, remote
+
+    def test_push_all_tags(self, repo):
+        """Test that all tags reach the remote in one push."""
+        path, remote = repo
+        names = ["compliance/a-2024-01-01", "compliance/b-2024-01-01"]
+
+        with patch("subprocess.run", wraps=subprocess.run) as mock_run:
+            push_git_tags(names, cwd=path)
+
+        assert mock_run.call_count == 1
+        assert list_git_tags(cwd=remote) == names
+
+    def test_push_failure(self, repo):
+        """Test that a failed push raises with git's message."""
+        path, _ = repo
+
+        with pytest.raises(RuntimeError, match="Failed to push tags"):
+            push_git_tags(["compliance/a-2024-01-01"], remote="missing", cwd=path)
+
+    def test_delete_tags(self, repo):
+        """Test deleting several tags at once."""
+        path, _ = repo
+
+        assert delete_git_tags(["compliance/a-2024-01-01", "compliance/b-2024-01-01"], cwd=path)
+        assert list_git_tags(cwd=path) == []
+        assert not delete_git_tags(["compliance/a-2024-01-01"], cwd=path)
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+class TestListGitTagDetails:
+    """Test listing tags with their metadata from for-each-ref."""
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        """Create a repository with an annotated and a lightweight tag."""
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+        sha = commit_files(repo, {"a.txt": "1"}, "first commit")
+        self.tag(repo, "compliance/audit-2024-10-15", "Audit approved\n\nReviewed by Jane")
+        subprocess.run(["git", "tag", "light"], cwd=repo, check=True)
+        return repo, sha
+
+    def tag(self, repo, name, message):
+        """Create an annotated tag."""
+        subprocess.run(
+            ["git", "-c", "user.name=Jane", "-c", "user.email=jane@example.com"]
+            + ["tag", "-a", name, "-m", message],
+            cwd=repo,
+            check=True,
+        )
+
+    def test_fields(self, repo):
+        """Test the tagger, date, message and target commit of each tag."""
+        path, sha = repo
+
+        annotated, light = list_git_tag_details(cwd=path)
+
+        assert annotated.name == "compliance/audit-2024-10-15"
+        assert annotated.commit == sha
+        assert (annotated.tagger, annotated.email) == ("Jane", "jane@example.com")
+        assert (annotated.subject, annotated.body) == ("Audit approved", "Reviewed by Jane")
+        assert annotated.date is not None
+        assert light.name == "light"
+        assert light.commit == sha
+        assert not light.annotated
+        assert light.tagger == ""
+        assert light.subject == "first commit"
+
+    def test_pattern(self, repo):
+        """Test filtering tags with a glob."""
+        path, _ = repo
+
+        tags = list_git_tag_details("compliance/*", cwd=path)
+
+        assert [tag.name for tag in tags] == ["compliance/audit-2024-10-15"]
+
+    def test_cache(self, repo, tmp_path):
+        """Test that cached tags are reused until a tag is added."""
+        path, _ = repo
+        cache_path = tmp_path / "tags.json"
+        first = list_git_tag_details(cwd=path, cache_path=cache_path)
+
+        with patch("subprocess.run", wraps=subprocess.run) as mock_run:
+            cached = list_git_tag_details(cwd=path, cache_path=cache_path)
+        assert cached == first
+        assert all("for-each-ref" not in call.args[0] for call in mock_run.call_args_list)
+
+        self.tag(path, "compliance/audit-2024-10-16", "Second audit")
+        names = [tag.name for tag in list_git_tag_details(cwd=path, cache_path=cache_path)]
+
+        assert "compliance/audit-2024-10-16" in names
+
+    def test_not_a_repository(self, tmp_path):
+        """Test failure outside a git repository."""
+        with pytest.raises(RuntimeError, match="Failed to list tags"):
+            list_git_tag_details(cwd=tmp_path)
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+class TestIterGitLog:
+    """Test streaming the git log with changed files and line counts."""
+
+    def test_changes(self, tmp_path):
+        """Test statuses, renames, binary files and line counts relative to cwd."""
+        subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+        first = commit_files(tmp_path, {"notebooks/a.ipynb": "1\n2\n", "other.txt": "1"}, "first")
+        (tmp_path / "notebooks" / "image.png").write_bytes(b"\x00\x01")
+        subprocess.run(["git", "mv", "notebooks/a.ipynb", "notebooks/b.ipynb"], cwd=tmp_path)
+        second = commit_files(tmp_path, {"other.txt": "2"}, "second")
+
+        commits = list(iter_git_log(["HEAD"], ["."], cwd=tmp_path / "notebooks"))
+
+        assert [c.sha for c in commits] == [second, first]
+        assert commits[0].parents == [first]
+        assert (commits[0].author, commits[0].subject) == ("Test", "second")
+        assert commits[0].changes == [
+            FileChange("R", "b.ipynb", "a.ipynb", 0, 0),
+            FileChange("A", "image.png"),
+        ]
+        assert commits[1].changes == [FileChange("A", "a.ipynb", None, 2, 0)]
+
+    def test_excluded_revision(self, tmp_path):
+        """Test reading only the commits made since another one."""
+        subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+        first = commit_files(tmp_path, {"a.txt": "1"}, "first")
+        second = commit_files(tmp_path, {"a.txt": "2"}, "second")
+
+        assert [c.sha for c in iter_git_log([second, f"^{first}"], ["."], cwd=tmp_path)] == [second]
+        with pytest.raises(RuntimeError, match="Failed to read git log"):
+            list(iter_git_log(["HEAD", "^" + "0" * 40], ["."], cwd=tmp_path))
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+class TestPythonGitBackend:
+    """Test the in-process backend against the git command."""
+
+    git = ["git", "-c", "user.name=Jane", "-c", "user.email=jane@example.com"]
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        """Create a repository with packed and loose objects, tags and a merge."""
+        subprocess.run(["git", "init", "-q", "-b", "main"], cwd=tmp_path, check=True)
+        commit_files(tmp_path, {"notebooks/a.ipynb": "1", "notebooks/b.ipynb": "1"}, "first")
+        subprocess.run([*self.git, "tag", "-a", "v1", "-m", "One\nline\n\nBody"], cwd=tmp_path)
+        subprocess.run(["git", "checkout", "-qb", "side"], cwd=tmp_path, check=True)
+        commit_files(tmp_path, {"notebooks/b.ipynb": "2"}, "side")
+        subprocess.run(["git", "checkout", "-q", "main"], cwd=tmp_path, check=True)
+        commit_files(tmp_path, {"notebooks/c.ipynb": "1"}, "main")
+        subprocess.run([*self.git, "merge", "-q", "--no-edit", "side"], cwd=tmp_path, check=True)
+        subprocess.run(["git", "gc", "-q"], cwd=tmp_path, check=True)
+        # Loose objects and refs on top of the pack
+        commit_files(tmp_path, {"notebooks/a.ipynb": "2"}, "after gc\n\nWith a body")
+        subprocess.run(["git", "tag", "light"], cwd=tmp_path, check=True)
+        subprocess.run(
+            [*self.git, "tag", "-a", "compliance/a-2024-01-01", "-m", "Audit"], cwd=tmp_path
+        )
+        subprocess.run(["git", "config", "user.name", "Jane"], cwd=tmp_path, check=True)
+        subprocess.run(
+            ["git", "config", "user.email", "jane@example.com"], cwd=tmp_path, check=True
+        )
+        return tmp_path
+
+    def test_reads_match_git(self, repo):
+        """Test that refs, tags and file history match the git command."""
+        python, git = PythonGitBackend(repo), SubprocessGitBackend(repo)
+        files = [Path(f"notebooks/{name}.ipynb") for name in "abc"]
+
+        assert python.head_sha() == git.head_sha()
+        assert python.list_tags() == git.list_tags()
+        assert python.list_tags("compliance/*") == git.list_tags("compliance/*")
+        assert python.tag_details() == git.tag_details()
+        assert python.git_dir() == git.git_dir()
+        assert python.files_last_commit_shas(files) == git.files_last_commit_shas(files)
+
+    def test_object_caches_are_bounded(self, repo):
+        """Test that parsed trees and commits are evicted beyond the cache sizes."""
+        python = PythonGitBackend(repo)
+        files = [Path(f"notebooks/{name}.ipynb") for name in "abc"]
+
+        with (
+            patch("ai_kit.cli.utils.git_objects._TREE_CACHE_SIZE", 2),
+            patch("ai_kit.cli.utils.git_objects._COMMIT_CACHE_SIZE", 2),
+        ):
+            shas = python.files_last_commit_shas(files)
+
+        assert shas == SubprocessGitBackend(repo).files_last_commit_shas(files)
+        assert len(python._repository._trees) <= 2
+        assert len(python._repository._commits) <= 2
+
+    def test_create_tag(self, repo):
+        """Test that tags are created by git, with its reflog, and read back in-process."""
+        python = PythonGitBackend(repo)
+        subprocess.run(["git", "config", "core.logAllRefUpdates", "always"], cwd=repo, check=True)
+
+        assert python.create_tag("compliance/b-2024-01-01", "Reviewed\n\nBy Jane")
+        assert (repo / ".git" / "logs" / "refs" / "tags" / "compliance" / "b-2024-01-01").exists()
+        assert not python.create_tag("compliance/b-2024-01-01", "Again")
+        assert not python.create_tag("bad..name", "Invalid")
+
+        subprocess.run(["git", "fsck", "--strict", "--no-dangling"], cwd=repo, check=True)
+        (tag,) = SubprocessGitBackend(repo).tag_details()[1:2]
+        assert tag.name == "compliance/b-2024-01-01"
+        assert tag.commit == python.head_sha()
+        assert (tag.tagger, tag.subject, tag.body) == ("Jane", "Reviewed", "By Jane")
+
+    def test_no_process_started(self, repo):
+        """Test that reads do not run git."""
+        python = PythonGitBackend(repo)
+
+        with patch("subprocess.Popen") as mock_popen:
+            python.head_sha()
+            python.tag_details()
+            python.files_last_commit_shas([Path("notebooks/a.ipynb")])
+
+        mock_popen.assert_not_called()
+
+    def test_errors(self, repo, tmp_path_factory):
+        """Test the errors raised like the git command's."""
+        python = PythonGitBackend(repo)
+
+        with pytest.raises(RuntimeError, match="Files not found in git history"):
+            python.files_last_commit_shas([Path("missing.ipynb")])
+        with pytest.raises(RuntimeError, match="File not found in git history"):
+            python.file_last_commit_sha(Path("missing.ipynb"))
+        with pytest.raises(RuntimeError, match="Failed to get current commit SHA"):
+            PythonGitBackend(tmp_path_factory.mktemp("empty")).head_sha()
+
+    def test_unsupported_repository_uses_git(self, tmp_path):
+        """Test the fallback to git for SHA-256 repositories."""
+        result = subprocess.run(
+            ["git", "init", "-q", "--object-format=sha256"], cwd=tmp_path, check=False
+        )
+        if result.returncode:
+            pytest.skip("git without SHA-256 support")
+        sha = commit_files(tmp_path, {"a.txt": "1"}, "first")
+
+        assert PythonGitBackend(tmp_path).head_sha() == sha
+
+    def test_selected_by_environment(self, repo, monkeypatch):
+        """Test choosing the backend with AI_KIT_GIT_BACKEND."""
+        monkeypatch.setenv("AI_KIT_GIT_BACKEND", "python")
+        assert isinstance(get_git_backend(repo), PythonGitBackend)
+        assert get_current_commit_sha(cwd=repo) == SubprocessGitBackend(repo).head_sha()
+
+        monkeypatch.setenv("AI_KIT_GIT_BACKEND", "libgit")
+        with pytest.raises(ValueError, match="Unknown git backend"):
+            get_git_backend(repo)
+
+
+class TestMemoryGitBackend:
+    """Test the in-memory backend used in place of a repository."""
+
+    @pytest.fixture
+    def backend(self):
+        """Install an in-memory backend for every git helper."""
+        backend = MemoryGitBackend(
+            head="abc123",
+            files={"notebooks/a.ipynb": "def456"},
+            user_name="Jane",
+            tags=[GitTag(name="light", commit="abc123", date=None, annotated=False)],
+        )
+        previous = set_git_backend(backend)
+        yield backend
+        set_git_backend(previous)
+
+    def test_helpers_use_backend(self, backend):
+        """Test that the module helpers go through the installed backend."""
+        assert get_git_user_name() == "Jane"
+        assert get_current_commit_sha() == "abc123"
+        assert get_file_last_commit_sha(Path("notebooks/a.ipynb")) == "def456"
+        with pytest.raises(RuntimeError, match="Files not found in git history"):
+            get_files_last_commit_shas([Path("notebooks/b.ipynb")])
+
+    def test_tags(self, backend):
+        """Test creating, listing, pushing and deleting tags."""
+        assert create_git_tag("compliance/a-2024-01-01", "Audit\n\nDone")
+        assert not create_git_tag("light", "Exists")
+        assert list_git_tags("compliance/*") == ["compliance/a-2024-01-01"]
+        (tag,) = list_git_tag_details("compliance/*", cache_path=Path("unused.json"))
+        assert (tag.commit, tag.tagger, tag.subject, tag.body) == (
+            "abc123",
+            "Jane",
+            "Audit",
+            "Done",
+        )
+
+        push_git_tags(["compliance/a-2024-01-01"])
+        assert backend.pushed == [("origin", ["compliance/a-2024-01-01"])]
+        with pytest.raises(RuntimeError, match="Failed to push tags"):
+            push_git_tags(["missing"])
+
+        assert delete_git_tags(["compliance/a-2024-01-01"])
+        assert list_git_tags() == ["light"]
@@ -0,0 +1,94 @@
+"""Benchmark ``ai_kit_core.fairness`` against the evaluation template's loop.
+
+Usage:
+    uv run python benchmarks/fairness.py --rows 1000000 --groups 8 --attributes 2
+"""
+
+import argparse
+import time
+
+import numpy as np
+from ai_kit_core.fairness import encode_groups, fairness_metrics
+
+
+def calculate_fairness_metrics(y_true, y_pred, protected_attribute):
+    """The evaluation template's implementation, with ``np.unique`` for ``Series.unique``."""
+    groups = np.unique(protected_attribute)
+    metrics = {}
+
+    for group in groups:
+        mask = protected_attribute == group
+        y_true_group = y_true[mask]
+        y_pred_group = y_pred[mask]
+
+        positive_rate = (y_pred_group == 1).mean()
+
+        tp = ((y_true_group == 1) & (y_pred_group == 1)).sum()
+        fn = ((y_true_group == 1) & (y_pred_group == 0)).sum()
+        tpr = tp / (tp + fn) if (tp + fn) > 0 else 0
+
+        fp = ((y_true_group == 0) & (y_pred_group == 1)).sum()
+        tn = ((y_true_group == 0) & (y_pred_group == 0)).sum()
+        fpr = fp / (fp + tn) if (fp + tn) > 0 else 0
+
+        metrics[group] = {
+            "positive_rate": positive_rate,
+            "tpr": tpr,
+            "fpr": fpr,
+            "sample_size": len(y_true_group),
+        }
+
+    return metrics
+
+
+def best_of(repeat, function, *args):
+    """Shortest run time of ``function(*args)``, in seconds, and its result."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--groups", type=int, default=8, help="Values per attribute")
+    parser.add_argument("--attributes", type=int, default=2, help="Intersected attributes")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    y_true = rng.integers(0, 2, args.rows)
+    y_pred = rng.integers(0, 2, args.rows)
+    attributes = [
+        rng.choice([f"group-{i}" for i in range(args.groups)], args.rows)
+        for _ in range(args.attributes)
+    ]
+
+    # The loop version handles a single attribute: intersect by joining the values
+    joined = attributes[0]
+    for attribute in attributes[1:]:
+        joined = np.char.add(np.char.add(joined, "|"), attribute)
+    loop_time, expected = best_of(args.repeat, calculate_fairness_metrics, y_true, y_pred, joined)
+    time_taken, report = best_of(args.repeat, fairness_metrics, y_true, y_pred, *attributes)
+    codes, groups = encode_groups(*attributes)
+    coded_time, _ = best_of(args.repeat, fairness_metrics, y_true, y_pred, codes)
+
+    actual = {
+        "|".join(np.atleast_1d(group)): metrics for group, metrics in report.to_dict().items()
+    }
+    for group, metrics in expected.items():
+        for name, value in metrics.items():
+            assert np.isclose(actual[group][name], value), (group, name)
+
+    print(f"{args.rows:,} rows, {len(groups)} groups")
+    print(f"  template loop:             {loop_time:8.3f}s")
+    print(f"  fairness_metrics:          {time_taken:8.3f}s ({loop_time / time_taken:.1f}x)")
+    print(f"  fairness_metrics (coded):  {coded_time:8.3f}s ({loop_time / coded_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,473 @@
+"""Load testing of an HTTP service: latency percentiles, throughput and errors.
+
+Two ways to load a service:
+
+- :func:`closed_loop` keeps a fixed number of requests in flight, each
+  worker sending its next request as soon as the previous one returns. It
+  measures the throughput the service sustains at that concurrency.
+- :func:`open_loop` sends requests at a fixed arrival rate, whatever the
+  service's response times. Latencies are measured from each request's
+  scheduled time, so the queueing caused by a slow service is counted instead
+  of hidden (coordinated omission).
+
+:func:`sweep` runs either over several concurrency levels or rates, and
+:func:`write_csv` saves results as rows that the reporting template loads
+with ``pd.read_csv`` (``date``, ``api_calls``, ``response_time_ms``,
+``error_rate``, plus percentiles and throughput).
+
+Latencies are recorded in a :class:`LatencyHistogram`, an HDR-style
+log-linear histogram with better than 0.5% relative precision, so that
+percentiles of long runs take constant memory.
+
+Examples:
+    >>> histogram = LatencyHistogram()
+    >>> histogram.record([0.010, 0.020, 0.030, 0.040])
+    >>> histogram.count
+    4
+    >>> round(histogram.quantile(0.5) * 1000, 1)
+    20.0
+
+Running a sweep from the command line::
+
+    python -m ai_kit_core.bench http://localhost:8000/v1/chat/completions \\
+        --data @payload.json --concurrency 1 2 4 8 16 --duration 30 --output bench.csv
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import time
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from ai_kit_core.client import DEFAULT_TIMEOUT, ConnectionPool
+
+# Latencies are recorded in whole microseconds, in buckets of 2**SUB_BUCKET_BITS
+# equal sub-buckets per power of two (relative precision 2**-SUB_BUCKET_BITS)
+SUB_BUCKET_BITS = 8
+# Largest power of two of microseconds recorded (2**40 µs is about 12 days)
+MAX_EXPONENT = 40
+
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_BUCKETS = (MAX_EXPONENT - SUB_BUCKET_BITS + 1) * _SUB_BUCKETS
+_MAX_MICROSECONDS = (1 << MAX_EXPONENT) - 1
+
+# Latency percentiles reported by LoadResult
+PERCENTILES = (50, 95, 99)
+
+# Most connections opened by an open-loop run
+DEFAULT_MAX_CONNECTIONS = 256
+
+
+def _bucket_index(microseconds: np.ndarray) -> np.ndarray:
+    """Bucket of each latency: exact below 2**SUB_BUCKET_BITS µs, log-linear above."""
+    exponent = np.maximum(np.frexp(microseconds)[1] - SUB_BUCKET_BITS, 0)
+    return (exponent << SUB_BUCKET_BITS) + (microseconds >> exponent)
+
+
+def _bucket_values() -> np.ndarray:
+    """Middle of each bucket, in microseconds."""
+    index = np.arange(_BUCKETS)
+    exponent = index >> SUB_BUCKET_BITS
+    low = (index & (_SUB_BUCKETS - 1)) << exponent
+    return low + ((1 << exponent) - 1) / 2
+
+
+_BUCKET_VALUES = _bucket_values()
+
+
+@dataclass
+class LatencyHistogram:
+    """Counts of latencies in log-linear buckets, which merge by addition.
+
+    Also keeps the exact total and largest latency.
+    """
+
+    counts: np.ndarray = field(default_factory=lambda: np.zeros(_BUCKETS, dtype=np.int64))
+    total: float = 0.0
+    max: float = 0.0
+
+    def record(self, seconds: ArrayLike) -> None:
+        """Add latencies, in seconds."""
+        seconds = np.asarray(seconds, dtype=np.float64).reshape(-1)
+        if not len(seconds):
+            return
+        microseconds = np.clip(np.rint(seconds * 1e6), 0, _MAX_MICROSECONDS).astype(np.int64)
+        self.counts += np.bincount(_bucket_index(microseconds), minlength=_BUCKETS)
+        self.total += float(seconds.sum())
+        self.max = max(self.max, float(seconds.max()))
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add another histogram's latencies to this one."""
+        self.counts += other.counts
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def mean(self) -> float:
+        """Mean latency in seconds (NaN when empty)."""
+        return self.total / self.count if self.count else float("nan")
+
+    def quantile(self, q: ArrayLike) -> float | np.ndarray:
+        """Latency (in seconds) below which a share ``q`` of latencies fall.
+
+        NaN when the histogram is empty.
+        """
+        q = np.asarray(q, dtype=np.float64)
+        cumulative = np.cumsum(self.counts)
+        if cumulative[-1]:
+            ranks = np.maximum(np.ceil(q * cumulative[-1]), 1)
+            values = np.minimum(_BUCKET_VALUES[np.searchsorted(cumulative, ranks)] / 1e6, self.max)
+        else:
+            values = np.full(q.shape, np.nan)
+        return float(values) if values.ndim == 0 else values
+
+
+@dataclass
+class LoadResult:
+    """Latencies and errors of one load-test run.
+
+    ``rate`` is the target arrival rate (requests per second) of open-loop
+    runs, and ``concurrency`` the number of workers of closed-loop runs.
+    Latencies only cover successful requests.
+    """
+
+    mode: str
+    concurrency: int | None
+    rate: float | None
+    started: datetime
+    duration: float
+    requests: int
+    errors: int
+    latencies: LatencyHistogram = field(repr=False)
+
+    @property
+    def throughput(self) -> float:
+        """Successful requests per second."""
+        return (self.requests - self.errors) / self.duration if self.duration else float("nan")
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else float("nan")
+
+    def percentiles(self) -> dict[int, float]:
+        """Latency percentiles, in milliseconds."""
+        values = self.latencies.quantile(np.array(PERCENTILES) / 100) * 1000
+        return dict(zip(PERCENTILES, values.tolist(), strict=True))
+
+    def to_dict(self) -> dict[str, Any]:
+        """Row of the reporting template's metrics table."""
+        row = {
+            "date": self.started.isoformat(timespec="seconds"),
+            "mode": self.mode,
+            "concurrency": self.concurrency,
+            "rate": self.rate,
+            "duration_s": round(self.duration, 3),
+            "api_calls": self.requests,
+            "errors": self.errors,
+            "error_rate": self.error_rate,
+            "throughput_rps": self.throughput,
+            "response_time_ms": self.latencies.mean * 1000,
+        }
+        row.update({f"p{p}_ms": value for p, value in self.percentiles().items()})
+        row["max_ms"] = self.latencies.max * 1000
+        return row
+
+
+@dataclass
+class _Target:
+    """Request sent by every worker."""
+
+    pool: ConnectionPool
+    method: str
+    path: str
+    body: bytes | None
+    headers: dict[str, str]
+
+    @classmethod
+    def create(
+        cls,
+        url: str,
+        method: str | None,
+        body: bytes | Mapping | None,
+        headers: Mapping[str, str] | None,
+        max_connections: int,
+        timeout: float,
+    ) -> "_Target":
+        parts = urlsplit(url)
+        pool = ConnectionPool(f"{parts.scheme}://{parts.netloc}", max_connections, timeout)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        headers = dict(headers or {})
+        if isinstance(body, Mapping):
+            body = json.dumps(body, ensure_ascii=False).encode()
+            headers.setdefault("Content-Type", "application/json")
+        return cls(pool, method or ("POST" if body is not None else "GET"), path, body, headers)
+
+    async def send(self) -> bool:
+        """Send the request, returning whether it succeeded."""
+        try:
+            response = await self.pool.request(self.method, self.path, self.body, self.headers)
+        except (OSError, TimeoutError, asyncio.IncompleteReadError):
+            return False
+        return response.status < 400
+
+
+class _Recorder:
+    """Latencies of successful requests, buffered before going to the histogram."""
+
+    def __init__(self, flush_every: int = 10_000):
+        self.histogram = LatencyHistogram()
+        self.requests = 0
+        self.errors = 0
+        self._buffer: list[float] = []
+        self._flush_every = flush_every
+
+    def add(self, ok: bool, latency: float) -> None:
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+            return
+        self._buffer.append(latency)
+        if len(self._buffer) >= self._flush_every:
+            self.flush()
+
+    def flush(self) -> LatencyHistogram:
+        self.histogram.record(self._buffer)
+        self._buffer.clear()
+        return self.histogram
+
+
+async def closed_loop(
+    url: str,
+    concurrency: int,
+    duration: float,
+    method: str | None = None,
+    body: bytes | Mapping | None = None,
+    headers: Mapping[str, str] | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> LoadResult:
+    """Load a service with a fixed number of requests in flight.
+
+    Args:
+        url: URL of the requests
+        concurrency: Workers, each sending a request as soon as its previous
+            one returns
+        duration: Seconds during which workers send new requests
+        method: HTTP method, ``POST`` if there is a body and ``GET`` otherwise
+        body: Request body, bytes or a mapping sent as JSON
+        headers: Request headers, such as ``Authorization``
+        timeout: Seconds after which a request counts as failed
+
+    Returns:
+        Latencies and errors of the run
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    target = _Target.create(url, method, body, headers, concurrency, timeout)
+    recorder = _Recorder()
+    started = datetime.now(UTC)
+    start = time.perf_counter()
+    deadline = start + duration
+
+    async def worker() -> None:
+        while (sent := time.perf_counter()) < deadline:
+            ok = await target.send()
+            recorder.add(ok, time.perf_counter() - sent)
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        await target.pool.aclose()
+    return LoadResult(
+        mode="closed",
+        concurrency=concurrency,
+        rate=None,
+        started=started,
+        duration=time.perf_counter() - start,
+        requests=recorder.requests,
+        errors=recorder.errors,
+        latencies=recorder.flush(),
+    )
+
+
+async def open_loop(
+    url: str,
+    rate: float,
+    duration: float,
+    method: str | None = None,
+    body: bytes | Mapping | None = None,
+    headers: Mapping[str, str] | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+) -> LoadResult:
+    """Load a service with requests arriving at a fixed rate.
+
+    Requests that find all ``max_connections`` busy wait for one, and that
+    wait counts in their latency.
+
+    Args:
+        url: URL of the requests
+        rate: Requests sent per second, evenly spaced
+        duration: Seconds during which requests are sent
+        method: HTTP method, ``POST`` if there is a body and ``GET`` otherwise
+        body: Request body, bytes or a mapping sent as JSON
+        headers: Request headers, such as ``Authorization``
+        timeout: Seconds after which a request counts as failed
+        max_connections: Most connections open at once
+
+    Returns:
+        Latencies and errors of the run
+    """
+    if rate <= 0:
+        raise ValueError("rate must be positive")
+    target = _Target.create(url, method, body, headers, max_connections, timeout)
+    recorder = _Recorder()
+    loop = asyncio.get_running_loop()
+
+    async def send(scheduled: float) -> None:
+        ok = await target.send()
+        recorder.add(ok, loop.time() - scheduled)
+
+    started = datetime.now(UTC)
+    start = loop.time()
+    tasks = set()
+    try:
+        for i in range(int(rate * duration)):
+            scheduled = start + i / rate
+            if (delay := scheduled - loop.time()) > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(send(scheduled))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+    finally:
+        await target.pool.aclose()
+    return LoadResult(
+        mode="open",
+        concurrency=None,
+        rate=rate,
+        started=started,
+        duration=loop.time() - start,
+        requests=recorder.requests,
+        errors=recorder.errors,
+        latencies=recorder.flush(),
+    )
+
+
+async def sweep(
+    url: str,
+    concurrencies: Sequence[int] = (),
+    rates: Sequence[float] = (),
+    duration: float = 10.0,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    **options,
+) -> list[LoadResult]:
+    """Closed-loop runs at each concurrency level, then open-loop runs at each rate.
+
+    Args:
+        url: URL of the requests
+        concurrencies: Concurrency levels of closed-loop runs
+        rates: Arrival rates (requests per second) of open-loop runs
+        duration: Seconds of each run
+        max_connections: Most connections open at once in open-loop runs
+            (closed-loop runs open one per concurrent request)
+        **options: Other arguments of :func:`closed_loop` and :func:`open_loop`
+
+    Returns:
+        Result of each run, in order
+    """
+    results = [await closed_loop(url, c, duration, **options) for c in concurrencies]
+    return results + [
+        await open_loop(url, r, duration, max_connections=max_connections, **options) for r in rates
+    ]
+
+
+def write_csv(results: Sequence[LoadResult], path: str | Path) -> None:
+    """Append results to a CSV file, writing its header if the file is new."""
+    path = Path(path)
+    rows = [result.to_dict() for result in results]
+    if not rows:
+        return
+    new = not path.exists() or path.stat().st_size == 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        if new:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv: Sequence[str] | None = None) -> list[LoadResult]:
+    parser = argparse.ArgumentParser(
+        prog="python -m ai_kit_core.bench", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("url")
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[], help="closed-loop levels")
+    parser.add_argument("--rate", type=float, nargs="*", default=[], help="open-loop rates (/s)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run")
+    parser.add_argument("--method")
+    parser.add_argument("--data", help="request body, or @file to read it from a file")
+    parser.add_argument("--header", action="append", default=[], help="'Name: value'")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=DEFAULT_MAX_CONNECTIONS,
+        help="most connections of open-loop runs",
+    )
+    parser.add_argument("--output", type=Path, help="CSV file to append results to")
+    args = parser.parse_args(argv)
+    if not args.concurrency and not args.rate:
+        parser.error("give at least one --concurrency level or --rate")
+
+    body = args.data
+    if body is not None:
+        body = Path(body[1:]).read_bytes() if body.startswith("@") else body.encode()
+    headers = dict(header.split(":", 1) for header in args.header)
+    headers = {name.strip(): value.strip() for name, value in headers.items()}
+    if body is not None and body.lstrip().startswith((b"{", b"[")):
+        headers.setdefault("Content-Type", "application/json")
+
+    results = asyncio.run(
+        sweep(
+            args.url,
+            args.concurrency,
+            args.rate,
+            args.duration,
+            args.max_connections,
+            method=args.method,
+            body=body,
+            headers=headers,
+            timeout=args.timeout,
+        )
+    )
+    for result in results:
+        row = result.to_dict()
+        level = (
+            f"concurrency {result.concurrency}" if result.mode == "closed" else f"{result.rate}/s"
+        )
+        print(
+            f"{result.mode:6} {level:>16}: {row['throughput_rps']:8.1f} req/s, "
+            f"p50 {row['p50_ms']:8.1f} ms, p95 {row['p95_ms']:8.1f} ms, "
+            f"p99 {row['p99_ms']:8.1f} ms, errors {result.error_rate:.1%}"
+        )
+    if args.output:
+        write_csv(results, args.output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
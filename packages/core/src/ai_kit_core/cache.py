@@ -0,0 +1,268 @@
+"""Persistent cache of model responses.
+
+:class:`ResponseCache` stores the responses of an OpenAI-compatible API in a
+SQLite file, keyed by a canonical hash of each request (server and endpoint
+URL, model, parameters and messages). Re-running an evaluation then only sends the
+requests that changed. Given to :class:`ai_kit_core.client.AsyncClient` with
+``cache=``, it is used transparently.
+
+The database runs in write-ahead-log mode, so parallel workers (threads, or
+processes each opening the same file) can read and write it concurrently.
+Entries expire after ``ttl`` seconds, and the least recently used ones are
+evicted beyond ``max_size`` bytes. Lookups only read the database: access
+times are buffered and written with the next writes or eviction.
+
+Examples:
+    >>> url = "https://albert.api.etalab.gouv.fr/v1/chat/completions"
+    >>> key = cache_key(url, {"model": "m", "messages": [], "temperature": 0})
+    >>> key == cache_key(url, {"temperature": 0, "messages": [], "model": "m"})
+    True
+    >>> with ResponseCache(":memory:") as cache:
+    ...     cache.get(key)
+    ...     cache.set(key, {"choices": []})
+    ...     cache.get(key)
+    ...     cache.stats.hit_rate
+    {'choices': []}
+    0.5
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+# Seconds a writer waits for another writer's lock before failing
+BUSY_TIMEOUT = 60.0
+
+# Writes between two automatic evictions, when the cache has a size limit
+EVICT_EVERY = 256
+
+# Buffered access times written in their own transaction beyond this
+FLUSH_ACCESSED_EVERY = 1024
+
+# Most keys per query, below SQLite's limit on query parameters
+_MAX_VARIABLES = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+_TOTAL_SIZE = "SELECT COALESCE(SUM(size), 0) FROM responses"
+
+
+def cache_key(url: str, payload: Mapping[str, Any]) -> str:
+    """Canonical hash of a request to ``url``, independent of the order of its keys.
+
+    The URL includes the server, so that servers serving models of the same
+    name do not share responses.
+    """
+    canonical = json.dumps(
+        [url, payload], sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Cache lookups and writes since the cache was opened."""
+
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups found in the cache (NaN before any lookup)."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else float("nan")
+
+
+class ResponseCache:
+    """Responses stored in a SQLite file.
+
+    Each process should open its own instance; one instance may be shared by
+    threads.
+
+    Args:
+        path: Database file, created if needed (``":memory:"`` for a
+            temporary cache)
+        ttl: Seconds after which entries expire, if any
+        max_size: Most bytes of stored responses, if any; least recently used
+            entries are evicted beyond it
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl: float | None = None,
+        max_size: int | None = None,
+    ):
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if max_size is not None and max_size < 0:
+            raise ValueError("max_size must not be negative")
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._writes_since_eviction = 0
+        self._accessed: dict[str, float] = {}
+        self._db = sqlite3.connect(
+            path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Write transaction, taking the database lock up front to avoid deadlocks."""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _flush_accessed(self) -> None:
+        """Write the buffered access times, within a transaction."""
+        if self._accessed:
+            self._db.executemany(
+                "UPDATE responses SET accessed = MAX(accessed, ?) WHERE key = ?",
+                [(accessed, key) for key, accessed in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def _oldest_valid(self) -> float:
+        return -float("inf") if self.ttl is None else time.time() - self.ttl
+
+    def get(self, key: str) -> Any | None:
+        """Cached response of a request key, or ``None``."""
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Iterable[str]) -> list[Any | None]:
+        """Cached responses of many request keys (``None`` where missing)."""
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), _MAX_VARIABLES):
+                batch = keys[start : start + _MAX_VARIABLES]
+                rows = self._db.execute(
+                    f"SELECT key, value FROM responses WHERE created >= ? "
+                    f"AND key IN ({','.join('?' * len(batch))})",
+                    [self._oldest_valid(), *batch],
+                )
+                found.update(rows)
+            now = time.time()
+            self._accessed.update(dict.fromkeys(found, now))
+            if len(self._accessed) >= FLUSH_ACCESSED_EVERY:
+                with self._transaction():
+                    self._flush_accessed()
+            self.stats.hits += sum(key in found for key in keys)
+            self.stats.misses += sum(key not in found for key in keys)
+        return [json.loads(found[key]) if key in found else None for key in keys]
+
+    def set(self, key: str, value: Any) -> None:
+        """Store the response of a request key."""
+        self.set_many([(key, value)])
+
+    def set_many(self, items: Iterable[tuple[str, Any]]) -> None:
+        """Store many responses, in one transaction."""
+        now = time.time()
+        rows = []
+        for key, value in items:
+            text = json.dumps(value, ensure_ascii=False)
+            rows.append((key, text, len(text.encode()), now, now))
+        with self._lock:
+            with self._transaction():
+                self._flush_accessed()
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)", rows
+                )
+            self.stats.writes += len(rows)
+            self._writes_since_eviction += len(rows)
+            evict = self.max_size is not None and self._writes_since_eviction >= EVICT_EVERY
+        if evict:
+            self.evict()
+
+    def evict(self) -> int:
+        """Delete expired entries, then least recently used ones beyond ``max_size``.
+
+        Returns:
+            Number of entries deleted
+        """
+        with self._lock, self._transaction():
+            self._flush_accessed()
+            deleted = self._db.execute(
+                "DELETE FROM responses WHERE created < ?", [self._oldest_valid()]
+            ).rowcount
+            if self.max_size is not None:
+                (size,) = self._db.execute(_TOTAL_SIZE).fetchone()
+                if size > self.max_size:
+                    # Keep the most recently used entries that fit within the limit
+                    deleted += self._db.execute(
+                        """
+                        DELETE FROM responses WHERE key IN (
+                            SELECT key FROM (
+                                SELECT key, SUM(size) OVER (
+                                    ORDER BY accessed DESC, key ROWS UNBOUNDED PRECEDING
+                                ) AS total
+                                FROM responses
+                            )
+                            WHERE total > ?
+                        )
+                        """,
+                        [self.max_size],
+                    ).rowcount
+            self.stats.evictions += deleted
+            self._writes_since_eviction = 0
+        return deleted
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        with self._lock, self._transaction():
+            self._accessed.clear()
+            self._db.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """Bytes of stored responses."""
+        with self._lock:
+            return self._db.execute(_TOTAL_SIZE).fetchone()[0]
+
+    def close(self) -> None:
+        """Write buffered access times, evict entries over the limits, and close the database."""
+        if self.ttl is not None or self.max_size is not None:
+            self.evict()
+        elif self._accessed:
+            with self._lock, self._transaction():
+                self._flush_accessed()
+        self._db.close()
+
+    def __enter__(self) -> "ResponseCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
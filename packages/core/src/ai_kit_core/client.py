@@ -0,0 +1,526 @@
+"""Async batched client for OpenAI-compatible model endpoints.
+
+:class:`AsyncClient` sends many chat or embedding requests concurrently to an
+OpenAI-compatible API (such as OpenGateLLM), so that evaluations over large
+prompt sets use the whole quota instead of waiting for each answer in turn:
+
+- requests go through a pool of keep-alive HTTP connections,
+- at most ``max_concurrency`` requests are in flight at once,
+- an optional token bucket caps the request rate,
+- failed requests (network errors, 429 and 5xx responses) are retried with
+  exponential backoff and full jitter, honoring ``Retry-After``,
+- batch results come back in the order of their inputs,
+- with a :class:`~ai_kit_core.cache.ResponseCache`, responses already
+  received by an earlier run are reused instead of being requested again.
+
+The HTTP/1.1 transport only uses the standard library's asyncio streams, so
+it leaves out what an HTTP library would do: ``HTTPS_PROXY`` and
+``HTTP_PROXY`` are ignored (the server must be reachable directly), and a
+response with neither a length nor chunked encoding is read until the server
+closes the connection, bounded only by ``timeout``. Responses that are not
+valid HTTP fail like network errors, and are retried.
+
+Examples:
+    >>> bucket = TokenBucket(rate=10, capacity=2)
+    >>> bucket.capacity
+    2.0
+    >>> message_content({"choices": [{"message": {"content": "Bonjour"}}]})
+    'Bonjour'
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import random
+import ssl
+import time
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from ai_kit_core.cache import ResponseCache, cache_key
+
+# Environment variable holding the API key, as in the notebooks' guidelines
+API_KEY_VARIABLE = "OPENGATELLM_API_KEY"
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_EMBEDDING_BATCH_SIZE = 64
+
+# Exponential backoff between retries: base delay and cap, in seconds
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+# Longest status or header line accepted from a server
+_MAX_LINE = 64 * 1024
+
+
+class APIError(Exception):
+    """Request that failed, after any retries.
+
+    ``status`` is ``None`` when no response was received (network error or
+    timeout).
+    """
+
+    def __init__(self, message: str, status: int | None = None, body: bytes = b""):
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+
+@dataclass
+class Response:
+    """HTTP response, with its body fully read."""
+
+    status: int
+    headers: dict[str, str]
+    body: bytes = field(repr=False)
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class _StaleConnectionError(Exception):
+    """Kept-alive connection closed by the server before sending a response."""
+
+
+class _ProtocolError(ConnectionError):
+    """Response that is not valid HTTP/1.1."""
+
+
+@dataclass
+class _Connection:
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    reused: bool = False
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Pool of keep-alive HTTP/1.1 connections to one server.
+
+    At most ``max_connections`` requests are sent at once, each on its own
+    connection; idle connections are kept open for the next requests.
+
+    Args:
+        base_url: Server URL, such as ``https://albert.api.etalab.gouv.fr/v1``;
+            request paths are appended to its path
+        max_connections: Most connections (and requests in flight)
+        timeout: Seconds allowed for each request, connection included
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        url = urlsplit(base_url)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise ValueError(f"Expected an http(s) URL, got {base_url!r}")
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.prefix = url.path.rstrip("/")
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._ssl = ssl.create_default_context() if url.scheme == "https" else None
+        default_port = self.port == (443 if url.scheme == "https" else 80)
+        self._host_header = self.host if default_port else f"{self.host}:{self.port}"
+        self._idle: list[_Connection] = []
+        self._slots = asyncio.Semaphore(max_connections)
+        self.connections_opened = 0
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> Response:
+        """Send a request and read its response.
+
+        Raises:
+            OSError: If the connection fails or the response is not valid HTTP
+            TimeoutError: If the request takes longer than ``timeout``
+        """
+        head = [
+            f"{method} {self.prefix}{path} HTTP/1.1",
+            f"Host: {self._host_header}",
+            f"Content-Length: {len(body or b'')}",
+        ]
+        head += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        message = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + (body or b"")
+
+        async with self._slots:
+            async with asyncio.timeout(self.timeout):
+                while True:
+                    connection = await self._acquire()
+                    try:
+                        response, reusable = await self._exchange(connection, message)
+                    except _StaleConnectionError:
+                        connection.close()
+                        continue
+                    except BaseException:
+                        connection.close()
+                        raise
+                    break
+            if reusable:
+                connection.reused = True
+                self._idle.append(connection)
+            else:
+                connection.close()
+            return response
+
+    async def _acquire(self) -> _Connection:
+        while self._idle:
+            connection = self._idle.pop()
+            if not connection.writer.is_closing() and not connection.reader.at_eof():
+                return connection
+            connection.close()
+        reader, writer = await asyncio.open_connection(
+            self.host, self.port, ssl=self._ssl, limit=_MAX_LINE
+        )
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def _exchange(self, connection: _Connection, message: bytes) -> tuple[Response, bool]:
+        reader = connection.reader
+        try:
+            connection.writer.write(message)
+            await connection.writer.drain()
+            status_line = await reader.readline()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            if connection.reused:
+                raise _StaleConnectionError from None
+            raise
+        except ValueError as e:
+            raise _ProtocolError(f"Invalid response: {e}") from e
+        if not status_line:
+            if connection.reused:
+                raise _StaleConnectionError
+            raise ConnectionError("Server closed the connection without responding")
+        try:
+            return await self._read_response(reader, status_line)
+        except ValueError as e:
+            raise _ProtocolError(f"Invalid response: {e}") from e
+
+    @staticmethod
+    async def _read_response(
+        reader: asyncio.StreamReader, status_line: bytes
+    ) -> tuple[Response, bool]:
+        """Read a response after its status line.
+
+        Raises:
+            ValueError: If the response is not valid HTTP, or a line is
+                longer than ``_MAX_LINE``
+        """
+        while True:
+            version, _, rest = status_line.decode("latin-1").partition(" ")
+            status = rest[:3]
+            if not version.startswith("HTTP/") or not (status.isdigit() and len(status) == 3):
+                raise ValueError(f"status line {status_line[:100]!r}")
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            # Informational responses (such as 100 Continue) precede the final one
+            if not 100 <= int(status) < 200:
+                break
+            status_line = await reader.readline()
+
+        reusable = headers.get("connection", "").lower() != "close" and version != "HTTP/1.0"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while size := int((await reader.readline()).split(b";")[0], 16):
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            while await reader.readline() not in (b"\r\n", b"\n", b""):
+                pass
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            reusable = False
+        return Response(int(status), headers, body), reusable
+
+    async def aclose(self) -> None:
+        """Close the idle connections."""
+        while self._idle:
+            connection = self._idle.pop()
+            connection.close()
+            with contextlib.suppress(OSError):
+                await connection.writer.wait_closed()
+
+
+class TokenBucket:
+    """Rate limiter letting through ``rate`` requests per second on average.
+
+    Up to ``capacity`` requests (by default, one second's worth) may go out at
+    once after an idle period.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1.0))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until ``tokens`` are available, then take them."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """Random delay before retry number ``attempt`` (from 0), with full jitter."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def _retry_after(response: Response) -> float | None:
+    try:
+        return max(0.0, float(response.headers["retry-after"]))
+    except (KeyError, ValueError):
+        return None
+
+
+def message_content(response: Mapping[str, Any]) -> str:
+    """Text of the first choice of a chat completion response."""
+    return response["choices"][0]["message"]["content"]
+
+
+class AsyncClient:
+    """Async client for an OpenAI-compatible API.
+
+    Use it as an async context manager, or call :meth:`aclose` when done. In a
+    notebook, ``await`` its methods directly; in a script, run them with
+    :func:`asyncio.run`.
+
+    Args:
+        base_url: API URL, including its version prefix (such as ``/v1``)
+        api_key: API key, read from ``OPENGATELLM_API_KEY`` by default
+        model: Default model for requests that don't name one
+        max_concurrency: Most requests in flight (and open connections)
+        requests_per_second: Rate limit, if any
+        max_retries: Retries of each failed request before giving up
+        timeout: Seconds allowed for each attempt
+        cache: Cache of responses, to reuse instead of sending requests again
+
+    Examples:
+        In a notebook::
+
+            async with AsyncClient("https://albert.api.etalab.gouv.fr/v1", model=model) as client:
+                responses = await client.chat_batch(prompts, temperature=0)
+            answers = [message_content(response) for response in responses]
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str | None = None,
+        model: str | None = None,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        requests_per_second: float | None = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        timeout: float = DEFAULT_TIMEOUT,
+        cache: ResponseCache | None = None,
+    ):
+        self.pool = ConnectionPool(base_url, max_concurrency, timeout)
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.cache = cache
+        self.max_retries = max_retries
+        self.rate_limiter = (
+            None if requests_per_second is None else TokenBucket(requests_per_second)
+        )
+        api_key = api_key if api_key is not None else os.environ.get(API_KEY_VARIABLE)
+        self._headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        if api_key:
+            self._headers["Authorization"] = f"Bearer {api_key}"
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the client's connections."""
+        await self.pool.aclose()
+
+    async def post(self, path: str, payload: Mapping[str, Any]) -> Any:
+        """Send a JSON request, retrying transient failures, and decode its response.
+
+        With a cache, a response cached for the same URL and payload is
+        returned without sending the request.
+
+        Raises:
+            APIError: If the request still fails after ``max_retries`` retries,
+                fails with a status that is not worth retrying, or its
+                response is not JSON
+        """
+        if self.cache is not None:
+            key = cache_key(self.base_url + path, payload)
+            # SQLite calls may wait for another writer: keep them off the event loop
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            delay = None
+            try:
+                response = await self.pool.request("POST", path, body, self._headers)
+            except (OSError, TimeoutError, asyncio.IncompleteReadError) as e:
+                error = APIError(f"POST {path} failed: {e!r}")
+                error.__cause__ = e
+            else:
+                if response.status < 300:
+                    try:
+                        result = response.json()
+                    except ValueError as e:
+                        raise APIError(
+                            f"POST {path} returned invalid JSON: "
+                            f"{response.body[:200].decode(errors='replace')}",
+                            response.status,
+                            response.body,
+                        ) from e
+                    if self.cache is not None:
+                        await asyncio.to_thread(self.cache.set, key, result)
+                    return result
+                error = APIError(
+                    f"POST {path} returned {response.status}: "
+                    f"{response.body[:200].decode(errors='replace')}",
+                    response.status,
+                    response.body,
+                )
+                if response.status not in RETRY_STATUSES:
+                    raise error
+                delay = _retry_after(response)
+            if attempt < self.max_retries:
+                await asyncio.sleep(delay if delay is not None else backoff_delay(attempt))
+        raise error
+
+    def _model(self, model: str | None) -> str:
+        model = model or self.model
+        if model is None:
+            raise ValueError("No model given, and the client has no default model")
+        return model
+
+    async def chat(
+        self, messages: str | Sequence[Mapping[str, Any]], model: str | None = None, **params
+    ) -> dict:
+        """Chat completion of one conversation (or one user prompt).
+
+        Args:
+            messages: Messages of the conversation, or the user's prompt
+            model: Model, instead of the client's default
+            **params: Other request parameters, such as ``temperature``
+
+        Returns:
+            Decoded response
+        """
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        payload = {"model": self._model(model), "messages": list(messages), **params}
+        return await self.post("/chat/completions", payload)
+
+    async def chat_batch(
+        self,
+        conversations: Iterable[str | Sequence[Mapping[str, Any]]],
+        model: str | None = None,
+        return_exceptions: bool = False,
+        **params,
+    ) -> list:
+        """Chat completions of many conversations, sent concurrently.
+
+        Args:
+            conversations: Conversations, or user prompts
+            model: Model, instead of the client's default
+            return_exceptions: Return the :class:`APIError` of failed requests
+                in their place, instead of raising the first one
+            **params: Other request parameters, such as ``temperature``
+
+        Returns:
+            Decoded responses, in the order of ``conversations``
+        """
+        model = self._model(model)
+        return await self._map(
+            lambda messages: self.chat(messages, model, **params),
+            list(conversations),
+            return_exceptions,
+        )
+
+    async def embed(
+        self,
+        texts: Iterable[str],
+        model: str | None = None,
+        batch_size: int = DEFAULT_EMBEDDING_BATCH_SIZE,
+        **params,
+    ) -> np.ndarray:
+        """Embeddings of texts, sent ``batch_size`` texts per request.
+
+        Returns:
+            Embeddings, one row per text, in the order of ``texts``
+        """
+        model = self._model(model)
+        texts = list(texts)
+
+        async def embed_batch(batch: list[str]) -> list[list[float]]:
+            response = await self.post("/embeddings", {"model": model, "input": batch, **params})
+            data = sorted(response["data"], key=lambda item: item["index"])
+            return [item["embedding"] for item in data]
+
+        batches = [texts[start : start + batch_size] for start in range(0, len(texts), batch_size)]
+        embeddings = await self._map(embed_batch, batches)
+        return np.array([row for batch in embeddings for row in batch], dtype=np.float32)
+
+    async def _map(self, function, items: list, return_exceptions: bool = False) -> list:
+        """Results of ``function`` on every item, in order, from a fixed set of workers.
+
+        Workers take the next item as soon as they are free, so that large
+        batches don't create one task per item up front.
+        """
+        results: list = [None] * len(items)
+        next_item = iter(range(len(items)))
+
+        async def worker() -> None:
+            for i in next_item:
+                try:
+                    results[i] = await function(items[i])
+                except APIError as e:
+                    if not return_exceptions:
+                        raise
+                    results[i] = e
+
+        workers = min(self.pool.max_connections, len(items))
+        try:
+            async with asyncio.TaskGroup() as group:
+                for _ in range(workers):
+                    group.create_task(worker())
+        except ExceptionGroup as group:
+            raise group.exceptions[0] from None
+        return results
@@ -0,0 +1,413 @@
+"""ROC and precision-recall curves, threshold sweeps and calibration.
+
+:func:`binary_curves` splits the scores of positive and negative samples,
+sorts each once, and derives the confusion matrix at every distinct score
+from cumulative counts. The full ROC and PR curves, their areas, and the
+metrics at any threshold then come without another pass over the data.
+
+Scores and labels are read by chunks, so memory-mapped arrays only cost a
+sorted copy of the scores (in their own dtype) and, per distinct score, its
+threshold and two counts (int32 below 2^31 samples): up to 16 bytes per
+float32 score, plus temporary buffers of ``chunk_size`` samples::
+
+    y_score = np.load("scores.npy", mmap_mode="r")
+    y_true = np.load("labels.npy", mmap_mode="r")
+    curves = binary_curves(y_true, y_score)
+    curves.best_threshold("f1_score", minimums={"precision": 0.85})
+
+Examples:
+    >>> curves = binary_curves([0, 0, 1, 1], [0.1, 0.4, 0.35, 0.8])
+    >>> curves.roc_auc
+    0.75
+    >>> curves.thresholds.tolist()
+    [0.8, 0.4, 0.35, 0.1]
+    >>> curves.tp.tolist(), curves.fp.tolist()
+    ([1, 1, 2, 2], [0, 1, 1, 2])
+"""
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+# Confidence bins of the evaluation template's "Performance by Confidence" cell
+DEFAULT_CONFIDENCE_BINS = (0.0, 0.6, 0.8, 0.9, 1.0)
+
+DEFAULT_CHUNK_SIZE = 10_000_000
+
+# Metrics of threshold tables, as in the evaluation template's thresholds dict
+TABLE_METRICS = ("accuracy", "precision", "recall", "f1_score", "fpr")
+
+
+def _chunks(length: int, chunk_size: int):
+    for start in range(0, length, chunk_size):
+        yield slice(start, min(start + chunk_size, length))
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Element-wise ratio, 0 where the denominator is 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator, 0.0)
+
+
+@dataclass
+class Calibration:
+    """Accuracy and mean confidence by confidence bin.
+
+    Bins are closed on the right, as with ``pd.cut``: the first bin of the
+    default edges is ``(0, 0.6]``. Confidences outside the edges are counted
+    in the first or last bin.
+    """
+
+    edges: np.ndarray
+    count: np.ndarray
+    correct: np.ndarray
+    confidence_sum: np.ndarray
+
+    @classmethod
+    def empty(cls, edges: Sequence[float] = DEFAULT_CONFIDENCE_BINS) -> "Calibration":
+        """Calibration with no sample."""
+        edges = np.asarray(edges, dtype=np.float64)
+        if len(edges) < 2 or np.any(np.diff(edges) <= 0):
+            raise ValueError("Confidence bin edges must be increasing")
+        bins = len(edges) - 1
+        return cls(edges, np.zeros(bins, np.int64), np.zeros(bins, np.int64), np.zeros(bins))
+
+    def update(self, confidence: ArrayLike, correct: ArrayLike) -> "Calibration":
+        """Add samples, given their confidence and whether they were predicted correctly."""
+        confidence = np.asarray(confidence, dtype=np.float64).reshape(-1)
+        correct = np.asarray(correct, dtype=bool).reshape(-1)
+        if confidence.shape != correct.shape:
+            raise ValueError("confidence and correct must have the same length")
+        bins = len(self.count)
+        index = (np.searchsorted(self.edges, confidence, side="left") - 1).clip(0, bins - 1)
+        self.count += np.bincount(index, minlength=bins)
+        self.correct += np.bincount(index, weights=correct, minlength=bins).astype(np.int64)
+        self.confidence_sum += np.bincount(index, weights=confidence, minlength=bins)
+        return self
+
+    @property
+    def accuracy(self) -> np.ndarray:
+        """Accuracy of each bin (0 for empty bins)."""
+        return _ratio(self.correct, self.count)
+
+    @property
+    def mean_confidence(self) -> np.ndarray:
+        """Mean confidence of each bin (0 for empty bins)."""
+        return _ratio(self.confidence_sum, self.count)
+
+    @property
+    def ece(self) -> float:
+        """Expected calibration error: mean gap between accuracy and confidence."""
+        total = self.count.sum()
+        if not total:
+            return float("nan")
+        gaps = np.abs(self.accuracy - self.mean_confidence)
+        return float((gaps * self.count).sum() / total)
+
+    def rows(self) -> list[dict[str, Any]]:
+        """One row per bin: its range, sample count, accuracy and mean confidence."""
+        return [
+            {
+                "bin": (float(low), float(high)),
+                "count": int(count),
+                "accuracy": float(accuracy),
+                "mean_confidence": float(confidence),
+            }
+            for low, high, count, accuracy, confidence in zip(
+                self.edges[:-1],
+                self.edges[1:],
+                self.count,
+                self.accuracy,
+                self.mean_confidence,
+                strict=True,
+            )
+        ]
+
+
+def calibration(
+    confidence: ArrayLike,
+    correct: ArrayLike,
+    bins: Sequence[float] = DEFAULT_CONFIDENCE_BINS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Calibration:
+    """Accuracy by confidence bin and expected calibration error.
+
+    Args:
+        confidence: Confidence of each prediction, such as ``y_pred_proba.max(axis=1)``
+        correct: Whether each prediction is correct, such as ``y_pred == y_test``
+        bins: Bin edges
+        chunk_size: Samples read at once (for memory-mapped arrays)
+    """
+    if not isinstance(confidence, np.ndarray):
+        confidence = np.asarray(confidence, dtype=np.float64)
+    if not isinstance(correct, np.ndarray):
+        correct = np.asarray(correct, dtype=bool)
+    if len(confidence) != len(correct):
+        raise ValueError("confidence and correct must have the same length")
+    result = Calibration.empty(bins)
+    for chunk in _chunks(len(confidence), chunk_size):
+        result.update(confidence[chunk], correct[chunk])
+    return result
+
+
+@dataclass
+class Curves:
+    """Confusion matrix of a binary classifier at every distinct score.
+
+    ``tp[i]`` and ``fp[i]`` count the positive and negative samples scored
+    at least ``thresholds[i]``; thresholds are decreasing.
+    """
+
+    thresholds: np.ndarray
+    tp: np.ndarray
+    fp: np.ndarray
+    n_positive: int
+    n_negative: int
+    calibration: Calibration | None = None
+
+    @property
+    def fpr(self) -> np.ndarray:
+        """False positive rate at each threshold."""
+        return _ratio(self.fp, np.asarray(self.n_negative))
+
+    @property
+    def tpr(self) -> np.ndarray:
+        """True positive rate (recall) at each threshold."""
+        return _ratio(self.tp, np.asarray(self.n_positive))
+
+    @property
+    def precision(self) -> np.ndarray:
+        """Precision at each threshold."""
+        return _ratio(self.tp, self.tp + self.fp)
+
+    def roc(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ROC curve as ``(fpr, tpr, thresholds)``.
+
+        The curve starts at (0, 0), with an infinite threshold.
+        """
+        return (
+            np.concatenate([[0.0], self.fpr]),
+            np.concatenate([[0.0], self.tpr]),
+            np.concatenate([[np.inf], self.thresholds]),
+        )
+
+    def pr(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Precision-recall curve as ``(precision, recall, thresholds)``."""
+        return self.precision, self.tpr, self.thresholds
+
+    @property
+    def roc_auc(self) -> float:
+        """Area under the ROC curve (ties count as half)."""
+        if not self.n_positive or not self.n_negative:
+            return float("nan")
+        fpr, tpr, _ = self.roc()
+        return float(np.trapezoid(tpr, fpr))
+
+    @property
+    def average_precision(self) -> float:
+        """Area under the PR curve, as a step function (as scikit-learn computes it)."""
+        if not self.n_positive:
+            return float("nan")
+        recall_steps = np.diff(np.concatenate([[0.0], self.tpr]))
+        return float((recall_steps * self.precision).sum())
+
+    def _counts_at(self, thresholds: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """tp and fp when predicting positive from each of ``thresholds`` up."""
+        # Number of distinct scores at or above each threshold
+        above = len(self.thresholds) - np.searchsorted(
+            self.thresholds[::-1], thresholds, side="left"
+        )
+        tp = np.concatenate([[0], self.tp])[above]
+        fp = np.concatenate([[0], self.fp])[above]
+        return tp, fp
+
+    def table(
+        self, thresholds: ArrayLike | None = None, average: str = "binary"
+    ) -> dict[str, np.ndarray]:
+        """Metrics when predicting positive from each threshold up.
+
+        Args:
+            thresholds: Thresholds to evaluate (every distinct score by default)
+            average: ``"binary"`` for the metrics of the positive class, or
+                ``"weighted"`` for the support-weighted average of both
+                classes (the evaluation template's precision, recall and F1)
+
+        Returns:
+            Columns ``threshold``, ``tp``, ``fp``, ``fn``, ``tn`` and the
+            metrics of ``TABLE_METRICS``, as arrays
+        """
+        if average not in ("binary", "weighted"):
+            raise ValueError(f"Unknown average: {average}. Use binary or weighted")
+        if thresholds is None:
+            thresholds, tp, fp = self.thresholds, self.tp, self.fp
+        else:
+            thresholds = np.asarray(thresholds, dtype=np.float64).reshape(-1)
+            tp, fp = self._counts_at(thresholds)
+        fn = self.n_positive - tp
+        tn = self.n_negative - fp
+        total = self.n_positive + self.n_negative
+
+        def scores(tp, fp, fn):
+            precision = _ratio(tp, tp + fp)
+            recall = _ratio(tp, tp + fn)
+            return precision, recall, _ratio(2 * precision * recall, precision + recall)
+
+        precision, recall, f1 = scores(tp, fp, fn)
+        if average == "weighted":
+            # The negative class's own metrics, weighted by each class's support
+            negative = scores(tn, fn, fp)
+            precision, recall, f1 = (
+                (positive * self.n_positive + other * self.n_negative) / total
+                for positive, other in zip((precision, recall, f1), negative, strict=True)
+            )
+        return {
+            "threshold": thresholds,
+            "tp": tp,
+            "fp": fp,
+            "fn": fn,
+            "tn": tn,
+            "accuracy": _ratio(tp + tn, np.asarray(total)),
+            "precision": precision,
+            "recall": recall,
+            "f1_score": f1,
+            "fpr": _ratio(fp, np.asarray(self.n_negative)),
+        }
+
+    def best_threshold(
+        self,
+        metric: str = "f1_score",
+        minimums: Mapping[str, float] | None = None,
+        average: str = "binary",
+    ) -> float | None:
+        """Threshold maximizing a metric among those meeting minimum values.
+
+        Args:
+            metric: Metric of ``TABLE_METRICS`` to maximize
+            minimums: Minimum value of other metrics, such as the evaluation
+                template's ``thresholds`` dict
+            average: See :meth:`table`
+
+        Returns:
+            The threshold, or None if no threshold meets the minimums
+        """
+        if metric not in TABLE_METRICS:
+            raise ValueError(f"Unknown metric: {metric}. Use one of {', '.join(TABLE_METRICS)}")
+        table = self.table(average=average)
+        allowed = np.ones(len(self.thresholds), dtype=bool)
+        for name, minimum in (minimums or {}).items():
+            if name not in TABLE_METRICS:
+                raise ValueError(f"Unknown metric: {name}. Use one of {', '.join(TABLE_METRICS)}")
+            allowed &= table[name] >= minimum
+        if not allowed.any():
+            return None
+        values = np.where(allowed, table[metric], -np.inf)
+        return float(self.thresholds[np.argmax(values)])
+
+
+def _distinct_mask(sorted_values: np.ndarray) -> np.ndarray:
+    """Mask of the first occurrence of each value of a sorted array (either order)."""
+    keep = np.empty(len(sorted_values), dtype=bool)
+    if len(sorted_values):
+        keep[0] = True
+        np.not_equal(sorted_values[1:], sorted_values[:-1], out=keep[1:])
+    return keep
+
+
+def _distinct(sorted_values: np.ndarray) -> np.ndarray:
+    """Distinct values of a sorted array, in linear time."""
+    return sorted_values[_distinct_mask(sorted_values)]
+
+
+def binary_curves(
+    y_true: ArrayLike,
+    y_score: ArrayLike,
+    positive_label: Any = 1,
+    confidence_bins: Sequence[float] | None = DEFAULT_CONFIDENCE_BINS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Curves:
+    """Compute the confusion matrix of a binary classifier at every distinct score.
+
+    Args:
+        y_true: True labels (a memory-mapped array works)
+        y_score: Score of the positive class, such as ``y_pred_proba[:, 1]``
+        positive_label: Label of the positive class
+        confidence_bins: Confidence bin edges for calibration, or None to skip
+            it. Calibration treats scores as probabilities predicting positive
+            from 0.5, and is skipped if a score is outside [0, 1].
+        chunk_size: Samples read at once
+
+    Raises:
+        ValueError: If lengths differ or a score is NaN
+    """
+    if not isinstance(y_true, np.ndarray):
+        y_true = np.asarray(y_true)
+    if not isinstance(y_score, np.ndarray):
+        y_score = np.asarray(y_score, dtype=np.float64)
+    if len(y_true) != len(y_score):
+        raise ValueError("y_true and y_score must have the same length")
+    dtype = y_score.dtype if np.issubdtype(y_score.dtype, np.floating) else np.float64
+
+    # First pass: count positives, check scores and bin confidences
+    n_positive = 0
+    calibrated = Calibration.empty(confidence_bins) if confidence_bins is not None else None
+    for chunk in _chunks(len(y_score), chunk_size):
+        scores = y_score[chunk]
+        if np.isnan(scores).any():
+            raise ValueError("y_score contains NaN")
+        positive = y_true[chunk] == positive_label
+        n_positive += int(positive.sum())
+        if calibrated is not None:
+            if scores.min(initial=0.0) < 0 or scores.max(initial=1.0) > 1:
+                calibrated = None
+                continue
+            predicted = scores >= 0.5
+            calibrated.update(np.where(predicted, scores, 1 - scores), predicted == positive)
+    n_negative = len(y_score) - n_positive
+
+    # Second pass: split scores by label, then sort each side in place
+    positives = np.empty(n_positive, dtype=dtype)
+    negatives = np.empty(n_negative, dtype=dtype)
+    filled_positive = filled_negative = 0
+    for chunk in _chunks(len(y_score), chunk_size):
+        scores = y_score[chunk]
+        positive = y_true[chunk] == positive_label
+        count = int(positive.sum())
+        positives[filled_positive : filled_positive + count] = scores[positive]
+        negatives[filled_negative : filled_negative + len(scores) - count] = scores[~positive]
+        filled_positive += count
+        filled_negative += len(scores) - count
+    positives.sort()
+    negatives.sort()
+
+    # Distinct scores of both sides in one buffer; sorting two sorted runs
+    # merges them in linear time
+    keep_positive, keep_negative = _distinct_mask(positives), _distinct_mask(negatives)
+    n_kept = int(keep_positive.sum())
+    merged = np.empty(n_kept + int(keep_negative.sum()), dtype=dtype)
+    np.compress(keep_positive, positives, out=merged[:n_kept])
+    np.compress(keep_negative, negatives, out=merged[n_kept:])
+    del keep_positive, keep_negative
+    merged.sort(kind="stable")
+    # Decreasing and contiguous, so chunks of it are searched without a copy
+    thresholds = _distinct(merged[::-1])
+    del merged
+
+    count_dtype = np.int32 if len(y_score) <= np.iinfo(np.int32).max else np.int64
+    tp = np.empty(len(thresholds), dtype=count_dtype)
+    fp = np.empty(len(thresholds), dtype=count_dtype)
+    for counts, side in ((tp, positives), (fp, negatives)):
+        for chunk in _chunks(len(thresholds), chunk_size):
+            below = np.searchsorted(side, thresholds[chunk], side="left")
+            np.subtract(len(side), below, out=counts[chunk], casting="unsafe")
+            del below
+    return Curves(
+        thresholds=thresholds,
+        tp=tp,
+        fp=fp,
+        n_positive=n_positive,
+        n_negative=n_negative,
+        calibration=calibrated,
+    )
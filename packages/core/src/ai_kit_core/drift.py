@@ -0,0 +1,462 @@
+"""Distribution shift between a reference and a current dataset.
+
+Each column is summarized by a fixed-size sketch, updated chunk by chunk and
+merged by adding counts, so datasets of any size are compared without being
+held in memory:
+
+- numeric columns go in a histogram with logarithmic bins, where each value
+  is known to within ``RELATIVE_ACCURACY`` (the bins of a DDSketch, on a
+  fixed range, so no bin ever needs collapsing),
+- other columns go in counts of their ``DEFAULT_MAX_CATEGORIES`` most
+  frequent categories, the rarer ones being counted together.
+
+PSI and the Jensen-Shannon distance are computed on bins holding equal shares
+of the reference (deciles by default), and the Kolmogorov-Smirnov statistic
+on the sketch's own bins. Columns are sketched in parallel, each worker
+reading only its share of the columns (which Parquet files make cheap)::
+
+    reference = sketch_file("reference.parquet")
+    current = sketch_file("current.parquet")
+    for column, result in detect_drift(reference, current).items():
+        print(column, result.psi, result.severity)
+"""
+
+import math
+import os
+from collections import Counter
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from ai_kit_core.metrics import DEFAULT_BATCH_SIZE, iter_file_batches
+
+# Values are known to within this relative error in numeric sketches
+RELATIVE_ACCURACY = 0.01
+
+# Magnitudes below MIN_MAGNITUDE count as zero; those above MAX_MAGNITUDE go
+# in the outermost bins
+MIN_MAGNITUDE = 1e-9
+MAX_MAGNITUDE = 1e15
+
+DEFAULT_DRIFT_BINS = 10
+
+# Categories counted one by one in categorical sketches; rarer ones go in "other"
+DEFAULT_MAX_CATEGORIES = 1000
+
+# Usual reading of PSI: below 0.1 no shift, above 0.25 a significant one
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+# Share given to bins empty on one side, so that PSI stays finite
+_EMPTY_SHARE = 1e-4
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+_MIN_KEY = math.ceil(math.log(MIN_MAGNITUDE) / _LOG_GAMMA)
+_MAX_KEY = math.ceil(math.log(MAX_MAGNITUDE) / _LOG_GAMMA)
+# Keys per sign; bins are negative values (largest magnitude first), zero, positive values
+_KEYS = _MAX_KEY - _MIN_KEY + 1
+_ZERO = _KEYS
+
+
+@dataclass
+class NumericSketch:
+    """Counts of a numeric column's values in logarithmic bins.
+
+    Bin ``_ZERO + 1 + i`` holds positive values in
+    ``(gamma ** (key - 1), gamma ** key]`` with ``key = _MIN_KEY + i``, and
+    negative values mirror them below ``_ZERO``, so bins are in increasing
+    order of value.
+    """
+
+    counts: np.ndarray = field(default_factory=lambda: np.zeros(2 * _KEYS + 1, np.int64))
+    missing: int = 0
+
+    @property
+    def count(self) -> int:
+        """Number of values, missing ones included."""
+        return int(self.counts.sum()) + self.missing
+
+    def update(self, values: ArrayLike) -> "NumericSketch":
+        """Add a chunk of values (NaN counts as missing)."""
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        missing = np.isnan(values)
+        self.missing += int(missing.sum())
+        values = values[~missing]
+        magnitude = np.abs(values)
+        with np.errstate(divide="ignore"):
+            keys = np.ceil(np.log(np.maximum(magnitude, MIN_MAGNITUDE)) / _LOG_GAMMA)
+        offsets = keys.clip(_MIN_KEY, _MAX_KEY).astype(np.int64) - _MIN_KEY + 1
+        bins = np.where(
+            magnitude < MIN_MAGNITUDE, _ZERO, np.where(values > 0, _ZERO + offsets, _ZERO - offsets)
+        )
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+        return self
+
+    def merge(self, other: "NumericSketch") -> "NumericSketch":
+        """Add the counts of a sketch of other values of the column."""
+        self.counts += other.counts
+        self.missing += other.missing
+        return self
+
+    @staticmethod
+    def values(bins: np.ndarray) -> np.ndarray:
+        """Value representing each bin, within ``RELATIVE_ACCURACY`` of its values."""
+        offsets = np.abs(bins - _ZERO)
+        magnitude = 2 * _GAMMA ** (_MIN_KEY + offsets - 1) / (_GAMMA + 1)
+        return np.where(bins == _ZERO, 0.0, np.sign(bins - _ZERO) * magnitude)
+
+    def quantile(self, q: float | ArrayLike) -> np.ndarray | float:
+        """Approximate quantiles of the non-missing values (NaN if there are none)."""
+        q = np.asarray(q, dtype=np.float64)
+        total = self.counts.sum()
+        if not total:
+            return np.full(q.shape, np.nan) if q.ndim else float("nan")
+        ranks = np.minimum(np.ceil(q * total), total).clip(1, None)
+        result = self.values(np.searchsorted(np.cumsum(self.counts), ranks))
+        return result if q.ndim else float(result)
+
+    def to_categorical(self) -> "CategoricalSketch":
+        """Categorical sketch of the same values, each named after its bin's value."""
+        bins = np.flatnonzero(self.counts)
+        categories = [f"{value:.6g}" for value in self.values(bins).tolist()]
+        sketch = CategoricalSketch(missing=self.missing)
+        for category, count in zip(categories, self.counts[bins].tolist(), strict=True):
+            sketch.counts[category] += count
+        return sketch._fold()
+
+
+@dataclass
+class CategoricalSketch:
+    """Counts of a column's most frequent categories.
+
+    Past ``max_categories`` categories, the least frequent ones are folded
+    into ``other``, so that ID or free-text columns keep a fixed size. A
+    folded category seen again starts counting from zero, so counts near the
+    cut are approximate.
+    """
+
+    counts: Counter = field(default_factory=Counter)
+    missing: int = 0
+    other: int = 0
+    max_categories: int = DEFAULT_MAX_CATEGORIES
+
+    @property
+    def count(self) -> int:
+        """Number of values, missing ones included."""
+        return sum(self.counts.values()) + self.other + self.missing
+
+    def update(self, values: ArrayLike) -> "CategoricalSketch":
+        """Add a chunk of values (None and NaN count as missing)."""
+        values = np.asarray(values).reshape(-1)
+        if values.dtype.kind not in "US":
+            values = values.astype(object)
+            # NaN is the only value different from itself
+            missing = (values == None) | (values != values)
+            self.missing += int(missing.sum())
+            values = values[~missing].astype(str)
+        categories, counts = np.unique(values, return_counts=True)
+        self.counts.update(dict(zip(categories.tolist(), counts.tolist(), strict=True)))
+        return self._fold()
+
+    def merge(self, other: "CategoricalSketch") -> "CategoricalSketch":
+        """Add the counts of a sketch of other values of the column."""
+        self.counts.update(other.counts)
+        self.missing += other.missing
+        self.other += other.other
+        return self._fold()
+
+    def _fold(self) -> "CategoricalSketch":
+        """Fold the least frequent categories into ``other``."""
+        if len(self.counts) > self.max_categories:
+            kept = Counter(dict(self.counts.most_common(self.max_categories)))
+            self.other += sum(self.counts.values()) - sum(kept.values())
+            self.counts = kept
+        return self
+
+
+Sketch = NumericSketch | CategoricalSketch
+
+
+def _missing(values: np.ndarray) -> np.ndarray:
+    """Mask of the None and NaN values of a chunk."""
+    if values.dtype.kind in "fc":
+        return np.isnan(values)
+    if values.dtype.kind in "mM":
+        return np.isnat(values)
+    if values.dtype.kind == "O":
+        # NaN is the only value different from itself
+        return (values == None) | (values != values)
+    return np.zeros(values.shape, dtype=bool)
+
+
+def _is_numeric(values: np.ndarray) -> bool:
+    """Whether a chunk's values are numbers or booleans, None aside."""
+    if values.dtype.kind == "O":
+        return all(
+            value is None or isinstance(value, (int, float, np.number)) for value in values.tolist()
+        )
+    return np.issubdtype(values.dtype, np.number) or np.issubdtype(values.dtype, np.bool_)
+
+
+def new_sketch(values: ArrayLike) -> Sketch:
+    """Empty sketch for a column, numeric or categorical depending on its non-missing values."""
+    if _is_numeric(np.asarray(values).reshape(-1)):
+        return NumericSketch()
+    return CategoricalSketch()
+
+
+def sketch_batches(
+    batches: Iterable[Mapping[str, ArrayLike]], columns: Sequence[str] | None = None
+) -> dict[str, Sketch]:
+    """Sketch columns of a stream of batches (mappings of column name to values).
+
+    A column's type is taken from its first non-missing values. Should a
+    numeric column hold text further on (as a CSV column read by chunks
+    may), its sketch turns categorical, the values seen so far counting as
+    the representative value of their bin.
+
+    Args:
+        batches: Batches, such as those of ``ai_kit_core.metrics.iter_file_batches``
+        columns: Columns to sketch (every column of the first batch by default)
+    """
+    sketches: dict[str, Sketch | None] = {}
+    # Missing values of the columns whose type is not known yet
+    pending: Counter = Counter()
+    for batch in batches:
+        for column in columns if columns is not None else batch:
+            values = np.asarray(batch[column]).reshape(-1)
+            sketch = sketches.setdefault(column, None)
+            if sketch is None:
+                missing = _missing(values)
+                if missing.all():
+                    pending[column] += len(values)
+                    continue
+                sketch = sketches[column] = new_sketch(values[~missing])
+                sketch.missing += pending.pop(column, 0)
+            elif isinstance(sketch, NumericSketch) and not _is_numeric(values):
+                sketch = sketches[column] = sketch.to_categorical()
+            sketch.update(values)
+    return {
+        column: NumericSketch(missing=pending[column]) if sketch is None else sketch
+        for column, sketch in sketches.items()
+    }
+
+
+def merge_sketches(*sketches: Mapping[str, Sketch]) -> dict[str, Sketch]:
+    """Merge sketches of the same columns computed on separate parts of a dataset.
+
+    A column numeric in some parts and categorical in others gets a
+    categorical sketch, as in ``sketch_batches``.
+    """
+    merged: dict[str, Sketch] = {}
+    for part in sketches:
+        for column, sketch in part.items():
+            if column not in merged:
+                merged[column] = deepcopy(sketch)
+                continue
+            # A column holding text in some parts only is categorical
+            if type(merged[column]) is not type(sketch):
+                if isinstance(sketch, NumericSketch):
+                    sketch = sketch.to_categorical()
+                else:
+                    merged[column] = merged[column].to_categorical()
+            merged[column].merge(sketch)
+    return merged
+
+
+def _sketch_group(
+    read_batches: Callable[[list[str]], Iterable[Mapping[str, ArrayLike]]], columns: list[str]
+) -> dict[str, Sketch]:
+    return sketch_batches(read_batches(columns), columns)
+
+
+def sketch_columns(
+    read_batches: Callable[[list[str]], Iterable[Mapping[str, ArrayLike]]],
+    columns: Sequence[str],
+    max_workers: int | None = None,
+) -> dict[str, Sketch]:
+    """Sketch columns in worker processes, each reading its share of the columns.
+
+    Args:
+        read_batches: Picklable function returning batches of the given
+            columns, such as ``partial(iter_file_batches, path)``
+        columns: Columns to sketch
+        max_workers: Worker processes (defaults to the number of CPUs); 1
+            sketches in this process
+    """
+    columns = list(columns)
+    workers = min(max_workers or os.cpu_count() or 1, len(columns))
+    if workers <= 1:
+        return _sketch_group(read_batches, columns)
+    groups = [list(group) for group in np.array_split(np.array(columns, dtype=object), workers)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parts = executor.map(_sketch_group, [read_batches] * workers, groups)
+        sketches = merge_sketches(*parts)
+    return {column: sketches[column] for column in columns}
+
+
+def file_columns(path: Path) -> list[str]:
+    """Column names of a CSV or Parquet file.
+
+    Raises:
+        ImportError: If pandas (CSV) or pyarrow (Parquet) is not installed
+    """
+    if Path(path).suffix.lower() in (".parquet", ".pq"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("pyarrow is not installed. Install with: uv add pyarrow") from e
+        return list(pq.read_schema(path).names)
+    try:
+        import pandas as pd
+    except ImportError as e:
+        raise ImportError("pandas is not installed. Install with: uv add pandas") from e
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def sketch_file(
+    path: Path,
+    columns: Sequence[str] | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_workers: int | None = None,
+) -> dict[str, Sketch]:
+    """Sketch columns of a CSV or Parquet file, in parallel across columns.
+
+    Args:
+        path: File to read
+        columns: Columns to sketch (all by default)
+        batch_size: Rows read at once
+        max_workers: Worker processes (defaults to the number of CPUs)
+    """
+    read_batches = partial(iter_file_batches, path, batch_size=batch_size)
+    return sketch_columns(read_batches, columns or file_columns(path), max_workers)
+
+
+@dataclass
+class DriftResult:
+    """Shift of a column between the reference and current data.
+
+    ``ks`` is None for categorical columns. Missing values are a bin of
+    their own for PSI and the Jensen-Shannon distance, as are the categories
+    folded into ``other`` by either sketch.
+    """
+
+    psi: float
+    js: float
+    ks: float | None
+    reference_count: int
+    current_count: int
+    reference_missing: float
+    current_missing: float
+
+    @property
+    def severity(self) -> str:
+        """``"none"``, ``"moderate"`` or ``"significant"``, from the usual PSI thresholds."""
+        if self.psi >= PSI_SIGNIFICANT:
+            return "significant"
+        if self.psi >= PSI_MODERATE:
+            return "moderate"
+        return "none"
+
+
+def _shares(counts: np.ndarray) -> np.ndarray:
+    total = counts.sum()
+    return counts / total if total else counts.astype(np.float64)
+
+
+def _psi(reference: np.ndarray, current: np.ndarray) -> float:
+    reference = np.maximum(_shares(reference), _EMPTY_SHARE)
+    current = np.maximum(_shares(current), _EMPTY_SHARE)
+    return float(((current - reference) * np.log(current / reference)).sum())
+
+
+def _js(reference: np.ndarray, current: np.ndarray) -> float:
+    """Jensen-Shannon distance in base 2, between 0 and 1."""
+    reference, current = _shares(reference), _shares(current)
+    middle = (reference + current) / 2
+
+    def kl(p: np.ndarray) -> float:
+        present = p > 0
+        return float((p[present] * np.log2(p[present] / middle[present])).sum())
+
+    return math.sqrt(max(0.0, (kl(reference) + kl(current)) / 2))
+
+
+def _quantile_bins(reference: NumericSketch, current: NumericSketch, n_bins: int):
+    """Counts of both sketches in bins holding equal shares of the reference."""
+    cumulative = np.cumsum(reference.counts)
+    total = cumulative[-1]
+    if total:
+        cuts = np.searchsorted(cumulative, total * np.arange(1, n_bins) / n_bins)
+        starts = np.unique(np.concatenate([[0], cuts + 1]))
+        starts = starts[starts < len(cumulative)]
+    else:
+        starts = np.array([0])
+    return (
+        np.append(np.add.reduceat(reference.counts, starts), reference.missing),
+        np.append(np.add.reduceat(current.counts, starts), current.missing),
+    )
+
+
+def compare(reference: Sketch, current: Sketch, n_bins: int = DEFAULT_DRIFT_BINS) -> DriftResult:
+    """Measure the shift of a column between two sketches.
+
+    Raises:
+        ValueError: If one column is numeric and the other categorical
+    """
+    if type(reference) is not type(current):
+        raise ValueError("Cannot compare a numeric and a categorical column")
+    ks = None
+    if isinstance(reference, NumericSketch):
+        reference_counts, current_counts = _quantile_bins(reference, current, n_bins)
+        # Over non-missing values, at every sketch bin boundary
+        reference_cdf = np.cumsum(_shares(reference.counts))
+        current_cdf = np.cumsum(_shares(current.counts))
+        if reference.counts.any() and current.counts.any():
+            ks = float(np.abs(reference_cdf - current_cdf).max())
+        else:
+            ks = float("nan")
+    else:
+        categories = sorted(reference.counts.keys() | current.counts.keys())
+        reference_counts, current_counts = (
+            np.array(
+                [sketch.counts[c] for c in categories] + [sketch.other, sketch.missing],
+                dtype=np.int64,
+            )
+            for sketch in (reference, current)
+        )
+    return DriftResult(
+        psi=_psi(reference_counts, current_counts),
+        js=_js(reference_counts, current_counts),
+        ks=ks,
+        reference_count=reference.count,
+        current_count=current.count,
+        reference_missing=reference.missing / reference.count if reference.count else 0.0,
+        current_missing=current.missing / current.count if current.count else 0.0,
+    )
+
+
+def detect_drift(
+    reference: Mapping[str, Sketch],
+    current: Mapping[str, Sketch],
+    n_bins: int = DEFAULT_DRIFT_BINS,
+) -> dict[str, DriftResult]:
+    """Measure the shift of every column sketched in both datasets.
+
+    Args:
+        reference: Sketches of the reference data (such as the training set)
+        current: Sketches of the current data
+        n_bins: Reference quantile bins for PSI and the Jensen-Shannon distance
+    """
+    return {
+        column: compare(reference[column], current[column], n_bins)
+        for column in reference
+        if column in current
+    }
@@ -0,0 +1,274 @@
+"""Group fairness metrics over NumPy arrays.
+
+Every group's confusion matrix is counted in a single ``np.bincount`` over
+integer group codes, instead of building boolean masks group by group, so the
+cost is one pass over the predictions whatever the number of groups. Groups
+can be the intersection of several protected attributes (for example gender
+and age band).
+
+Examples:
+    >>> import numpy as np
+    >>> y_true = np.array([1, 0, 1, 1, 0, 0])
+    >>> y_pred = np.array([1, 0, 0, 1, 1, 0])
+    >>> gender = np.array(["f", "f", "f", "m", "m", "m"])
+    >>> report = fairness_metrics(y_true, y_pred, gender)
+    >>> report.groups
+    ['f', 'm']
+    >>> report.positive_rate.round(3).tolist()
+    [0.333, 0.667]
+    >>> round(report.disparate_impact, 3)
+    0.5
+"""
+
+from dataclasses import dataclass
+from math import prod
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+# Threshold of the "four-fifths rule" used in the evaluation template
+DISPARATE_IMPACT_THRESHOLD = 0.8
+
+# Threshold on TPR and FPR differences used in the evaluation template
+EQUALIZED_ODDS_THRESHOLD = 0.1
+
+
+def _is_missing(value: Any) -> bool:
+    """Whether a value is None, NaN, or pandas' NA or NaT."""
+    if value is None or type(value).__name__ in ("NAType", "NaTType"):
+        return True
+    return isinstance(value, float | np.floating) and np.isnan(value)
+
+
+def _unique(attribute: ArrayLike) -> tuple[np.ndarray, np.ndarray]:
+    """Sorted distinct values, then None for missing values, and each sample's index."""
+    array = np.asarray(attribute).reshape(-1)
+    if array.dtype == object:
+        missing = np.fromiter(map(_is_missing, array), dtype=bool, count=len(array))
+    elif array.dtype.kind in "fc":
+        missing = np.isnan(array)
+    else:
+        missing = np.zeros(len(array), dtype=bool)
+    try:
+        unique, inverse = np.unique(array[~missing], return_inverse=True)
+    except TypeError as e:
+        raise ValueError(f"Protected attribute values cannot be sorted: {e}") from e
+    if not missing.any():
+        return unique, inverse.reshape(-1)
+    codes = np.full(len(array), len(unique))
+    codes[~missing] = inverse.reshape(-1)
+    return np.array([*unique.tolist(), None], dtype=object), codes
+
+
+def encode_groups(*attributes: ArrayLike) -> tuple[np.ndarray, list[Any]]:
+    """Integer-code the groups formed by one or more protected attributes.
+
+    Only the combinations that occur are kept as groups, so intersecting
+    attributes does not create empty groups.
+
+    Args:
+        attributes: Arrays of the same length (strings, integers, ...)
+
+    Returns:
+        The group code of each sample, in ``range(len(labels))``, and the
+        group labels: the attribute value for a single attribute, a tuple of
+        values for an intersection. Labels are sorted; missing values (None,
+        NaN) form a group labelled None, after the others.
+
+    Raises:
+        ValueError: If no attribute is given, their lengths differ, or an
+            attribute mixes values that cannot be compared
+    """
+    if not attributes:
+        raise ValueError("At least one protected attribute is required")
+    values, inverses = [], []
+    for attribute in attributes:
+        unique, inverse = _unique(attribute)
+        values.append(unique)
+        inverses.append(inverse)
+    if len({len(inverse) for inverse in inverses}) > 1:
+        raise ValueError("Protected attributes must have the same length")
+
+    if len(attributes) == 1:
+        return inverses[0], values[0].tolist()
+
+    sizes = [len(unique) for unique in values]
+    if prod(sizes) < np.iinfo(np.int64).max:
+        combined = np.ravel_multi_index(inverses, sizes)
+        present, codes = np.unique(combined, return_inverse=True)
+        indices = np.unravel_index(present, sizes)
+    else:
+        rows, codes = np.unique(np.stack(inverses, axis=1), axis=0, return_inverse=True)
+        indices = rows.T
+    labels = list(
+        zip(
+            *(unique[index].tolist() for unique, index in zip(values, indices, strict=True)),
+            strict=True,
+        )
+    )
+    return codes.reshape(-1), labels
+
+
+def confusion_by_group(
+    y_true: ArrayLike, y_pred: ArrayLike, codes: ArrayLike, n_groups: int, positive_label: Any = 1
+) -> np.ndarray:
+    """Count each group's binary confusion matrix in one pass.
+
+    Args:
+        y_true: True labels
+        y_pred: Predicted labels
+        codes: Group code of each sample, in ``range(n_groups)``
+        n_groups: Number of groups
+        positive_label: Label of the positive class
+
+    Returns:
+        An array of shape ``(n_groups, 2, 2)`` indexed by group, true label
+        and predicted label (0 for negative, 1 for positive), so that
+        ``counts[g, 1, 1]`` is the true positives of group ``g``.
+
+    Raises:
+        ValueError: If the arrays' lengths differ
+    """
+    positive_true = np.asarray(y_true) == positive_label
+    positive_pred = np.asarray(y_pred) == positive_label
+    codes = np.asarray(codes, dtype=np.int64)
+    if not positive_true.shape == positive_pred.shape == codes.shape:
+        raise ValueError("y_true, y_pred and protected attributes must have the same length")
+    cells = codes * 4 + positive_true * 2 + positive_pred
+    return np.bincount(cells, minlength=n_groups * 4).reshape(n_groups, 2, 2)
+
+
+def _rate(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def _gap(rates: np.ndarray) -> float:
+    """Largest difference between two groups, ignoring undefined rates."""
+    rates = rates[~np.isnan(rates)]
+    return float(rates.max() - rates.min()) if len(rates) else float("nan")
+
+
+@dataclass
+class FairnessReport:
+    """Fairness metrics of every group.
+
+    Rates are arrays aligned with ``groups``. A rate is NaN for a group with
+    no sample to compute it on (for example the TPR of a group without
+    positives); such groups are ignored by the gaps. Groups smaller than
+    ``min_group_size`` are reported but also left out of the gaps and of the
+    disparate impact.
+    """
+
+    groups: list[Any]
+    counts: np.ndarray
+    min_group_size: int = 1
+
+    @property
+    def sample_size(self) -> np.ndarray:
+        """Number of samples of each group."""
+        return self.counts.sum(axis=(1, 2))
+
+    @property
+    def positive_rate(self) -> np.ndarray:
+        """Demographic parity: P(ŷ=1 | A=a)."""
+        return _rate(self.counts[:, :, 1].sum(axis=1), self.sample_size)
+
+    @property
+    def tpr(self) -> np.ndarray:
+        """Equal opportunity: P(ŷ=1 | y=1, A=a)."""
+        return _rate(self.counts[:, 1, 1], self.counts[:, 1].sum(axis=1))
+
+    @property
+    def fpr(self) -> np.ndarray:
+        """P(ŷ=1 | y=0, A=a)."""
+        return _rate(self.counts[:, 0, 1], self.counts[:, 0].sum(axis=1))
+
+    def _compared(self, rates: np.ndarray) -> np.ndarray:
+        return rates[self.sample_size >= self.min_group_size]
+
+    @property
+    def disparate_impact(self) -> float:
+        """Lowest positive rate divided by the highest (0 if none is positive)."""
+        rates = self._compared(self.positive_rate)
+        rates = rates[~np.isnan(rates)]
+        if not len(rates) or rates.max() == 0:
+            return 0.0
+        return float(rates.min() / rates.max())
+
+    @property
+    def demographic_parity_difference(self) -> float:
+        """Largest difference of positive rate between groups."""
+        return _gap(self._compared(self.positive_rate))
+
+    @property
+    def equal_opportunity_difference(self) -> float:
+        """Largest difference of TPR between groups."""
+        return _gap(self._compared(self.tpr))
+
+    @property
+    def equalized_odds_difference(self) -> float:
+        """Largest difference of TPR or FPR between groups."""
+        gaps = [_gap(self._compared(self.tpr)), _gap(self._compared(self.fpr))]
+        defined = [gap for gap in gaps if not np.isnan(gap)]
+        return max(defined) if defined else float("nan")
+
+    def passes(
+        self,
+        disparate_impact: float = DISPARATE_IMPACT_THRESHOLD,
+        equalized_odds: float = EQUALIZED_ODDS_THRESHOLD,
+    ) -> bool:
+        """Whether the thresholds of the evaluation template are met."""
+        return (
+            self.disparate_impact > disparate_impact
+            and self.equalized_odds_difference < equalized_odds
+        )
+
+    def to_dict(self) -> dict[Any, dict[str, float | int]]:
+        """Metrics by group, in the format of the evaluation template."""
+        return {
+            group: {
+                "positive_rate": float(positive_rate),
+                "tpr": float(tpr),
+                "fpr": float(fpr),
+                "sample_size": int(size),
+            }
+            for group, positive_rate, tpr, fpr, size in zip(
+                self.groups,
+                self.positive_rate,
+                self.tpr,
+                self.fpr,
+                self.sample_size,
+                strict=True,
+            )
+        }
+
+
+def fairness_metrics(
+    y_true: ArrayLike,
+    y_pred: ArrayLike,
+    *protected_attributes: ArrayLike,
+    positive_label: Any = 1,
+    min_group_size: int = 1,
+) -> FairnessReport:
+    """Compute fairness metrics for the groups of one or more protected attributes.
+
+    With several attributes, groups are their intersections.
+
+    Args:
+        y_true: True labels
+        y_pred: Predicted labels
+        protected_attributes: Protected attribute arrays (pandas Series work too)
+        positive_label: Label of the positive class
+        min_group_size: Smallest group compared by the gaps and disparate impact
+
+    Returns:
+        The metrics of every group
+
+    Raises:
+        ValueError: If no attribute is given or lengths differ
+    """
+    codes, groups = encode_groups(*protected_attributes)
+    counts = confusion_by_group(y_true, y_pred, codes, len(groups), positive_label)
+    return FairnessReport(groups=groups, counts=counts, min_group_size=min_group_size)
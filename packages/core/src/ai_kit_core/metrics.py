@@ -0,0 +1,434 @@
+"""Streaming classification metrics.
+
+:class:`MetricsAccumulator` takes predictions batch by batch (from a chunked
+file, or from a model inference loop) and keeps only a confusion matrix and,
+for ROC AUC, a fixed-size histogram of scores per class. Every metric of the
+evaluation template is derived from those counts, whatever the number of
+predictions, and accumulators computed on separate shards (for example in
+worker processes) are merged by adding their counts.
+
+Examples:
+    >>> accumulator = MetricsAccumulator(classes=[0, 1])
+    >>> for y_true, y_pred, y_score in [([0, 1], [0, 1], [0.2, 0.9]), ([1], [0], [0.4])]:
+    ...     _ = accumulator.update(y_true, y_pred, y_score)
+    >>> accumulator.count
+    3
+    >>> round(accumulator.metrics()["accuracy"], 3)
+    0.667
+"""
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+# Score histogram resolution: scores closer than 1 / DEFAULT_BINS count as ties
+DEFAULT_BINS = 10_000
+
+DEFAULT_BATCH_SIZE = 100_000
+
+
+class MetricsAccumulator:
+    """Confusion matrix and score histograms of the predictions seen so far.
+
+    ROC AUC is computed from score histograms, so scores falling in the same
+    bin count as ties: the result differs from the exact AUC by at most half
+    the fraction of (positive, negative) pairs sharing a bin.
+
+    Args:
+        classes: Every label that can occur, in the order of score columns
+        n_bins: Number of score histogram bins
+        score_range: Range of scores; scores outside it go in the edge bins
+    """
+
+    def __init__(
+        self,
+        classes: Sequence[Any],
+        n_bins: int = DEFAULT_BINS,
+        score_range: tuple[float, float] = (0.0, 1.0),
+    ):
+        self.classes = list(classes)
+        if len(self.classes) < 2:
+            raise ValueError("At least two classes are required")
+        if len(set(self.classes)) != len(self.classes):
+            raise ValueError("Classes must be unique")
+        self.n_bins = n_bins
+        self.score_range = score_range
+        k = len(self.classes)
+        self.confusion_matrix = np.zeros((k, k), dtype=np.int64)
+        # Binary problems are scored on the positive (last) class only
+        self._scored_classes = [1] if k == 2 else list(range(k))
+        # Indexed by scored class, label (0 for other classes, 1 for this one) and bin
+        self.score_histogram = np.zeros((len(self._scored_classes), 2, n_bins), dtype=np.int64)
+        self._sorted = np.asarray(self.classes)
+        self._order = np.argsort(self._sorted, kind="stable")
+        self._sorted = self._sorted[self._order]
+
+    @property
+    def count(self) -> int:
+        """Number of predictions accumulated."""
+        return int(self.confusion_matrix.sum())
+
+    @property
+    def scored(self) -> bool:
+        """Whether scores were given with the predictions."""
+        return bool(self.score_histogram.any())
+
+    def _indices(self, labels: ArrayLike) -> np.ndarray:
+        """Position of each label in ``classes``."""
+        labels = np.asarray(labels).reshape(-1)
+        positions = np.searchsorted(self._sorted, labels).clip(0, len(self.classes) - 1)
+        unknown = self._sorted[positions] != labels
+        if unknown.any():
+            raise ValueError(f"Unknown label: {labels[unknown][0].item()!r}")
+        return self._order[positions]
+
+    def update(
+        self, y_true: ArrayLike, y_pred: ArrayLike, y_score: ArrayLike | None = None
+    ) -> "MetricsAccumulator":
+        """Add a batch of predictions.
+
+        Args:
+            y_true: True labels
+            y_pred: Predicted labels
+            y_score: Class probabilities (or scores) of shape ``(n, len(classes))``,
+                or of shape ``(n,)`` for the positive class of a binary problem
+
+        Returns:
+            The accumulator, updated in place
+
+        Raises:
+            ValueError: On unknown labels, mismatched lengths, NaN or infinite
+                scores, or scores given for some batches only
+        """
+        if (y_score is None) == self.scored and self.count:
+            raise ValueError("y_score must be given with every batch or with none")
+
+        # Every cell is computed (and validated) before any count changes
+        confusion_cells, score_cells = self.cells(y_true, y_pred, y_score)
+        self.confusion_matrix += np.bincount(
+            confusion_cells, minlength=self.confusion_matrix.size
+        ).reshape(self.confusion_matrix.shape)
+        if score_cells is not None:
+            self.score_histogram += np.bincount(
+                score_cells.reshape(-1), minlength=self.score_histogram.size
+            ).reshape(self.score_histogram.shape)
+        return self
+
+    def cells(
+        self, y_true: ArrayLike, y_pred: ArrayLike, y_score: ArrayLike | None = None
+    ) -> tuple[np.ndarray, np.ndarray | None]:
+        """Cells of the confusion matrix and score histogram each prediction counts in.
+
+        The counts of a batch are the bincounts of its cells, so weighting
+        the cells gives the counts of a resample of the batch (see
+        ``ai_kit_core.stats``).
+
+        Returns:
+            Flat indices into ``confusion_matrix``, of shape ``(n,)``, and into
+            ``score_histogram``, of shape ``(n, scored classes)`` (None
+            without scores)
+
+        Raises:
+            ValueError: On unknown labels, mismatched lengths, or NaN or
+                infinite scores
+        """
+        true = self._indices(y_true)
+        pred = self._indices(y_pred)
+        if len(true) != len(pred):
+            raise ValueError("y_true and y_pred must have the same length")
+        score_cells = None
+        if y_score is not None:
+            score_cells = self._score_cells(true, np.asarray(y_score, dtype=np.float64))
+        return true * len(self.classes) + pred, score_cells
+
+    def _score_cells(self, true: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        if scores.ndim == 1 and len(self.classes) == 2:
+            scores = scores[:, None]
+        elif scores.ndim == 2 and scores.shape[1] == len(self.classes):
+            scores = scores[:, self._scored_classes]
+        else:
+            raise ValueError(
+                f"y_score must have shape (n, {len(self.classes)})"
+                + (" or (n,)" if len(self.classes) == 2 else "")
+            )
+        if len(scores) != len(true):
+            raise ValueError("y_score and y_true must have the same length")
+        if not np.isfinite(scores).all():
+            raise ValueError("y_score contains NaN or infinite values")
+
+        low, high = self.score_range
+        bins = ((scores - low) * (self.n_bins / (high - low))).astype(np.int64)
+        bins = bins.clip(0, self.n_bins - 1)
+        scored = np.asarray(self._scored_classes)
+        # Indexed by (class, label, bin)
+        return (
+            np.arange(len(scored)) * (2 * self.n_bins)
+            + (true[:, None] == scored) * self.n_bins
+            + bins
+        )
+
+    def merge(self, other: "MetricsAccumulator") -> "MetricsAccumulator":
+        """Add the counts of an accumulator built on other predictions.
+
+        Raises:
+            ValueError: If the accumulators have different classes or bins
+        """
+        if (self.classes, self.n_bins, tuple(self.score_range)) != (
+            other.classes,
+            other.n_bins,
+            tuple(other.score_range),
+        ):
+            raise ValueError("Cannot merge accumulators with different classes or bins")
+        if self.count and other.count and self.scored != other.scored:
+            raise ValueError("Cannot merge accumulators with and without scores")
+        self.confusion_matrix += other.confusion_matrix
+        self.score_histogram += other.score_histogram
+        return self
+
+    def per_class(self) -> dict[Any, dict[str, float | int]]:
+        """Precision, recall, F1 and support of each class.
+
+        Undefined precision or recall (no prediction or no sample of the
+        class) is 0, as with scikit-learn's default ``zero_division``.
+        """
+        precision, recall, f1, support = class_scores(self.confusion_matrix)
+        return {
+            label: {
+                "precision": float(precision[i]),
+                "recall": float(recall[i]),
+                "f1_score": float(f1[i]),
+                "support": int(support[i]),
+            }
+            for i, label in enumerate(self.classes)
+        }
+
+    def roc_auc(self) -> float:
+        """ROC AUC: of the positive class for binary problems, one-vs-rest
+        macro-averaged otherwise (NaN without scores).
+
+        Classes without positives or negatives are left out of the average.
+        """
+        return float(histogram_roc_auc(self.score_histogram))
+
+    def metrics(self) -> dict[str, float]:
+        """Accuracy, support-weighted precision, recall and F1, and ROC AUC.
+
+        The keys are those of the evaluation template's ``metrics`` dict.
+        """
+        values = confusion_metrics(self.confusion_matrix)
+        values["roc_auc"] = histogram_roc_auc(self.score_histogram)
+        return {name: float(value) for name, value in values.items()}
+
+
+# The functions below work on stacks of confusion matrices or histograms (with
+# leading axes), so that many resamples of the predictions are scored at once.
+
+
+def class_scores(
+    confusion: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Precision, recall, F1 and support of each class from confusion matrices.
+
+    Args:
+        confusion: Array of shape ``(..., k, k)`` indexed by true then predicted class
+
+    Returns:
+        Arrays of shape ``(..., k)``
+    """
+    tp = np.diagonal(confusion, axis1=-2, axis2=-1)
+    support = confusion.sum(axis=-1)
+    predicted = confusion.sum(axis=-2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(support > 0, tp / support, 0.0)
+        total = precision + recall
+        f1 = np.where(total > 0, 2 * precision * recall / total, 0.0)
+    return precision, recall, f1, support
+
+
+def confusion_metrics(confusion: np.ndarray) -> dict[str, np.ndarray]:
+    """Accuracy and support-weighted precision, recall and F1 of confusion matrices.
+
+    Args:
+        confusion: Array of shape ``(..., k, k)`` indexed by true then predicted class
+
+    Returns:
+        Arrays of shape ``(...)``, NaN for empty confusion matrices
+    """
+    precision, recall, f1, support = class_scores(confusion)
+    total = support.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+
+        def weighted(values: np.ndarray) -> np.ndarray:
+            return np.where(total > 0, (values * support).sum(axis=-1) / total, np.nan)
+
+        return {
+            "accuracy": np.where(
+                total > 0, np.trace(confusion, axis1=-2, axis2=-1) / total, np.nan
+            ),
+            "precision": weighted(precision),
+            "recall": weighted(recall),
+            "f1_score": weighted(f1),
+        }
+
+
+def histogram_roc_auc(histogram: np.ndarray) -> np.ndarray:
+    """ROC AUC from score histograms, macro-averaged over scored classes.
+
+    Args:
+        histogram: Array of shape ``(..., classes, 2, bins)``, as
+            :attr:`MetricsAccumulator.score_histogram`
+
+    Returns:
+        Array of shape ``(...)``, NaN where no class has both labels
+    """
+    negatives = histogram[..., 0, :]
+    positives = histogram[..., 1, :]
+    # Negatives scored lower than each bin, and ties counted as half
+    below = np.cumsum(negatives, axis=-1) - negatives
+    pairs = positives.sum(axis=-1) * negatives.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        auc = (positives * (below + negatives / 2)).sum(axis=-1) / pairs
+        defined = pairs > 0
+        return np.where(defined, auc, 0.0).sum(axis=-1) / defined.sum(axis=-1)
+
+
+def iter_csv_batches(
+    path: Path, columns: Sequence[str], batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[dict[str, np.ndarray]]:
+    """Read columns of a CSV file by batches of rows.
+
+    Raises:
+        ImportError: If pandas is not installed
+    """
+    try:
+        import pandas as pd
+    except ImportError as e:
+        raise ImportError("pandas is not installed. Install with: uv add pandas") from e
+
+    with pd.read_csv(path, usecols=list(columns), chunksize=batch_size) as reader:
+        for chunk in reader:
+            yield {column: chunk[column].to_numpy() for column in columns}
+
+
+def iter_parquet_batches(
+    path: Path, columns: Sequence[str], batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[dict[str, np.ndarray]]:
+    """Read columns of a Parquet file by batches of rows.
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("pyarrow is not installed. Install with: uv add pyarrow") from e
+
+    with pq.ParquetFile(path) as parquet_file:
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=list(columns)):
+            yield {
+                column: batch.column(column).to_numpy(zero_copy_only=False) for column in columns
+            }
+
+
+def iter_file_batches(
+    path: Path, columns: Sequence[str], batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[dict[str, np.ndarray]]:
+    """Read columns of a CSV or Parquet file (by extension) by batches of rows."""
+    if Path(path).suffix.lower() in (".parquet", ".pq"):
+        return iter_parquet_batches(path, columns, batch_size)
+    return iter_csv_batches(path, columns, batch_size)
+
+
+def accumulate(
+    batches: Iterable[Mapping[str, ArrayLike]],
+    classes: Sequence[Any],
+    true_column: str = "y_true",
+    pred_column: str = "y_pred",
+    score_columns: Sequence[str] | None = None,
+    n_bins: int = DEFAULT_BINS,
+) -> MetricsAccumulator:
+    """Accumulate batches of columns, such as those of :func:`iter_file_batches`.
+
+    Args:
+        batches: Mappings of column name to values
+        classes: Every label that can occur
+        true_column: Column of true labels
+        pred_column: Column of predicted labels
+        score_columns: Score column of each class, or of the positive class
+            only for a binary problem
+        n_bins: Number of score histogram bins
+    """
+    accumulator = MetricsAccumulator(classes, n_bins=n_bins)
+    for batch in batches:
+        scores = None
+        if score_columns:
+            scores = np.column_stack([batch[column] for column in score_columns])
+            if scores.shape[1] == 1:
+                scores = scores[:, 0]
+        accumulator.update(batch[true_column], batch[pred_column], scores)
+    return accumulator
+
+
+def _accumulate_file(
+    path: Path,
+    classes: Sequence[Any],
+    true_column: str,
+    pred_column: str,
+    score_columns: Sequence[str] | None,
+    n_bins: int,
+    batch_size: int,
+) -> MetricsAccumulator:
+    columns = [true_column, pred_column, *(score_columns or [])]
+    return accumulate(
+        iter_file_batches(path, columns, batch_size),
+        classes,
+        true_column,
+        pred_column,
+        score_columns,
+        n_bins,
+    )
+
+
+def accumulate_files(
+    paths: Sequence[Path],
+    classes: Sequence[Any],
+    true_column: str = "y_true",
+    pred_column: str = "y_pred",
+    score_columns: Sequence[str] | None = None,
+    n_bins: int = DEFAULT_BINS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_workers: int | None = None,
+) -> MetricsAccumulator:
+    """Accumulate prediction files (CSV or Parquet shards) in worker processes.
+
+    Each file is read by batches in a worker and the workers' accumulators
+    are merged.
+
+    Args:
+        paths: Files to read
+        classes: Every label that can occur
+        true_column: Column of true labels
+        pred_column: Column of predicted labels
+        score_columns: Score column of each class, or of the positive class
+            only for a binary problem
+        n_bins: Number of score histogram bins
+        batch_size: Rows read at once
+        max_workers: Worker processes (defaults to the number of CPUs); 1 reads
+            the files in this process
+    """
+    total = MetricsAccumulator(classes, n_bins=n_bins)
+    args = (classes, true_column, pred_column, score_columns, n_bins, batch_size)
+    if max_workers == 1 or len(paths) <= 1:
+        for path in paths:
+            total.merge(_accumulate_file(path, *args))
+        return total
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_accumulate_file, path, *args) for path in paths]
+        for future in futures:
+            total.merge(future.result())
+    return total
@@ -0,0 +1,323 @@
+"""Robustness of a model's predictions to perturbed inputs.
+
+:func:`evaluate_robustness` perturbs a batch of inputs several times, feeds
+every variant to the model's predict function in large batches, and reports
+how often predictions flip compared to the clean inputs. It backs the "Small
+perturbations" item of the templates' adversarial robustness checklist.
+
+Perturbations work on whole arrays at once:
+
+- :class:`GaussianNoise` and :class:`FeatureMasking` on numeric features,
+- :class:`StripAccents`, :class:`Typos` and :class:`CaseNoise` on French
+  text, which is handled as a matrix of Unicode code points so that every
+  character of every string is perturbed by the same array operations.
+
+Examples:
+    >>> import numpy as np
+    >>> X = np.array([[0.5, 1.0], [-2.0, 0.1], [0.05, 0.0]])
+    >>> results = evaluate_robustness(
+    ...     lambda x: (x.sum(axis=1) > 0).astype(int),
+    ...     X,
+    ...     [FeatureMasking(rate=1.0)],
+    ...     seed=0,
+    ... )
+    >>> results["FeatureMasking(rate=1.0, fill=0.0)"].flip_rate
+    0.6666666666666666
+"""
+
+import unicodedata
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Protocol
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+DEFAULT_BATCH_SIZE = 10_000
+
+
+class Perturbation(Protocol):
+    """Perturbs every sample of a batch, independently, keeping its shape."""
+
+    def __call__(self, inputs: np.ndarray, rng: np.random.Generator) -> np.ndarray: ...
+
+
+@dataclass
+class GaussianNoise:
+    """Add Gaussian noise to numeric features.
+
+    ``scale`` is the noise's standard deviation, either one for every feature
+    or one per feature (see :meth:`relative_to`).
+    """
+
+    scale: float | np.ndarray = 0.01
+
+    @classmethod
+    def relative_to(cls, inputs: ArrayLike, scale: float = 0.01) -> "GaussianNoise":
+        """Noise of ``scale`` times each feature's standard deviation in ``inputs``."""
+        return cls(scale * np.asarray(inputs, dtype=np.float64).std(axis=0))
+
+    def __call__(self, inputs: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        return inputs + rng.normal(0.0, 1.0, inputs.shape) * self.scale
+
+
+@dataclass
+class FeatureMasking:
+    """Replace a random share of feature values by ``fill``.
+
+    ``fill`` is one value, or one per feature (such as the features' means).
+    """
+
+    rate: float = 0.1
+    fill: float | np.ndarray = 0.0
+
+    def __call__(self, inputs: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        mask = rng.random(inputs.shape) < self.rate
+        return np.where(mask, self.fill, inputs)
+
+
+# Text perturbations edit this matrix of code points: one row per string,
+# padded with zeros, which numpy drops when converting back to strings
+
+
+def _to_codes(texts: np.ndarray) -> np.ndarray:
+    texts = np.asarray(texts).astype(str)
+    width = max(texts.dtype.itemsize // 4, 1)
+    return texts.astype(f"<U{width}").view(np.uint32).reshape(len(texts), width).copy()
+
+
+def _from_codes(codes: np.ndarray) -> np.ndarray:
+    width = codes.shape[1]
+    return np.ascontiguousarray(codes, dtype=np.uint32).view(f"<U{width}").reshape(len(codes))
+
+
+def _compact(codes: np.ndarray) -> np.ndarray:
+    """Move the zeros of each row (deleted characters) to its end."""
+    order = np.argsort(codes == 0, axis=1, kind="stable")
+    return np.take_along_axis(codes, order, axis=1)
+
+
+# Code points covered by the lookup tables: ASCII and Latin-1 Supplement/Extended-A
+_TABLE_SIZE = 0x180
+
+
+def _lookup(table: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    return np.where(codes < _TABLE_SIZE, table[np.minimum(codes, _TABLE_SIZE - 1)], codes)
+
+
+def _base_letters() -> np.ndarray:
+    """Table of each code point without its accent (é → e, Ç → C)."""
+    table = np.arange(_TABLE_SIZE, dtype=np.uint32)
+    for code in range(0xC0, _TABLE_SIZE):
+        base = unicodedata.normalize("NFD", chr(code))[0]
+        if base != chr(code) and base.isascii():
+            table[code] = ord(base)
+    return table
+
+
+def _swapped_case() -> np.ndarray:
+    """Table of each letter in the other case, where it is a single code point."""
+    table = np.arange(_TABLE_SIZE, dtype=np.uint32)
+    for code in range(_TABLE_SIZE):
+        swapped = chr(code).swapcase()
+        if len(swapped) == 1 and ord(swapped) < _TABLE_SIZE:
+            table[code] = ord(swapped)
+    return table
+
+
+# Rows of the French AZERTY keyboard, for plausible substitutions
+_AZERTY_ROWS = ("azertyuiop", "qsdfghjklm", "wxcvbn")
+
+
+def _azerty_neighbors() -> tuple[np.ndarray, np.ndarray]:
+    """Keys next to each letter (same row, and same column on adjacent rows)."""
+    neighbors: dict[str, list[str]] = {}
+    for r, row in enumerate(_AZERTY_ROWS):
+        for c, key in enumerate(row):
+            keys = [row[i] for i in (c - 1, c + 1) if 0 <= i < len(row)]
+            keys += [
+                _AZERTY_ROWS[i][c]
+                for i in (r - 1, r + 1)
+                if 0 <= i < 3 and c < len(_AZERTY_ROWS[i])
+            ]
+            neighbors[key] = keys
+    width = max(len(keys) for keys in neighbors.values())
+    table = np.zeros((_TABLE_SIZE, width), dtype=np.uint32)
+    counts = np.zeros(_TABLE_SIZE, dtype=np.int64)
+    for key, keys in neighbors.items():
+        for case in (str.lower, str.upper):
+            table[ord(case(key)), : len(keys)] = [ord(case(k)) for k in keys]
+            counts[ord(case(key))] = len(keys)
+    return table, counts
+
+
+_BASE_LETTERS = _base_letters()
+_SWAPPED_CASE = _swapped_case()
+_NEIGHBORS, _NEIGHBOR_COUNTS = _azerty_neighbors()
+
+
+@dataclass
+class StripAccents:
+    """Drop the accents of a random share of accented characters (élève → eleve).
+
+    Ligatures are spelled out (œ → oe) when ``rate`` is 1.
+    """
+
+    rate: float = 1.0
+
+    def __call__(self, inputs: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        codes = _to_codes(inputs)
+        mask = rng.random(codes.shape) < self.rate
+        texts = _from_codes(np.where(mask, _lookup(_BASE_LETTERS, codes), codes))
+        if self.rate >= 1:
+            for ligature, spelled in (("œ", "oe"), ("Œ", "OE"), ("æ", "ae"), ("Æ", "AE")):
+                texts = np.strings.replace(texts, ligature, spelled)
+        return texts
+
+
+@dataclass
+class CaseNoise:
+    """Swap the case of a random share of characters."""
+
+    rate: float = 0.05
+
+    def __call__(self, inputs: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        codes = _to_codes(inputs)
+        mask = rng.random(codes.shape) < self.rate
+        return _from_codes(np.where(mask, _lookup(_SWAPPED_CASE, codes), codes))
+
+
+@dataclass
+class Typos:
+    """Typing mistakes on a random share of characters.
+
+    Each affected character is replaced by a neighboring AZERTY key, deleted,
+    or swapped with the next character, with equal probability.
+    """
+
+    rate: float = 0.02
+
+    def __call__(self, inputs: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        codes = _to_codes(inputs)
+        edited = (rng.random(codes.shape) < self.rate) & (codes != 0)
+        kind = rng.integers(0, 3, codes.shape)
+
+        # Substitutions, by a random neighbor of the key (if it has any)
+        substitute = edited & (kind == 0)
+        rows, cols = np.nonzero(substitute)
+        keys = codes[rows, cols]
+        counts = _NEIGHBOR_COUNTS[np.minimum(keys, _TABLE_SIZE - 1)] * (keys < _TABLE_SIZE)
+        choice = (rng.random(len(keys)) * np.maximum(counts, 1)).astype(np.int64)
+        replaced = _NEIGHBORS[np.minimum(keys, _TABLE_SIZE - 1), choice]
+        codes[rows, cols] = np.where(counts > 0, replaced, keys)
+
+        # Swaps with the next character, none overlapping another
+        swap = edited & (kind == 1)
+        swap[:, -1] = False
+        swap &= np.roll(codes, -1, axis=1) != 0
+        swap[:, 1:] &= ~swap[:, :-1]
+        rows, cols = np.nonzero(swap)
+        codes[rows, cols], codes[rows, cols + 1] = codes[rows, cols + 1], codes[rows, cols].copy()
+
+        # Deletions
+        codes[edited & (kind == 2)] = 0
+        return _from_codes(_compact(codes))
+
+
+@dataclass
+class RobustnessResult:
+    """How a perturbation changed the model's predictions.
+
+    ``flips`` is the number of perturbed variants of each sample whose
+    prediction differs from the clean input's.
+    """
+
+    n_samples: int
+    n_variants: int
+    flips: np.ndarray = field(repr=False)
+    clean_accuracy: float | None = None
+    perturbed_accuracy: float | None = None
+
+    @property
+    def flip_rate(self) -> float:
+        """Share of perturbed variants whose prediction flipped."""
+        return float(self.flips.sum() / (self.n_samples * self.n_variants))
+
+    @property
+    def samples_flipped(self) -> float:
+        """Share of samples with at least one flipped variant."""
+        return float((self.flips > 0).mean())
+
+
+def _labels(predictions: ArrayLike) -> np.ndarray:
+    """Predicted labels, from labels or from class scores of shape (n, classes)."""
+    predictions = np.asarray(predictions)
+    return predictions.argmax(axis=1) if predictions.ndim == 2 else predictions.reshape(-1)
+
+
+def _predict(predict: Callable, inputs: np.ndarray, batch_size: int) -> np.ndarray:
+    return np.concatenate(
+        [
+            _labels(predict(inputs[start : start + batch_size]))
+            for start in range(0, len(inputs), batch_size)
+        ]
+    )
+
+
+def evaluate_robustness(
+    predict: Callable[[np.ndarray], ArrayLike],
+    inputs: ArrayLike,
+    perturbations: Sequence[Perturbation] | Mapping[str, Perturbation],
+    y_true: ArrayLike | None = None,
+    n_variants: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    seed: int | None = None,
+) -> dict[str, RobustnessResult]:
+    """Measure how often perturbations flip the model's predictions.
+
+    Args:
+        predict: Model predict function, taking a batch of inputs and returning
+            labels, or class scores of shape ``(n, classes)``
+        inputs: Inputs, one sample per row (or one string per text sample)
+        perturbations: Perturbations, named by their ``repr`` unless given as
+            a mapping
+        y_true: True labels, to also report the accuracy on perturbed inputs
+        n_variants: Perturbed variants of each sample
+        batch_size: Most samples per call to ``predict``
+        seed: Random seed, for reproducible perturbations
+
+    Returns:
+        Result of each perturbation
+    """
+    inputs = np.asarray(inputs)
+    if not isinstance(perturbations, Mapping):
+        perturbations = {repr(perturbation): perturbation for perturbation in perturbations}
+    rng = np.random.default_rng(seed)
+    clean = _predict(predict, inputs, batch_size)
+    y_true = None if y_true is None else np.asarray(y_true).reshape(-1)
+
+    results = {}
+    # Samples per chunk, so that each chunk's variants fill one predict batch
+    chunk = max(1, batch_size // n_variants)
+    for name, perturbation in perturbations.items():
+        flips = np.zeros(len(inputs), dtype=np.int64)
+        correct = 0
+        for start in range(0, len(inputs), chunk):
+            samples = inputs[start : start + chunk]
+            variants = perturbation(
+                np.tile(samples, (n_variants,) + (1,) * (samples.ndim - 1)), rng
+            )
+            predicted = _predict(predict, variants, batch_size).reshape(n_variants, len(samples))
+            flips[start : start + len(samples)] = (predicted != clean[start : start + chunk]).sum(
+                axis=0
+            )
+            if y_true is not None:
+                correct += int((predicted == y_true[start : start + chunk]).sum())
+        results[name] = RobustnessResult(
+            n_samples=len(inputs),
+            n_variants=n_variants,
+            flips=flips,
+            clean_accuracy=None if y_true is None else float((clean == y_true).mean()),
+            perturbed_accuracy=None if y_true is None else correct / (len(inputs) * n_variants),
+        )
+    return results
@@ -0,0 +1,332 @@
+"""Bootstrap confidence intervals for classification metrics.
+
+A resample of ``n`` predictions is a vector of multinomial counts: how many
+times each prediction is drawn. A chunk of resamples is drawn at once as a
+``(resamples, n)`` count matrix, and multiplying it by the (sparse) indicator
+matrix of the confusion-matrix and score-histogram cell of each prediction
+gives the confusion matrix and score histogram of every resample. The metrics
+of ``ai_kit_core.metrics`` are then computed on those stacks at once.
+
+With :func:`paired_bootstrap`, the same resamples score a model and a
+baseline on the same test set, so the interval of their difference accounts
+for the samples both find easy or hard.
+
+Examples:
+    >>> intervals = bootstrap([0, 1, 1, 0, 1], [0, 1, 0, 0, 1], n_resamples=200, seed=0)
+    >>> intervals["accuracy"].estimate
+    0.8
+    >>> intervals["accuracy"].low <= 0.8 <= intervals["accuracy"].high
+    True
+"""
+
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from ai_kit_core.metrics import (
+    DEFAULT_BINS,
+    MetricsAccumulator,
+    confusion_metrics,
+    histogram_roc_auc,
+)
+
+# Metrics of MetricsAccumulator.metrics, in the evaluation template's order
+METRICS = ("accuracy", "precision", "recall", "f1_score", "roc_auc")
+
+DEFAULT_RESAMPLES = 1000
+
+DEFAULT_CONFIDENCE = 0.95
+
+# Memory used by the count matrix of a chunk of resamples
+DEFAULT_CHUNK_BYTES = 64 * 2**20
+
+# Indicator matrices with at most this many cells are multiplied densely
+DENSE_CELLS = 64
+
+
+@dataclass
+class ConfidenceInterval:
+    """Percentile bootstrap interval of a metric (or of a difference of metrics).
+
+    ``p_value`` is only set for paired differences: the two-sided bootstrap
+    p-value of no difference.
+    """
+
+    estimate: float
+    low: float
+    high: float
+    confidence: float
+    p_value: float | None = None
+
+
+class _Indicator:
+    """Indicator matrix of the cells each sample counts in.
+
+    It is dense when there are few cells (such as confusion matrix cells),
+    and stored as samples sorted by cell otherwise.
+    """
+
+    def __init__(self, cells: np.ndarray, n_cells: int):
+        if cells.ndim == 1:
+            cells = cells[:, None]
+        self.n_cells = n_cells
+        self.n_samples = len(cells)
+        self.entries = cells.size
+        if n_cells <= DENSE_CELLS:
+            self.matrix = np.zeros((len(cells), n_cells))
+            np.add.at(self.matrix, (np.arange(len(cells))[:, None], cells), 1)
+            return
+        self.matrix = None
+        flat = cells.reshape(-1)
+        order = np.argsort(flat, kind="stable")
+        sorted_cells = flat[order]
+        # Sample of each cell entry, in cell order
+        self.samples = order // cells.shape[1]
+        self.starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+        self.columns = sorted_cells[self.starts]
+
+    def aggregate(self, weights: np.ndarray) -> np.ndarray:
+        """``weights @ indicator``: cell counts of each row of sample weights."""
+        if self.matrix is not None:
+            return weights @ self.matrix
+        counts = np.zeros((len(weights), self.n_cells))
+        if self.entries:
+            counts[:, self.columns] = np.add.reduceat(weights[:, self.samples], self.starts, axis=1)
+        return counts
+
+
+class _Scorer:
+    """Metrics of weighted predictions, for many weight vectors at once."""
+
+    def __init__(self, accumulator: MetricsAccumulator, y_true, y_pred, y_score):
+        confusion_cells, score_cells = accumulator.cells(y_true, y_pred, y_score)
+        self.confusion_shape = accumulator.confusion_matrix.shape
+        self.histogram_shape = accumulator.score_histogram.shape
+        self.confusion = _Indicator(confusion_cells, accumulator.confusion_matrix.size)
+        self.histogram = None
+        if score_cells is not None:
+            self.histogram = _Indicator(score_cells, accumulator.score_histogram.size)
+
+    @property
+    def entries(self) -> int:
+        """Cell entries gathered per resample."""
+        return self.confusion.entries + (self.histogram.entries if self.histogram else 0)
+
+    def metrics(self, weights: np.ndarray) -> dict[str, np.ndarray]:
+        confusion = self.confusion.aggregate(weights)
+        values = confusion_metrics(confusion.reshape(len(weights), *self.confusion_shape))
+        if self.histogram is None:
+            values["roc_auc"] = np.full(len(weights), np.nan)
+        else:
+            histogram = self.histogram.aggregate(weights)
+            values["roc_auc"] = histogram_roc_auc(
+                histogram.reshape(len(weights), *self.histogram_shape)
+            )
+        return values
+
+
+# Scorers of the worker processes, sent once by the pool initializer
+_worker_scorers: list[_Scorer] = []
+
+
+def _init_worker(scorers: list[_Scorer]) -> None:
+    global _worker_scorers
+    _worker_scorers = scorers
+
+
+def _resample(
+    scorers: list[_Scorer], n: int, size: int, seed: np.random.SeedSequence
+) -> list[dict[str, np.ndarray]]:
+    """Metrics of each scorer on the same ``size`` resamples."""
+    rng = np.random.default_rng(seed)
+    # Multinomial counts of n uniform draws per resample, from one bincount
+    draws = rng.integers(0, n, size=(size, n))
+    draws += np.arange(size)[:, None] * n
+    weights = np.bincount(draws.reshape(-1), minlength=size * n).reshape(size, n)
+    weights = weights.astype(np.float64)
+    return [scorer.metrics(weights) for scorer in scorers]
+
+
+def _worker_resample(n: int, size: int, seed: np.random.SeedSequence):
+    return _resample(_worker_scorers, n, size, seed)
+
+
+def _run(
+    scorers: list[_Scorer],
+    n: int,
+    n_resamples: int,
+    seed: int | None,
+    chunk_size: int | None,
+    n_jobs: int | None,
+) -> list[dict[str, np.ndarray]]:
+    """Metrics of each scorer on every resample, by chunks of resamples."""
+    if n == 0:
+        raise ValueError("Cannot bootstrap an empty set of predictions")
+    if chunk_size is None:
+        # The largest of the count matrix and of the gathered cell entries
+        entries = max(n, max(scorer.entries for scorer in scorers))
+        chunk_size = max(1, DEFAULT_CHUNK_BYTES // (8 * entries))
+    sizes = [min(chunk_size, n_resamples - start) for start in range(0, n_resamples, chunk_size)]
+    # One seed per chunk: results depend on the seed and chunk size, not on n_jobs
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if n_jobs == 1 or len(sizes) == 1:
+        chunks = [_resample(scorers, n, size, s) for size, s in zip(sizes, seeds, strict=True)]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_init_worker, initargs=(scorers,)
+        ) as executor:
+            chunks = list(executor.map(_worker_resample, [n] * len(sizes), sizes, seeds))
+
+    return [
+        {name: np.concatenate([chunk[i][name] for chunk in chunks]) for name in chunks[0][i]}
+        for i in range(len(scorers))
+    ]
+
+
+def _interval(
+    estimate: float, resampled: np.ndarray, confidence: float, p_value: float | None = None
+) -> ConfidenceInterval:
+    alpha = (1 - confidence) / 2
+    resampled = resampled[~np.isnan(resampled)]
+    if not len(resampled):
+        low = high = float("nan")
+    else:
+        low, high = np.quantile(resampled, [alpha, 1 - alpha])
+    return ConfidenceInterval(float(estimate), float(low), float(high), confidence, p_value)
+
+
+def _metric_names(metrics: Sequence[str] | None, scored: bool) -> list[str]:
+    if metrics is None:
+        return [name for name in METRICS if scored or name != "roc_auc"]
+    for name in metrics:
+        if name not in METRICS:
+            raise ValueError(f"Unknown metric: {name}. Use one of {', '.join(METRICS)}")
+    if "roc_auc" in metrics and not scored:
+        raise ValueError("roc_auc requires scores")
+    return list(metrics)
+
+
+def _classes(classes: Sequence[Any] | None, *labels: ArrayLike) -> list[Any]:
+    if classes is not None:
+        return list(classes)
+    return np.unique(np.concatenate([np.asarray(label).reshape(-1) for label in labels])).tolist()
+
+
+def bootstrap(
+    y_true: ArrayLike,
+    y_pred: ArrayLike,
+    y_score: ArrayLike | None = None,
+    classes: Sequence[Any] | None = None,
+    metrics: Sequence[str] | None = None,
+    n_resamples: int = DEFAULT_RESAMPLES,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: int | None = None,
+    chunk_size: int | None = None,
+    n_jobs: int | None = 1,
+    n_bins: int = DEFAULT_BINS,
+) -> dict[str, ConfidenceInterval]:
+    """Bootstrap confidence intervals of classification metrics.
+
+    Args:
+        y_true: True labels
+        y_pred: Predicted labels
+        y_score: Scores, as for :meth:`MetricsAccumulator.update` (for ROC AUC)
+        classes: Every label, in the order of score columns (sorted labels by default)
+        metrics: Metrics of ``METRICS`` (all those computable by default)
+        n_resamples: Number of resamples
+        confidence: Confidence level of the intervals
+        seed: Random seed, for reproducible intervals
+        chunk_size: Resamples drawn at once (sized to bound memory by default)
+        n_jobs: Worker processes (None for one per CPU)
+        n_bins: Score histogram bins for ROC AUC
+
+    Returns:
+        Interval of each metric
+
+    Raises:
+        ValueError: On unknown metrics or labels, or mismatched lengths
+    """
+    names = _metric_names(metrics, y_score is not None)
+    accumulator = MetricsAccumulator(_classes(classes, y_true, y_pred), n_bins=n_bins)
+    scorer = _Scorer(accumulator, y_true, y_pred, y_score)
+    n = scorer.confusion.n_samples
+
+    estimates = scorer.metrics(np.ones((1, n)))
+    (resampled,) = _run([scorer], n, n_resamples, seed, chunk_size, n_jobs)
+    return {name: _interval(estimates[name][0], resampled[name], confidence) for name in names}
+
+
+def paired_bootstrap(
+    y_true: ArrayLike,
+    y_pred: ArrayLike,
+    baseline_pred: ArrayLike,
+    y_score: ArrayLike | None = None,
+    baseline_score: ArrayLike | None = None,
+    classes: Sequence[Any] | None = None,
+    metrics: Sequence[str] | None = None,
+    n_resamples: int = DEFAULT_RESAMPLES,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: int | None = None,
+    chunk_size: int | None = None,
+    n_jobs: int | None = 1,
+    n_bins: int = DEFAULT_BINS,
+) -> dict[str, ConfidenceInterval]:
+    """Bootstrap confidence intervals of a model's improvement over a baseline.
+
+    Both are scored on the same resamples of the test set, and each interval
+    is of the model's metric minus the baseline's.
+
+    Args:
+        y_true: True labels
+        y_pred: Labels predicted by the model
+        baseline_pred: Labels predicted by the baseline
+        y_score: Scores of the model (for ROC AUC)
+        baseline_score: Scores of the baseline (for ROC AUC)
+        classes: Every label, in the order of score columns (sorted labels by default)
+        metrics: Metrics of ``METRICS`` (all those computable by default)
+        n_resamples: Number of resamples
+        confidence: Confidence level of the intervals
+        seed: Random seed, for reproducible intervals
+        chunk_size: Resamples drawn at once (sized to bound memory by default)
+        n_jobs: Worker processes (None for one per CPU)
+        n_bins: Score histogram bins for ROC AUC
+
+    Returns:
+        Interval of the difference of each metric, with its p-value
+
+    Raises:
+        ValueError: On unknown metrics or labels, or mismatched lengths
+    """
+    if (y_score is None) != (baseline_score is None):
+        raise ValueError("Scores must be given for both the model and the baseline, or neither")
+    names = _metric_names(metrics, y_score is not None)
+    accumulator = MetricsAccumulator(
+        _classes(classes, y_true, y_pred, baseline_pred), n_bins=n_bins
+    )
+    scorers = [
+        _Scorer(accumulator, y_true, y_pred, y_score),
+        _Scorer(accumulator, y_true, baseline_pred, baseline_score),
+    ]
+    n = scorers[0].confusion.n_samples
+    if scorers[1].confusion.n_samples != n:
+        raise ValueError("y_pred and baseline_pred must have the same length")
+
+    ones = np.ones((1, n))
+    model, baseline = (scorer.metrics(ones) for scorer in scorers)
+    resampled_model, resampled_baseline = _run(scorers, n, n_resamples, seed, chunk_size, n_jobs)
+    intervals = {}
+    for name in names:
+        differences = resampled_model[name] - resampled_baseline[name]
+        differences = differences[~np.isnan(differences)]
+        p_value = None
+        if len(differences):
+            p_value = float(min(1.0, 2 * min(np.mean(differences <= 0), np.mean(differences >= 0))))
+        intervals[name] = _interval(
+            model[name][0] - baseline[name][0], differences, confidence, p_value
+        )
+    return intervals
@@ -0,0 +1,412 @@
+"""Text-generation metrics over a corpus of French outputs.
+
+:func:`text_metrics` scores predictions against references with exact match,
+token-level F1, BLEU, ROUGE-L and chrF. The corpus is tokenized once, and the
+tokens (and characters) are mapped to integer IDs, so that every metric is
+computed with array operations on all pairs at once:
+
+- n-grams of every order are numbered by combining the IDs of the previous
+  order with the next token, and the clipped n-gram matches of all pairs
+  come from one sort per order. Unigram matches give token F1, word
+  1-4-grams give BLEU, and character 1-6-grams give chrF.
+- ROUGE-L's longest common subsequences use the bit-parallel algorithm, with
+  the pairs of a batch processed together as rows of 64-bit words.
+
+Text is normalized for French by a :class:`Normalizer`: typographic
+apostrophes, elisions (``l'``, ``qu'``...) split from the next word, case,
+and optionally accents and articles. Every metric sees the same tokens, so
+scores differ slightly from those of reference implementations on raw text.
+Scores are between 0 and 1.
+
+Examples:
+    >>> scores = text_metrics(
+    ...     ["L’élève est arrivé.", "Il pleut"],
+    ...     ["l'élève est arrivé", "Il fait beau"],
+    ... )
+    >>> scores.exact_match.tolist()
+    [1.0, 0.0]
+    >>> scores.f1.round(2).tolist()
+    [1.0, 0.4]
+    >>> Normalizer(strip_accents=True).tokenize("Qu’il réussît l'examen !")
+    ["qu'", 'il', 'reussit', "l'", 'examen']
+"""
+
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from itertools import chain
+from typing import Any
+
+import numpy as np
+
+# Orders of the n-grams of BLEU (words) and chrF (characters)
+BLEU_ORDER = 4
+CHRF_ORDER = 6
+# Weight of recall relative to precision in chrF
+CHRF_BETA = 2.0
+
+# Pairs scored per chunk (and per task of the process pool)
+DEFAULT_CHUNK_SIZE = 10_000
+# Pairs whose longest common subsequences are computed together
+LCS_BATCH_SIZE = 2048
+
+_APOSTROPHES = str.maketrans({"’": "'", "‘": "'", "ʼ": "'", "´": "'", "`": "'"})
+_LIGATURES = str.maketrans({"œ": "oe", "Œ": "OE", "æ": "ae", "Æ": "AE"})
+# Elided words, split from the word they precede (l'avion → l' avion)
+_ELISIONS = r"(?:lorsqu|puisqu|quoiqu|jusqu|qu|[cdjlmnst])'"
+_WORDS = re.compile(rf"\b{_ELISIONS}|\w+", re.IGNORECASE)
+_WORDS_AND_PUNCTUATION = re.compile(rf"\b{_ELISIONS}|\w+|[^\w\s]", re.IGNORECASE)
+# Articles removed by drop_articles, as in FQuAD's evaluation
+_ARTICLES = frozenset({"le", "la", "les", "l'", "du", "des", "au", "aux", "un", "une"})
+
+
+@dataclass(frozen=True)
+class Normalizer:
+    """French-aware text normalization and tokenization.
+
+    Attributes:
+        lowercase: Compare texts regardless of case
+        strip_accents: Compare texts regardless of accents (and ligatures)
+        keep_punctuation: Keep punctuation marks as tokens
+        drop_articles: Drop articles, as SQuAD-style exact match and F1 do
+    """
+
+    lowercase: bool = True
+    strip_accents: bool = False
+    keep_punctuation: bool = False
+    drop_articles: bool = False
+
+    def tokenize(self, text: str) -> list[str]:
+        """Normalized tokens of a text."""
+        text = unicodedata.normalize("NFC", text).translate(_APOSTROPHES)
+        if self.lowercase:
+            text = text.lower()
+        if self.strip_accents:
+            text = "".join(
+                c
+                for c in unicodedata.normalize("NFD", text.translate(_LIGATURES))
+                if not unicodedata.combining(c)
+            )
+        tokens = (_WORDS_AND_PUNCTUATION if self.keep_punctuation else _WORDS).findall(text)
+        if self.drop_articles:
+            tokens = [t for t in tokens if t.lower() not in _ARTICLES]
+        return tokens
+
+
+@dataclass
+class TextScores:
+    """Statistics of each prediction-reference pair, and the metrics derived from them.
+
+    N-gram statistics have shape ``(order, n)``: clipped matches, and n-gram
+    counts of the predictions and the references.
+    """
+
+    exact: np.ndarray
+    word_matches: np.ndarray
+    word_predicted: np.ndarray
+    word_reference: np.ndarray
+    lcs: np.ndarray
+    char_matches: np.ndarray
+    char_predicted: np.ndarray
+    char_reference: np.ndarray
+
+    @classmethod
+    def concatenate(cls, chunks: Sequence["TextScores"]) -> "TextScores":
+        """Scores of consecutive chunks of pairs, as one."""
+        return cls(
+            exact=np.concatenate([c.exact for c in chunks]),
+            word_matches=np.hstack([c.word_matches for c in chunks]),
+            word_predicted=np.hstack([c.word_predicted for c in chunks]),
+            word_reference=np.hstack([c.word_reference for c in chunks]),
+            lcs=np.concatenate([c.lcs for c in chunks]),
+            char_matches=np.hstack([c.char_matches for c in chunks]),
+            char_predicted=np.hstack([c.char_predicted for c in chunks]),
+            char_reference=np.hstack([c.char_reference for c in chunks]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.exact)
+
+    @property
+    def exact_match(self) -> np.ndarray:
+        """1 where the normalized prediction equals the reference."""
+        return self.exact.astype(np.float64)
+
+    @property
+    def f1(self) -> np.ndarray:
+        """Token-level F1 (1 when both texts are empty)."""
+        return _f_score(
+            self.word_matches[0], self.word_predicted[0], self.word_reference[0], empty=1.0
+        )
+
+    @property
+    def rouge_l(self) -> np.ndarray:
+        """ROUGE-L F-measure, from the longest common subsequence of tokens."""
+        return _f_score(self.lcs, self.word_predicted[0], self.word_reference[0], empty=0.0)
+
+    @property
+    def bleu(self) -> np.ndarray:
+        """Sentence BLEU, with exponential smoothing and effective order."""
+        return _bleu(self.word_matches, self.word_predicted, self.word_reference[0])
+
+    @property
+    def chrf(self) -> np.ndarray:
+        """Sentence chrF (character 1-6-grams, beta = 2)."""
+        return _chrf(self.char_matches, self.char_predicted, self.char_reference)
+
+    @property
+    def corpus_bleu(self) -> float:
+        """BLEU of the whole corpus, from the n-gram statistics summed over pairs."""
+        return float(
+            _bleu(
+                self.word_matches.sum(axis=1, keepdims=True),
+                self.word_predicted.sum(axis=1, keepdims=True),
+                self.word_reference[:1].sum(axis=1),
+            )[0]
+        )
+
+    @property
+    def corpus_chrf(self) -> float:
+        """chrF of the whole corpus, from the n-gram statistics summed over pairs."""
+        return float(
+            _chrf(
+                self.char_matches.sum(axis=1, keepdims=True),
+                self.char_predicted.sum(axis=1, keepdims=True),
+                self.char_reference.sum(axis=1, keepdims=True),
+            )[0]
+        )
+
+    def summary(self) -> dict[str, Any]:
+        """Corpus scores: means of the sentence scores, corpus BLEU and chrF."""
+        return {
+            "n_pairs": len(self),
+            "exact_match": float(self.exact_match.mean()),
+            "f1": float(self.f1.mean()),
+            "bleu": self.corpus_bleu,
+            "rouge_l": float(self.rouge_l.mean()),
+            "chrf": self.corpus_chrf,
+        }
+
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return numerator / np.maximum(denominator, 1)
+
+
+def _f_beta(precision: np.ndarray, recall: np.ndarray, beta: float = 1.0) -> np.ndarray:
+    denominator = beta**2 * precision + recall
+    return np.where(
+        denominator > 0, (1 + beta**2) * precision * recall / np.maximum(denominator, 1e-300), 0.0
+    )
+
+
+def _f_score(matches, predicted, reference, empty: float, beta: float = 1.0) -> np.ndarray:
+    scores = _f_beta(_divide(matches, predicted), _divide(matches, reference), beta)
+    return np.where((predicted == 0) & (reference == 0), empty, scores)
+
+
+def _bleu(matches: np.ndarray, predicted: np.ndarray, reference_length: np.ndarray) -> np.ndarray:
+    """BLEU from n-gram statistics of shape (order, n)."""
+    orders = predicted > 0
+    # Exponential smoothing: the k-th order without matches counts 1 / 2**k match
+    zeros = np.cumsum((matches == 0) & orders, axis=0)
+    smoothed = np.where(matches > 0, matches, 0.5**zeros)
+    log_precision = np.where(orders, np.log(smoothed) - np.log(np.maximum(predicted, 1)), 0.0)
+    effective_order = orders.sum(axis=0)
+    mean = log_precision.sum(axis=0) / np.maximum(effective_order, 1)
+    length = predicted[0]
+    brevity = np.minimum(0.0, 1 - reference_length / np.maximum(length, 1))
+    return np.where(effective_order > 0, np.exp(mean + brevity), 0.0)
+
+
+def _chrf(matches: np.ndarray, predicted: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """chrF from character n-gram statistics of shape (order, n).
+
+    Precision and recall are averaged over the orders present in both texts,
+    then combined into one F-score.
+    """
+    orders = (predicted > 0) & (reference > 0)
+    effective_order = np.maximum(orders.sum(axis=0), 1)
+    precision = np.where(orders, _divide(matches, predicted), 0.0).sum(axis=0) / effective_order
+    recall = np.where(orders, _divide(matches, reference), 0.0).sum(axis=0) / effective_order
+    return _f_beta(precision, recall, CHRF_BETA)
+
+
+def _encode_tokens(tokens: list[list[str]]) -> tuple[np.ndarray, np.ndarray]:
+    """IDs of the tokens of every text, with the index of each token's text."""
+    # Unseen tokens get the next ID
+    vocabulary: defaultdict[str, int] = defaultdict()
+    vocabulary.default_factory = vocabulary.__len__
+    ids = np.fromiter(map(vocabulary.__getitem__, chain.from_iterable(tokens)), dtype=np.int64)
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    return ids, np.repeat(np.arange(len(tokens)), lengths)
+
+
+def _encode_characters(texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """IDs of the characters of every text, with the index of each character's text."""
+    code_points = np.frombuffer("".join(texts).encode("utf-32-le"), dtype="<u4")
+    # Number the code points present in the corpus, without sorting them
+    present = np.bincount(code_points, minlength=1) > 0
+    ids = (np.cumsum(present) - 1)[code_points]
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    return ids, np.repeat(np.arange(len(texts)), lengths)
+
+
+def _ngram_statistics(
+    ids: np.ndarray, owner: np.ndarray, n: int, max_order: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Clipped n-gram matches of orders 1 to ``max_order``, and n-gram counts.
+
+    ``ids`` holds the items of the ``n`` predictions, then of the ``n``
+    references, and ``owner`` the sequence of each item.
+    """
+    sequences = np.arange(2 * n)
+    lengths = np.bincount(owner, minlength=2 * n)
+    counts = np.maximum(lengths - np.arange(max_order)[:, None], 0)
+    # Slot of each item's sequence: its pair, then 0 for predictions and 1 for references
+    slots = ((sequences % n) * 2 + sequences // n)[owner]
+
+    matches = np.zeros((max_order, n), dtype=np.int64)
+    vocabulary = int(ids.max()) + 1 if len(ids) else 1
+    grams, n_grams = ids, vocabulary
+    for order in range(1, max_order + 1):
+        if order > 1:
+            if n_grams * vocabulary >= 2**62 // max(2 * n, 1):
+                _, grams = np.unique(grams, return_inverse=True)
+                n_grams = int(grams.max()) + 1
+            grams = grams[:-1] * vocabulary + ids[order - 1 :]
+            n_grams *= vocabulary
+        # N-grams starting at each position, within a single sequence
+        valid = owner[: len(grams)] == owner[order - 1 :]
+
+        # Count each (n-gram, pair, side) at once: a prediction's and its
+        # reference's counts of an n-gram end up next to each other
+        keys, key_counts = np.unique(
+            grams[valid] * (2 * n) + slots[: len(grams)][valid], return_counts=True
+        )
+        both = (keys[1:] - keys[:-1] == 1) & (keys[:-1] % 2 == 0)
+        matches[order - 1] = np.bincount(
+            (keys[:-1][both] % (2 * n)) // 2,
+            weights=np.minimum(key_counts[:-1], key_counts[1:])[both],
+            minlength=n,
+        )
+    return matches, counts[:, :n], counts[:, n:]
+
+
+def _lcs_lengths(ids: np.ndarray, owner: np.ndarray, n: int) -> np.ndarray:
+    """Length of the longest common subsequence of each prediction and reference.
+
+    Bit-parallel algorithm (Crochemore et al., 2001): a bit vector over the
+    reference's tokens is updated for each token of the prediction, with the
+    pairs of a batch as rows and the references' bits in 64-bit words.
+    """
+    lengths = np.bincount(owner, minlength=2 * n)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    predicted, reference = lengths[:n], lengths[n:]
+    lcs = np.zeros(n, dtype=np.int64)
+    words = (reference + 63) // 64
+    scored = np.flatnonzero((predicted > 0) & (reference > 0))
+    # Batches of pairs with as many words, and similar prediction lengths
+    scored = scored[np.lexsort((predicted[scored], words[scored]))]
+    for w in np.unique(words[scored]):
+        group = scored[words[scored] == w]
+        for batch in np.array_split(group, -(-len(group) // LCS_BATCH_SIZE)):
+            lcs[batch] = _lcs_batch(ids, starts, predicted, reference, batch, n, int(w))
+    return lcs
+
+
+def _padded(ids: np.ndarray, starts: np.ndarray, lengths: np.ndarray, width: int, fill: int):
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    columns = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    matrix = np.full((len(lengths), width), fill, dtype=np.int64)
+    matrix[rows, columns] = ids[np.repeat(starts, lengths) + columns]
+    return matrix
+
+
+def _lcs_batch(ids, starts, predicted, reference, batch, n, words) -> np.ndarray:
+    # Padding never matches: -1 in references, -2 in predictions
+    references = _padded(ids, starts[n + batch], reference[batch], 64 * words, -1)
+    predictions = _padded(ids, starts[batch], predicted[batch], predicted[batch].max(), -2)
+    vector = np.full((len(batch), words), np.iinfo(np.uint64).max, dtype=np.uint64)
+    for column in predictions.T:
+        match = np.packbits(references == column[:, None], axis=1, bitorder="little")
+        match = match.view("<u8").astype(np.uint64, copy=False)
+        # V = (V + (V & M)) | (V & ~M), with carries across words
+        total = vector + (vector & match)
+        carry = total < vector
+        for word in range(1, words):
+            total[:, word] += carry[:, word - 1]
+            carry[:, word] |= carry[:, word - 1] & (total[:, word] == 0)
+        vector = total | (vector & ~match)
+    # Bits of the references' tokens, the others being padding
+    bit = np.arange(64 * words).reshape(words, 64)
+    mask = np.packbits(bit[None] < reference[batch, None, None], axis=2, bitorder="little")
+    mask = mask.reshape(len(batch), 8 * words).view("<u8").astype(np.uint64, copy=False)
+    return reference[batch] - np.bitwise_count(vector & mask).sum(axis=1)
+
+
+def _score_chunk(pairs: tuple[Sequence[str], Sequence[str]], normalizer: Normalizer) -> TextScores:
+    predictions, references = pairs
+    n = len(predictions)
+    tokens = [normalizer.tokenize(text) for text in [*predictions, *references]]
+    normalized = np.array([" ".join(t) for t in tokens])
+
+    word_ids, word_owner = _encode_tokens(tokens)
+    word_matches, word_predicted, word_reference = _ngram_statistics(
+        word_ids, word_owner, n, BLEU_ORDER
+    )
+    # chrF ignores whitespace
+    char_ids, char_owner = _encode_characters(["".join(t) for t in tokens])
+    char_matches, char_predicted, char_reference = _ngram_statistics(
+        char_ids, char_owner, n, CHRF_ORDER
+    )
+    return TextScores(
+        exact=normalized[:n] == normalized[n:],
+        word_matches=word_matches,
+        word_predicted=word_predicted,
+        word_reference=word_reference,
+        lcs=_lcs_lengths(word_ids, word_owner, n),
+        char_matches=char_matches,
+        char_predicted=char_predicted,
+        char_reference=char_reference,
+    )
+
+
+def text_metrics(
+    predictions: Sequence[str],
+    references: Sequence[str],
+    normalizer: Normalizer | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    n_jobs: int | None = 1,
+) -> TextScores:
+    """Exact match, token F1, BLEU, ROUGE-L and chrF of each prediction.
+
+    Args:
+        predictions: Generated texts
+        references: Reference text of each prediction
+        normalizer: Text normalization (lowercase, with accents, by default)
+        chunk_size: Pairs scored at once
+        n_jobs: Worker processes scoring chunks (None for one per CPU)
+
+    Returns:
+        Scores of each pair; :meth:`TextScores.summary` gives corpus scores
+
+    Raises:
+        ValueError: If predictions and references differ in number
+    """
+    if len(predictions) != len(references):
+        raise ValueError(f"Got {len(predictions)} predictions but {len(references)} references")
+    normalizer = normalizer or Normalizer()
+    chunks = [
+        (predictions[start : start + chunk_size], references[start : start + chunk_size])
+        for start in range(0, len(predictions), chunk_size)
+    ] or [([], [])]
+    score = partial(_score_chunk, normalizer=normalizer)
+    if n_jobs == 1 or len(chunks) == 1:
+        return TextScores.concatenate([score(chunk) for chunk in chunks])
+    with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count()) as executor:
+        return TextScores.concatenate(list(executor.map(score, chunks)))
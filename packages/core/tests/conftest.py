@@ -0,0 +1,106 @@
+"""Shared fixtures: a local stub of an OpenAI-compatible API."""
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class StubAPI(ThreadingHTTPServer):
+    """OpenAI-compatible stub, recording connections and concurrent requests.
+
+    Chat completions answer the last message in upper case after
+    ``delay`` seconds (a request parameter). Prompts ``fail:<n>:...`` get a
+    503 for their first ``n`` attempts, ``reject`` gets a 400 and ``html``
+    a 200 whose body is not JSON.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.attempts = Counter()
+        self.authorization = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.authorization = self.headers.get("Authorization")
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(payload.get("delay", 0))
+            if self.path == "/v1/embeddings":
+                texts = payload["input"]
+                data = [{"index": i, "embedding": [len(text), i]} for i, text in enumerate(texts)]
+                self.reply(200, {"data": data[::-1]}, chunked=payload.get("chunked", False))
+                return
+            prompt = payload["messages"][-1]["content"]
+            with server.lock:
+                server.attempts[prompt] += 1
+                attempt = server.attempts[prompt]
+            if prompt == "reject":
+                self.reply(400, {"error": "invalid request"})
+            elif prompt == "html":
+                self.reply(200, b"<html>Maintenance</html>")
+            elif prompt.startswith("fail:") and attempt <= int(prompt.split(":")[1]):
+                self.reply(503, {"error": "overloaded"}, headers={"Retry-After": "0"})
+            else:
+                message = {"role": "assistant", "content": prompt.upper()}
+                answer = {"choices": [{"message": message}]}
+                self.reply(200, answer, chunked=payload.get("chunked", False))
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def reply(self, status, body, headers=None, chunked=False):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(data), 7):
+                piece = data[start : start + 7]
+                self.wfile.write(f"{len(piece):x}\r\n".encode() + piece + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+
+@pytest.fixture
+def stub():
+    server = StubAPI()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,135 @@
+"""Tests for the load-testing harness, against the stub API."""
+
+import asyncio
+import csv
+
+import numpy as np
+import pytest
+from ai_kit_core.bench import (
+    LatencyHistogram,
+    closed_loop,
+    main,
+    open_loop,
+    sweep,
+    write_csv,
+)
+
+
+def chat_body(prompt="bonjour", delay=0.01):
+    return {"messages": [{"role": "user", "content": prompt}], "delay": delay}
+
+
+class TestLatencyHistogram:
+    """Test the log-linear latency histogram."""
+
+    def test_quantiles(self):
+        """Test quantiles within the histogram's precision."""
+        latencies = np.random.default_rng(0).lognormal(np.log(0.05), 1.0, 100_000)
+        histogram = LatencyHistogram()
+        histogram.record(latencies)
+
+        q = np.array([0.5, 0.95, 0.99, 0.999])
+        assert np.allclose(histogram.quantile(q), np.quantile(latencies, q), rtol=0.005)
+        assert histogram.mean == pytest.approx(latencies.mean())
+        assert histogram.quantile(1.0) == histogram.max == latencies.max()
+
+    def test_merge(self):
+        """Test that merged histograms equal one histogram of all latencies."""
+        latencies = np.random.default_rng(1).exponential(0.1, 1000)
+        whole, first, second = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        whole.record(latencies)
+        first.record(latencies[:300])
+        second.record(latencies[300:])
+
+        merged = first.merge(second)
+        assert np.array_equal(merged.counts, whole.counts)
+        assert merged.count == 1000
+
+    def test_small_and_empty(self):
+        """Test exact microsecond buckets, and NaN quantiles when empty."""
+        histogram = LatencyHistogram()
+        assert np.isnan(histogram.quantile(0.5))
+
+        histogram.record([0.000_003, 0.000_005])
+        assert histogram.quantile(0.5) == pytest.approx(0.000_003)
+
+
+class TestLoadGenerator:
+    """Test load-test runs against the stub API."""
+
+    def test_closed_loop(self, stub):
+        """Test that a closed loop keeps the concurrency level."""
+        url = f"{stub.url}/chat/completions"
+        result = asyncio.run(closed_loop(url, concurrency=3, duration=0.3, body=chat_body()))
+
+        assert result.requests > 10
+        assert result.errors == 0
+        assert stub.max_in_flight <= 3
+        assert result.percentiles()[50] >= 10
+        assert result.throughput == pytest.approx(result.requests / result.duration)
+
+    def test_open_loop(self, stub):
+        """Test that an open loop sends requests at the given rate."""
+        url = f"{stub.url}/chat/completions"
+        result = asyncio.run(open_loop(url, rate=100, duration=0.3, body=chat_body()))
+
+        assert result.requests == 30
+        assert result.errors == 0
+        assert result.duration >= 0.29
+        assert result.latencies.quantile(0.0) >= 0.01
+
+    def test_errors(self, stub):
+        """Test that error responses are counted, without latencies."""
+        url = f"{stub.url}/chat/completions"
+        result = asyncio.run(open_loop(url, rate=50, duration=0.1, body=chat_body("reject")))
+
+        assert result.error_rate == 1.0
+        assert result.latencies.count == 0
+
+    def test_sweep_to_csv(self, stub, tmp_path):
+        """Test that sweep results append to a CSV of the reporting template's columns."""
+        url = f"{stub.url}/chat/completions"
+        results = asyncio.run(
+            sweep(
+                url,
+                concurrencies=[1, 2],
+                rates=[20],
+                duration=0.1,
+                max_connections=4,
+                body=chat_body(delay=0),
+            )
+        )
+        path = tmp_path / "bench.csv"
+        write_csv(results, path)
+        write_csv(results[:1], path)
+
+        with path.open() as f:
+            rows = list(csv.DictReader(f))
+        assert [row["mode"] for row in rows] == ["closed", "closed", "open", "closed"]
+        assert {"date", "api_calls", "response_time_ms", "error_rate", "p99_ms"} <= set(rows[0])
+        assert int(rows[0]["api_calls"]) == results[0].requests
+
+    def test_command_line(self, stub, tmp_path, capsys):
+        """Test the command-line sweep."""
+        output = tmp_path / "bench.csv"
+        main(
+            [
+                f"{stub.url}/chat/completions",
+                "--data",
+                '{"messages": [{"role": "user", "content": "salut"}]}',
+                "--concurrency",
+                "2",
+                "--duration",
+                "0.1",
+                "--output",
+                str(output),
+            ]
+        )
+
+        assert "concurrency 2" in capsys.readouterr().out
+        assert output.read_text().startswith("date,mode,concurrency")
+
+    def test_invalid_levels(self):
+        """Test that empty load levels are rejected."""
+        with pytest.raises(ValueError, match="concurrency"):
+            asyncio.run(closed_loop("http://127.0.0.1:1/", concurrency=0, duration=1))
@@ -0,0 +1,145 @@
+"""Tests for the persistent response cache."""
+
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from ai_kit_core.cache import ResponseCache, cache_key
+from ai_kit_core.client import AsyncClient
+
+
+def write_entries(path, worker, n):
+    """Write entries from a separate process."""
+    with ResponseCache(path) as cache:
+        for i in range(n):
+            cache.set(f"{worker}-{i}", {"worker": worker, "i": i})
+
+
+class TestCacheKey:
+    """Test request hashing."""
+
+    def test_canonical(self):
+        """Test that keys ignore key order but not values, servers or endpoints."""
+        payload = {"model": "m", "messages": [{"role": "user", "content": "été"}], "top_p": 1}
+        reordered = {"top_p": 1, "messages": [{"content": "été", "role": "user"}], "model": "m"}
+
+        url = "http://a.example/v1/chat/completions"
+
+        assert cache_key(url, payload) == cache_key(url, reordered)
+        assert cache_key(url, payload) != cache_key("http://a.example/v1/embeddings", payload)
+        assert cache_key(url, payload) != cache_key("http://b.example/v1/chat/completions", payload)
+        assert cache_key(url, payload) != cache_key(url, {**payload, "top_p": 0.9})
+
+
+class TestResponseCache:
+    """Test storage, expiry and eviction."""
+
+    def test_persists(self, tmp_path):
+        """Test that entries survive reopening the file."""
+        path = tmp_path / "cache" / "responses.sqlite"
+        with ResponseCache(path) as cache:
+            cache.set_many([("a", {"x": 1}), ("b", [1, "é"])])
+
+        with ResponseCache(path) as cache:
+            assert cache.get_many(["a", "missing", "b"]) == [{"x": 1}, None, [1, "é"]]
+            assert len(cache) == 2
+            assert cache.stats.hits == 2
+            assert cache.stats.misses == 1
+            assert cache.stats.hit_rate == pytest.approx(2 / 3)
+
+    def test_ttl(self, tmp_path):
+        """Test that expired entries are misses, and deleted on eviction."""
+        with ResponseCache(tmp_path / "c.sqlite", ttl=0.05) as cache:
+            cache.set("a", 1)
+            assert cache.get("a") == 1
+            time.sleep(0.1)
+            assert cache.get("a") is None
+            assert cache.evict() == 1
+            assert len(cache) == 0
+
+    def test_size_eviction(self, tmp_path):
+        """Test that the least recently used entries are evicted first."""
+        with ResponseCache(tmp_path / "c.sqlite", max_size=30) as cache:
+            for key in "abcd":
+                cache.set(key, "x" * 8)  # 10 bytes of JSON each
+                time.sleep(0.01)
+            cache.get("a")
+
+            assert cache.size == 40
+            assert cache.evict() == 1
+            assert cache.get_many("abcd") == ["x" * 8, None, "x" * 8, "x" * 8]
+            assert cache.size <= 30
+
+    def test_lookups_do_not_write(self, tmp_path):
+        """Test that hits are served while another process holds the write lock."""
+        path = tmp_path / "c.sqlite"
+        with ResponseCache(path, max_size=100) as cache:
+            cache.set("a", 1)
+            writer = sqlite3.connect(path, isolation_level=None)
+            writer.execute("BEGIN IMMEDIATE")
+            start = time.monotonic()
+            assert cache.get_many(["a", "b"]) == [1, None]
+            assert time.monotonic() - start < 1
+            writer.execute("ROLLBACK")
+            writer.close()
+            accessed = cache._accessed["a"]
+
+        with ResponseCache(path) as cache:
+            assert cache._db.execute("SELECT accessed FROM responses").fetchone() == (accessed,)
+
+    def test_concurrent_writers(self, tmp_path):
+        """Test that processes can write to the same file at once."""
+        path = tmp_path / "c.sqlite"
+        ResponseCache(path).close()
+
+        with ProcessPoolExecutor(max_workers=3) as executor:
+            for future in [executor.submit(write_entries, path, w, 200) for w in range(3)]:
+                future.result()
+
+        with ResponseCache(path) as cache:
+            assert len(cache) == 600
+            assert cache.get("2-199") == {"worker": 2, "i": 199}
+
+    def test_invalid_limits(self, tmp_path):
+        """Test that non-positive TTLs are rejected."""
+        with pytest.raises(ValueError, match="ttl"):
+            ResponseCache(tmp_path / "c.sqlite", ttl=0)
+
+
+class TestClientCache:
+    """Test the cache used by the client."""
+
+    def test_second_run_uses_cache(self, stub, tmp_path):
+        """Test that a second run sends no request."""
+        prompts = [f"question {i}" for i in range(10)]
+
+        async def main(cache):
+            async with AsyncClient(stub.url, model="m", cache=cache) as client:
+                return await client.chat_batch(prompts, temperature=0)
+
+        with ResponseCache(tmp_path / "c.sqlite") as cache:
+            first = asyncio.run(main(cache))
+        with ResponseCache(tmp_path / "c.sqlite") as cache:
+            second = asyncio.run(main(cache))
+            assert cache.stats.hit_rate == 1.0
+
+        assert second == first
+        assert sum(stub.attempts.values()) == 10
+
+    def test_servers_do_not_share_responses(self, stub, tmp_path):
+        """Test that clients of two servers sharing a cache each send their requests."""
+        other_url = stub.url.replace("/v1", "/v2")
+
+        async def main(cache, url):
+            async with AsyncClient(url, model="m", cache=cache) as client:
+                return await client.chat("bonjour", temperature=0)
+
+        with ResponseCache(tmp_path / "c.sqlite") as cache:
+            asyncio.run(main(cache, stub.url))
+            asyncio.run(main(cache, other_url))
+            asyncio.run(main(cache, other_url + "/"))
+            assert cache.stats.hits == 1
+
+        assert stub.attempts["bonjour"] == 2
@@ -0,0 +1,196 @@
+"""Tests for the OpenAI-compatible client, against a local stub server."""
+
+import asyncio
+import socketserver
+import threading
+import time
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pytest
+from ai_kit_core.client import (
+    APIError,
+    AsyncClient,
+    ConnectionPool,
+    TokenBucket,
+    backoff_delay,
+    message_content,
+)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@contextmanager
+def raw_server(response):
+    """Server sending ``response`` as is to every request, then closing, counting requests."""
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            self.request.recv(65536)
+            with lock:
+                requests.append(1)
+            self.request.sendall(response)
+
+    requests, lock = [], threading.Lock()
+    with socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler) as server:
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            yield f"http://127.0.0.1:{server.server_address[1]}/v1", requests
+        finally:
+            server.shutdown()
+
+
+class TestAsyncClient:
+    """Test batched requests to the stub API."""
+
+    def test_chat_batch_is_ordered_and_bounded(self, stub):
+        """Test that results follow the inputs, with bounded concurrency and pooled connections."""
+        prompts = [f"question {i}" for i in range(40)]
+
+        async def main():
+            client = AsyncClient(stub.url, api_key="secret", model="m", max_concurrency=4)
+            async with client:
+                return await client.chat_batch(prompts, delay=0.01)
+
+        responses = run(main())
+
+        assert [message_content(r) for r in responses] == [p.upper() for p in prompts]
+        assert stub.max_in_flight <= 4
+        assert stub.connections <= 4
+        assert stub.authorization == "Bearer secret"
+
+    def test_retries_transient_errors(self, stub):
+        """Test that 503 responses are retried until the request succeeds."""
+
+        async def main():
+            async with AsyncClient(stub.url, model="m", max_retries=3) as client:
+                return await client.chat("fail:2:bonjour")
+
+        assert message_content(run(main())) == "FAIL:2:BONJOUR"
+        assert stub.attempts["fail:2:bonjour"] == 3
+
+    def test_gives_up_after_max_retries(self, stub):
+        """Test errors after the last retry, raised or returned in place."""
+
+        async def main(return_exceptions):
+            async with AsyncClient(stub.url, model="m", max_retries=1) as client:
+                return await client.chat_batch(
+                    ["ok", "fail:5:a", "reject"], return_exceptions=return_exceptions
+                )
+
+        ok, retried, rejected = run(main(return_exceptions=True))
+        assert message_content(ok) == "OK"
+        assert retried.status == 503
+        assert rejected.status == 400
+        assert stub.attempts["fail:5:a"] == 2
+        assert stub.attempts["reject"] == 1
+
+        with pytest.raises(APIError, match="503|400"):
+            run(main(return_exceptions=False))
+
+    def test_invalid_json(self, stub):
+        """Test that a success status with a body that is not JSON is an API error."""
+
+        async def main():
+            async with AsyncClient(stub.url, model="m") as client:
+                return await client.chat_batch(["ok", "html"], return_exceptions=True)
+
+        ok, invalid = run(main())
+
+        assert message_content(ok) == "OK"
+        assert isinstance(invalid, APIError)
+        assert invalid.status == 200
+        assert invalid.body == b"<html>Maintenance</html>"
+        assert stub.attempts["html"] == 1
+
+    def test_embed(self, stub):
+        """Test embeddings across several requests, in input order."""
+        texts = ["a" * n for n in range(1, 11)]
+
+        async def main():
+            async with AsyncClient(stub.url, model="e") as client:
+                return await client.embed(texts, batch_size=3, chunked=True)
+
+        embeddings = run(main())
+
+        assert embeddings.shape == (10, 2)
+        assert embeddings[:, 0].tolist() == list(range(1, 11))
+        assert embeddings[:, 1].tolist() == [0, 1, 2] * 3 + [0]
+
+    def test_requires_model(self, stub):
+        """Test that requests without any model are rejected."""
+        with pytest.raises(ValueError, match="model"):
+            run(AsyncClient(stub.url).chat("bonjour"))
+
+    def test_network_errors(self):
+        """Test that connection failures surface as API errors."""
+        with ThreadingHTTPServer(("127.0.0.1", 0), None) as server:
+            url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+        client = AsyncClient(url, model="m", max_retries=0)
+
+        with pytest.raises(APIError) as error:
+            run(client.chat("bonjour"))
+        assert error.value.status is None
+
+    def test_invalid_responses(self):
+        """Test that responses that are not HTTP are retried, then returned as API errors."""
+        long_header = b"HTTP/1.1 200 OK\r\nX-Long: " + b"a" * 100_000 + b"\r\n\r\n"
+        bad_length = b"HTTP/1.1 200 OK\r\nContent-Length: many\r\n\r\n"
+
+        async def main(url):
+            async with AsyncClient(url, model="m", max_retries=1) as client:
+                return await client.chat_batch(["bonjour"], return_exceptions=True)
+
+        for response in (b"garbage\r\n\r\n", long_header, bad_length):
+            with raw_server(response) as (url, requests):
+                (error,) = run(main(url))
+            assert isinstance(error, APIError)
+            assert error.status is None
+            assert "Invalid response" in str(error)
+            assert len(requests) == 2
+
+
+class TestTransport:
+    """Test the connection pool and rate limiting."""
+
+    def test_invalid_url(self):
+        """Test that only http(s) URLs are accepted."""
+        with pytest.raises(ValueError, match="http"):
+            ConnectionPool("ftp://example.org")
+
+    def test_informational_response(self):
+        """Test that a 100 Continue is skipped for the final response."""
+        body = b'{"choices": [{"message": {"content": "OK"}}]}'
+        response = (
+            b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 200 OK\r\nConnection: close\r\n"
+            b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+        )
+
+        with raw_server(response) as (url, _):
+            answer = run(AsyncClient(url, model="m").chat("bonjour"))
+
+        assert message_content(answer) == "OK"
+
+    def test_token_bucket(self):
+        """Test that the bucket spaces requests beyond its capacity."""
+
+        async def main():
+            bucket = TokenBucket(rate=50, capacity=1)
+            start = time.monotonic()
+            for _ in range(6):
+                await bucket.acquire()
+            return time.monotonic() - start
+
+        assert run(main()) >= 5 / 50 * 0.9
+
+    def test_backoff_delay(self):
+        """Test that delays grow with attempts up to the cap."""
+        delays = np.array([backoff_delay(10, base=1.0, cap=4.0) for _ in range(1000)])
+
+        assert delays.max() <= 4.0
+        assert delays.mean() > 1.5
+        assert max(backoff_delay(0, base=0.1) for _ in range(100)) <= 0.1
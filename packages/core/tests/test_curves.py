@@ -0,0 +1,135 @@
+"""Tests for ROC and PR curves, threshold sweeps and calibration."""
+
+import numpy as np
+import pytest
+from ai_kit_core.curves import binary_curves, calibration
+from ai_kit_core.metrics import MetricsAccumulator
+
+
+@pytest.fixture
+def scores():
+    """Labels and scores with many ties."""
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 2, 2000)
+    y_score = np.round(np.clip(rng.normal(0.4 + 0.2 * y_true, 0.2), 0, 1), 2)
+    return y_true, y_score
+
+
+class TestBinaryCurves:
+    """Test curves derived from one sort of the scores."""
+
+    def test_counts(self, scores):
+        """Test the confusion matrix at every distinct score."""
+        y_true, y_score = scores
+
+        curves = binary_curves(y_true, y_score)
+
+        assert curves.thresholds.tolist() == sorted(set(y_score.tolist()), reverse=True)
+        for i in [0, 10, len(curves.thresholds) - 1]:
+            predicted = y_score >= curves.thresholds[i]
+            assert curves.tp[i] == (predicted & (y_true == 1)).sum()
+            assert curves.fp[i] == (predicted & (y_true == 0)).sum()
+
+    def test_areas(self, scores):
+        """Test ROC AUC against pair counting and average precision against its definition."""
+        y_true, y_score = scores
+
+        curves = binary_curves(y_true, y_score)
+
+        diff = np.subtract.outer(y_score[y_true == 1], y_score[y_true == 0])
+        assert curves.roc_auc == pytest.approx(
+            ((diff > 0).sum() + (diff == 0).sum() / 2) / diff.size
+        )
+        expected_ap, previous_recall = 0.0, 0.0
+        for threshold in sorted(set(y_score.tolist()), reverse=True):
+            predicted = y_score >= threshold
+            tp = (predicted & (y_true == 1)).sum()
+            recall = tp / (y_true == 1).sum()
+            expected_ap += (recall - previous_recall) * tp / predicted.sum()
+            previous_recall = recall
+        assert curves.average_precision == pytest.approx(expected_ap)
+
+        fpr, tpr, thresholds = curves.roc()
+        assert (fpr[0], tpr[0], thresholds[0]) == (0.0, 0.0, np.inf)
+        assert (fpr[-1], tpr[-1]) == (1.0, 1.0)
+
+    def test_table_matches_accumulator(self, scores):
+        """Test threshold tables against metrics of the thresholded predictions."""
+        y_true, y_score = scores
+        curves = binary_curves(y_true, y_score)
+
+        table = curves.table([0.35, 0.5, 0.555], average="weighted")
+
+        for i, threshold in enumerate([0.35, 0.5, 0.555]):
+            y_pred = (y_score >= threshold).astype(int)
+            expected = MetricsAccumulator([0, 1]).update(y_true, y_pred).metrics()
+            for name in ["accuracy", "precision", "recall", "f1_score"]:
+                assert table[name][i] == pytest.approx(expected[name]), (threshold, name)
+
+    def test_best_threshold(self, scores):
+        """Test choosing a threshold under the template's minimums."""
+        y_true, y_score = scores
+        curves = binary_curves(y_true, y_score)
+        table = curves.table()
+
+        threshold = curves.best_threshold("recall", minimums={"precision": 0.7})
+
+        row = list(curves.thresholds).index(threshold)
+        assert table["precision"][row] >= 0.7
+        assert table["recall"][row] == table["recall"][table["precision"] >= 0.7].max()
+        assert curves.best_threshold(minimums={"precision": 1.01}) is None
+        with pytest.raises(ValueError, match="Unknown metric"):
+            curves.best_threshold("auc")
+
+    def test_memory_mapped(self, scores, tmp_path):
+        """Test memory-mapped float32 arrays read by small chunks."""
+        y_true, y_score = scores
+        np.save(tmp_path / "labels.npy", y_true.astype(np.int8))
+        np.save(tmp_path / "scores.npy", y_score.astype(np.float32))
+
+        curves = binary_curves(
+            np.load(tmp_path / "labels.npy", mmap_mode="r"),
+            np.load(tmp_path / "scores.npy", mmap_mode="r"),
+            chunk_size=300,
+        )
+
+        expected = binary_curves(y_true, y_score.astype(np.float32))
+        assert curves.thresholds.dtype == np.float32
+        assert curves.tp.dtype == curves.fp.dtype == np.int32
+        assert np.array_equal(binary_curves(y_true, y_score, chunk_size=7).tp, expected.tp)
+        assert np.array_equal(curves.tp, expected.tp)
+        assert np.array_equal(curves.fp, expected.fp)
+        assert curves.calibration.rows() == expected.calibration.rows()
+
+    def test_errors(self):
+        """Test invalid scores."""
+        with pytest.raises(ValueError, match="NaN"):
+            binary_curves([0, 1], [0.5, np.nan])
+        with pytest.raises(ValueError, match="same length"):
+            binary_curves([0, 1], [0.5])
+        assert binary_curves([0, 1], [-1.0, 2.0]).calibration is None
+
+
+class TestCalibration:
+    """Test accuracy by confidence bin."""
+
+    def test_bins(self):
+        """Test right-closed bins and the expected calibration error."""
+        confidence = [0.55, 0.6, 0.7, 0.95, 1.0]
+        correct = [True, False, True, True, True]
+
+        result = calibration(confidence, correct)
+
+        assert [row["count"] for row in result.rows()] == [2, 1, 0, 2]
+        assert result.accuracy.tolist() == [0.5, 1.0, 0.0, 1.0]
+        expected = (2 * abs(0.5 - 0.575) + abs(1 - 0.7) + 2 * abs(1 - 0.975)) / 5
+        assert result.ece == pytest.approx(expected)
+
+    def test_binary_curves_calibration(self):
+        """Test calibration of binary scores predicting positive from 0.5."""
+        curves = binary_curves([1, 0, 0, 1], [0.9, 0.2, 0.7, 0.4])
+
+        rows = curves.calibration.rows()
+        # Confidences 0.9, 0.8, 0.7, 0.6: only the first two are correct
+        assert [row["count"] for row in rows] == [1, 2, 1, 0]
+        assert [row["accuracy"] for row in rows] == [0.0, 0.5, 1.0, 0.0]
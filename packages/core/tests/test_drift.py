@@ -0,0 +1,199 @@
+"""Tests for the distribution shift measures."""
+
+from functools import partial
+
+import numpy as np
+import pytest
+from ai_kit_core.drift import (
+    RELATIVE_ACCURACY,
+    CategoricalSketch,
+    NumericSketch,
+    compare,
+    detect_drift,
+    merge_sketches,
+    sketch_batches,
+    sketch_columns,
+    sketch_file,
+)
+
+
+def read_batches(seed, columns):
+    """Batches of synthetic columns (run in worker processes)."""
+    rng = np.random.default_rng(seed)
+    for _ in range(4):
+        batch = {
+            "age": rng.normal(40 + seed, 10, 1000),
+            "income": rng.lognormal(10, 1, 1000),
+            "region": rng.choice(["nord", "sud", "est"], 1000),
+        }
+        yield {column: batch[column] for column in columns}
+
+
+class TestNumericSketch:
+    """Test the fixed-size histogram of numeric columns."""
+
+    def test_quantiles(self):
+        """Test that quantiles are within the relative accuracy."""
+        rng = np.random.default_rng(0)
+        values = np.concatenate([rng.lognormal(0, 3, 10_000), -rng.lognormal(0, 1, 1000), [0.0]])
+
+        sketch = NumericSketch().update(values)
+
+        q = np.array([0.01, 0.1, 0.5, 0.9, 0.99])
+        expected = np.quantile(values, q, method="inverted_cdf")
+        assert np.allclose(sketch.quantile(q), expected, rtol=RELATIVE_ACCURACY)
+        assert sketch.quantile(0.0) < 0
+        assert sketch.count == 11_001
+
+    def test_merge(self):
+        """Test that merged chunks equal the sketch of all values."""
+        rng = np.random.default_rng(1)
+        values = rng.normal(0, 100, 5000)
+        values[::50] = np.nan
+
+        merged = NumericSketch().update(values[:1234]).merge(NumericSketch().update(values[1234:]))
+
+        whole = NumericSketch().update(values)
+        assert np.array_equal(merged.counts, whole.counts)
+        assert merged.missing == whole.missing == 100
+
+
+class TestCompare:
+    """Test PSI, Jensen-Shannon and Kolmogorov-Smirnov measures."""
+
+    def test_no_shift(self):
+        """Test samples of the same distribution."""
+        rng = np.random.default_rng(2)
+        reference = NumericSketch().update(rng.normal(0, 1, 50_000))
+        current = NumericSketch().update(rng.normal(0, 1, 50_000))
+
+        result = compare(reference, current)
+
+        assert result.psi < 0.01
+        assert result.js < 0.05
+        assert result.ks < 0.02
+        assert result.severity == "none"
+
+    def test_shift(self):
+        """Test a shifted mean, with KS close to the exact statistic."""
+        rng = np.random.default_rng(3)
+        reference_values = rng.normal(0, 1, 20_000)
+        current_values = rng.normal(0.5, 1, 20_000)
+
+        result = compare(
+            NumericSketch().update(reference_values), NumericSketch().update(current_values)
+        )
+
+        points = np.sort(np.concatenate([reference_values, current_values]))
+        exact_ks = np.abs(
+            np.searchsorted(np.sort(reference_values), points, side="right") / 20_000
+            - np.searchsorted(np.sort(current_values), points, side="right") / 20_000
+        ).max()
+        assert result.ks == pytest.approx(exact_ks, abs=0.01)
+        assert result.psi > 0.2
+        assert 0 < result.js < 1
+        assert result.severity in ("moderate", "significant")
+
+    def test_categorical(self):
+        """Test category shares and missing values."""
+        reference = CategoricalSketch().update(["a"] * 50 + ["b"] * 50)
+        current = CategoricalSketch().update(["a"] * 80 + ["c"] * 10 + [None] * 10)
+
+        result = compare(reference, current)
+
+        assert result.ks is None
+        assert result.current_missing == 0.1
+        assert result.severity == "significant"
+        assert compare(reference, reference).psi == 0.0
+        with pytest.raises(ValueError, match="numeric and a categorical"):
+            compare(reference, NumericSketch())
+
+    def test_categories_beyond_limit(self):
+        """Test that rare categories are folded into a bucket counted in PSI."""
+        values = ["a"] * 50 + ["b"] * 30 + [f"id{i}" for i in range(20)]
+        reference = CategoricalSketch(max_categories=2).update(values)
+        current = CategoricalSketch(max_categories=2).update(["a"] * 50 + ["b"] * 50)
+        current.merge(CategoricalSketch().update([f"new{i}" for i in range(100)]))
+
+        assert reference.counts == {"a": 50, "b": 30}
+        assert reference.other == 20
+        assert reference.count == 100
+        assert len(current.counts) == 2
+        assert current.other == 100
+        assert compare(reference, reference).psi == 0.0
+        assert compare(reference, current).severity == "significant"
+
+
+class TestSketchColumns:
+    """Test sketching streams of column batches."""
+
+    def test_batches(self):
+        """Test that sketch types follow column dtypes."""
+        sketches = sketch_batches(read_batches(0, ["age", "region"]))
+
+        assert isinstance(sketches["age"], NumericSketch)
+        assert isinstance(sketches["region"], CategoricalSketch)
+        assert sketches["region"].count == 4000
+
+    def test_parallel_columns(self):
+        """Test that columns sketched in worker processes match a single pass."""
+        columns = ["age", "income", "region"]
+
+        parallel = sketch_columns(partial(read_batches, 0), columns, max_workers=2)
+
+        single = sketch_batches(read_batches(0, columns))
+        assert list(parallel) == columns
+        assert np.array_equal(parallel["income"].counts, single["income"].counts)
+        assert parallel["region"].counts == single["region"].counts
+
+    def test_detect_drift(self):
+        """Test that only the shifted column is reported as drifting."""
+        columns = ["age", "income", "region"]
+        reference = merge_sketches(
+            sketch_batches(read_batches(0, columns)), sketch_batches(read_batches(1, columns))
+        )
+        current = sketch_batches(read_batches(20, columns))
+
+        results = detect_drift(reference, current)
+
+        assert results["age"].severity == "significant"
+        assert results["income"].severity == "none"
+        assert results["region"].severity == "none"
+
+    def test_csv_file(self, tmp_path):
+        """Test sketching every column of a CSV file."""
+        pytest.importorskip("pandas")
+        path = tmp_path / "data.csv"
+        path.write_text("age,region\n30,nord\n40,sud\n,nord\n")
+
+        sketches = sketch_file(path, max_workers=1)
+
+        assert sketches["age"].missing == 1
+        assert sketches["region"].counts == {"nord": 2, "sud": 1}
+
+    def test_column_typed_by_first_values(self, tmp_path):
+        """Test CSV columns empty or numeric in their first chunk and text later."""
+        pytest.importorskip("pandas")
+        path = tmp_path / "data.csv"
+        rows = [f",{i}" for i in range(60)] + [f"x{i},y{i}" for i in range(40)]
+        path.write_text("\n".join(["late,mixed", *rows]) + "\n")
+
+        sketches = sketch_file(path, batch_size=50, max_workers=1)
+
+        assert isinstance(sketches["late"], CategoricalSketch)
+        assert sketches["late"].missing == 60
+        assert sketches["late"].counts["x0"] == 1
+        assert isinstance(sketches["mixed"], CategoricalSketch)
+        assert sketches["mixed"].count == 100
+        assert sketches["mixed"].counts["y0"] == 1
+
+    def test_merge_numeric_and_text_parts(self):
+        """Test that a column numeric in one part and text in another is categorical."""
+        merged = merge_sketches(
+            {"code": NumericSketch().update([1.0, 1.0, None])},
+            {"code": CategoricalSketch().update(["a"])},
+        )
+
+        # 0.99 represents the bin of 1.0
+        assert merged["code"].counts == {"0.99": 2, "a": 1}
+        assert merged["code"].missing == 1
@@ -0,0 +1,157 @@
+"""Tests for the fairness metrics."""
+
+import math
+
+import numpy as np
+import pytest
+from ai_kit_core.fairness import (
+    FairnessReport,
+    confusion_by_group,
+    encode_groups,
+    fairness_metrics,
+)
+
+
+def loop_metrics(y_true, y_pred, protected_attribute):
+    """Per-group metrics computed with one boolean mask per group."""
+    metrics = {}
+    for group in np.unique(protected_attribute):
+        mask = protected_attribute == group
+        true, pred = y_true[mask], y_pred[mask]
+        positives, negatives = true == 1, true == 0
+        metrics[group.item()] = {
+            "positive_rate": (pred == 1).mean(),
+            "tpr": (pred[positives] == 1).mean() if positives.any() else math.nan,
+            "fpr": (pred[negatives] == 1).mean() if negatives.any() else math.nan,
+            "sample_size": int(mask.sum()),
+        }
+    return metrics
+
+
+class TestEncodeGroups:
+    """Test integer-coding protected attributes."""
+
+    def test_single_attribute(self):
+        """Test that labels are the sorted attribute values."""
+        codes, labels = encode_groups(np.array(["m", "f", "m", "x"]))
+
+        assert labels == ["f", "m", "x"]
+        assert codes.tolist() == [1, 0, 1, 2]
+
+    def test_intersection(self):
+        """Test that only the combinations present become groups."""
+        gender = ["f", "f", "m", "m", "f"]
+        age = [30, 50, 30, 30, 30]
+
+        codes, labels = encode_groups(gender, age)
+
+        assert labels == [("f", 30), ("f", 50), ("m", 30)]
+        assert codes.tolist() == [0, 1, 2, 2, 0]
+
+    def test_missing_values(self):
+        """Test that missing values form their own group, after the others."""
+        codes, labels = encode_groups(np.array(["a", None, "b", "a", math.nan], dtype=object))
+        assert labels == ["a", "b", None]
+        assert codes.tolist() == [0, 2, 1, 0, 2]
+
+        codes, labels = encode_groups(["f", "m", "f"], [30.0, math.nan, math.nan])
+        assert labels == [("f", 30.0), ("f", None), ("m", None)]
+        assert codes.tolist() == [0, 2, 1]
+
+        report = fairness_metrics(
+            [1, 0, 1, 1], [1, 0, 0, 1], np.array(["a", None, "b", "a"], dtype=object)
+        )
+        assert report.groups == ["a", "b", None]
+
+    def test_errors(self):
+        """Test missing and mismatched attributes."""
+        with pytest.raises(ValueError, match="At least one"):
+            encode_groups()
+        with pytest.raises(ValueError, match="same length"):
+            encode_groups([1, 2], [1])
+        with pytest.raises(ValueError, match="cannot be sorted"):
+            encode_groups(np.array(["a", 1], dtype=object))
+
+
+class TestFairnessMetrics:
+    """Test computing group fairness metrics."""
+
+    def test_matches_loop(self):
+        """Test that counting with bincount gives the per-group loop's metrics."""
+        rng = np.random.default_rng(0)
+        y_true = rng.integers(0, 2, 5000)
+        y_pred = rng.integers(0, 2, 5000)
+        attribute = rng.choice(["a", "b", "c", "d"], 5000)
+
+        report = fairness_metrics(y_true, y_pred, attribute)
+
+        expected = loop_metrics(y_true, y_pred, attribute)
+        assert report.to_dict().keys() == expected.keys()
+        for group, metrics in report.to_dict().items():
+            for name, value in metrics.items():
+                assert value == pytest.approx(expected[group][name]), (group, name)
+
+    def test_gaps(self):
+        """Test disparate impact and equalized odds on hand-computed groups."""
+        # Group a: TPR 1, FPR 0.5, positive rate 0.75; group b: TPR 0.5, FPR 0, rate 0.25
+        y_true = [1, 1, 0, 0, 1, 1, 0, 0]
+        y_pred = [1, 1, 1, 0, 1, 0, 0, 0]
+        group = ["a"] * 4 + ["b"] * 4
+
+        report = fairness_metrics(y_true, y_pred, group)
+
+        assert report.positive_rate.tolist() == [0.75, 0.25]
+        assert report.disparate_impact == pytest.approx(1 / 3)
+        assert report.demographic_parity_difference == 0.5
+        assert report.equal_opportunity_difference == 0.5
+        assert report.equalized_odds_difference == 0.5
+        assert not report.passes()
+
+    def test_undefined_rates(self):
+        """Test that groups without positives do not count in TPR gaps."""
+        report = fairness_metrics([0, 0, 1, 0], [1, 0, 1, 0], ["a", "a", "b", "b"])
+
+        assert math.isnan(report.tpr[0])
+        assert report.equal_opportunity_difference == 0.0
+        assert report.equalized_odds_difference == 0.5
+
+    def test_min_group_size(self):
+        """Test that small intersectional groups are reported but not compared."""
+        y_true = [1, 1, 1, 1, 1]
+        y_pred = [1, 1, 1, 1, 0]
+        gender = ["f", "f", "m", "m", "x"]
+        region = ["n", "n", "n", "n", "s"]
+
+        report = fairness_metrics(y_true, y_pred, gender, region, min_group_size=2)
+
+        assert report.groups == [("f", "n"), ("m", "n"), ("x", "s")]
+        assert report.sample_size.tolist() == [2, 2, 1]
+        assert report.disparate_impact == 1.0
+        assert report.passes()
+
+    def test_positive_label(self):
+        """Test string labels with a custom positive class."""
+        report = fairness_metrics(
+            ["yes", "no", "yes"], ["yes", "yes", "no"], [0, 0, 1], positive_label="yes"
+        )
+
+        assert report.tpr.tolist() == [1.0, 0.0]
+        assert report.fpr[0] == 1.0
+
+    def test_counts_merge(self):
+        """Test that counts of separate batches add up to the counts of all samples."""
+        rng = np.random.default_rng(1)
+        y_true, y_pred = rng.integers(0, 2, (2, 1000))
+        codes = rng.integers(0, 3, 1000)
+
+        counts = confusion_by_group(y_true[:400], y_pred[:400], codes[:400], 3)
+        counts += confusion_by_group(y_true[400:], y_pred[400:], codes[400:], 3)
+
+        assert counts.sum() == 1000
+        whole = FairnessReport(groups=[0, 1, 2], counts=counts)
+        assert whole.to_dict() == fairness_metrics(y_true, y_pred, codes).to_dict()
+
+    def test_length_mismatch(self):
+        """Test the error when arrays have different lengths."""
+        with pytest.raises(ValueError, match="same length"):
+            fairness_metrics([1, 0], [1], ["a", "b"])
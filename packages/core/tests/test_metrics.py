@@ -0,0 +1,152 @@
+"""Tests for the streaming classification metrics."""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+from ai_kit_core.metrics import MetricsAccumulator, accumulate, accumulate_files
+
+
+def exact_auc(positive_scores, negative_scores):
+    """ROC AUC as the fraction of (positive, negative) pairs ranked correctly."""
+    diff = np.subtract.outer(positive_scores, negative_scores)
+    return ((diff > 0).sum() + (diff == 0).sum() / 2) / diff.size
+
+
+def shard_metrics(seed):
+    """Accumulate a random shard (run in a worker process)."""
+    rng = np.random.default_rng(seed)
+    y_true = rng.integers(0, 3, 1000)
+    scores = rng.dirichlet([1, 1, 1], 1000)
+    return MetricsAccumulator(classes=[0, 1, 2]).update(y_true, scores.argmax(axis=1), scores)
+
+
+class TestMetricsAccumulator:
+    """Test accumulating predictions batch by batch."""
+
+    def test_weighted_metrics(self):
+        """Test accuracy and support-weighted precision, recall and F1."""
+        y_true = ["cat", "cat", "cat", "dog", "dog", "bird"]
+        y_pred = ["cat", "cat", "dog", "dog", "cat", "cat"]
+
+        metrics = MetricsAccumulator(["bird", "cat", "dog"]).update(y_true, y_pred).metrics()
+
+        # cat: P 2/4 R 2/3; dog: P 1/2 R 1/2; bird: P 0 R 0
+        assert metrics["accuracy"] == pytest.approx(3 / 6)
+        assert metrics["precision"] == pytest.approx((3 * 2 / 4 + 2 * 1 / 2) / 6)
+        assert metrics["recall"] == pytest.approx((3 * 2 / 3 + 2 * 1 / 2) / 6)
+        assert metrics["f1_score"] == pytest.approx((3 * 4 / 7 + 2 * 1 / 2) / 6)
+        assert np.isnan(metrics["roc_auc"])
+
+    def test_batches_match_single_pass(self):
+        """Test that batches accumulate to the metrics of all predictions at once."""
+        rng = np.random.default_rng(0)
+        y_true = rng.integers(0, 2, 10_000)
+        y_score = np.clip(y_true * 0.3 + rng.random(10_000) * 0.7, 0, 1)
+        y_pred = (y_score > 0.5).astype(int)
+
+        whole = MetricsAccumulator([0, 1]).update(y_true, y_pred, y_score)
+        batched = MetricsAccumulator([0, 1])
+        for start in range(0, 10_000, 999):
+            batch = slice(start, start + 999)
+            batched.update(y_true[batch], y_pred[batch], y_score[batch])
+
+        assert batched.count == 10_000
+        assert batched.metrics() == whole.metrics()
+
+    def test_binary_roc_auc(self):
+        """Test that the AUC is exact when distinct scores fall in distinct bins."""
+        rng = np.random.default_rng(1)
+        y_true = rng.integers(0, 2, 2000)
+        # Bin centers, with many ties
+        y_score = (rng.integers(0, 100, 2000) + 0.5) / 100
+
+        accumulator = MetricsAccumulator([0, 1], n_bins=100)
+        accumulator.update(y_true, y_true, np.column_stack([1 - y_score, y_score]))
+
+        expected = exact_auc(y_score[y_true == 1], y_score[y_true == 0])
+        assert accumulator.roc_auc() == pytest.approx(expected)
+
+    def test_multiclass_roc_auc(self):
+        """Test the one-vs-rest macro average, within the binning error."""
+        rng = np.random.default_rng(2)
+        y_true = rng.integers(0, 3, 3000)
+        scores = rng.dirichlet([1, 1, 1], 3000)
+        scores[np.arange(3000), y_true] += 0.5
+        scores /= scores.sum(axis=1, keepdims=True)
+
+        accumulator = MetricsAccumulator([0, 1, 2]).update(y_true, scores.argmax(axis=1), scores)
+
+        expected = np.mean(
+            [exact_auc(scores[y_true == c, c], scores[y_true != c, c]) for c in range(3)]
+        )
+        assert accumulator.roc_auc() == pytest.approx(expected, abs=1e-3)
+
+    def test_merge_across_processes(self):
+        """Test that accumulators built in worker processes merge into the whole."""
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            shards = list(executor.map(shard_metrics, [1, 2, 3]))
+
+        merged = MetricsAccumulator([0, 1, 2])
+        for shard in shards:
+            merged.merge(shard)
+
+        expected = MetricsAccumulator([0, 1, 2])
+        for seed in [1, 2, 3]:
+            rng = np.random.default_rng(seed)
+            y_true = rng.integers(0, 3, 1000)
+            scores = rng.dirichlet([1, 1, 1], 1000)
+            expected.update(y_true, scores.argmax(axis=1), scores)
+        assert merged.count == 3000
+        assert np.array_equal(merged.confusion_matrix, expected.confusion_matrix)
+        assert merged.metrics() == expected.metrics()
+
+    def test_errors(self):
+        """Test unknown labels, inconsistent scores and incompatible merges."""
+        accumulator = MetricsAccumulator([0, 1])
+        with pytest.raises(ValueError, match="Unknown label: 2"):
+            accumulator.update([0, 2], [0, 1])
+        with pytest.raises(ValueError, match="shape"):
+            accumulator.update([0, 1], [0, 1], np.zeros((2, 3)))
+        with pytest.raises(ValueError, match="NaN"):
+            accumulator.update([0, 1, 1], [0, 1, 1], [0.1, np.nan, 0.9])
+        assert accumulator.count == 0
+
+        accumulator.update([0, 1], [0, 1], [0.1, 0.9])
+        with pytest.raises(ValueError, match="every batch"):
+            accumulator.update([0], [0])
+        with pytest.raises(ValueError, match="different classes"):
+            accumulator.merge(MetricsAccumulator([0, 1, 2]))
+        with pytest.raises(ValueError, match="At least two"):
+            MetricsAccumulator([0])
+
+
+class TestAccumulateBatches:
+    """Test accumulating batches of columns."""
+
+    def test_columns(self):
+        """Test reading labels and the positive class score from column batches."""
+        batches = [
+            {"label": np.array([0, 1]), "pred": np.array([0, 1]), "p1": np.array([0.2, 0.7])},
+            {"label": np.array([1]), "pred": np.array([0]), "p1": np.array([0.4])},
+        ]
+
+        accumulator = accumulate(batches, [0, 1], "label", "pred", ["p1"])
+
+        assert accumulator.count == 3
+        assert accumulator.roc_auc() == 1.0
+
+    def test_csv_files(self, tmp_path):
+        """Test accumulating CSV shards in worker processes."""
+        pytest.importorskip("pandas")
+        paths = []
+        for i, rows in enumerate([["0,0,0.1", "1,1,0.8"], ["1,0,0.3", "0,0,0.2"]]):
+            path = tmp_path / f"shard-{i}.csv"
+            path.write_text("\n".join(["y_true,y_pred,score", *rows]) + "\n")
+            paths.append(path)
+
+        accumulator = accumulate_files(paths, [0, 1], score_columns=["score"], max_workers=2)
+
+        assert accumulator.count == 4
+        assert accumulator.metrics()["accuracy"] == 0.75
+        assert accumulator.roc_auc() == 1.0
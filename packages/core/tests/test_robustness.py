@@ -0,0 +1,146 @@
+"""Tests for the perturbation harness."""
+
+import numpy as np
+import pytest
+from ai_kit_core.robustness import (
+    CaseNoise,
+    FeatureMasking,
+    GaussianNoise,
+    StripAccents,
+    Typos,
+    evaluate_robustness,
+)
+
+
+class CountingModel:
+    """Predicts whether features sum above zero, recording batch sizes."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, inputs):
+        self.batch_sizes.append(len(inputs))
+        return (inputs.sum(axis=1) > 0).astype(int)
+
+
+class TestNumericPerturbations:
+    """Test perturbations of numeric features."""
+
+    def test_gaussian_noise(self):
+        """Test per-feature noise scaled on the features' spread."""
+        rng = np.random.default_rng(0)
+        inputs = rng.normal(0, [1.0, 100.0], (10_000, 2))
+
+        noise = GaussianNoise.relative_to(inputs, scale=0.1)
+        perturbed = noise(inputs, rng)
+
+        assert np.allclose((perturbed - inputs).std(axis=0), [0.1, 10.0], rtol=0.05)
+
+    def test_feature_masking(self):
+        """Test masking with per-feature fill values."""
+        inputs = np.ones((5000, 2))
+
+        perturbed = FeatureMasking(rate=0.2, fill=np.array([-1.0, -2.0]))(
+            inputs, np.random.default_rng(0)
+        )
+
+        assert set(np.unique(perturbed[:, 1]).tolist()) == {-2.0, 1.0}
+        assert (perturbed != 1).mean() == pytest.approx(0.2, abs=0.02)
+
+
+class TestTextPerturbations:
+    """Test perturbations of French text."""
+
+    def test_strip_accents(self):
+        """Test accents, cedillas and ligatures."""
+        texts = np.array(["Élève à Noël", "garçon", "cœur", ""])
+
+        perturbed = StripAccents()(texts, np.random.default_rng(0))
+
+        assert perturbed.tolist() == ["Eleve a Noel", "garcon", "coeur", ""]
+
+    def test_case_noise(self):
+        """Test that only the case of letters changes."""
+        texts = np.array(["Déclaration d'impôts"] * 100)
+
+        perturbed = CaseNoise(rate=0.5)(texts, np.random.default_rng(0))
+
+        assert all(text.lower() == texts[0].lower() for text in perturbed)
+        assert (perturbed != texts).mean() > 0.9
+
+    def test_typos(self):
+        """Test substitutions by AZERTY neighbors, deletions and swaps."""
+        texts = np.array(["bonjour madame", "a", ""] * 200, dtype=object)
+
+        perturbed = Typos(rate=0.3)(texts, np.random.default_rng(0))
+
+        assert perturbed.dtype.kind == "U"
+        lengths = np.strings.str_len(perturbed)
+        assert lengths.max() <= 14
+        assert (lengths[::3] < 14).any()
+        assert set("".join(perturbed.tolist())) <= set("azertyuiopqsdfghjklmwxcvbn ")
+        assert perturbed[2] == ""
+        assert (perturbed[::3] != "bonjour madame").mean() > 0.9
+
+    def test_reproducible(self):
+        """Test that a seed gives the same perturbations."""
+        texts = np.array(["les données personnelles"] * 10)
+
+        first = Typos(rate=0.2)(texts, np.random.default_rng(1))
+
+        assert (first == Typos(rate=0.2)(texts, np.random.default_rng(1))).all()
+        assert Typos(rate=0)(texts, np.random.default_rng(1)).tolist() == texts.tolist()
+
+
+class TestEvaluateRobustness:
+    """Test measuring how perturbations flip predictions."""
+
+    def test_batches(self):
+        """Test that variants reach the model in batches of at most batch_size."""
+        model = CountingModel()
+        inputs = np.random.default_rng(0).normal(0, 1, (1000, 3))
+
+        results = evaluate_robustness(
+            model, inputs, [GaussianNoise(0.0)], n_variants=8, batch_size=400, seed=0
+        )
+
+        (result,) = results.values()
+        assert result.flip_rate == 0.0
+        assert result.n_variants == 8
+        # Clean predictions, then 8 variants of 50 samples per batch
+        assert model.batch_sizes == [400, 400, 200] + [400] * 20
+
+    def test_flips_and_accuracy(self):
+        """Test flip counts and accuracy on perturbed inputs."""
+        inputs = np.array([[1.0, 1.0], [0.01, 0.0], [-1.0, -1.0], [-0.01, 0.0]])
+        y_true = np.array([1, 1, 0, 0])
+
+        results = evaluate_robustness(
+            CountingModel(),
+            inputs,
+            {"noise": GaussianNoise(0.1)},
+            y_true=y_true,
+            n_variants=200,
+            seed=0,
+        )
+
+        result = results["noise"]
+        assert result.flips[[0, 2]].tolist() == [0, 0]
+        assert 50 < result.flips[1] < 150
+        assert result.samples_flipped == 0.5
+        # Clean predictions are all right, so every flip is a mistake
+        assert result.clean_accuracy == 1.0
+        assert result.perturbed_accuracy == pytest.approx(1 - result.flip_rate)
+
+    def test_text_with_scores(self):
+        """Test a text model returning class scores."""
+
+        def predict(texts):
+            accented = np.strings.find(texts, "é") >= 0
+            return np.column_stack([~accented, accented]).astype(float)
+
+        texts = np.array(["société", "numérique", "service", "public"])
+
+        results = evaluate_robustness(predict, texts, [StripAccents()], n_variants=2, seed=0)
+
+        assert results["StripAccents(rate=1.0)"].flips.tolist() == [2, 2, 0, 0]
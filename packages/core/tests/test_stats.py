@@ -0,0 +1,130 @@
+"""Tests for the bootstrap confidence intervals."""
+
+import numpy as np
+import pytest
+from ai_kit_core.metrics import MetricsAccumulator
+from ai_kit_core.stats import bootstrap, paired_bootstrap
+
+
+@pytest.fixture
+def predictions():
+    """A model right 80% of the time, a baseline right 70% of the time, with scores."""
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 2, 500)
+    y_pred = np.where(rng.random(500) < 0.8, y_true, 1 - y_true)
+    baseline_pred = np.where(rng.random(500) < 0.7, y_true, 1 - y_true)
+    y_score = np.clip(0.5 + (2 * y_pred - 1) * rng.random(500) / 2, 0, 1)
+    return y_true, y_pred, baseline_pred, y_score
+
+
+def loop_bootstrap(y_true, y_pred, y_score, n_resamples, seed):
+    """Metrics of resamples drawn and scored one at a time."""
+    rng = np.random.default_rng(seed)
+    n = len(y_true)
+    resampled = []
+    for _ in range(n_resamples):
+        index = rng.integers(0, n, n)
+        accumulator = MetricsAccumulator([0, 1]).update(
+            y_true[index], y_pred[index], y_score[index]
+        )
+        resampled.append(accumulator.metrics())
+    return {name: np.array([m[name] for m in resampled]) for name in resampled[0]}
+
+
+class TestBootstrap:
+    """Test confidence intervals of one model's metrics."""
+
+    def test_estimates(self, predictions):
+        """Test that estimates are the metrics of the whole test set."""
+        y_true, y_pred, _, y_score = predictions
+
+        intervals = bootstrap(y_true, y_pred, y_score, n_resamples=50, seed=0)
+
+        expected = MetricsAccumulator([0, 1]).update(y_true, y_pred, y_score).metrics()
+        assert list(intervals) == ["accuracy", "precision", "recall", "f1_score", "roc_auc"]
+        for name, interval in intervals.items():
+            assert interval.estimate == pytest.approx(expected[name])
+            assert interval.low <= interval.estimate <= interval.high
+            assert interval.p_value is None
+
+    def test_matches_loop(self, predictions):
+        """Test that count matrices give the same distribution as drawing indices."""
+        y_true, y_pred, _, y_score = predictions
+
+        intervals = bootstrap(y_true, y_pred, y_score, n_resamples=2000, seed=1)
+
+        resampled = loop_bootstrap(y_true, y_pred, y_score, 2000, seed=2)
+        for name, interval in intervals.items():
+            low, high = np.quantile(resampled[name], [0.025, 0.975])
+            assert interval.low == pytest.approx(low, abs=0.01), name
+            assert interval.high == pytest.approx(high, abs=0.01), name
+
+    def test_reproducible(self, predictions):
+        """Test that a seed gives the same intervals, chunked or in worker processes."""
+        y_true, y_pred, _, _ = predictions
+
+        first = bootstrap(y_true, y_pred, n_resamples=300, seed=3, chunk_size=64)
+        parallel = bootstrap(y_true, y_pred, n_resamples=300, seed=3, chunk_size=64, n_jobs=2)
+
+        assert first == parallel
+        assert "roc_auc" not in first
+        assert bootstrap(y_true, y_pred, n_resamples=300, seed=4, chunk_size=64) != first
+
+    def test_multiclass(self):
+        """Test string labels of several classes, with class scores."""
+        rng = np.random.default_rng(5)
+        labels = np.array(["bird", "cat", "dog"])
+        y_true = labels[rng.integers(0, 3, 300)]
+        scores = rng.dirichlet([1, 1, 1], 300)
+
+        intervals = bootstrap(
+            y_true, labels[scores.argmax(axis=1)], scores, metrics=["roc_auc"], seed=0
+        )
+
+        assert list(intervals) == ["roc_auc"]
+        assert intervals["roc_auc"].low < 0.5 < intervals["roc_auc"].high
+
+    def test_errors(self, predictions):
+        """Test unknown metrics and ROC AUC without scores."""
+        y_true, y_pred, _, _ = predictions
+        with pytest.raises(ValueError, match="Unknown metric"):
+            bootstrap(y_true, y_pred, metrics=["auc"])
+        with pytest.raises(ValueError, match="requires scores"):
+            bootstrap(y_true, y_pred, metrics=["roc_auc"])
+        with pytest.raises(ValueError, match="empty"):
+            bootstrap([], [], classes=[0, 1])
+
+
+class TestPairedBootstrap:
+    """Test confidence intervals of a model's improvement over a baseline."""
+
+    def test_improvement(self, predictions):
+        """Test that a clearly better model has a positive interval and a small p-value."""
+        y_true, y_pred, baseline_pred, _ = predictions
+
+        intervals = paired_bootstrap(y_true, y_pred, baseline_pred, seed=0)
+
+        accuracy = intervals["accuracy"]
+        assert accuracy.estimate == pytest.approx(
+            np.mean(y_pred == y_true) - np.mean(baseline_pred == y_true)
+        )
+        assert 0 < accuracy.low < accuracy.estimate < accuracy.high
+        assert accuracy.p_value < 0.05
+
+    def test_same_predictions(self, predictions):
+        """Test that identical predictions differ by exactly zero on every resample."""
+        y_true, y_pred, _, y_score = predictions
+
+        intervals = paired_bootstrap(
+            y_true, y_pred, y_pred, y_score, y_score, n_resamples=100, seed=0
+        )
+
+        for interval in intervals.values():
+            assert (interval.estimate, interval.low, interval.high) == (0.0, 0.0, 0.0)
+            assert interval.p_value == 1.0
+
+    def test_scores_for_both(self, predictions):
+        """Test that scores are required for both models or neither."""
+        y_true, y_pred, baseline_pred, y_score = predictions
+        with pytest.raises(ValueError, match="both"):
+            paired_bootstrap(y_true, y_pred, baseline_pred, y_score)
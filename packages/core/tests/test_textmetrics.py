@@ -0,0 +1,173 @@
+"""Tests for the text-generation metrics, against per-pair implementations."""
+
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+from ai_kit_core.textmetrics import Normalizer, text_metrics
+
+
+def random_texts(rng, n, max_length, vocabulary="abcdef"):
+    return [
+        " ".join(rng.choice(list(vocabulary), rng.integers(0, max_length + 1))) for _ in range(n)
+    ]
+
+
+def ngrams(items, order):
+    return Counter(tuple(items[i : i + order]) for i in range(len(items) - order + 1))
+
+
+def clipped(prediction, reference, order):
+    return sum((ngrams(prediction, order) & ngrams(reference, order)).values())
+
+
+def lcs(a, b):
+    table = np.zeros((len(a) + 1, len(b) + 1), dtype=int)
+    for i, x in enumerate(a):
+        for j, y in enumerate(b):
+            table[i + 1, j + 1] = (
+                table[i, j] + 1 if x == y else max(table[i, j + 1], table[i + 1, j])
+            )
+    return table[-1, -1]
+
+
+def chrf(prediction, reference, beta=2.0):
+    precisions, recalls = [], []
+    for order in range(1, 7):
+        hyp, ref = ngrams(prediction, order), ngrams(reference, order)
+        if hyp and ref:
+            matches = sum((hyp & ref).values())
+            precisions.append(matches / sum(hyp.values()))
+            recalls.append(matches / sum(ref.values()))
+    if not precisions:
+        return 0.0
+    p, r = sum(precisions) / len(precisions), sum(recalls) / len(recalls)
+    return (1 + beta**2) * p * r / (beta**2 * p + r) if p + r else 0.0
+
+
+class TestNormalizer:
+    """Test French normalization."""
+
+    def test_elisions_and_apostrophes(self):
+        """Test that elided words are split, whatever the apostrophe."""
+        assert Normalizer().tokenize("Lorsqu’on l'a vu, c'était aujourd'hui.") == [
+            "lorsqu'",
+            "on",
+            "l'",
+            "a",
+            "vu",
+            "c'",
+            "était",
+            "aujourd",
+            "hui",
+        ]
+
+    def test_options(self):
+        """Test accents, case, punctuation and articles."""
+        text = "Les Œufs de l'Élève !"
+
+        assert Normalizer(strip_accents=True).tokenize(text) == [
+            "les",
+            "oeufs",
+            "de",
+            "l'",
+            "eleve",
+        ]
+        assert Normalizer(lowercase=False, keep_punctuation=True).tokenize(text) == [
+            "Les",
+            "Œufs",
+            "de",
+            "l'",
+            "Élève",
+            "!",
+        ]
+        assert Normalizer(drop_articles=True).tokenize(text) == ["œufs", "de", "élève"]
+
+
+class TestTextMetrics:
+    """Test the metrics against per-pair implementations."""
+
+    def test_ngram_statistics(self):
+        """Test clipped n-gram matches of words and characters."""
+        rng = np.random.default_rng(0)
+        predictions, references = random_texts(rng, 300, 12), random_texts(rng, 300, 12)
+
+        scores = text_metrics(predictions, references, chunk_size=128)
+
+        for i, (prediction, reference) in enumerate(zip(predictions, references, strict=True)):
+            words, reference_words = prediction.split(), reference.split()
+            for order in range(1, 5):
+                assert scores.word_matches[order - 1, i] == clipped(words, reference_words, order)
+                assert scores.word_predicted[order - 1, i] == max(len(words) - order + 1, 0)
+            assert scores.chrf[i] == pytest.approx(
+                chrf(prediction.replace(" ", ""), reference.replace(" ", ""))
+            )
+        assert np.array_equal(scores.exact, np.array(predictions) == np.array(references))
+
+    def test_chrf_averages_precision_and_recall(self):
+        """Test chrF as one F-score of the precision and recall averaged over orders."""
+        scores = text_metrics(["bonjour"], ["bonsoir à tous"])
+
+        assert scores.chrf[0] == pytest.approx(0.159473, abs=1e-6)
+        assert scores.corpus_chrf == pytest.approx(0.159473, abs=1e-6)
+
+    def test_rouge_l(self):
+        """Test longest common subsequences, including references over 64 tokens."""
+        rng = np.random.default_rng(1)
+        predictions = random_texts(rng, 200, 150, "abc")
+        references = random_texts(rng, 200, 150, "abc")
+
+        scores = text_metrics(predictions, references)
+
+        expected = [lcs(p.split(), r.split()) for p, r in zip(predictions, references, strict=True)]
+        assert scores.lcs.tolist() == expected
+
+    def test_bleu(self):
+        """Test sentence BLEU with smoothing and brevity penalty."""
+        scores = text_metrics(
+            ["le chat est sur le tapis", "le chat", "chien"],
+            ["le chat est sur le tapis", "le chat est là", "le chat"],
+        )
+
+        # Second pair: precisions 2/2 and 1/1 (effective order 2), brevity exp(1 - 4/2)
+        # Third pair: no unigram match, smoothed to 1 / (2 * 1)
+        assert scores.bleu == pytest.approx([1.0, math.exp(1 - 4 / 2), 0.5 * math.exp(1 - 2)])
+        assert scores.corpus_bleu < 1.0
+        assert text_metrics(["a b c d"], ["a b c d"]).corpus_bleu == pytest.approx(1.0)
+
+    def test_f1_and_empty_texts(self):
+        """Test token F1, and scores of empty texts."""
+        scores = text_metrics(["", "", "un deux trois", "Bonjour !"], ["", "x", "deux trois", "!"])
+
+        assert scores.f1.tolist() == pytest.approx([1.0, 0.0, 0.8, 0.0])
+        assert scores.exact_match.tolist() == [1.0, 0.0, 0.0, 0.0]
+        assert scores.bleu[:2].tolist() == [0.0, 0.0]
+        assert scores.rouge_l[:2].tolist() == [0.0, 0.0]
+
+    def test_summary(self):
+        """Test corpus scores of identical texts."""
+        texts = ["la réponse est quarante-deux", "Paris est la capitale de la France"]
+
+        summary = text_metrics(texts, texts).summary()
+
+        assert summary == pytest.approx(
+            {"n_pairs": 2, "exact_match": 1.0, "f1": 1.0, "bleu": 1.0, "rouge_l": 1.0, "chrf": 1.0}
+        )
+
+    def test_process_pool(self):
+        """Test that worker processes give the same scores."""
+        rng = np.random.default_rng(2)
+        predictions, references = random_texts(rng, 500, 20), random_texts(rng, 500, 20)
+
+        serial = text_metrics(predictions, references)
+        parallel = text_metrics(predictions, references, chunk_size=100, n_jobs=2)
+
+        assert parallel.summary() == pytest.approx(serial.summary())
+        assert np.array_equal(parallel.lcs, serial.lcs)
+        assert np.allclose(parallel.chrf, serial.chrf)
+
+    def test_length_mismatch(self):
+        """Test that predictions and references must pair up."""
+        with pytest.raises(ValueError, match="references"):
+            text_metrics(["a"], [])